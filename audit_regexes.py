@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Backtracking audit for every parser regex
+Runs the guarded lionpath patterns, plus the patterns the scraper profiles pass to re directly, against
+generated worst-case inputs with a time bound; exits non-zero if any pattern fails
+"""
+
+import argparse
+import ast
+import re
+import sys
+import time
+from pathlib import Path
+
+import lionpath.parsers  # registers the guarded parser patterns
+from lionpath.regex_guard import AUDIT_SIZES, DEFAULT_BUDGET, PATTERNS, PatternTimer, audit_pattern
+
+PROFILE_FILES = ['scraper.py', 'scraper_enhanced.py', 'scraper_enhanced_v2.py', 'scraper_comprehensive.py',
+                 'scraper_optimized.py']
+RE_FUNCTIONS = {'compile': 1, 'search': 2, 'match': 2, 'fullmatch': 2, 'findall': 2, 'finditer': 2,
+                'sub': 4, 'subn': 4, 'split': 3}
+# Stands in for values interpolated into f-string patterns (class numbers, field names)
+PLACEHOLDER = '12345'
+
+def string_value(node):
+    """A str constant, or an f-string with its interpolated values replaced by a placeholder"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return ''.join(part.value if isinstance(part, ast.Constant) else PLACEHOLDER for part in node.values)
+    return None
+
+def string_values(node):
+    """Every pattern string in a constant, f-string, or a list/tuple/dict of them"""
+    value = string_value(node)
+    if value is not None:
+        return [value]
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [v for element in node.elts for v in string_values(element)]
+    if isinstance(node, ast.Dict):
+        return [v for element in node.values for v in string_values(element)]
+    return []
+
+def flags_value(node):
+    """Evaluate re.I | re.DOTALL style flag expressions"""
+    if node is None:
+        return 0
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 're':
+        return int(getattr(re, node.attr, 0))
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return flags_value(node.left) | flags_value(node.right)
+    return 0
+
+def profile_patterns(path):
+    """(pattern, flags, location) for every re call in a file whose pattern can be resolved statically"""
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'))
+
+    # Names bound to pattern strings (or lists of them), directly or as a for-loop variable
+    bindings = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    bindings.setdefault(target.id, []).extend(string_values(node.value))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.For) and isinstance(node.iter, ast.Name):
+            names = [node.target] if isinstance(node.target, ast.Name) else getattr(node.target, 'elts', [])
+            for name in names:
+                if isinstance(name, ast.Name):
+                    bindings.setdefault(name.id, []).extend(bindings.get(node.iter.id, []))
+
+    found = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.value.id == 're'
+                and node.func.attr in RE_FUNCTIONS and node.args):
+            continue
+        flag_index = RE_FUNCTIONS[node.func.attr]
+        flags_node = node.args[flag_index] if len(node.args) > flag_index else next(
+            (k.value for k in node.keywords if k.arg == 'flags'), None)
+        first = node.args[0]
+        patterns = string_values(first) or (bindings.get(first.id, []) if isinstance(first, ast.Name) else [])
+        for pattern in patterns:
+            found.append((pattern, flags_value(flags_node), f"{path}:{node.lineno}"))
+    return found
+
+def main():
+    """Run the audit"""
+    parser = argparse.ArgumentParser(description='Audit parser regexes for catastrophic backtracking')
+    parser.add_argument('--bound', type=float, default=DEFAULT_BUDGET, help='Seconds allowed per call')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in AUDIT_SIZES),
+                        help='Worst-case input sizes in characters (comma-separated, each 4x the last)')
+    parser.add_argument('--registered-only', action='store_true', help='Only audit the guarded lionpath patterns')
+    args = parser.parse_args()
+    sizes = tuple(int(size) for size in args.sizes.split(','))
+
+    targets = {}
+    for name, guarded in PATTERNS.items():
+        targets.setdefault((guarded.pattern, guarded.flags), name)
+    if not args.registered_only:
+        root = Path(__file__).parent
+        for profile in PROFILE_FILES:
+            for pattern, flags, location in profile_patterns(root / profile):
+                targets.setdefault((pattern, flags), Path(location).name)
+
+    print(f"🔍 Auditing {len(targets)} patterns (bound {args.bound}s, sizes {sizes})")
+    failures = 0
+    started = time.perf_counter()
+    with PatternTimer() as timer:
+        for (pattern, flags), label in targets.items():
+            result = audit_pattern(pattern, flags, sizes, args.bound, timer)
+            if result['ok']:
+                print(f"✅ {label:<36} {result['seconds'] * 1000:8.2f} ms  x{result['growth']:<5.1f} {pattern[:60]}")
+            else:
+                failures += 1
+                print(f"❌ {label:<36} {result['error']}\n   {pattern}")
+
+    print(f"📊 {len(targets) - failures} passed, {failures} failed in {time.perf_counter() - started:.1f}s")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
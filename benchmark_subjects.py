@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Subject list extraction benchmark
+Times the single-pass PTS_SELECT scanner against the previous backreference regexes on the real search
+page (saved or archived) and on adversarial pages of growing size, to show the scan stays linear
+"""
+
+import argparse
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from lionpath import ResponseArchive, SEARCH_URL, parse_subject_list
+from lionpath.parsers import _subject_entry
+
+LEGACY_PATTERNS = [
+    r'<input[^>]*id="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*id="PTS_SELECT_LBL\$\1"[^>]*>([^<]+)</label>',
+    r'<input[^>]*name="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*for="PTS_SELECT\$\1"[^>]*>([^<]+)</label>',
+    r'<input[^>]*id="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*>([^<]*)</label>',
+    r"<label[^>]*for=['\"]PTS_SELECT\$(\d+)['\"][^>]*>([^<]+)</label>",
+    r"<input[^>]*id=['\"]PTS_SELECT\$(\d+)['\"][^>]*title=\"([^\"]+)\"",
+]
+
+def legacy_parse_subject_list(html_text):
+    """The previous extractor: DOTALL backreference patterns, then a full BeautifulSoup parse"""
+    subjects = []
+    for pattern in LEGACY_PATTERNS:
+        for checkbox_num, label_text in re.findall(pattern, html_text, re.DOTALL | re.IGNORECASE):
+            entry = _subject_entry(checkbox_num, label_text)
+            if entry:
+                subjects.append(entry)
+        if subjects:
+            break
+
+    if not subjects:
+        soup = BeautifulSoup(html_text, 'html.parser')
+        for checkbox in soup.find_all('input', {'id': re.compile(r'PTS_SELECT\$\d+')}):
+            checkbox_num = checkbox.get('id', '').split('$')[-1]
+            label = soup.find('label', {'id': f'PTS_SELECT_LBL${checkbox_num}'})
+            if label:
+                entry = _subject_entry(checkbox_num, label.get_text(strip=True))
+                if entry:
+                    subjects.append(entry)
+
+    unique_subjects = {}
+    for subject in subjects:
+        unique_subjects.setdefault(subject['code'], subject)
+    return sorted(unique_subjects.values(), key=lambda x: x['code'])
+
+def synthetic_search_page(subjects=280, padding=600):
+    """A search page shaped like LionPath's: PeopleSoft boilerplate around one checkbox and label per subject"""
+    filler = '<div class="ps_box-group"><span class="ps-text">&nbsp;</span></div>' * padding
+    rows = ''.join(
+        f'<div class="ps_box-checkbox"><input type="checkbox" id="PTS_SELECT${i}" name="PTS_SELECT${i}" '
+        f'value="Y" class="ps-checkbox"><label id="PTS_SELECT_LBL${i}" for="PTS_SELECT${i}" '
+        f'class="ps-label">S{chr(65 + i % 26)}{chr(65 + i // 26 % 26)} / Subject {i}</label></div>'
+        for i in range(subjects)
+    )
+    return f'<html><body><form>{filler}{rows}{filler}</form></body></html>'
+
+def adversarial_pages(size):
+    """Pages of roughly size bytes built to make the old patterns backtrack"""
+    unit = '<input id="PTS_SELECT$1" type="checkbox">'
+    return {
+        # Every checkbox starts a lazy scan to the end of the page looking for its label
+        'unlabeled checkboxes': unit * (size // len(unit)),
+        # [^>]* runs to the end of the page from every tag start
+        'unclosed tags': '<input id="PTS_SELECT$1" ' * (size // 25),
+        # Labels that never close, after one checkbox whose label scan runs past all of them
+        'unclosed labels': '<input id="PTS_SELECT$7">' + '<label id="PTS_SELECT_LBL$7">X' * (size // 31),
+    }
+
+def best_time(function, html_text, repeat):
+    """Best wall time of several runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(html_text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def report(label, html_text, repeat, legacy):
+    """Print scanner (and optionally legacy) timings for one page"""
+    scan = best_time(parse_subject_list, html_text, repeat)
+    line = f"{label:<34} {len(html_text) / 1024:8.0f} KB  scan {scan * 1000:9.2f} ms"
+    if legacy:
+        old = best_time(legacy_parse_subject_list, html_text, 1)
+        line += f"  legacy {old * 1000:10.2f} ms  ({old / scan:6.1f}x)"
+    print(line)
+
+def archived_search_page(path):
+    """Latest search page GET in a response archive"""
+    archive = ResponseArchive(path)
+    try:
+        pages = [r for r in archive.records.values() if r['method'] == 'GET' and r['url'].startswith(SEARCH_URL)]
+        if not pages:
+            return None
+        return archive.body(max(pages, key=lambda r: r['recorded_at'])).decode('utf-8', errors='replace')
+    finally:
+        archive.close()
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark subject list extraction')
+    parser.add_argument('--page', help='Saved class search page HTML')
+    parser.add_argument('--archive', help='Response archive to take the latest class search page from')
+    parser.add_argument('--sizes', default='8,64,512,4096', help='Adversarial page sizes in KB (comma-separated)')
+    parser.add_argument('--legacy-max-kb', type=int, default=8,
+                        help='Skip the old regexes on adversarial pages larger than this (they grow quadratically)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    pages = {'synthetic search page': synthetic_search_page()}
+    if args.page:
+        with open(args.page, 'r', encoding='utf-8', errors='replace') as f:
+            pages['saved search page'] = f.read()
+    if args.archive:
+        archived = archived_search_page(args.archive)
+        if archived:
+            pages['archived search page'] = archived
+        else:
+            print(f"No search page in {args.archive}")
+
+    for label, html_text in pages.items():
+        scanned = parse_subject_list(html_text)
+        legacy = legacy_parse_subject_list(html_text)
+        match = 'same' if scanned == legacy else 'DIFFERENT'
+        print(f"📄 {label}: {len(scanned)} subjects ({match} as legacy)")
+        report(label, html_text, args.repeat, legacy=True)
+
+    print("-" * 90)
+    for size_kb in (int(size) for size in args.sizes.split(',')):
+        for label, html_text in adversarial_pages(size_kb * 1024).items():
+            report(label, html_text, args.repeat, legacy=size_kb <= args.legacy_max_kb)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Write-throughput benchmark for the optimized scraper output writers
+Builds a synthetic catalog and measures MB/s for each serialization path
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict
+
+from lionpath import writers
+from lionpath import (
+    CourseInfo,
+    SectionInfo,
+    OptimizedCourseData,
+    course_data_to_record,
+    save_optimized_results
+)
+
+DAYS = ['MoWeFr', 'TuTh', 'MoWe', 'Fr', 'TuThFr']
+TIMES = ['8:00AM - 8:50AM', '10:10AM - 11:00AM', '1:25PM - 2:40PM', '3:05PM - 4:20PM']
+
+def build_synthetic_catalog(total_sections: int = 30000, sections_per_course: int = 6, seed: int = 42):
+    """Build a synthetic catalog with realistic field sizes"""
+    rng = random.Random(seed)
+    courses_data = {}
+    course_count = max(1, total_sections // sections_per_course)
+
+    for i in range(course_count):
+        subject = f"SUB{i % 200:03d}"
+        course_code = f"{subject} {100 + i}"
+        course_info = CourseInfo(
+            course_code=course_code,
+            course_title=f"Synthetic Course {i}",
+            subject=subject,
+            catalog_number=str(100 + i),
+            units="3.00",
+            career="Undergraduate",
+            grading="Undergraduate Standard Grades",
+            component="Lecture",
+            course_description=" ".join(rng.choice(['theory', 'practice', 'analysis', 'design', 'systems'])
+                                        for _ in range(60)),
+            enrollment_requirements=f"Prerequisite: {subject} {rng.randint(1, 99)}",
+            class_attributes=["GenEd: GQ", "Writing Across the Curriculum"],
+            academic_organization="Synthetic Department",
+            semester="Fall 2025"
+        )
+
+        sections = []
+        for j in range(sections_per_course):
+            times = rng.choice(TIMES)
+            capacity = rng.randint(20, 300)
+            enrolled = rng.randint(0, capacity)
+            sections.append(SectionInfo(
+                section=f"{j + 1:03d}",
+                class_number=str(10000 + i * sections_per_course + j),
+                section_type="Lecture",
+                days=rng.choice(DAYS),
+                times=times,
+                start_time=times.split(' - ')[0],
+                end_time=times.split(' - ')[1],
+                campus="UP",
+                building="Willard",
+                room=f"WILLARD {rng.randint(1, 400)}",
+                instruction_mode="In Person",
+                instructor="Smith, Jane",
+                class_capacity=capacity,
+                enrollment_total=enrolled,
+                available_seats=capacity - enrolled,
+                status="Open" if enrolled < capacity else "Closed",
+                reserve_capacity=[{'reserved_for': 'Majors', 'capacity': 10, 'enrollment_total': 4}],
+                exam_schedule=[{'date': '12/15/2025', 'time': '8:00AM - 9:50AM'}],
+                course_url=f"showClassDetails(2258,{10000 + i * sections_per_course + j})"
+            ))
+
+        courses_data[course_code] = OptimizedCourseData(course_info=course_info, sections=sections)
+
+    return courses_data
+
+def save_with_asdict(courses_data, output_file):
+    """The previous writer: asdict() per object and json.dump straight to the file"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for course_data in courses_data.values():
+            record = {
+                'course': asdict(course_data.course_info),
+                'sections': [asdict(section) for section in course_data.sections],
+                'stats': course_data_to_record(course_data)['stats']
+            }
+            json.dump(record, f, ensure_ascii=False, separators=(',', ':'))
+            f.write('\n')
+
+def time_writer(label, writer, courses_data, output_file, repeat):
+    """Run a writer several times and report the best throughput"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        writer(courses_data, output_file)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    size_mb = os.path.getsize(output_file) / (1024 * 1024)
+    print(f"{label:<28} {size_mb:8.2f} MB {best:8.3f} s {size_mb / best:9.1f} MB/s")
+    return size_mb / best
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark optimized output writers')
+    parser.add_argument('--sections', type=int, default=30000, help='Number of synthetic sections')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per writer (best is reported)')
+    args = parser.parse_args()
+
+    courses_data = build_synthetic_catalog(args.sections)
+    print(f"📊 Synthetic catalog: {len(courses_data)} courses, {args.sections} sections")
+    print("-" * 60)
+
+    orjson_module = writers.orjson
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = os.path.join(temp_dir, 'bench.jsonl')
+
+        time_writer("asdict + json.dump (old)", save_with_asdict, courses_data, output_file, args.repeat)
+
+        writers.orjson = None
+        try:
+            time_writer("field walk + stdlib json",
+                        lambda data, path: save_optimized_results(data, path, 'jsonl'),
+                        courses_data, output_file, args.repeat)
+        finally:
+            writers.orjson = orjson_module
+
+        if orjson_module is not None:
+            time_writer("field walk + orjson",
+                        lambda data, path: save_optimized_results(data, path, 'jsonl'),
+                        courses_data, output_file, args.repeat)
+        else:
+            print("orjson not installed; skipping orjson path")
+
+if __name__ == "__main__":
+    main()
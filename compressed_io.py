@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Transparent streaming compression for scraper output files
+The codec is chosen from the file extension: .gz uses gzip, .zst uses zstandard, anything else is plain
+"""
+
+import gzip
+import io
+import json
+from typing import Any, Dict, Iterator, Optional, BinaryIO
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_SUFFIXES = ('.gz', '.gzip')
+ZSTD_SUFFIXES = ('.zst', '.zstd')
+
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_ZSTD_LEVEL = 10
+
+def compression_for_path(path: str) -> Optional[str]:
+    """Return 'gzip', 'zstd' or None based on the file extension"""
+    lowered = str(path).lower()
+    if lowered.endswith(GZIP_SUFFIXES):
+        return 'gzip'
+    if lowered.endswith(ZSTD_SUFFIXES):
+        return 'zstd'
+    return None
+
+def strip_compression_suffix(path: str) -> str:
+    """Return the path without a trailing compression extension (data.jsonl.gz -> data.jsonl)"""
+    path = str(path)
+    for suffix in GZIP_SUFFIXES + ZSTD_SUFFIXES:
+        if path.lower().endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("Writing or reading .zst files requires the 'zstandard' package (pip install zstandard)")
+
+def open_output_stream(path: str, compression_level: Optional[int] = None) -> BinaryIO:
+    """Open a binary stream for writing, compressing on the fly when the extension asks for it"""
+    compression = compression_for_path(path)
+
+    if compression == 'gzip':
+        level = DEFAULT_GZIP_LEVEL if compression_level is None else compression_level
+        # mtime=0 keeps output byte-identical for identical data, so unchanged snapshots diff cleanly
+        return gzip.GzipFile(filename=path, mode='wb', compresslevel=level, mtime=0)
+
+    if compression == 'zstd':
+        _require_zstandard()
+        level = DEFAULT_ZSTD_LEVEL if compression_level is None else compression_level
+        compressor = zstandard.ZstdCompressor(level=level)
+        return compressor.stream_writer(open(path, 'wb'), closefd=True)
+
+    return open(path, 'wb', buffering=1024 * 1024)
+
+def open_input_stream(path: str) -> BinaryIO:
+    """Open a binary stream for reading, decompressing on the fly based on the extension"""
+    compression = compression_for_path(path)
+
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+
+    if compression == 'zstd':
+        _require_zstandard()
+        decompressor = zstandard.ZstdDecompressor()
+        return io.BufferedReader(decompressor.stream_reader(open(path, 'rb'), closefd=True))
+
+    return open(path, 'rb', buffering=1024 * 1024)
+
+def open_text_output(path: str, compression_level: Optional[int] = None, newline: Optional[str] = None):
+    """Open a text (UTF-8) stream for writing with transparent compression"""
+    return io.TextIOWrapper(open_output_stream(path, compression_level), encoding='utf-8', newline=newline)
+
+def open_text_input(path: str, newline: Optional[str] = None):
+    """Open a text (UTF-8) stream for reading with transparent decompression"""
+    return io.TextIOWrapper(open_input_stream(path), encoding='utf-8', newline=newline)
+
+def iter_jsonl_lines(path: str) -> Iterator[bytes]:
+    """Yield raw non-empty lines from a (possibly compressed) JSONL file without loading it all"""
+    with open_input_stream(path) as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+def iter_jsonl_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield decoded records from a (possibly compressed) JSONL file one at a time"""
+    for line in iter_jsonl_lines(path):
+        yield json.loads(line)
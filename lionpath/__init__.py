@@ -0,0 +1,133 @@
+"""
+LionPath scraper core
+One fetch engine, one parser library and one set of writers shared by every scraper profile
+(scraper.py, scraper_enhanced.py, scraper_enhanced_v2.py, scraper_comprehensive.py, scraper_optimized.py)
+"""
+
+from .models import CourseInfo, SectionInfo, OptimizedCourseData
+from .archive import ResponseArchive, ArchiveAdapter, request_key
+from .engine import (
+    LionPathEngine,
+    BASE_URL,
+    SEARCH_URL,
+    DETAIL_URL,
+    TERM_FORM_FIELD,
+    CAMPUS_FORM_FIELD,
+    CAREER_FORM_FIELD,
+    CATALOG_FORM_FIELD,
+)
+from .terms import DEFAULT_TERM, parse_term, parse_terms, term_name, term_from_url, term_output_path
+from .parsers import (
+    is_university_park,
+    parse_listing_text,
+    find_section_links,
+    find_section_rows,
+    parse_listing_row,
+    listing_missing_fields,
+    extract_form_data,
+    parse_subject_list,
+    DetailPage,
+    extract_field_value,
+    extract_course_description,
+    extract_class_attributes,
+    parse_course_level_info,
+    parse_listing_sections,
+    parse_enrollment_fields,
+    CAREERS,
+    career_code,
+    detect_career,
+    detail_page_is_empty,
+    days_to_mask,
+    mask_to_days,
+    normalize_meeting_time,
+)
+from .singleflight import SingleFlight
+from .regex_guard import guard, regex_metrics, regex_incidents, audit_pattern, audit_registered
+from .reparse import ArchiveReparser
+from .search import SearchIndex, build_search_index, search_index_path
+from .schedule import ScheduleIndex, busy_block, sections_conflict
+from .prereqs import PrerequisiteGraph, parse_prerequisites, graph_path
+from .reader import iter_courses, decode_record, load_offsets, offsets_path
+from .writers import (
+    course_data_to_record,
+    dumps_record,
+    save_optimized_results,
+    save_course_batches,
+    load_optimized_results,
+    save_record_list,
+    save_flat_results,
+    save_sqlite_results,
+)
+
+__all__ = [
+    'CourseInfo',
+    'SectionInfo',
+    'OptimizedCourseData',
+    'ResponseArchive',
+    'ArchiveAdapter',
+    'request_key',
+    'LionPathEngine',
+    'BASE_URL',
+    'SEARCH_URL',
+    'DETAIL_URL',
+    'TERM_FORM_FIELD',
+    'CAMPUS_FORM_FIELD',
+    'CAREER_FORM_FIELD',
+    'CATALOG_FORM_FIELD',
+    'DEFAULT_TERM',
+    'parse_term',
+    'parse_terms',
+    'term_name',
+    'term_from_url',
+    'term_output_path',
+    'is_university_park',
+    'parse_listing_text',
+    'find_section_links',
+    'find_section_rows',
+    'parse_listing_row',
+    'listing_missing_fields',
+    'extract_form_data',
+    'parse_subject_list',
+    'DetailPage',
+    'extract_field_value',
+    'extract_course_description',
+    'extract_class_attributes',
+    'parse_course_level_info',
+    'parse_listing_sections',
+    'parse_enrollment_fields',
+    'CAREERS',
+    'career_code',
+    'detect_career',
+    'detail_page_is_empty',
+    'days_to_mask',
+    'mask_to_days',
+    'normalize_meeting_time',
+    'SingleFlight',
+    'guard',
+    'regex_metrics',
+    'regex_incidents',
+    'audit_pattern',
+    'audit_registered',
+    'ArchiveReparser',
+    'SearchIndex',
+    'build_search_index',
+    'search_index_path',
+    'ScheduleIndex',
+    'busy_block',
+    'sections_conflict',
+    'PrerequisiteGraph',
+    'parse_prerequisites',
+    'graph_path',
+    'iter_courses',
+    'decode_record',
+    'load_offsets',
+    'offsets_path',
+    'course_data_to_record',
+    'dumps_record',
+    'save_optimized_results',
+    'save_course_batches',
+    'load_optimized_results',
+    'save_record_list',
+    'save_flat_results',
+    'save_sqlite_results',
+]
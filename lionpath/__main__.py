@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Command line tools built on the shared LionPath core
+Usage: python -m lionpath <command> [options]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from .engine import LionPathEngine
+from .archive import ResponseArchive
+from .prereqs import GRAPH_SUFFIX, PrerequisiteGraph, graph_path
+from .terms import DEFAULT_TERM, parse_term, parse_terms, term_name, term_output_path
+from .reparse import ArchiveReparser
+from .search import INDEX_SUFFIX, SearchIndex, search_index_path
+from .serve import SnapshotStore, make_server
+from .watch import EnrollmentWatcher, resolve_targets
+from .writers import load_optimized_results, save_course_batches
+
+logger = logging.getLogger('lionpath')
+
+def run_watch(args) -> int:
+    """Poll enrollment for the given class numbers/courses and print change events as JSON lines"""
+    engine = LionPathEngine(rate_limit_per_second=args.rate_limit, pool_size=args.max_workers, term=args.term)
+    events = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    watcher = EnrollmentWatcher(engine, min_interval=args.min_interval, max_interval=args.max_interval,
+                                max_workers=args.max_workers, events=events)
+    
+    try:
+        for target in resolve_targets(engine, args.targets, args.term, args.snapshot):
+            watcher.watch(target['class_number'], target['strm'], course_code=target['course_code'],
+                          section=target['section'], career=target.get('career', ''))
+        
+        if not watcher.entries:
+            logger.error("❌ No sections to watch")
+            return 1
+        
+        logger.info(f"👀 Watching {len(watcher.entries)} sections in {term_name(args.term)} "
+                    f"(polling every {args.min_interval}-{args.max_interval}s)")
+        watcher.run(duration=args.duration)
+    
+    except KeyboardInterrupt:
+        logger.info("⏹️ Watch stopped by user")
+    finally:
+        if events is not sys.stdout:
+            events.close()
+    
+    logger.info(f"📊 {watcher.stats['polls']} polls, {watcher.stats['events']} events, "
+                f"{watcher.stats['failed_polls']} failed")
+    return 0
+
+def run_serve(args) -> int:
+    """Serve the read-only query API over the latest snapshot until interrupted"""
+    store = SnapshotStore(args.snapshot, reload_interval=args.reload_interval)
+    if args.reload_interval:
+        store.watch()
+    
+    server = make_server(store, args.host, args.port)
+    logger.info(f"🌐 Serving {store.source} on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("⏹️ Server stopped by user")
+    finally:
+        server.server_close()
+    return 0
+
+def run_search(args) -> int:
+    """Print the best keyword matches from a search index"""
+    index_file = args.index if args.index.endswith(INDEX_SUFFIX) else search_index_path(args.index)
+    index = SearchIndex(index_file)
+    try:
+        for course_code, score in index.search(' '.join(args.query), limit=args.limit):
+            print(f"{score:8.3f}  {course_code}")
+    finally:
+        index.close()
+    return 0
+
+def run_prereqs(args) -> int:
+    """Print a course's prerequisite chain and what it unlocks, or what a set of taken courses opens up"""
+    if args.graph.endswith(GRAPH_SUFFIX):
+        graph = PrerequisiteGraph.load(args.graph)
+    elif os.path.exists(graph_path(args.graph)):
+        graph = PrerequisiteGraph.load(graph_path(args.graph))
+    else:
+        graph = PrerequisiteGraph.from_courses(load_optimized_results(args.graph))
+    
+    courses = [course.upper() for course in args.courses]
+    if args.after:
+        for course_code in graph.available_after(courses):
+            print(course_code)
+        return 0
+    
+    for course_code in courses:
+        print(f"{course_code} (level {graph.level(course_code)})")
+        print(f"  requires:     {', '.join(graph.prerequisites(course_code)) or '-'}")
+        print(f"  full chain:   {', '.join(graph.prerequisite_chain(course_code)) or '-'}")
+        print(f"  unlocks:      {', '.join(graph.unlocks(course_code)) or '-'}")
+        print(f"  leads to:     {', '.join(graph.leads_to(course_code)) or '-'}")
+    return 0
+
+def run_reparse(args) -> int:
+    """Re-derive snapshots from an archive with the current parsers, one output file per archived term"""
+    archive = ResponseArchive(args.archive)
+    try:
+        reparser = ArchiveReparser(archive, workers=args.workers, campus_filter=args.campus)
+        snapshots = reparser.reparse()
+    finally:
+        archive.close()
+    reparser.log_stats()
+    
+    if args.terms:
+        snapshots = {strm: courses for strm, courses in snapshots.items() if strm in args.terms}
+    if not snapshots:
+        logger.error(f"❌ No archived results pages in {args.archive}")
+        return 1
+    
+    for strm, subject_batches in sorted(snapshots.items()):
+        # A single term keeps the plain file name; several terms get one file per STRM
+        output_file = term_output_path(args.output, strm) if len(snapshots) > 1 else args.output
+        count = save_course_batches(subject_batches, output_file, args.format, args.compression_level,
+                                    search_index=args.search_index, prereq_graph=args.prereq_graph)
+        logger.info(f"💾 {term_name(strm)}: {count} courses saved to {output_file}")
+    return 0
+
+def main(argv=None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(prog='python -m lionpath', description='Penn State LionPath tools')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    watch_parser = subparsers.add_parser('watch', help='Poll seat availability and emit change events as JSON lines')
+    watch_parser.add_argument('targets', nargs='+', help='Class numbers (12345) or course codes ("CMPSC 131")')
+    watch_parser.add_argument('--term', type=parse_term, default=DEFAULT_TERM,
+                              help='Term as a STRM (2258) or name ("Fall 2025")')
+    watch_parser.add_argument('--snapshot', help='Optimized JSONL output used to resolve course codes and seed sections')
+    watch_parser.add_argument('--output', '-o', help='Append events to this file instead of stdout')
+    watch_parser.add_argument('--min-interval', type=float, default=2.0,
+                              help='Seconds between polls of full or nearly-full sections (default: 2)')
+    watch_parser.add_argument('--max-interval', type=float, default=60.0,
+                              help='Seconds between polls of sections with plenty of seats (default: 60)')
+    watch_parser.add_argument('--max-workers', type=int, default=8, help='Concurrent polls')
+    watch_parser.add_argument('--rate-limit', type=float, default=10, help='Requests per second limit')
+    watch_parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: run until interrupted)')
+    
+    serve_parser = subparsers.add_parser('serve', help='Serve a read-only JSON query API over a snapshot')
+    serve_parser.add_argument('snapshot', help='Optimized JSONL snapshot, or a directory (newest .jsonl[.gz|.zst] is served)')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8000, help='Port (default: 8000)')
+    serve_parser.add_argument('--reload-interval', type=float, default=5.0,
+                              help='Seconds between checks for a new snapshot; 0 disables hot reload (default: 5)')
+    
+    search_parser = subparsers.add_parser('search', help='Keyword search over a saved BM25 index')
+    search_parser.add_argument('index', help='Search index (.bm25) or the output file it was saved next to')
+    search_parser.add_argument('query', nargs='+', help='Keywords')
+    search_parser.add_argument('--limit', type=int, default=10, help='Number of results (default: 10)')
+    
+    prereqs_parser = subparsers.add_parser('prereqs', help='Prerequisite chains and what a course unlocks')
+    prereqs_parser.add_argument('graph', help='Saved prerequisite graph (.prereqs.json) or an optimized JSONL snapshot')
+    prereqs_parser.add_argument('courses', nargs='+', help='Course codes ("CMPSC 132")')
+    prereqs_parser.add_argument('--after', action='store_true',
+                                help='Treat the courses as taken and list everything they make available')
+    
+    reparse_parser = subparsers.add_parser('reparse', help='Rebuild a snapshot from a response archive with the current parsers')
+    reparse_parser.add_argument('archive', help='Archive directory written by --record')
+    reparse_parser.add_argument('--output', '-o', required=True,
+                                help='Output file; several archived terms get one file per STRM')
+    reparse_parser.add_argument('--format', choices=['jsonl', 'json', 'csv', 'sqlite'], default='jsonl', help='Output format')
+    reparse_parser.add_argument('--compression-level', type=int, help='Compression level for .gz/.zst output files')
+    reparse_parser.add_argument('--campus', '-c', default='UP', help='Campus filter (UP for University Park, ALL for all)')
+    reparse_parser.add_argument('--terms', type=parse_terms, help='Only rebuild these comma-separated terms')
+    reparse_parser.add_argument('--workers', type=int, help='Parser processes (default: one per core)')
+    reparse_parser.add_argument('--search-index', action='store_true', help='Also write a BM25 keyword search index')
+    reparse_parser.add_argument('--prereq-graph', action='store_true', help='Also write the prerequisite graph')
+    
+    args = parser.parse_args(argv)
+    
+    # Events own stdout, so logs go to stderr
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+    
+    if args.command == 'watch':
+        return run_watch(args)
+    if args.command == 'serve':
+        return run_serve(args)
+    if args.command == 'search':
+        return run_search(args)
+    if args.command == 'prereqs':
+        return run_prereqs(args)
+    if args.command == 'reparse':
+        return run_reparse(args)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Record/replay archive of raw LionPath responses
+Recording appends every response (request key, status, headers, compressed body) to an append-only
+archive with bodies deduplicated by content hash; replay serves the same responses with no network
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+RECORDS_FILE = 'records.jsonl'
+BODIES_FILE = 'bodies.bin'
+
+# PeopleSoft state fields change on every page load; keying on them would make no replayed post match
+VOLATILE_FORM_PREFIX = 'IC'
+KEPT_FORM_FIELDS = frozenset(['ICAction'])
+# The stored body is already decoded, so transfer headers no longer describe it
+DROPPED_HEADERS = frozenset(['content-encoding', 'content-length', 'transfer-encoding', 'set-cookie'])
+
+def request_key(method: str, url: str, body: Any = None) -> str:
+    """Stable key for a request: method, URL path, sorted query and the non-volatile form fields"""
+    parts = urlsplit(url)
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    form = sorted(
+        (name, value) for name, value in parse_qsl(body or '', keep_blank_values=True)
+        if not name.startswith(VOLATILE_FORM_PREFIX) or name in KEPT_FORM_FIELDS
+    )
+    
+    material = json.dumps([method.upper(), f"{parts.scheme}://{parts.netloc}{parts.path}", query, form],
+                          separators=(',', ':'))
+    return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+class ResponseArchive:
+    """Directory with an append-only records log and an append-only deduplicated body store
+    
+    records.jsonl: one line per recorded response (key, method, url, status, headers, digest, offset, length)
+    bodies.bin:    zlib-compressed bodies, each stored once however many responses share it
+    """
+    
+    def __init__(self, path: str, writable: bool = False):
+        self.path = path
+        self.writable = writable
+        self.lock = threading.Lock()
+        self.records: Dict[str, Dict[str, Any]] = {}  # key -> latest record
+        self.bodies: Dict[str, Tuple[int, int]] = {}  # digest -> (offset, length) in bodies.bin
+        
+        if writable:
+            os.makedirs(path, exist_ok=True)
+        elif not os.path.exists(os.path.join(path, RECORDS_FILE)):
+            raise FileNotFoundError(f"No response archive at {path}")
+        
+        for record in self.iter_records():
+            self.records[record['key']] = record
+            self.bodies[record['digest']] = (record['offset'], record['length'])
+        
+        self.records_out = open(os.path.join(path, RECORDS_FILE), 'a', encoding='utf-8') if writable else None
+        self.bodies_out = open(os.path.join(path, BODIES_FILE), 'ab') if writable else None
+        self.bodies_in = None
+    
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Every record in the log, oldest first"""
+        records_file = os.path.join(self.path, RECORDS_FILE)
+        if not os.path.exists(records_file):
+            return
+        with open(records_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    def close(self):
+        """Close the archive files"""
+        for handle in (self.records_out, self.bodies_out, self.bodies_in):
+            if handle is not None:
+                handle.close()
+        self.records_out = self.bodies_out = self.bodies_in = None
+    
+    def add(self, key: str, method: str, url: str, status: int, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+        """Append a response; the body is only written if no earlier response had the same bytes"""
+        digest = hashlib.sha1(body).hexdigest()
+        with self.lock:
+            if digest not in self.bodies:
+                compressed = zlib.compress(body, 6)
+                self.bodies_out.seek(0, os.SEEK_END)
+                offset = self.bodies_out.tell()
+                self.bodies_out.write(compressed)
+                self.bodies_out.flush()
+                self.bodies[digest] = (offset, len(compressed))
+            
+            offset, length = self.bodies[digest]
+            record = {
+                'key': key,
+                'method': method,
+                'url': url,
+                'status': status,
+                'headers': {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS},
+                'digest': digest,
+                'offset': offset,
+                'length': length,
+                'recorded_at': time.time(),
+            }
+            self.records_out.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self.records_out.flush()
+            self.records[key] = record
+            return record
+    
+    def body(self, record: Dict[str, Any]) -> bytes:
+        """Decompressed body of a record"""
+        with self.lock:
+            if self.bodies_in is None:
+                if self.bodies_out is not None:
+                    self.bodies_out.flush()
+                self.bodies_in = open(os.path.join(self.path, BODIES_FILE), 'rb')
+            self.bodies_in.seek(record['offset'])
+            compressed = self.bodies_in.read(record['length'])
+        return zlib.decompress(compressed)
+    
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Latest record for a request key"""
+        return self.records.get(key)
+    
+    def stats(self) -> Dict[str, int]:
+        """Record and unique-body counts"""
+        return {'records': len(self.records), 'bodies': len(self.bodies)}
+
+class ArchiveAdapter(HTTPAdapter):
+    """Transport adapter that records real responses into an archive, or replays them without a network"""
+    
+    def __init__(self, archive: ResponseArchive, replay: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+        self.replay = replay
+    
+    def send(self, request, **kwargs):
+        key = request_key(request.method, request.url, request.body)
+        
+        if self.replay:
+            record = self.archive.lookup(key)
+            if record is None:
+                raise requests.exceptions.ConnectionError(f"Not in archive: {request.method} {request.url}")
+            return self.build_replay_response(request, record)
+        
+        response = super().send(request, **kwargs)
+        self.archive.add(key, request.method, request.url, response.status_code, dict(response.headers),
+                         response.content)
+        return response
+    
+    def build_replay_response(self, request, record: Dict[str, Any]) -> requests.Response:
+        """Rebuild a requests.Response from an archived record"""
+        response = requests.Response()
+        response.status_code = record['status']
+        response.headers = CaseInsensitiveDict(record['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.archive.body(record)
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK' if record['status'] == 200 else ''
+        return response
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Fetch engine shared by the LionPath scrapers
+One session pool, one sliding-window rate limiter and one subject list fetch for every profile
+"""
+
+import copy
+import logging
+import time
+from queue import Queue, Empty, Full
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+
+from .archive import ArchiveAdapter, ResponseArchive
+from .parsers import CAREERS, detail_page_is_empty, extract_form_data, parse_subject_list
+from .terms import DEFAULT_TERM
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://public.lionpath.psu.edu"
+SEARCH_URL = f"{BASE_URL}/psc/CSPRD/EMPLOYEE/SA/c/PE_SR175_PUBLIC.PE_SR175_CLS_SRCH.GBL"
+DETAIL_URL = f"{BASE_URL}/psc/CSPRD/EMPLOYEE/SA/c/SA_LEARNER_SERVICES.SSR_SSENRL_DETAIL.GBL"
+SEARCH_PAGE_PARAMS = {'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'}
+
+# Term selector on the class search form; its value is a STRM such as 2258
+TERM_FORM_FIELD = 'CLASS_SRCH_WRK2_STRM$273$'
+
+# Campus criterion on the class search form; LionPath then lists only that campus's sections
+CAMPUS_FORM_FIELD = 'SSR_CLSRCH_WRK_CAMPUS$0'
+UNIVERSITY_PARK_CAMPUS = 'UP'
+
+# Criteria that narrow one subject's search: career, and a catalog number with a comparison
+CAREER_FORM_FIELD = 'SSR_CLSRCH_WRK_ACAD_CAREER$2'
+CATALOG_FORM_FIELD = 'SSR_CLSRCH_WRK_CATALOG_NBR$1'
+CATALOG_MATCH_FORM_FIELD = 'SSR_CLSRCH_WRK_SSR_EXACT_MATCH1$1'
+CATALOG_AT_MOST = 'T'
+CATALOG_AT_LEAST = 'G'
+
+SESSION_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Cache-Control': 'max-age=0',
+}
+
+class LionPathEngine:
+    """Session pool, rate limiting and subject discovery; scraper profiles subclass this"""
+    
+    def __init__(self, rate_limit_per_second: float = 20, pool_size: int = 16, request_timeout: float = 10,
+                 term: str = DEFAULT_TERM):
+        self.rate_limit_per_second = rate_limit_per_second
+        self.request_timeout = request_timeout
+        self.term = term
+        
+        # Campus sent with every subject search ('' searches all campuses)
+        self.campus = ''
+        
+        # Career that returned data for each (STRM, CLASS_NBR), so later fetches go straight to it; class
+        # numbers are only unique within a term, so a multi-term run must not carry one term's career over
+        self.class_careers = {}
+        
+        # Subject list is the same for every term, so it is fetched once and shared
+        self.subjects_cache = None
+        self.subjects_lock = Lock()
+        
+        # Rate limiting
+        self.last_request_times = []
+        self.request_lock = Lock()
+        
+        # Record/replay transport, mounted on every pooled session once use_archive is called
+        self.archive_adapter = None
+        self.replaying = False
+        
+        # Session pool
+        self.session_pool = Queue(maxsize=pool_size)
+        self.init_session_pool(pool_size)
+        
+        # URLs
+        self.base_url = BASE_URL
+        self.search_url = SEARCH_URL
+        self.detail_url = DETAIL_URL
+    
+    def new_session(self) -> requests.Session:
+        """Create a session with the standard browser headers"""
+        session = requests.Session()
+        session.headers.update(SESSION_HEADERS)
+        if self.archive_adapter is not None:
+            session.mount('https://', self.archive_adapter)
+            session.mount('http://', self.archive_adapter)
+        return session
+    
+    def init_session_pool(self, pool_size: int):
+        """Initialize a pool of session objects for reuse"""
+        for _ in range(pool_size):
+            self.session_pool.put(self.new_session())
+    
+    def get_session(self) -> requests.Session:
+        """Get a session from the pool, creating one if the pool is empty"""
+        try:
+            return self.session_pool.get_nowait()
+        except Empty:
+            return self.new_session()
+    
+    def return_session(self, session: requests.Session):
+        """Return a session to the pool (extra sessions are closed)"""
+        try:
+            self.session_pool.put_nowait(session)
+        except Full:
+            session.close()
+    
+    def use_archive(self, archive: ResponseArchive, replay: bool = False):
+        """Record every response into an archive, or answer every request from it (no network, no rate limit)"""
+        # One adapter serves every session, so its connection pool is sized for all of them
+        self.archive_adapter = ArchiveAdapter(archive, replay=replay, pool_maxsize=max(self.session_pool.maxsize, 10))
+        self.replaying = replay
+        
+        # Sessions already pooled get the adapter too
+        with self.session_pool.mutex:
+            for session in self.session_pool.queue:
+                session.mount('https://', self.archive_adapter)
+                session.mount('http://', self.archive_adapter)
+    
+    def rate_limited_request(self, method, *args, **kwargs):
+        """Make a request, allowing at most rate_limit_per_second requests in any one-second window"""
+        if self.replaying:
+            return method(*args, **kwargs)
+        
+        with self.request_lock:
+            now = time.time()
+            self.last_request_times = [t for t in self.last_request_times if now - t < 1.0]
+            
+            if len(self.last_request_times) >= self.rate_limit_per_second:
+                sleep_time = 1.0 - (now - self.last_request_times[0])
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+                now = time.time()
+            
+            self.last_request_times.append(now)
+        
+        return method(*args, **kwargs)
+    
+    def fetch_search_page(self, session: requests.Session) -> requests.Response:
+        """GET the class search page (subject checkboxes and the form state to post back)"""
+        response = self.rate_limited_request(
+            session.get,
+            self.search_url,
+            params=dict(SEARCH_PAGE_PARAMS),
+            timeout=self.request_timeout
+        )
+        response.raise_for_status()
+        return response
+    
+    def search_subject(self, session: requests.Session, checkbox_id: str,
+                       criteria: Optional[Dict[str, str]] = None) -> str:
+        """Post the class search for one subject checkbox in the current term, returning the results HTML"""
+        return self.search_subjects(session, [checkbox_id], criteria)
+    
+    def search_subjects(self, session: requests.Session, checkbox_ids: List[str],
+                        criteria: Optional[Dict[str, str]] = None) -> str:
+        """Post one class search with several subject checkboxes ticked; the results list every subject's sections
+        
+        criteria are extra search form fields (career, catalog number) that narrow the results
+        """
+        response = self.fetch_search_page(session)
+        
+        form_data = self.apply_campus(self.apply_term(extract_form_data(response.text)))
+        form_data.update(criteria or {})
+        for checkbox_id in checkbox_ids:
+            form_data[checkbox_id] = 'Y'
+        form_data['ICAction'] = checkbox_ids[-1]
+        
+        response = self.rate_limited_request(
+            session.post,
+            self.search_url,
+            data=form_data,
+            timeout=self.request_timeout
+        )
+        response.raise_for_status()
+        return response.text
+    
+    def get_all_subjects(self) -> List[Dict]:
+        """Get all subject codes from the class search page (cached after the first successful fetch)"""
+        with self.subjects_lock:
+            if self.subjects_cache is None:
+                subjects = self.fetch_subjects()
+                if not subjects:
+                    return []
+                self.subjects_cache = subjects
+            return list(self.subjects_cache)
+    
+    def fetch_subjects(self) -> List[Dict]:
+        """Fetch and parse the subject list from the class search page"""
+        session = self.get_session()
+        try:
+            response = self.fetch_search_page(session)
+            logger.debug(f"HTML length: {len(response.text)}")
+            
+            subjects = parse_subject_list(response.text)
+            logger.debug(f"Final subjects count: {len(subjects)}")
+            if subjects:
+                logger.debug(f"Sample subjects: {[s['code'] for s in subjects[:5]]}")
+            
+            return subjects
+            
+        except Exception as e:
+            logger.error(f"Error getting subjects: {e}")
+            return []
+        finally:
+            self.return_session(session)
+    
+    def apply_term(self, form_data: Dict[str, str]) -> Dict[str, str]:
+        """Select the scraper's current term on a class search form post"""
+        if self.term:
+            form_data[TERM_FORM_FIELD] = self.term
+        return form_data
+    
+    def apply_campus(self, form_data: Dict[str, str]) -> Dict[str, str]:
+        """Select the scraper's campus on a class search form post, so other campuses are filtered server-side"""
+        if self.campus:
+            form_data[CAMPUS_FORM_FIELD] = self.campus
+        return form_data
+    
+    def for_each_term(self, terms: Iterable[str], scrape: Callable[[str], Any]) -> Dict[str, Any]:
+        """Call scrape(strm) once per term with fresh results and stats; sessions and subjects are reused"""
+        results = {}
+        initial_stats = copy.deepcopy(self.stats)
+        for strm in terms:
+            logger.info(f"📅 Scraping term {strm}")
+            self.term = strm
+            self.courses_data = type(self.courses_data)()
+            self.stats = copy.deepcopy(initial_stats)
+            results[strm] = scrape(strm)
+        return results
+    
+    def scrape_terms(self, terms: Iterable[str], **scrape_kwargs) -> Dict[str, Any]:
+        """Run scrape_all_courses for several STRMs in one run; results keyed by STRM"""
+        return self.for_each_term(terms, lambda strm: self.scrape_all_courses(**scrape_kwargs))
+    
+    def fetch_class_detail_page(self, session: requests.Session, strm: str, class_nbr: str,
+                                career: str = 'UGRD') -> Optional[str]:
+        """Fetch a class detail page, returning its HTML (None on a non-200 response)"""
+        params = {
+            'Page': 'SSR_SSENRL_DETAIL',
+            'Action': 'A',
+            'STRM': strm,
+            'CLASS_NBR': class_nbr,
+            'ACAD_CAREER': career,
+        }
+        
+        response = self.rate_limited_request(
+            session.get,
+            self.detail_url,
+            params=params,
+            timeout=8
+        )
+        
+        if response.status_code == 200:
+            return response.text
+        return None
+    
+    def fetch_class_detail_any_career(self, session: requests.Session, strm: str, class_nbr: str,
+                                      career: str = None) -> Optional[str]:
+        """Fetch a class detail page once with the known (or hinted) career; other careers are tried only on an empty page"""
+        career = self.class_careers.get((strm, class_nbr)) or career or 'UGRD'
+        html = self.fetch_class_detail_page(session, strm, class_nbr, career)
+        if not detail_page_is_empty(html):
+            self.class_careers[(strm, class_nbr)] = career
+            return html
+        
+        for other in CAREERS:
+            if other == career:
+                continue
+            retry_html = self.fetch_class_detail_page(session, strm, class_nbr, other)
+            if not detail_page_is_empty(retry_html):
+                logger.debug(f"Class {class_nbr} found under career {other}, not {career}")
+                self.class_careers[(strm, class_nbr)] = other
+                return retry_html
+        
+        return html
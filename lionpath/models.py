@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Shared data model for the LionPath scrapers
+Course-level information is stored once per course, section-level information once per section
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+
+@dataclass
+class CourseInfo:
+    """Course-level information that stays constant across sections"""
+    course_code: str = ""
+    course_title: str = ""
+    subject: str = ""
+    catalog_number: str = ""
+    
+    # Academic details
+    units: str = ""
+    career: str = ""
+    grading: str = ""
+    component: str = ""
+    
+    # Course content
+    course_description: str = ""
+    enrollment_requirements: str = ""
+    enforced_concurrent: str = ""
+    class_attributes: List[str] = None
+    academic_organization: str = ""
+    
+    # Course-level requirements and notes
+    course_notes: str = ""
+    textbook_info: str = ""
+    
+    # Metadata
+    semester: str = ""
+    last_updated: str = ""
+    
+    def __post_init__(self):
+        if self.class_attributes is None:
+            self.class_attributes = []
+
+@dataclass
+class SectionInfo:
+    """Section-specific information that varies per section"""
+    section: str = ""
+    class_number: str = ""
+    section_type: str = ""  # Lecture, Lab, Recitation, etc.
+    
+    # Scheduling
+    days: str = ""
+    times: str = ""
+    start_time: str = ""
+    end_time: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    meeting_dates: str = ""
+    
+    # Normalized meeting time: minutes since midnight and a day bitmask (Mo=1, Tu=2, ... Su=64)
+    start_minutes: Optional[int] = None
+    end_minutes: Optional[int] = None
+    day_mask: int = 0
+    
+    # Location
+    campus: str = ""
+    location: str = ""
+    building: str = ""
+    room: str = ""
+    instruction_mode: str = ""
+    
+    # Instructor
+    instructor: str = ""
+    instructor_email: str = ""
+    
+    # Enrollment - General Capacity
+    class_capacity: int = 0
+    enrollment_total: int = 0
+    available_seats: int = 0
+    waitlist_capacity: int = 0
+    waitlist_total: int = 0
+    status: str = ""
+    
+    # Reserve Capacity details
+    reserve_capacity: List[Dict[str, Any]] = None
+    
+    # Section-specific details
+    add_consent: str = ""
+    drop_consent: str = ""
+    class_notes: str = ""
+    
+    # Exam schedule
+    exam_schedule: List[Dict[str, str]] = None
+    
+    # Metadata
+    course_url: str = ""
+    detail_url: str = ""
+    scrape_timestamp: str = ""
+    
+    def __post_init__(self):
+        if not self.scrape_timestamp:
+            self.scrape_timestamp = datetime.now().isoformat()
+        if self.reserve_capacity is None:
+            self.reserve_capacity = []
+        if self.exam_schedule is None:
+            self.exam_schedule = []
+
+@dataclass
+class OptimizedCourseData:
+    """Optimized course data structure separating course from section info"""
+    course_info: CourseInfo
+    sections: List[SectionInfo]
+    
+    def get_total_capacity(self) -> int:
+        """Get total capacity across all sections"""
+        return sum(section.class_capacity for section in self.sections)
+    
+    def get_total_enrollment(self) -> int:
+        """Get total enrollment across all sections"""
+        return sum(section.enrollment_total for section in self.sections)
+    
+    def get_available_seats(self) -> int:
+        """Get total available seats across all sections"""
+        return sum(section.available_seats for section in self.sections)
+    
+    def get_section_count(self) -> int:
+        """Get number of sections"""
+        return len(self.sections)
+    
+    def get_campuses(self) -> Set[str]:
+        """Get unique campuses where course is offered"""
+        return set(section.campus for section in self.sections if section.campus)
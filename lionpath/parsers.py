@@ -0,0 +1,806 @@
+#!/usr/bin/env python3
+"""
+Parser library shared by the LionPath scrapers
+Regex parsers for the search pages plus BeautifulSoup helpers for the class detail page
+"""
+
+import logging
+import re
+from dataclasses import asdict
+from datetime import datetime
+from html import unescape
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from .models import CourseInfo, SectionInfo
+from .regex_guard import guard
+
+logger = logging.getLogger(__name__)
+
+# Campuses as they appear in the listing text
+CAMPUS_NAMES = [
+    'World Campus', 'Berks', 'Abington', 'Altoona', 'Brandywine',
+    'Dubois', 'Erie', 'Fayette', 'Greater Allegheny', 'Harrisburg',
+    'Hazleton', 'Lehigh Valley', 'Mont Alto', 'New Kensington',
+    'Schuylkill', 'Shenango', 'Wilkes-Barre', 'York', 'University Park', 'UP'
+]
+
+NON_UP_CAMPUSES = [
+    'WORLD CAMPUS', 'BERKS', 'ABINGTON', 'ALTOONA', 'BRANDYWINE',
+    'DUBOIS', 'ERIE', 'FAYETTE', 'GREATER ALLEGHENY', 'HARRISBURG',
+    'HAZLETON', 'LEHIGH VALLEY', 'MONT ALTO', 'NEW KENSINGTON',
+    'SCHUYLKILL', 'SHENANGO', 'WILKES-BARRE', 'YORK'
+]
+
+# Patterns run over whole pages are registered with regex_guard (time budget, metrics, backtracking audit);
+# the plain re patterns only ever see one short field
+SUBJECT_CODE_PATTERN = re.compile(r'^[A-Z]+(?:-[A-Z]*)?$')
+SECTION_LINK_PREFIX = 'javascript:showClassDetails('
+SECTION_LINK_ARGS_PATTERN = re.compile(r'(\d+),(\d+)\)')
+COURSE_CODE_PATTERNS = [
+    re.compile(r'^([A-Z](?:[A-Z]*-)?[A-Z]+)\s+(\d+[A-Z]*)'),
+    re.compile(r'^([A-Z]{2,})\s+(\d+[A-Z]*)'),
+]
+SECTION_NUMBER_PATTERN = re.compile(r'(\d{3}[A-Z]*|[A-Z]\d{2}|\d{2,3})')
+
+# Academic careers accepted by the class detail page's ACAD_CAREER parameter, in fallback order
+CAREERS = {'UGRD': 'Undergraduate', 'GRAD': 'Graduate', 'LAW': 'Law', 'MED': 'Medicine'}
+CAREER_LABEL_PATTERN = guard('career_label', r'Career[:\s]*(Undergraduate|Graduate|Law|Medicine)', re.IGNORECASE)
+CATALOG_DIGITS_PATTERN = re.compile(r'\d+')
+GRADUATE_CATALOG_MIN = 500
+DETAIL_CONTENT_PATTERN = guard('detail_content', r'Class Number|Class Capacity|Enrollment Total|Course Description',
+                               re.IGNORECASE)
+
+def is_university_park(campus: str, section_number: str) -> bool:
+    """Campus filter used by every profile: not a Commonwealth/World campus and no W/Y section suffix"""
+    campus = (campus or '').upper()
+    section_number = (section_number or '').upper()
+    
+    if any(indicator in campus for indicator in NON_UP_CAMPUSES):
+        return False
+    
+    if section_number.endswith('Y') or section_number.endswith('W'):
+        return False
+    
+    return True
+
+def parse_listing_text(text: str) -> Optional[Dict[str, str]]:
+    """Parse "CMPSC 131 - 001 - University Park" style link text into course code, section and campus"""
+    text = (text or '').strip()
+    
+    subject = ""
+    catalog_number = ""
+    for pattern in COURSE_CODE_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            subject = match.group(1)
+            catalog_number = match.group(2)
+            break
+    
+    if not subject:
+        return None
+    
+    section = ""
+    campus = ""
+    if ' - ' in text:
+        section_campus = text.split(' - ', 1)[1]
+        
+        section_match = SECTION_NUMBER_PATTERN.search(section_campus)
+        if section_match:
+            section = section_match.group(1)
+        
+        for campus_name in CAMPUS_NAMES:
+            if campus_name in section_campus:
+                campus = 'UP' if campus_name == 'University Park' else campus_name
+                break
+        
+        if not campus and not section.upper().endswith(('W', 'Y')):
+            campus = 'UP'
+    
+    return {
+        'subject': subject,
+        'catalog_number': catalog_number,
+        'course_code': f"{subject} {catalog_number}",
+        'section': section,
+        'campus': campus
+    }
+
+def listing_section(text: str, strm: str, class_nbr: str, row: str = '') -> Optional[SectionInfo]:
+    """SectionInfo for one class detail link and the rest of its results row; course_code and career ride
+    along as temporary attributes"""
+    listing = parse_listing_text(text)
+    if not listing:
+        return None
+    
+    section = SectionInfo(
+        section=listing['section'],
+        class_number=class_nbr,
+        campus=listing['campus'],
+        course_url=f"showClassDetails({strm},{class_nbr})"
+    )
+    if row:
+        normalize_meeting_time(parse_listing_row(row, section))
+    section.course_code = listing['course_code']
+    section.career = detect_career(listing['catalog_number'], text)
+    return section
+
+def parse_listing_sections(html: str) -> List[SectionInfo]:
+    """Every section listed on a search results page, with whatever its row shows besides the link"""
+    sections = []
+    for strm, class_nbr, text, row in find_section_rows(html):
+        try:
+            section = listing_section(text, strm, class_nbr, row)
+            if section:
+                sections.append(section)
+        except Exception as e:
+            logger.debug(f"Error parsing section text '{text}': {e}")
+    return sections
+
+def career_code(value: str) -> str:
+    """Normalize a career code or name ("GRAD", "Graduate") to its code; '' if unknown"""
+    value = (value or '').strip()
+    if value.upper() in CAREERS:
+        return value.upper()
+    for code, name in CAREERS.items():
+        if value.lower() == name.lower():
+            return code
+    return ''
+
+def detect_career(catalog_number: str, text: str = '') -> str:
+    """Career for a class: an explicit "Career:" label in the listing wins, else 500-level and up is graduate"""
+    match = CAREER_LABEL_PATTERN.search(text or '')
+    if match:
+        return career_code(match.group(1))
+    
+    digits = CATALOG_DIGITS_PATTERN.match(catalog_number or '')
+    if digits and int(digits.group()) >= GRADUATE_CATALOG_MIN:
+        return 'GRAD'
+    return 'UGRD'
+
+def detail_page_is_empty(html: Optional[str]) -> bool:
+    """True when a class detail response carries no class data (wrong career, missing class, error page)"""
+    return not html or not DETAIL_CONTENT_PATTERN.search(html)
+
+def find_section_rows(html: str) -> List[Tuple[str, str, str, str]]:
+    """Return (strm, class_nbr, link_text, row_html) for every class detail link on a search results page
+    
+    Each link is only read up to the start of the next one, so the page is scanned once however it is broken;
+    the row is the markup after the link text, up to the next link or LISTING_ROW_WINDOW characters
+    """
+    rows = []
+    start = html.find(SECTION_LINK_PREFIX)
+    while start != -1:
+        args_start = start + len(SECTION_LINK_PREFIX)
+        next_start = html.find(SECTION_LINK_PREFIX, args_start)
+        end = next_start if next_start != -1 else len(html)
+        
+        match = SECTION_LINK_ARGS_PATTERN.match(html, args_start, end)
+        if match:
+            tag_end = html.find('>', match.end(), end)
+            text_end = html.find('<', tag_end + 1, end) if tag_end != -1 else -1
+            if text_end > tag_end + 1:
+                row = html[text_end:min(end, text_end + LISTING_ROW_WINDOW)]
+                rows.append((match.group(1), match.group(2), html[tag_end + 1:text_end], row))
+        start = next_start
+    
+    return rows
+
+def find_section_links(html: str) -> List[Tuple[str, str, str]]:
+    """Return (strm, class_nbr, link_text) for every class detail link on a search results page"""
+    return [(strm, class_nbr, text) for strm, class_nbr, text, _ in find_section_rows(html)]
+
+# A results row is never read further than this past its link
+LISTING_ROW_WINDOW = 4000
+# PeopleSoft results grid elements, by id up to the "$row" suffix
+LISTING_FIELD_IDS = {
+    'MTG_DAYTIME': 'meeting',
+    'MTG_ROOM': 'room',
+    'MTG_INSTR': 'instructor',
+    'DERIVED_CLSRCH_SSR_STATUS_LONG': 'status',
+    'SSR_CLS_STATUS': 'status',
+    'SSR_CLS_SEATS': 'seats',
+}
+# The same fields by visible label, as a label cell before the value or "Label: value" in one cell
+LISTING_FIELD_LABELS = {
+    'status': 'status',
+    'class status': 'status',
+    'days & times': 'meeting',
+    'days and times': 'meeting',
+    'days/times': 'meeting',
+    'meets': 'meeting',
+    'room': 'room',
+    'instructor': 'instructor',
+    'instructors': 'instructor',
+    'seats': 'seats',
+    'enrolled/capacity': 'seats',
+}
+LISTING_STATUSES = {'open': 'Open', 'closed': 'Closed', 'wait list': 'Wait List', 'waitlist': 'Wait List'}
+MEETING_PATTERN = re.compile(r'^((?:Mo|Tu|We|Th|Fr|Sa|Su)+)\s+(\d{1,2}:\d{2}\s*[AaPp][Mm])\s*-\s*(\d{1,2}:\d{2}\s*[AaPp][Mm])$')
+SEAT_COUNT_PATTERN = re.compile(r'^(\d+)\s*/\s*(\d+)$')
+# Rows are at most LISTING_ROW_WINDOW characters, so their tags are walked without the page-level guard
+ROW_TAG_PATTERN = re.compile(r'<[^<>]+>')
+# Elements without a closing tag
+VOID_TAGS = ('img', 'br', 'input', 'hr', 'meta', 'link', 'col', 'wbr')
+# Section fields a class detail page supplies; seat counts come as one cell, so capacity stands for all three
+DETAIL_SECTION_FIELDS = ('status', 'class_capacity')
+# An enrollment refresh must re-read waitlists too; rows rarely show them
+REFRESH_SECTION_FIELDS = DETAIL_SECTION_FIELDS + ('waitlist_capacity', 'waitlist_total')
+# Section fields parse_listing_row fills, grouped as a row shows them; the meeting group's minutes and
+# day mask are derived from its days and times
+LISTING_FIELD_GROUPS = (
+    ('status',),
+    ('class_capacity', 'enrollment_total', 'available_seats'),
+    ('waitlist_capacity', 'waitlist_total'),
+    ('days', 'times', 'start_time', 'end_time', 'start_minutes', 'end_minutes', 'day_mask'),
+    ('room',),
+    ('instructor',),
+)
+MEETING_FIELDS = LISTING_FIELD_GROUPS[3]
+
+def listing_row_cells(row: str) -> List[Tuple[str, str]]:
+    """(field, text) for every text run and icon alt text in a results row, in order
+    
+    field is the LISTING_FIELD_IDS name of the innermost open element with a known id, '' outside them;
+    known ids from another grid row (the next row's leading cells) end the row
+    """
+    # The row stops inside the next link's opening tag
+    if row.rfind('<') > row.rfind('>'):
+        row = row[:row.rfind('<')]
+    
+    cells = []
+    open_fields = []  # (field, depth its element opened at)
+    depth = 0  # relative to the link, so closing the link's own cells goes negative
+    row_index = None
+    position = 0
+    for match in ROW_TAG_PATTERN.finditer(row):
+        field = open_fields[-1][0] if open_fields else ''
+        cells.append((field, row[position:match.start()]))
+        position = match.end()
+        tag = match.group()
+        
+        if tag.startswith('<!'):
+            continue
+        if tag.startswith('</'):
+            depth -= 1
+            while open_fields and open_fields[-1][1] >= depth:
+                open_fields.pop()
+            continue
+        
+        attributes = tag_attributes(tag)
+        if tag[1:4].lower() == 'img' and attributes.get('alt'):
+            cells.append((field, attributes['alt']))
+        
+        element_id, _, index = attributes.get('id', '').partition('$')
+        void = tag.endswith('/>') or tag[1:].split(None, 1)[0].lower() in VOID_TAGS
+        if element_id in LISTING_FIELD_IDS:
+            if row_index is not None and index != row_index:
+                position = len(row)
+                break
+            row_index = index
+            if not void:
+                open_fields.append((LISTING_FIELD_IDS[element_id], depth))
+        if not void:
+            depth += 1
+    cells.append((open_fields[-1][0] if open_fields else '', row[position:]))
+    
+    return [(field, text) for field, text in ((field, ' '.join(unescape(text).split())) for field, text in cells) if text]
+
+def listing_row_fields(cells: List[Tuple[str, str]]) -> Dict[str, str]:
+    """Raw status/meeting/room/instructor/seats values of a row's cells: element ids first, then labels,
+    then cells recognizable by shape alone; co-instructors are joined, every other field keeps its first value"""
+    fields = {}
+    pending_label = ''
+    previous_field = ''
+    for field, text in cells:
+        label, colon, value = text.partition(':')
+        label = normalize_label(label)
+        if field:
+            if field == 'instructor' and previous_field == field:
+                fields[field] += f", {text}"
+            fields.setdefault(field, text)
+        elif pending_label:
+            fields.setdefault(pending_label, text)
+        elif colon and value.strip() and label in LISTING_FIELD_LABELS:
+            fields.setdefault(LISTING_FIELD_LABELS[label], value.strip())
+        elif text.lower() in LISTING_STATUSES:
+            fields.setdefault('status', text)
+        elif MEETING_PATTERN.match(text):
+            fields.setdefault('meeting', text)
+        elif SEAT_COUNT_PATTERN.match(text):
+            fields.setdefault('seats', text)
+        pending_label = LISTING_FIELD_LABELS.get(normalize_label(text), '') if not field else ''
+        previous_field = field
+    return fields
+
+def parse_listing_row(row: str, section):
+    """Fill the fields a results row shows: status, seat counts, waitlists, days/times, room and instructor
+    
+    section is any section dataclass with SectionInfo's field names (the comprehensive profile has its own).
+    The names filled are recorded in section.listed_fields (a temporary attribute), so a zero the row
+    showed is told apart from a field it never had
+    """
+    cells = listing_row_cells(row)
+    fields = listing_row_fields(cells)
+    shown = set()
+    
+    status = LISTING_STATUSES.get(fields.get('status', '').lower())
+    if status:
+        section.status = status
+        shown.add('status')
+    
+    meeting = MEETING_PATTERN.match(fields.get('meeting', ''))
+    if meeting:
+        section.days, section.start_time, section.end_time = meeting.groups()
+        section.times = f"{section.start_time} - {section.end_time}"
+        shown.update(MEETING_FIELDS)
+    
+    for name in ('room', 'instructor'):
+        if fields.get(name):
+            setattr(section, name, fields[name])
+            shown.add(name)
+    
+    seats = SEAT_COUNT_PATTERN.match(fields.get('seats', ''))
+    if seats:
+        section.enrollment_total, section.class_capacity = int(seats.group(1)), int(seats.group(2))
+        section.available_seats = max(section.class_capacity - section.enrollment_total, 0)
+        shown.update(('class_capacity', 'enrollment_total', 'available_seats'))
+    # "Class Capacity 40 ... Wait List Total 3" style rows
+    text = ' '.join(text for _, text in cells)
+    for field_name, pattern in ENROLLMENT_PATTERNS.items():
+        if field_name in shown:
+            continue
+        match = pattern.search(text)
+        if match:
+            setattr(section, field_name, int(match.group(1)))
+            shown.add(field_name)
+    
+    section.listed_fields = shown
+    return section
+
+def listing_missing_fields(section, fields: Tuple[str, ...] = DETAIL_SECTION_FIELDS) -> List[str]:
+    """Detail-page section fields its results row did not show; none means the detail request can be skipped
+    
+    Rows run through parse_listing_row are judged by the fields they showed, zeros included; other sections
+    by which fields are non-empty
+    """
+    shown = getattr(section, 'listed_fields', None)
+    if shown is None:
+        return [name for name in fields if not getattr(section, name)]
+    return [name for name in fields if name not in shown]
+
+# Inputs whose value is needed even when the page does not mark them hidden
+FORM_STATE_FIELDS = ('ICSID', 'ICStateNum', 'ICType', 'ICElementNum')
+INPUT_TAG_PATTERN = guard('input_tag', r'<input\b([^<>]*)>', re.IGNORECASE)
+
+def extract_form_data(html: str) -> Dict[str, str]:
+    """Extract the hidden PeopleSoft form fields (ICSID, ICStateNum, ...) needed to post back a page"""
+    form_data = {}
+    state_fields = {}
+    for attribute_text in INPUT_TAG_PATTERN.findall(html):
+        attributes = tag_attributes(attribute_text)
+        name = attributes.get('name')
+        if not name or 'value' not in attributes:
+            continue
+        if attributes.get('type', '').lower() == 'hidden':
+            form_data[name] = attributes['value']
+        elif name in FORM_STATE_FIELDS:
+            state_fields.setdefault(name, attributes['value'])
+    
+    for name, value in state_fields.items():
+        form_data.setdefault(name, value)
+    
+    return form_data
+
+def _subject_entry(checkbox_num: str, label_text: str) -> Optional[Dict[str, str]]:
+    """Build a subject dict from a checkbox number and its "CODE / Name" label"""
+    label_text = label_text.strip()
+    if '/' not in label_text or len(label_text) <= 5:
+        return None
+    
+    parts = label_text.split('/', 1)
+    code = parts[0].strip()
+    name = parts[1].strip() if len(parts) > 1 else code
+    
+    if not SUBJECT_CODE_PATTERN.match(code):
+        return None
+    
+    return {
+        'code': code,
+        'name': name,
+        'checkbox_id': f'PTS_SELECT${checkbox_num}',
+        'full_text': label_text
+    }
+
+# Subject checkbox markup: <input id="PTS_SELECT$N" ...> with <label id="PTS_SELECT_LBL$N" for="PTS_SELECT$N">CODE / Name</label>
+# Neither part can run past the next "<", so no two match attempts scan the same text and the page is read once
+SUBJECT_TAG_PATTERN = guard('subject_tag', r'<(input|label)\b([^<>]*)>([^<]*)', re.IGNORECASE)
+# Only the attributes the scanners read; the lookbehind rejects "data-id=" without rescanning
+TAG_ATTRIBUTE_PATTERN = guard('tag_attribute',
+                              r'(?<![\w:.-])(id|name|for|title|type|value|alt)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))',
+                              re.IGNORECASE)
+CHECKBOX_ID_PREFIX = 'PTS_SELECT$'
+LABEL_ID_PREFIX = 'PTS_SELECT_LBL$'
+
+def tag_attributes(tag: str) -> Dict[str, str]:
+    """id/name/for/title/type/value/alt attributes of one tag's source; names are lowercased and the first wins"""
+    attributes = {}
+    for name, double_quoted, single_quoted, bare in TAG_ATTRIBUTE_PATTERN.findall(tag):
+        attributes.setdefault(name.lower(), double_quoted or single_quoted or bare)
+    return attributes
+
+def _checkbox_number(value: str, prefix: str) -> Optional[str]:
+    """N from "PTS_SELECT$N" style ids, None for anything else"""
+    if value.startswith(prefix):
+        number = value[len(prefix):]
+        if number.isdigit():
+            return number
+    return None
+
+def parse_subject_list(html_text: str) -> List[Dict[str, str]]:
+    """Parse the subject checkboxes on the class search page into sorted, de-duplicated subject dicts
+    
+    One left-to-right scan over input and label tags: every character is read a bounded number of times,
+    so a malformed or hostile page costs the same as a well-formed one of its size
+    """
+    labels = {}  # checkbox number -> label text, from the label's id or for attribute
+    titles = {}  # checkbox number -> checkbox title, used when a checkbox has no label
+    order = []   # checkbox numbers in page order
+    
+    for tag, attribute_text, text in SUBJECT_TAG_PATTERN.findall(html_text):
+        # Most inputs and labels on the page are not subject checkboxes, and a checkbox only names
+        # its subject through a title
+        upper_text = attribute_text.upper()
+        is_input = tag.lower() == 'input'
+        if 'PTS_SELECT' not in upper_text or (is_input and 'TITLE' not in upper_text):
+            continue
+        attributes = tag_attributes(attribute_text)
+        
+        if is_input:
+            number = (_checkbox_number(attributes.get('id', ''), CHECKBOX_ID_PREFIX)
+                      or _checkbox_number(attributes.get('name', ''), CHECKBOX_ID_PREFIX))
+            if number is not None:
+                order.append(number)
+                if attributes.get('title'):
+                    titles.setdefault(number, unescape(attributes['title']))
+            continue
+        
+        number = (_checkbox_number(attributes.get('id', ''), LABEL_ID_PREFIX)
+                  or _checkbox_number(attributes.get('for', ''), CHECKBOX_ID_PREFIX))
+        if number is not None and text.strip():
+            order.append(number)
+            labels.setdefault(number, unescape(text))
+    
+    unique_subjects = {}
+    for number in dict.fromkeys(order):
+        label_text = labels.get(number) or titles.get(number)
+        entry = _subject_entry(number, label_text) if label_text else None
+        if entry:
+            unique_subjects.setdefault(entry['code'], entry)
+    
+    logger.debug(f"Subject scan found {len(order)} checkboxes/labels, {len(unique_subjects)} subjects")
+    return sorted(unique_subjects.values(), key=lambda x: x['code'])
+
+# Tags PeopleSoft renders field labels in, in the order a lookup prefers them
+LABEL_TAGS = ('span', 'td', 'label')
+# Longer strings are content, not labels
+LABEL_MAX_LENGTH = 80
+
+def normalize_label(text: str) -> str:
+    """Case- and whitespace-insensitive label key ("Class  Status:" -> "class status")"""
+    return ' '.join(text.split()).rstrip(':').strip().lower()
+
+class DetailPage:
+    """A class detail page parsed once: a label -> value map and the page text, each built on a single walk
+    
+    Field lookups are dictionary hits instead of one tree search per tag per alias
+    """
+    
+    def __init__(self, html):
+        self.soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, 'html.parser')
+        self._text = None
+        self.values = {}  # normalized label -> resolved value, filled on first lookup
+        
+        # normalized label -> label elements, spans before tds before labels, document order within each
+        ranked = {tag: [] for tag in LABEL_TAGS}
+        for element in self.soup.find_all(LABEL_TAGS):
+            string = element.string
+            if string is None:
+                continue
+            label = normalize_label(string)
+            if label and len(label) <= LABEL_MAX_LENGTH:
+                ranked[element.name].append((label, element))
+        
+        self.labels = {}
+        for tag in LABEL_TAGS:
+            for label, element in ranked[tag]:
+                self.labels.setdefault(label, []).append(element)
+    
+    @property
+    def text(self) -> str:
+        """soup.get_text(), computed once for every regex extractor"""
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+    
+    def field(self, field_names: List[str]) -> str:
+        """Value next to the first label that has one"""
+        for field_name in field_names:
+            value = self.value(field_name)
+            if value:
+                return value
+        return ""
+    
+    def value(self, field_name: str) -> str:
+        """Value next to a label; an exact label wins, else labels containing the name ("Class Status" for "Status")"""
+        key = normalize_label(field_name)
+        if key not in self.values:
+            elements = self.labels.get(key)
+            if elements is None:
+                elements = [element for label, found in self.labels.items() if key in label for element in found]
+            self.values[key] = self.label_value(elements, field_name)
+        return self.values[key]
+    
+    @staticmethod
+    def label_value(labels: list, field_name: str) -> str:
+        """Text of the element after a label, or after the label's parent (label and value in separate cells)"""
+        for label in labels:
+            for anchor in (label, label.parent):
+                if anchor is None:
+                    continue
+                next_elem = anchor.find_next_sibling()
+                if next_elem:
+                    value = next_elem.get_text(strip=True)
+                    if value and value != field_name:
+                        return value
+        return ""
+
+def extract_field_value(soup: BeautifulSoup, field_names: List[str]) -> str:
+    """Extract a field value by looking for labels (build a DetailPage once when reading several fields)"""
+    return DetailPage(soup).field(field_names)
+
+def extract_course_description(soup: BeautifulSoup) -> str:
+    """Extract course description"""
+    try:
+        desc_patterns = [
+            ('div', {'class': re.compile('description', re.IGNORECASE)}),
+            ('span', {'class': 'PSLONGEDITBOX'}),
+            ('td', {'class': re.compile('description', re.IGNORECASE)}),
+        ]
+        
+        for tag, attrs in desc_patterns:
+            desc_elem = soup.find(tag, attrs)
+            if desc_elem:
+                desc_text = desc_elem.get_text(strip=True)
+                if len(desc_text) > 50:
+                    return desc_text
+        
+        desc_labels = soup.find_all(string=re.compile(r'Description', re.IGNORECASE))
+        for label in desc_labels:
+            if label.parent:
+                next_elem = label.parent.find_next()
+                if next_elem:
+                    desc_text = next_elem.get_text(strip=True)
+                    if len(desc_text) > 50:
+                        return desc_text
+        
+        return ""
+        
+    except Exception as e:
+        logger.debug(f"Error extracting course description: {e}")
+        return ""
+
+CLASS_ATTRIBUTE_PATTERNS = [
+    guard('attributes_general_education', r'General Education[:\s]*([^\n]+)', re.IGNORECASE),
+    guard('attributes_label', r'Attributes[:\s]*([^\n]+)', re.IGNORECASE),
+    guard('attributes_gened', r'GenEd[:\s]*([^\n]+)', re.IGNORECASE),
+]
+
+# Course-level fields in the detail page text. A title follows a "Course:" label, or starts its own line
+# ("CMPSC 131 - Programming and Computation I") with an uppercase subject code and a catalog number of at
+# most three digits, so text like "Class Number 12345" is never taken for one. It runs to the end of the
+# line (cut at "Status" afterwards), so a failed start never rescans the rest of the line
+COURSE_TITLE_PATTERNS = [
+    guard('course_title_label', r'Course:\s*([A-Z](?:[A-Z]*-)?[A-Z]+\s+\d+[A-Z]*)\s+([^\n]+)', re.IGNORECASE),
+    guard('course_title', r'^[ \t]*([A-Z](?:[A-Z]*-)?[A-Z]+[ \t]+\d{1,3}[A-Z]?)\b[ \t]+(?:-[ \t]+)?([^\n]+)',
+          re.MULTILINE),
+]
+UNITS_PATTERN = guard('course_units', r'Units[:\s]*(\d+\.?\d*)', re.IGNORECASE)
+GRADING_PATTERN = guard('course_grading', r'Grading[:\s]*([^\n]+)', re.IGNORECASE)
+DESCRIPTION_PATTERN = guard('course_description',
+                            r'Course Description[:\s]*\n([\s\S]+?)(?:\n\n|Enrollment Information|$)', re.IGNORECASE)
+REQUIREMENT_PATTERNS = {
+    'enrollment_requirements': guard('requirements_enrollment', r'Enrollment Requirements[:\s]*([^\n]+)',
+                                     re.IGNORECASE),
+    'enforced_concurrent': guard('requirements_concurrent', r'Enforced Concurrent at Enrollment[:\s]*([^\n]+)',
+                                 re.IGNORECASE),
+    'prerequisites': guard('requirements_prerequisites', r'Prerequisites[:\s]*([^\n]+)', re.IGNORECASE),
+}
+CLASS_ATTRIBUTES_PATTERN = guard('class_attributes', r'Class Attributes[:\s]*([^\n]+)', re.IGNORECASE)
+CLASS_NOTES_PATTERN = guard('class_notes', r'Class Notes[:\s]*([^\n]+)', re.IGNORECASE)
+TEXTBOOK_PATTERN = guard('textbooks', r'Text Books[:\s]*([^\n]+)', re.IGNORECASE)
+TITLE_STOP_PATTERN = re.compile(r'Status', re.IGNORECASE)
+
+def extract_class_attributes(soup: BeautifulSoup, text: Optional[str] = None) -> List[str]:
+    """Extract class attributes (pass text when the page text is already cached, e.g. DetailPage.text)"""
+    try:
+        attributes = []
+        attr_text = text if text is not None else soup.get_text()
+        
+        for pattern in CLASS_ATTRIBUTE_PATTERNS:
+            for match in pattern.findall(attr_text):
+                if match.strip():
+                    attributes.append(match.strip())
+        
+        return list(set(attributes))
+        
+    except Exception as e:
+        logger.debug(f"Error extracting class attributes: {e}")
+        return []
+
+def parse_course_level_info(html: str, base_course_info: CourseInfo) -> CourseInfo:
+    """Parse comprehensive course-level information from a class detail page"""
+    try:
+        soup = BeautifulSoup(html, 'html.parser')
+        text = soup.get_text()
+        
+        # Create enhanced course info
+        enhanced_info = CourseInfo(**asdict(base_course_info))
+        
+        # Extract course title - look for patterns like "CMPSC 131 PROG & COMP I"
+        for pattern in COURSE_TITLE_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                title = match.group(2)
+                if pattern.name == 'course_title':
+                    title = TITLE_STOP_PATTERN.split(title, maxsplit=1)[0]
+                enhanced_info.course_code = match.group(1).strip()
+                enhanced_info.course_title = title.strip()
+                break
+        
+        # Extract units (3.00)
+        units_match = UNITS_PATTERN.search(text)
+        if units_match:
+            enhanced_info.units = units_match.group(1)
+        
+        # Extract grading
+        grading_match = GRADING_PATTERN.search(text)
+        if grading_match:
+            enhanced_info.grading = grading_match.group(1).strip()
+        
+        # Extract course description (long paragraph)
+        desc_match = DESCRIPTION_PATTERN.search(text)
+        if desc_match:
+            enhanced_info.course_description = desc_match.group(1).strip()
+        
+        # Extract enrollment requirements
+        for kind, pattern in REQUIREMENT_PATTERNS.items():
+            match = pattern.search(text)
+            if match:
+                req_text = match.group(1).strip()
+                if kind == 'enforced_concurrent':
+                    enhanced_info.enforced_concurrent = req_text
+                else:
+                    enhanced_info.enrollment_requirements = req_text
+        
+        # Extract class attributes
+        attr_match = CLASS_ATTRIBUTES_PATTERN.search(text)
+        if attr_match and attr_match.group(1).strip() != "No Class Attributes":
+            enhanced_info.class_attributes = [attr_match.group(1).strip()]
+        
+        # Extract class notes
+        notes_match = CLASS_NOTES_PATTERN.search(text)
+        if notes_match and notes_match.group(1).strip() != "No Class Notes":
+            enhanced_info.course_notes = notes_match.group(1).strip()
+        
+        # Extract textbook info
+        textbook_match = TEXTBOOK_PATTERN.search(text)
+        if textbook_match:
+            enhanced_info.textbook_info = textbook_match.group(1).strip()
+        
+        enhanced_info.last_updated = datetime.now().isoformat()
+        
+        return enhanced_info
+        
+    except Exception as e:
+        logger.debug(f"Error parsing course-level info: {e}")
+        return base_course_info
+
+ENROLLMENT_PATTERNS = {
+    'class_capacity': guard('class_capacity', r'Class Capacity[:\s]*(\d+)', re.IGNORECASE),
+    'enrollment_total': guard('enrollment_total', r'Enrollment Total[:\s]*(\d+)', re.IGNORECASE),
+    'available_seats': guard('available_seats', r'Available Seats[:\s]*(\d+)', re.IGNORECASE),
+    'waitlist_capacity': guard('waitlist_capacity', r'Wait ?List Capacity[:\s]*(\d+)', re.IGNORECASE),
+    'waitlist_total': guard('waitlist_total', r'Wait ?List Total[:\s]*(\d+)', re.IGNORECASE),
+}
+STATUS_PATTERN = guard('class_status', r'Status[:\s]*(Open|Closed|Wait ?List)', re.IGNORECASE)
+# A stray "<" ends the tag it interrupts instead of swallowing everything up to the next ">"
+TAG_PATTERN = guard('markup_tag', r'<[^<>]+>')
+
+def enrollment_fields(html: str) -> Dict[str, Any]:
+    """The volatile enrollment fields a detail page shows, by SectionInfo field name, without building a DOM"""
+    text = TAG_PATTERN.sub(' ', html).replace('&nbsp;', ' ')
+    
+    found = {}
+    for field_name, pattern in ENROLLMENT_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            found[field_name] = int(match.group(1))
+    
+    status_match = STATUS_PATTERN.search(text)
+    if status_match:
+        found['status'] = status_match.group(1)
+    return found
+
+def apply_enrollment_fields(section: SectionInfo, fields: Dict[str, Any]) -> SectionInfo:
+    """Set enrollment fields read from a detail page on a section"""
+    for field_name, value in fields.items():
+        setattr(section, field_name, value)
+    section.scrape_timestamp = datetime.now().isoformat()
+    return section
+
+def parse_enrollment_fields(html: str, section: SectionInfo) -> SectionInfo:
+    """Update a section's volatile enrollment fields from a detail page, without building a DOM"""
+    return apply_enrollment_fields(section, enrollment_fields(html))
+
+DAY_CODES = ['Mo', 'Tu', 'We', 'Th', 'Fr', 'Sa', 'Su']
+SINGLE_LETTER_DAYS = {'M': 'Mo', 'T': 'Tu', 'W': 'We', 'R': 'Th', 'F': 'Fr', 'S': 'Sa', 'U': 'Su'}
+DAY_BITS = {day: 1 << i for i, day in enumerate(DAY_CODES)}
+
+# A days string is all two-letter codes ("MoWeFr") or all single letters ("MWF"), optionally separated;
+# anything else ("TBA", "ARR", "Arranged") is an unscheduled section with no meeting days
+DAY_SEPARATOR_PATTERN = re.compile(r'[\s,/]+')
+TWO_LETTER_DAYS_PATTERN = re.compile(r'(?:Mo|Tu|We|Th|Fr|Sa|Su)+')
+SINGLE_LETTER_DAYS_PATTERN = re.compile(r'[MTWRFSU]+')
+
+def split_meeting_days(days: str) -> List[str]:
+    """Split a days string like "MoWeFr" (or "MWF") into two-letter day codes, each once; [] for TBA/ARR"""
+    compact = DAY_SEPARATOR_PATTERN.sub('', days or '')
+    if TWO_LETTER_DAYS_PATTERN.fullmatch(compact):
+        found = [compact[i:i + 2] for i in range(0, len(compact), 2)]
+    elif SINGLE_LETTER_DAYS_PATTERN.fullmatch(compact):
+        found = [SINGLE_LETTER_DAYS[c] for c in compact]
+    else:
+        return []
+    return list(dict.fromkeys(found))
+
+def parse_clock_minutes(value: str) -> Optional[int]:
+    """Convert a clock time like "10:10AM" or "1:25 PM" to minutes since midnight"""
+    match = re.match(r'\s*(\d{1,2}):(\d{2})\s*([AaPp][Mm])?', value or '')
+    if not match:
+        return None
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    meridiem = (match.group(3) or '').upper()
+    if meridiem == 'PM' and hours != 12:
+        hours += 12
+    elif meridiem == 'AM' and hours == 12:
+        hours = 0
+    return hours * 60 + minutes
+
+def section_time_range(section: SectionInfo) -> Tuple[str, str]:
+    """Return (start_time, end_time), falling back to splitting the combined times field"""
+    if section.start_time or section.end_time:
+        return section.start_time, section.end_time
+    parts = re.split(r'\s*(?:-|to)\s*', section.times or '', maxsplit=1)
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    return '', ''
+
+def days_to_mask(days: str) -> int:
+    """Bitmask of a days string: "MoWeFr" -> Mo|We|Fr = 0b10101"""
+    mask = 0
+    for day in split_meeting_days(days):
+        mask |= DAY_BITS[day]
+    return mask
+
+def mask_to_days(mask: int) -> List[str]:
+    """Day codes set in a bitmask, Monday first"""
+    return [day for day in DAY_CODES if mask & DAY_BITS[day]]
+
+def normalize_meeting_time(section: SectionInfo) -> SectionInfo:
+    """Fill start_minutes/end_minutes/day_mask from the free-text days and times fields"""
+    start_time, end_time = section_time_range(section)
+    section.start_minutes = parse_clock_minutes(start_time)
+    section.end_minutes = parse_clock_minutes(end_time)
+    section.day_mask = days_to_mask(section.days)
+    return section
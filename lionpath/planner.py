@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Subject search planning
+Subjects that listed few sections last run are packed into shared search posts (one checkbox each), and
+the listed sections are split back out by subject; oversized subjects are searched as narrower sub-queries
+"""
+
+import json
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from compressed_io import strip_compression_suffix
+
+from .engine import (
+    CAREER_FORM_FIELD,
+    CATALOG_AT_LEAST,
+    CATALOG_AT_MOST,
+    CATALOG_FORM_FIELD,
+    CATALOG_MATCH_FORM_FIELD,
+)
+from .models import SectionInfo
+from .parsers import CAREERS
+from .reader import course_subject, iter_courses
+
+logger = logging.getLogger(__name__)
+
+# Sections a batched results page is planned to hold, judged by the previous run
+BATCH_SECTION_BUDGET = 150
+# Subjects that listed more sections than this are always searched alone
+SMALL_SUBJECT_SECTIONS = 25
+# Checkboxes ticked in one search post
+BATCH_MAX_SUBJECTS = 12
+
+# PeopleSoft stops listing a search's classes at this many rows
+RESULT_ROW_CAP = 300
+# A results page this large is one worker's download and parse for too long
+OVERSIZED_PAGE_BYTES = 3 * 1024 * 1024
+# Subjects that listed more sections than this last run go straight to sub-queries
+OVERSIZED_SUBJECT_SECTIONS = 250
+# First split: lower division (000-299) and everything from 300 up. PeopleSoft compares catalog numbers
+# as strings and the form has no "less than", so the lower half runs to the last suffixed 299 ('299H', '299W')
+CATALOG_SPLIT = '300'
+CATALOG_BELOW_SPLIT = '299Z'
+
+# Per-subject listing counts written next to an output, empty subjects included
+SUBJECTS_SUFFIX = '.subjects.json'
+
+def subjects_path(output_file: str) -> str:
+    """Subject counts file written next to an output: courses.jsonl.gz -> courses.jsonl.subjects.json"""
+    return strip_compression_suffix(output_file) + SUBJECTS_SUFFIX
+
+def save_subject_counts(counts_file: str, counts: Dict[str, int]):
+    """Write the sections each searched subject listed; subjects whose search failed are left out"""
+    with open(counts_file, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(counts.items())), f, separators=(',', ':'))
+
+def subject_section_counts(data_file: str) -> Dict[str, int]:
+    """Sections listed per subject in a previous optimized JSONL snapshot
+    
+    Read from the snapshot's subject counts file when there is one, so subjects that listed nothing are
+    known empty; otherwise counted from the snapshot, where only subjects with sections appear
+    """
+    counts_file = subjects_path(data_file)
+    if Path(counts_file).exists():
+        with open(counts_file, 'r', encoding='utf-8') as f:
+            return {code: int(count) for code, count in json.load(f).items()}
+    
+    counts = defaultdict(int)
+    for course_data in iter_courses(data_file, projection='enrollment'):
+        counts[course_subject(course_data.course_info.course_code)] += len(course_data.sections)
+    return dict(counts)
+
+def plan_subject_batches(subjects: List[Dict], section_counts: Dict[str, int],
+                         budget: int = BATCH_SECTION_BUDGET,
+                         max_subjects: int = BATCH_MAX_SUBJECTS) -> List[List[Dict]]:
+    """Group subjects into search batches, first-fit decreasing by last run's section count
+    
+    Subjects missing from the history are unknown (new, or their search failed last run) and are searched
+    alone, as is every subject when there is no history at all
+    """
+    if not section_counts:
+        return [[subject] for subject in subjects]
+    
+    batches = []
+    small = []
+    for subject in subjects:
+        count = section_counts.get(subject.get('code'))
+        if count is None or count > SMALL_SUBJECT_SECTIONS or not subject.get('checkbox_id'):
+            batches.append([subject])
+        else:
+            small.append((count, subject))
+    
+    open_batches = []  # [planned sections, subjects]
+    for count, subject in sorted(small, key=lambda item: -item[0]):
+        for entry in open_batches:
+            if entry[0] + count <= budget and len(entry[1]) < max_subjects:
+                entry[0] += count
+                entry[1].append(subject)
+                break
+        else:
+            open_batches.append([count, [subject]])
+    
+    batches.extend(entry[1] for entry in open_batches)
+    return batches
+
+def split_sections_by_subject(sections: Iterable[SectionInfo], subject_codes: Iterable[str]) -> Dict[str, List[SectionInfo]]:
+    """Listed sections of a batched search, keyed by the subject of their course code"""
+    by_subject = {code: [] for code in subject_codes}
+    for section in sections:
+        subject = course_subject(getattr(section, 'course_code', '') or '')
+        if subject in by_subject:
+            by_subject[subject].append(section)
+        else:
+            logger.debug(f"Dropping section {section.class_number} of unrequested subject {subject!r}")
+    return by_subject
+
+def is_oversized_page(html: str, sections: List[SectionInfo]) -> bool:
+    """Whether a results page hit the row cap or is too large to take in one piece"""
+    return len(sections) >= RESULT_ROW_CAP or len(html) >= OVERSIZED_PAGE_BYTES
+
+def split_criteria(criteria: Dict[str, str]) -> List[Dict[str, str]]:
+    """Narrower sub-queries that together cover one search: first by catalog number, then by career
+    
+    Returns [] once the search is split both ways
+    """
+    if CATALOG_FORM_FIELD not in criteria:
+        return [
+            dict(criteria, **{CATALOG_FORM_FIELD: CATALOG_BELOW_SPLIT, CATALOG_MATCH_FORM_FIELD: CATALOG_AT_MOST}),
+            dict(criteria, **{CATALOG_FORM_FIELD: CATALOG_SPLIT, CATALOG_MATCH_FORM_FIELD: CATALOG_AT_LEAST}),
+        ]
+    if CAREER_FORM_FIELD not in criteria:
+        return [dict(criteria, **{CAREER_FORM_FIELD: career}) for career in CAREERS]
+    return []
+
+def merge_sections(*groups: Iterable[SectionInfo]) -> List[SectionInfo]:
+    """Sections of overlapping searches, each class number once (first listing wins)"""
+    merged = {}
+    for group in groups:
+        for section in group:
+            merged.setdefault(section.class_number, section)
+    return list(merged.values())
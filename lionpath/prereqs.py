@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Prerequisite graph
+Parses enrollment requirement text into AND-of-OR course groups once, and keeps the resulting
+dependency graph in compact adjacency arrays with precomputed transitive closures and levels
+"""
+
+import json
+import re
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from compressed_io import strip_compression_suffix
+
+from .models import OptimizedCourseData
+
+GRAPH_SUFFIX = '.prereqs.json'
+
+# Subject words never include an uppercase connector ("MATH 140 OR MATH 140H" is two refs, not "OR MATH")
+COURSE_REF_PATTERN = re.compile(r'\b(?!(?:AND|OR)\b)([A-Z]{1,5}(?: (?!(?:AND|OR)\b)[A-Z]{1,5})?)\s*(\d{3}[A-Z]?)\b')
+# "CMPSC 121 or 131": a bare catalog number right after a connector borrows the previous subject
+BARE_NUMBER_PATTERN = re.compile(r'(?:\bor|\band|,)\s+(\d{3}[A-Z]?)\b', re.IGNORECASE)
+PREREQUISITE_LABEL_PATTERN = re.compile(r'prerequisites?(?: at enrollment)?\s*:?', re.IGNORECASE)
+COREQUISITE_PATTERN = re.compile(r'(?:enforced\s+)?(?:concurrent|corequisite)', re.IGNORECASE)
+AND_PATTERN = re.compile(r'\band\b|;', re.IGNORECASE)
+OR_PATTERN = re.compile(r'\bor\b', re.IGNORECASE)
+
+def prerequisite_text(requirements: str) -> str:
+    """The prerequisite part of an enrollment requirements string (concurrent/corequisite parts dropped)"""
+    text = requirements or ''
+    label = PREREQUISITE_LABEL_PATTERN.search(text)
+    if label:
+        text = text[label.end():]
+    coreq = COREQUISITE_PATTERN.search(text)
+    if coreq:
+        text = text[:coreq.start()]
+    return text
+
+def course_refs(text: str) -> List[str]:
+    """Course codes mentioned in text, in order, with bare numbers expanded to the preceding subject"""
+    found = [(m.start(), m.group(1), m.group(2)) for m in COURSE_REF_PATTERN.finditer(text)]
+    found += [(m.start(1), None, m.group(1)) for m in BARE_NUMBER_PATTERN.finditer(text)]
+    
+    refs = []
+    subject = None
+    for _, ref_subject, number in sorted(found):
+        subject = ref_subject or subject
+        if subject:
+            refs.append(f"{subject} {number}")
+    return refs
+
+def top_level_split(text: str, pattern) -> List[str]:
+    """Split on a connector only where it is outside parentheses"""
+    parts = []
+    depth = 0
+    start = 0
+    outside = []
+    for char in text:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth = max(depth - 1, 0)
+        outside.append(depth == 0)
+    
+    for match in pattern.finditer(text):
+        if outside[match.start()]:
+            parts.append(text[start:match.start()])
+            start = match.end()
+    parts.append(text[start:])
+    return parts
+
+def parse_prerequisites(requirements: str) -> List[List[str]]:
+    """Parse requirement text into AND-of-OR groups of course codes
+    
+    "MATH 140 or MATH 140H; CMPSC 121 or 131" -> [["MATH 140", "MATH 140H"], ["CMPSC 121", "CMPSC 131"]]
+    A comma list takes the connector that ends it ("A, B, or C" is one OR group); non-course
+    alternatives such as placement exams are ignored
+    """
+    text = prerequisite_text(requirements)
+    if not COURSE_REF_PATTERN.search(text):
+        return []
+    
+    groups = []
+    for clause in top_level_split(text, AND_PATTERN):
+        if OR_PATTERN.search(clause):
+            alternatives = course_refs(clause)
+            if alternatives:
+                groups.append(list(dict.fromkeys(alternatives)))
+        else:
+            groups.extend([ref] for ref in dict.fromkeys(course_refs(clause)))
+    
+    seen = set()
+    unique = []
+    for group in groups:
+        key = tuple(group)
+        if key not in seen:
+            seen.add(key)
+            unique.append(group)
+    return unique
+
+def graph_path(output_file: str) -> str:
+    """Graph file written next to an output: courses.jsonl.gz -> courses.jsonl.prereqs.json"""
+    return strip_compression_suffix(output_file) + GRAPH_SUFFIX
+
+def to_csr(lists: List[Iterable[int]]):
+    """Pack per-node id lists into (offsets, targets) arrays"""
+    offsets = array('I', [0])
+    targets = array('I')
+    for items in lists:
+        targets.extend(sorted(items))
+        offsets.append(len(targets))
+    return offsets, targets
+
+def bits_to_ids(bits: int) -> List[int]:
+    """Set bit positions of an int, lowest first"""
+    ids = []
+    while bits:
+        low = bits & -bits
+        ids.append(low.bit_length() - 1)
+        bits ^= low
+    return ids
+
+class PrerequisiteGraph:
+    """Course dependency graph in CSR form with ancestor/descendant closures and topological levels
+    
+    Levels are the fewest terms of prerequisites before a course can be taken (OR takes the cheapest
+    alternative, AND the most expensive group); courses on a prerequisite cycle get level -1
+    """
+    
+    def __init__(self, requirements: Dict[str, List[List[str]]]):
+        names = set(requirements)
+        for groups in requirements.values():
+            for group in groups:
+                names.update(group)
+        self.nodes: List[str] = sorted(names)
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.nodes)}
+        
+        # AND-of-OR groups as ids, kept for "can I take this yet" checks; a course naming itself is dropped
+        # from its groups, and a group left empty by that is dropped too
+        self.groups: Dict[int, List[List[int]]] = {}
+        for code, groups in requirements.items():
+            id_groups = [[self.ids[ref] for ref in group if ref != code] for group in groups]
+            id_groups = [group for group in id_groups if group]
+            if id_groups:
+                self.groups[self.ids[code]] = id_groups
+        
+        requires = [set() for _ in self.nodes]
+        unlocks = [set() for _ in self.nodes]
+        for node, groups in self.groups.items():
+            for group in groups:
+                for prereq in group:
+                    requires[node].add(prereq)
+                    unlocks[prereq].add(node)
+        
+        self.requires_offsets, self.requires_targets = to_csr(requires)
+        self.unlocks_offsets, self.unlocks_targets = to_csr(unlocks)
+        self.compute_closures(requires, unlocks)
+    
+    def compute_closures(self, requires: List[Set[int]], unlocks: List[Set[int]]):
+        """Topological levels plus ancestor and descendant closures, one pass each over a Kahn order"""
+        count = len(self.nodes)
+        pending = [len(prereqs) for prereqs in requires]
+        queue = deque(i for i in range(count) if not pending[i])
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for dependent in unlocks[node]:
+                pending[dependent] -= 1
+                if not pending[dependent]:
+                    queue.append(dependent)
+        
+        levels = [-1] * count
+        ancestors = [0] * count
+        for node in order:
+            ancestors[node] = 0
+            for prereq in requires[node]:
+                ancestors[node] |= ancestors[prereq] | (1 << prereq)
+            groups = self.groups.get(node)
+            levels[node] = 1 + max(min(levels[p] for p in group) for group in groups) if groups else 0
+        
+        # Nodes left out of the order sit on or behind a cycle: iterate their closure to a fixed point
+        cyclic = [i for i in range(count) if pending[i]]
+        changed = bool(cyclic)
+        while changed:
+            changed = False
+            for node in cyclic:
+                bits = ancestors[node]
+                for prereq in requires[node]:
+                    bits |= ancestors[prereq] | (1 << prereq)
+                if bits != ancestors[node]:
+                    ancestors[node] = bits
+                    changed = True
+        
+        descendants = [0] * count
+        for node in range(count):
+            for ancestor in bits_to_ids(ancestors[node]):
+                descendants[ancestor] |= 1 << node
+        
+        self.levels = array('i', levels)
+        self.ancestors_offsets, self.ancestors_targets = to_csr(bits_to_ids(bits) for bits in ancestors)
+        self.descendants_offsets, self.descendants_targets = to_csr(bits_to_ids(bits) for bits in descendants)
+    
+    @classmethod
+    def from_courses(cls, courses_data: Dict[str, OptimizedCourseData]) -> 'PrerequisiteGraph':
+        """Parse every course's enrollment requirements and build the graph"""
+        return cls({
+            course_code: parse_prerequisites(course_data.course_info.enrollment_requirements)
+            for course_code, course_data in courses_data.items()
+        })
+    
+    def neighbours(self, offsets: array, targets: array, course_code: str) -> List[str]:
+        """Slice one node's row out of a CSR pair"""
+        node = self.ids.get(course_code.upper())
+        if node is None:
+            return []
+        return [self.nodes[i] for i in targets[offsets[node]:offsets[node + 1]]]
+    
+    def prerequisites(self, course_code: str) -> List[str]:
+        """Courses named directly in a course's prerequisites"""
+        return self.neighbours(self.requires_offsets, self.requires_targets, course_code)
+    
+    def prerequisite_chain(self, course_code: str) -> List[str]:
+        """Every course a course depends on, transitively"""
+        return self.neighbours(self.ancestors_offsets, self.ancestors_targets, course_code)
+    
+    def unlocks(self, course_code: str) -> List[str]:
+        """Courses that list this course as a prerequisite"""
+        return self.neighbours(self.unlocks_offsets, self.unlocks_targets, course_code)
+    
+    def leads_to(self, course_code: str) -> List[str]:
+        """Every course this course is a (transitive) prerequisite of"""
+        return self.neighbours(self.descendants_offsets, self.descendants_targets, course_code)
+    
+    def level(self, course_code: str) -> Optional[int]:
+        """Topological level (0 = no course prerequisites), -1 on a cycle, None if unknown"""
+        node = self.ids.get(course_code.upper())
+        return None if node is None else self.levels[node]
+    
+    def available_after(self, taken: Iterable[str]) -> List[str]:
+        """Courses not yet taken whose every prerequisite group is satisfied by the taken set"""
+        done = {self.ids[code.upper()] for code in taken if code.upper() in self.ids}
+        candidates = set()
+        for node in done:
+            candidates.update(self.unlocks_targets[self.unlocks_offsets[node]:self.unlocks_offsets[node + 1]])
+        
+        return sorted(
+            self.nodes[node] for node in candidates - done
+            if all(any(prereq in done for prereq in group) for group in self.groups.get(node, []))
+        )
+    
+    def to_dict(self) -> Dict[str, object]:
+        """Plain lists of every array, as saved"""
+        return {
+            'nodes': self.nodes,
+            'groups': {str(node): groups for node, groups in self.groups.items()},
+            'levels': self.levels.tolist(),
+            'requires': [self.requires_offsets.tolist(), self.requires_targets.tolist()],
+            'unlocks': [self.unlocks_offsets.tolist(), self.unlocks_targets.tolist()],
+            'ancestors': [self.ancestors_offsets.tolist(), self.ancestors_targets.tolist()],
+            'descendants': [self.descendants_offsets.tolist(), self.descendants_targets.tolist()],
+        }
+    
+    def save(self, graph_file: str):
+        """Write the arrays as compact JSON"""
+        with open(graph_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+    
+    @classmethod
+    def load(cls, graph_file: str) -> 'PrerequisiteGraph':
+        """Load a saved graph without re-parsing any requirement text"""
+        with open(graph_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        graph = cls.__new__(cls)
+        graph.nodes = data['nodes']
+        graph.ids = {name: i for i, name in enumerate(graph.nodes)}
+        graph.groups = {int(node): groups for node, groups in data['groups'].items()}
+        graph.levels = array('i', data['levels'])
+        for name in ('requires', 'unlocks', 'ancestors', 'descendants'):
+            offsets, targets = data[name]
+            setattr(graph, f"{name}_offsets", array('I', offsets))
+            setattr(graph, f"{name}_targets", array('I', targets))
+        return graph
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Lazy reader for the optimized JSONL format
+Yields OptimizedCourseData one course at a time, can decode only the course block or only the
+enrollment fields, and uses a sidecar byte-offset index to read just the requested subjects
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+from dataclasses import fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from compressed_io import compression_for_path, iter_jsonl_lines, open_input_stream, strip_compression_suffix
+
+from .models import CourseInfo, SectionInfo, OptimizedCourseData
+from .parsers import normalize_meeting_time
+
+logger = logging.getLogger(__name__)
+
+OFFSETS_SUFFIX = '.offsets.json'
+OFFSETS_VERSION = 2
+
+COURSE_FIELD_NAMES = frozenset(f.name for f in fields(CourseInfo))
+SECTION_FIELD_NAMES = frozenset(f.name for f in fields(SectionInfo))
+COURSE_IDENTITY_FIELDS = frozenset(['course_code', 'course_title', 'subject', 'catalog_number'])
+ENROLLMENT_FIELDS = frozenset([
+    'section', 'class_number', 'campus', 'class_capacity', 'enrollment_total', 'available_seats',
+    'waitlist_capacity', 'waitlist_total', 'status',
+])
+PROJECTIONS = (None, 'course', 'enrollment')
+
+COURSE_CODE_BYTES = re.compile(rb'"course_code"\s*:\s*"((?:[^"\\]|\\.)*)"')
+RECORD_HEAD = re.compile(r'\s*\{\s*"course"\s*:\s*')
+SECTIONS_KEY = re.compile(r'\s*,\s*"sections"\s*:\s*')
+DECODER = json.JSONDecoder()
+
+READ_CHUNK = 1024 * 1024
+
+def offsets_path(data_file: str) -> str:
+    """Sidecar index next to a snapshot: courses.jsonl.gz -> courses.jsonl.offsets.json"""
+    return strip_compression_suffix(data_file) + OFFSETS_SUFFIX
+
+def course_subject(course_code: str) -> str:
+    """Subject part of a course code ("E E 210" -> "E E")"""
+    return course_code.rsplit(' ', 1)[0] if ' ' in course_code else course_code
+
+def add_subject_range(subjects: Dict[str, List[List[int]]], subject: str, start: int, end: int):
+    """Record a subject's byte range, extending the last range when records are contiguous"""
+    ranges = subjects.setdefault(subject, [])
+    if ranges and ranges[-1][1] == start:
+        ranges[-1][1] = end
+    else:
+        ranges.append([start, end])
+
+def source_signature(data_file: str) -> Dict[str, int]:
+    """Size and modification time of the snapshot an index was built for"""
+    stat = os.stat(data_file)
+    return {'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns}
+
+def offset_index(data_file: str, courses: Dict[str, List[int]], subjects: Dict[str, List[List[int]]],
+                 data_size: int) -> Dict[str, Any]:
+    """Offset index document for a finished snapshot file; data_size is the decompressed length"""
+    return {
+        'version': OFFSETS_VERSION,
+        **source_signature(data_file),
+        'data_size': data_size,
+        'courses': courses,
+        'subjects': subjects,
+    }
+
+def scan_offsets(data_file: str) -> Dict[str, Any]:
+    """Build an offset index by scanning line boundaries; only each line's course_code is looked at
+    
+    Snapshots saved by save_optimized_results already have one; this covers older or copied files.
+    Offsets are positions in the decompressed stream, so the same index works for .gz/.zst snapshots
+    """
+    courses = {}
+    subjects = {}
+    position = 0
+    with open_input_stream(data_file) as f:
+        for line in f:
+            match = COURSE_CODE_BYTES.search(line)
+            if match and line.strip():
+                course_code = json.loads(b'"' + match.group(1) + b'"')
+                courses[course_code] = [position, len(line)]
+                add_subject_range(subjects, course_subject(course_code), position, position + len(line))
+            position += len(line)
+    
+    return offset_index(data_file, courses, subjects, position)
+
+def write_offsets(data_file: str, index: Dict[str, Any]) -> str:
+    """Write an offset index next to its snapshot"""
+    index_file = offsets_path(data_file)
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return index_file
+
+def load_offsets(data_file: str, build: bool = True) -> Optional[Dict[str, Any]]:
+    """Offset index for a snapshot; a missing or stale sidecar is rebuilt (and saved when possible)"""
+    index_file = offsets_path(data_file)
+    if os.path.exists(index_file):
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            signature = source_signature(data_file)
+            if index.get('version') == OFFSETS_VERSION and all(index.get(k) == v for k, v in signature.items()):
+                return index
+        except (OSError, ValueError):
+            pass
+    
+    if not build:
+        return None
+    
+    index = scan_offsets(data_file)
+    try:
+        write_offsets(data_file, index)
+    except OSError as e:
+        logger.debug(f"Could not save offset index for {data_file}: {e}")
+    return index
+
+def skip_to(stream, current: int, target: int) -> int:
+    """Move a stream forward to target; compressed streams that cannot seek are read and discarded"""
+    if target <= current:
+        return current
+    if stream.seekable():
+        stream.seek(target - current, os.SEEK_CUR)
+        return target
+    while current < target:
+        chunk = stream.read(min(READ_CHUNK, target - current))
+        if not chunk:
+            break
+        current += len(chunk)
+    return current
+
+def partition_spans(index: Dict[str, Any], parts: int) -> List[Tuple[int, int]]:
+    """Split the whole snapshot into about `parts` contiguous (offset, length) ranges of similar size
+    
+    Ranges only break at indexed record boundaries, so every line lands in exactly one range
+    """
+    end = index['data_size']
+    if not end:
+        return []
+    
+    start = 0
+    target = max(end // max(parts, 1), 1)
+    spans = []
+    for offset, _ in sorted(index['courses'].values()):
+        if offset - start >= target and len(spans) < parts - 1:
+            spans.append((start, offset - start))
+            start = offset
+    spans.append((start, end - start))
+    return spans
+
+def read_spans(data_file: str, spans: Iterable[Tuple[int, int]]) -> Iterator[bytes]:
+    """Read (offset, length) spans of the decompressed snapshot in file order"""
+    position = 0
+    with open_input_stream(data_file) as f:
+        for offset, length in sorted(spans):
+            position = skip_to(f, position, offset)
+            chunk = f.read(length)
+            position += len(chunk)
+            yield chunk
+
+def iter_course_lines(data_file: str, subjects: Iterable[str] = None) -> Iterator[bytes]:
+    """Raw JSONL lines, limited to the given subjects through the offset index when subjects are given"""
+    if subjects is None:
+        yield from iter_jsonl_lines(data_file)
+        return
+    
+    index = load_offsets(data_file)
+    spans = []
+    for subject in {s.strip().upper() for s in subjects}:
+        spans.extend((start, end - start) for start, end in index['subjects'].get(subject, []))
+    
+    for chunk in read_spans(data_file, spans):
+        for line in chunk.splitlines():
+            if line.strip():
+                yield line
+
+def decode_record(line: bytes, projection: str = None) -> Optional[OptimizedCourseData]:
+    """Decode one JSONL line, parsing only the blocks the projection needs
+    
+    projection=None decodes everything, 'course' stops after the course block and 'enrollment'
+    keeps only course identity and per-section enrollment fields
+    """
+    if projection not in PROJECTIONS:
+        raise ValueError(f"Unknown projection: {projection}")
+    
+    text = line.decode('utf-8') if isinstance(line, bytes) else line
+    head = RECORD_HEAD.match(text)
+    if projection is None or not head:
+        record = json.loads(text)
+        course = record.get('course', {})
+        sections = record.get('sections', []) if projection != 'course' else []
+    else:
+        course, end = DECODER.raw_decode(text, head.end())
+        sections = []
+        if projection != 'course':
+            key = SECTIONS_KEY.match(text, end)
+            sections = DECODER.raw_decode(text, key.end())[0] if key else json.loads(text).get('sections', [])
+    
+    if not course.get('course_code'):
+        return None
+    
+    course_keys = COURSE_IDENTITY_FIELDS if projection == 'enrollment' else COURSE_FIELD_NAMES
+    section_keys = ENROLLMENT_FIELDS if projection == 'enrollment' else SECTION_FIELD_NAMES
+    course_data = OptimizedCourseData(
+        course_info=CourseInfo(**{k: v for k, v in course.items() if k in course_keys}),
+        sections=[SectionInfo(**{k: v for k, v in section.items() if k in section_keys}) for section in sections]
+    )
+    
+    # Snapshots written before meeting times were normalized only carry the text fields
+    if projection is None:
+        for section in course_data.sections:
+            if not section.day_mask and section.days:
+                normalize_meeting_time(section)
+    return course_data
+
+def iter_courses(data_file: str, subjects: Iterable[str] = None, projection: str = None) -> Iterator[OptimizedCourseData]:
+    """Lazily yield courses from an optimized JSONL snapshot (optionally .gz/.zst)
+    
+    subjects limits reading to those subjects' byte ranges; projection is None, 'course' or 'enrollment'
+    """
+    for line in iter_course_lines(data_file, subjects):
+        course_data = decode_record(line, projection)
+        if course_data is not None:
+            yield course_data
+
+class SnapshotReader:
+    """Random access to single courses or subjects of a snapshot through its offset index
+    
+    Uncompressed snapshots are memory-mapped and sliced; compressed ones are opened per lookup and
+    skipped forward to the record
+    """
+    
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self.index = load_offsets(data_file)
+        self.map = None
+        if compression_for_path(data_file) is None and os.path.getsize(data_file):
+            with open(data_file, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Release the memory map"""
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+    
+    def read_span(self, offset: int, length: int) -> bytes:
+        """Raw bytes of one span of the decompressed snapshot"""
+        if self.map is not None:
+            return self.map[offset:offset + length]
+        return next(read_spans(self.data_file, [(offset, length)]), b'')
+    
+    def course(self, course_code: str, projection: str = None) -> Optional[OptimizedCourseData]:
+        """One course by code, or None when the snapshot does not have it"""
+        entry = self.index['courses'].get(course_code.strip().upper())
+        return decode_record(self.read_span(*entry), projection) if entry else None
+    
+    def subject(self, subject: str, projection: str = None) -> Iterator[OptimizedCourseData]:
+        """Every course of one subject"""
+        for start, end in self.index['subjects'].get(subject.strip().upper(), []):
+            for line in self.read_span(start, end - start).splitlines():
+                course_data = decode_record(line, projection) if line.strip() else None
+                if course_data is not None:
+                    yield course_data
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Time-bounded parser regexes and the backtracking audit harness
+Parser patterns are registered by name with a per-call time budget and per-pattern metrics; the audit
+runs any pattern against generated worst-case inputs of growing size and flags super-linear growth
+"""
+
+import logging
+import multiprocessing
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+logger = logging.getLogger(__name__)
+
+# A parser pattern on one page should take well under this; a call over it counts as an overrun
+DEFAULT_BUDGET = 0.25
+# Longest text the stdlib re fallback will run a pattern on. The audit holds every pattern to linear time,
+# so capping the input caps the call; results pages past 3 MB are already split into sub-queries
+FALLBACK_MAX_CHARS = 4_000_000
+
+# Registered patterns by name
+PATTERNS: Dict[str, 'GuardedPattern'] = {}
+
+class GuardedPattern:
+    """A compiled parser pattern with a per-call time budget and call metrics
+    
+    With the regex module installed a call over budget is aborted mid-match and returns no match (None, []
+    or the unchanged string for sub). The stdlib re engine cannot be interrupted from a worker thread, so
+    there the budget is advisory: a call over it finishes with its real result and is only recorded, and
+    the call is bounded instead by refusing text longer than max_chars, which is counted as aborted. A slow
+    call (a GC pause, a busy core) never changes what later calls return.
+    """
+    
+    def __init__(self, name: str, pattern: str, flags: int = 0, budget: float = DEFAULT_BUDGET,
+                 max_chars: int = FALLBACK_MAX_CHARS):
+        self.name = name
+        self.pattern = pattern
+        self.flags = flags
+        self.budget = budget
+        self.max_chars = max_chars
+        self.compiled = re.compile(pattern, flags)
+        self.timed = regex.compile(pattern, flags) if regex is not None else None
+        self.lock = threading.Lock()
+        self.metrics = {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'overruns': 0, 'aborted': 0}
+    
+    def __repr__(self):
+        return f"GuardedPattern({self.name!r}, {self.pattern!r})"
+    
+    def run(self, method: str, text: str, args: tuple, default: Any = None) -> Any:
+        """Call a pattern method on text under the budget, returning default if the call is aborted"""
+        started = time.perf_counter()
+        try:
+            if self.timed is not None:
+                result = getattr(self.timed, method)(*args, timeout=self.budget)
+            elif len(text) > self.max_chars:
+                self.record(0.0, aborted=True)
+                logger.warning(f"⏱️ Pattern {self.name} skipped {len(text)} chars, over its {self.max_chars} limit")
+                return default
+            else:
+                result = getattr(self.compiled, method)(*args)
+        except TimeoutError:
+            self.record(time.perf_counter() - started, aborted=True)
+            logger.warning(f"⏱️ Pattern {self.name} aborted after {self.budget}s on {len(text)} chars")
+            return default
+        
+        elapsed = time.perf_counter() - started
+        overran = elapsed > self.budget
+        if overran:
+            logger.warning(f"⏱️ Pattern {self.name} took {elapsed:.2f}s on {len(text)} chars")
+        self.record(elapsed, overran=overran)
+        return result
+    
+    def record(self, seconds: float, overran: bool = False, aborted: bool = False):
+        """Add one call to the pattern's metrics"""
+        with self.lock:
+            self.metrics['calls'] += 1
+            self.metrics['seconds'] += seconds
+            self.metrics['max_seconds'] = max(self.metrics['max_seconds'], seconds)
+            self.metrics['overruns'] += overran
+            self.metrics['aborted'] += aborted
+    
+    def search(self, text: str, *args):
+        return self.run('search', text, (text,) + args)
+    
+    def match(self, text: str, *args):
+        return self.run('match', text, (text,) + args)
+    
+    def findall(self, text: str, *args) -> list:
+        return self.run('findall', text, (text,) + args, default=[])
+    
+    def sub(self, replacement, text: str, count: int = 0) -> str:
+        return self.run('sub', text, (replacement, text, count), default=text)
+
+def guard(name: str, pattern: str, flags: int = 0, budget: float = DEFAULT_BUDGET,
+          max_chars: int = FALLBACK_MAX_CHARS) -> GuardedPattern:
+    """Compile and register a parser pattern under a unique name"""
+    if name in PATTERNS:
+        raise ValueError(f"Pattern {name} is already registered")
+    PATTERNS[name] = GuardedPattern(name, pattern, flags, budget, max_chars)
+    return PATTERNS[name]
+
+def regex_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every registered pattern that has been called"""
+    return {name: dict(p.metrics) for name, p in PATTERNS.items() if p.metrics['calls']}
+
+def regex_incidents() -> Dict[str, Dict[str, Any]]:
+    """Metrics of the patterns that overran their budget or were aborted"""
+    return {name: m for name, m in regex_metrics().items() if m['overruns'] or m['aborted']}
+
+def reset_regex_metrics():
+    """Zero every pattern's metrics"""
+    for p in PATTERNS.values():
+        with p.lock:
+            p.metrics = {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'overruns': 0, 'aborted': 0}
+
+CATEGORY_CHARS = {
+    sre_constants.CATEGORY_DIGIT: '1',
+    sre_constants.CATEGORY_NOT_DIGIT: 'a',
+    sre_constants.CATEGORY_SPACE: ' ',
+    sre_constants.CATEGORY_NOT_SPACE: 'a',
+    sre_constants.CATEGORY_WORD: 'a',
+    sre_constants.CATEGORY_NOT_WORD: ' ',
+}
+# Candidates tried for a negated class, most page-like first
+CANDIDATE_CHARS = 'a1 <>"\'=/-:.\nA'
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) + (
+    (sre_constants.POSSESSIVE_REPEAT,) if hasattr(sre_constants, 'POSSESSIVE_REPEAT') else ())
+# Worst-case input sizes; each is 4x the last so linear growth shows as x4
+AUDIT_SIZES = (1024, 4096, 16384)
+# Appended to every attack so nothing that needs a specific terminator can finish matching
+FAIL_CHAR = '\x00'
+
+def _class_matches(items, char: str) -> bool:
+    """Whether a character is in a parsed [...] class"""
+    negate = False
+    found = False
+    for op, av in items:
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL:
+            found |= ord(char) == av
+        elif op == sre_constants.RANGE:
+            found |= av[0] <= ord(char) <= av[1]
+        elif op == sre_constants.CATEGORY:
+            found |= bool(re.match(f"[{_category_escape(av)}]", char))
+    return found != negate
+
+def _category_escape(category) -> str:
+    return {
+        sre_constants.CATEGORY_DIGIT: r'\d', sre_constants.CATEGORY_NOT_DIGIT: r'\D',
+        sre_constants.CATEGORY_SPACE: r'\s', sre_constants.CATEGORY_NOT_SPACE: r'\S',
+        sre_constants.CATEGORY_WORD: r'\w', sre_constants.CATEGORY_NOT_WORD: r'\W',
+    }.get(category, r'\w')
+
+def sample(items, groups: Dict[int, str]) -> str:
+    """A short string matching a parsed (sub)pattern, best effort; group texts are kept for backreferences"""
+    out = []
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            out.append(chr(av))
+        elif op == sre_constants.NOT_LITERAL:
+            out.append('a' if av != ord('a') else 'b')
+        elif op == sre_constants.ANY:
+            out.append('a')
+        elif op == sre_constants.IN:
+            out.append(next((c for c in CANDIDATE_CHARS if _class_matches(av, c)), 'a'))
+        elif op == sre_constants.CATEGORY:
+            out.append(CATEGORY_CHARS.get(av, 'a'))
+        elif op == sre_constants.BRANCH:
+            out.append(sample(av[1][0], groups))
+        elif op == sre_constants.SUBPATTERN:
+            text = sample(av[-1], groups)
+            if av[0]:
+                groups[av[0]] = text
+            out.append(text)
+        elif op in REPEATS:
+            out.append(sample(av[2], groups) * max(av[0], 1))
+        elif op == sre_constants.GROUPREF:
+            out.append(groups.get(av, ''))
+        elif op == sre_constants.ASSERT:
+            continue
+        elif getattr(sre_constants, 'ATOMIC_GROUP', None) == op:
+            out.append(sample(av, groups))
+    return ''.join(out)
+
+def _repeats(items, prefix: str, groups: Dict[int, str]) -> Iterable[Tuple[str, str]]:
+    """(text before, one iteration) for every repeat in a parsed pattern, including nested ones"""
+    for index, (op, av) in enumerate(items):
+        before = prefix + sample(items[:index], dict(groups))
+        if op in REPEATS:
+            yield before, sample(av[2], dict(groups))
+            yield from _repeats(av[2], before, groups)
+        elif op == sre_constants.SUBPATTERN:
+            yield from _repeats(av[-1], before, groups)
+        elif op == sre_constants.BRANCH:
+            for branch in av[1]:
+                yield from _repeats(branch, before, groups)
+
+def worst_case_inputs(pattern: str, flags: int, size: int) -> Dict[str, str]:
+    """Inputs of about size characters aimed at the ways a pattern can backtrack
+    
+    - pumped repeats: the text before a repeat, then one iteration of it over and over, then a dead end
+    - repeated prefixes: the first k elements of the pattern over and over, so every start gets far and fails
+    """
+    items = list(sre_parse.parse(pattern, flags))
+    inputs = {}
+    
+    for n, (before, unit) in enumerate(_repeats(items, '', {})):
+        if unit:
+            inputs[f"pump {n}"] = before + unit * max(1, (size - len(before)) // len(unit)) + FAIL_CHAR
+    
+    for k in range(1, len(items) + 1):
+        unit = sample(items[:k], {})
+        if unit:
+            inputs[f"prefix {k}"] = unit * max(1, size // len(unit)) + FAIL_CHAR
+    
+    # Identical strings only need timing once
+    unique = {}
+    for label, text in inputs.items():
+        unique.setdefault(text, label)
+    return {label: text for text, label in unique.items()}
+
+# Fast calls are repeated and the best time kept, so scheduler noise does not read as super-linear growth
+QUICK_CALL = 0.05
+QUICK_REPEATS = 5
+
+def _timing_worker(conn):
+    """Child process loop: time findall per request until sent None"""
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        pattern, flags, text = request
+        compiled = re.compile(pattern, flags)
+        best = None
+        for _ in range(QUICK_REPEATS):
+            started = time.perf_counter()
+            compiled.findall(text)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+            if elapsed > QUICK_CALL:
+                break
+        conn.send(best)
+
+class PatternTimer:
+    """Times findall calls in a child process, so a runaway match is killed instead of hanging the audit"""
+    
+    def __init__(self):
+        self.process = None
+        self.conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def start(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_timing_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+    
+    def close(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+        self.process = self.conn = None
+    
+    def time(self, pattern: str, flags: int, text: str, limit: float) -> Optional[float]:
+        """Seconds for a findall (the call that tries every start position), None if it ran past limit"""
+        if self.process is None:
+            self.start()
+        self.conn.send((pattern, flags, text))
+        if self.conn.poll(limit):
+            return self.conn.recv()
+        self.close()
+        return None
+
+def audit_pattern(pattern: str, flags: int = 0, sizes: Tuple[int, ...] = AUDIT_SIZES, bound: float = DEFAULT_BUDGET,
+                  timer: Optional[PatternTimer] = None) -> Dict[str, Any]:
+    """Time a pattern on worst-case inputs of growing size
+    
+    A pattern fails if any input takes longer than bound, or if quadrupling the input multiplies the time
+    by more than 8 once calls take long enough to measure (linear growth is 4). A call is killed shortly
+    after bound, and the audit of a pattern stops at its first failure.
+    """
+    try:
+        re.compile(pattern, flags)
+    except re.error as e:
+        return {'ok': False, 'error': f"does not compile: {e}", 'worst': None, 'seconds': None, 'growth': None}
+    
+    own_timer = timer is None
+    timer = timer or PatternTimer()
+    worst = ('', 0.0, 1.0)  # (input label, seconds at the largest size, growth)
+    failure = None
+    try:
+        for label in worst_case_inputs(pattern, flags, sizes[0]):
+            timings = []
+            for size in sizes:
+                text = worst_case_inputs(pattern, flags, size)[label]
+                seconds = timer.time(pattern, flags, text, bound * 2 + 0.5)
+                if seconds is None or seconds > bound:
+                    failure = failure or f"{label}: {'killed after' if seconds is None else 'took'} " \
+                                         f"{seconds or bound * 2 + 0.5:.2f}s at {len(text)} chars"
+                    timings.append(seconds or bound * 2 + 0.5)
+                    break
+                timings.append(seconds)
+            
+            growth = max((later / max(earlier, 1e-6) for earlier, later in zip(timings, timings[1:])), default=1.0)
+            if failure is None and timings[-1] > 0.005 and growth > 8:
+                failure = f"{label}: time x{growth:.0f} per 4x input"
+            if timings[-1] > worst[1]:
+                worst = (label, timings[-1], growth)
+            if failure:
+                break
+    finally:
+        if own_timer:
+            timer.close()
+    
+    return {'ok': failure is None, 'error': failure, 'worst': worst[0], 'seconds': worst[1], 'growth': worst[2]}
+
+def audit_registered(sizes: Tuple[int, ...] = AUDIT_SIZES, bound: float = DEFAULT_BUDGET) -> Dict[str, Dict[str, Any]]:
+    """Audit every registered parser pattern"""
+    with PatternTimer() as timer:
+        return {name: audit_pattern(p.pattern, p.flags, sizes, bound, timer) for name, p in PATTERNS.items()}
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Offline re-parse of a response archive
+Archived search results and class detail pages are fanned out across a process pool, run through the
+current parsers and assembled into a fresh snapshot without touching LionPath
+"""
+
+import concurrent.futures
+import logging
+import os
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from .archive import BODIES_FILE, ResponseArchive
+from .engine import DETAIL_URL, SEARCH_URL
+from .models import CourseInfo, OptimizedCourseData, SectionInfo
+from .parsers import (
+    CAREERS,
+    apply_enrollment_fields,
+    detail_page_is_empty,
+    enrollment_fields,
+    is_university_park,
+    parse_course_level_info,
+    parse_listing_sections,
+    parse_listing_text,
+)
+from .reader import course_subject
+from .terms import term_from_url, term_name
+
+logger = logging.getLogger(__name__)
+
+LISTING = 'listing'
+DETAIL = 'detail'
+
+# Pages per task handed to a worker; large enough to amortize pickling, small enough to balance cores
+CHUNK_SIZE = 16
+
+
+def classify_record(record: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, str]]]:
+    """(kind, detail params) for an archived page worth re-parsing; None for form loads and errors"""
+    if record['status'] != 200:
+        return None
+    
+    parts = urlsplit(record['url'])
+    path = parts.path
+    if record['method'] == 'POST' and path == urlsplit(SEARCH_URL).path:
+        return LISTING, {}
+    if record['method'] == 'GET' and path == urlsplit(DETAIL_URL).path:
+        params = dict(parse_qsl(parts.query))
+        if params.get('CLASS_NBR'):
+            return DETAIL, params
+    return None
+
+# Each worker process opens the body store once and reads pages by offset
+_bodies = None
+
+def _open_bodies(path: str):
+    global _bodies
+    _bodies = open(os.path.join(path, BODIES_FILE), 'rb')
+
+def _read_body(offset: int, length: int) -> str:
+    _bodies.seek(offset)
+    return zlib.decompress(_bodies.read(length)).decode('utf-8', errors='replace')
+
+def parse_archived_page(task: Tuple[str, int, int, Dict[str, str]]) -> Tuple[str, Any, int, float]:
+    """Run the current parsers over one archived page: (kind, result, worker pid, seconds spent)"""
+    kind, offset, length, params = task
+    started = time.perf_counter()
+    html = _read_body(offset, length)
+    
+    if kind == LISTING:
+        result = parse_listing_sections(html)
+    elif detail_page_is_empty(html):
+        result = None
+    else:
+        result = {
+            'class_number': params['CLASS_NBR'],
+            'strm': params.get('STRM', ''),
+            'career': params.get('ACAD_CAREER', ''),
+            # Only the fields the page shows, so a page without them leaves the listing row's values alone
+            'enrollment': enrollment_fields(html),
+            'course_info': parse_course_level_info(html, CourseInfo()),
+        }
+    
+    return kind, result, os.getpid(), time.perf_counter() - started
+
+def merge_course_info(base: CourseInfo, parsed: CourseInfo) -> CourseInfo:
+    """Listing-derived identity fields, overlaid with everything the detail page filled in"""
+    merged = CourseInfo(**base.__dict__)
+    for name, value in parsed.__dict__.items():
+        if value and name not in ('course_code', 'subject', 'catalog_number', 'semester', 'career'):
+            # Lists are copied; one parsed page can fill several courses
+            setattr(merged, name, list(value) if isinstance(value, list) else value)
+    return merged
+
+class ArchiveReparser:
+    """Re-derive snapshots from an archive with a process pool
+    
+    Only record metadata crosses to the workers; each worker reads and decompresses the bodies it parses
+    """
+    
+    def __init__(self, archive: ResponseArchive, workers: Optional[int] = None, campus_filter: str = 'UP'):
+        self.archive = archive
+        self.workers = workers or os.cpu_count() or 1
+        self.campus_filter = campus_filter
+        self.stats = {'pages': 0, 'listing_pages': 0, 'detail_pages': 0, 'empty_pages': 0,
+                      'wall_seconds': 0.0, 'worker_seconds': defaultdict(float), 'worker_pages': defaultdict(int)}
+    
+    def tasks(self) -> Iterable[Tuple[str, int, int, Dict[str, str]]]:
+        """One task per latest archived response to a results post or a detail page"""
+        for record in self.archive.records.values():
+            classified = classify_record(record)
+            if classified:
+                kind, params = classified
+                yield kind, record['offset'], record['length'], params
+    
+    def parse_pages(self) -> Tuple[List[SectionInfo], Dict[str, Dict[str, Any]]]:
+        """Parse every archived page in the pool, consuming results as they stream back"""
+        sections = {}
+        details = {}
+        started = time.perf_counter()
+        
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=_open_bodies,
+                                                    initargs=(self.archive.path,)) as executor:
+            for kind, result, pid, seconds in executor.map(parse_archived_page, self.tasks(), chunksize=CHUNK_SIZE):
+                self.stats['pages'] += 1
+                self.stats['worker_seconds'][pid] += seconds
+                self.stats['worker_pages'][pid] += 1
+                
+                if kind == LISTING:
+                    self.stats['listing_pages'] += 1
+                    for section in result:
+                        # Repeated searches list a class more than once; course_url carries STRM and class number
+                        sections.setdefault(section.course_url, section)
+                elif result is None:
+                    self.stats['empty_pages'] += 1
+                else:
+                    self.stats['detail_pages'] += 1
+                    details[(result['strm'], result['class_number'])] = result
+        
+        self.stats['wall_seconds'] = time.perf_counter() - started
+        return list(sections.values()), details
+    
+    def reparse(self) -> Dict[str, Iterator[Dict[str, OptimizedCourseData]]]:
+        """Per STRM, an iterator over that term's courses one subject at a time, keyed by course code like a
+        live scrape
+        
+        Pages are parsed up front, but courses are only assembled as each iterator is consumed, so a writer
+        can stream a snapshot out without holding all of it
+        """
+        sections, details = self.parse_pages()
+        by_term = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+        
+        for section in sections:
+            if self.campus_filter.upper() == 'UP' and not is_university_park(section.campus, section.section):
+                continue
+            strm = term_from_url(section.course_url)
+            by_term[strm][course_subject(section.course_code)][section.course_code].append(section)
+        
+        return {strm: self.iter_subjects(strm, subjects, details) for strm, subjects in by_term.items()}
+    
+    def iter_subjects(self, strm: str, subjects: Dict[str, Dict[str, List[SectionInfo]]],
+                      details: Dict[Tuple[str, str], Dict[str, Any]]) -> Iterator[Dict[str, OptimizedCourseData]]:
+        """Build and yield one subject's courses at a time, letting go of its sections once yielded"""
+        for subject in sorted(subjects):
+            courses = subjects.pop(subject)
+            yield {code: self.build_course(code, strm, courses[code], details) for code in sorted(courses)}
+    
+    def build_course(self, course_code: str, strm: str, sections: List[SectionInfo],
+                     details: Dict[Tuple[str, str], Dict[str, Any]]) -> OptimizedCourseData:
+        """Assemble one course from its listed sections and whichever of their detail pages were archived"""
+        sections.sort(key=lambda s: (s.section, s.class_number))
+        course_info = CourseInfo(course_code=course_code, semester=term_name(strm))
+        listing = parse_listing_text(course_code)
+        if listing:
+            course_info.subject, course_info.catalog_number = listing['subject'], listing['catalog_number']
+        course_info.career = CAREERS.get(sections[0].career, '')
+        
+        course_detail = None
+        for section in sections:
+            del section.course_code
+            listed_career = section.career
+            del section.career
+            
+            detail = details.get((strm, section.class_number))
+            if detail is None:
+                continue
+            apply_enrollment_fields(section, detail['enrollment'])
+            if course_detail is None:
+                course_detail = detail
+                course_info.career = CAREERS.get(detail['career'] or listed_career, course_info.career)
+        
+        if course_detail is not None:
+            course_info = merge_course_info(course_info, course_detail['course_info'])
+        return OptimizedCourseData(course_info=course_info, sections=sections)
+    
+    def log_stats(self):
+        """Log page counts and parse throughput, overall and per worker process"""
+        stats = self.stats
+        logger.info(f"📄 Re-parsed {stats['pages']} pages: {stats['listing_pages']} results pages, "
+                    f"{stats['detail_pages']} detail pages, {stats['empty_pages']} empty")
+        if stats['wall_seconds'] > 0:
+            logger.info(f"⚡ {stats['pages'] / stats['wall_seconds']:.1f} pages/sec on {self.workers} workers")
+        for pid, seconds in sorted(stats['worker_seconds'].items()):
+            if seconds > 0:
+                logger.info(f"   worker {pid}: {stats['worker_pages'][pid]} pages, "
+                            f"{stats['worker_pages'][pid] / seconds:.1f} pages/sec")
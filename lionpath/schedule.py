@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Time-slot index over section meetings
+Per-day and per-room interval lists sorted by start minute, for conflict detection, room occupancy
+and "what meets at / fits around this time" queries without re-parsing time strings
+"""
+
+import bisect
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import OptimizedCourseData, SectionInfo
+from .parsers import days_to_mask, mask_to_days, normalize_meeting_time
+
+@dataclass(frozen=True)
+class Meeting:
+    """One day's meeting of a section"""
+    start: int
+    end: int
+    day: str
+    class_number: str
+    course_code: str
+    building: str = ""
+    room: str = ""
+
+def sections_conflict(a: SectionInfo, b: SectionInfo) -> bool:
+    """True when two sections share a day and their meeting times overlap"""
+    if not (a.day_mask & b.day_mask) or None in (a.start_minutes, a.end_minutes, b.start_minutes, b.end_minutes):
+        return False
+    return a.start_minutes < b.end_minutes and b.start_minutes < a.end_minutes
+
+class IntervalList:
+    """Meetings sorted by start; overlap queries only scan starts within the longest meeting's length"""
+    
+    def __init__(self):
+        self.meetings: List[Meeting] = []
+        self.starts: List[int] = []
+        self.longest = 0
+    
+    def add(self, meeting: Meeting):
+        self.meetings.append(meeting)
+        self.longest = max(self.longest, meeting.end - meeting.start)
+    
+    def freeze(self):
+        """Sort after bulk loading"""
+        self.meetings.sort(key=lambda m: (m.start, m.end, m.class_number))
+        self.starts = [m.start for m in self.meetings]
+    
+    def overlapping(self, start: int, end: int) -> List[Meeting]:
+        """Meetings with start < end and end > start (touching meetings do not overlap)"""
+        lo = bisect.bisect_left(self.starts, start - self.longest)
+        hi = bisect.bisect_left(self.starts, end)
+        return [m for m in self.meetings[lo:hi] if m.end > start]
+    
+    def at(self, minute: int) -> List[Meeting]:
+        """Meetings in progress at a minute"""
+        return self.overlapping(minute, minute + 1)
+
+class ScheduleIndex:
+    """Interval indexes per day and per (building, room, day) over a whole catalog"""
+    
+    def __init__(self, courses_data: Dict[str, OptimizedCourseData]):
+        self.sections: Dict[str, Tuple[str, SectionInfo]] = {}
+        self.by_day: Dict[str, IntervalList] = defaultdict(IntervalList)
+        self.by_room: Dict[Tuple[str, str, str], IntervalList] = defaultdict(IntervalList)
+        
+        for course_code, course_data in courses_data.items():
+            for section in course_data.sections:
+                if not section.day_mask and section.days:
+                    normalize_meeting_time(section)
+                self.sections[section.class_number] = (course_code, section)
+                if section.start_minutes is None or section.end_minutes is None:
+                    continue
+                
+                for day in mask_to_days(section.day_mask):
+                    meeting = Meeting(section.start_minutes, section.end_minutes, day, section.class_number,
+                                      course_code, section.building, section.room)
+                    self.by_day[day].add(meeting)
+                    if section.building or section.room:
+                        self.by_room[(section.building, section.room, day)].add(meeting)
+        
+        for intervals in list(self.by_day.values()) + list(self.by_room.values()):
+            intervals.freeze()
+    
+    def meeting_at(self, day: str, minute: int) -> List[Meeting]:
+        """Sections in session on a day at a minute since midnight"""
+        return self.by_day[day].at(minute) if day in self.by_day else []
+    
+    def overlapping(self, day_mask: int, start: int, end: int) -> List[Meeting]:
+        """Meetings on any of the masked days that overlap [start, end)"""
+        found = []
+        for day in mask_to_days(day_mask):
+            if day in self.by_day:
+                found.extend(self.by_day[day].overlapping(start, end))
+        return found
+    
+    def conflicts(self, class_number: str) -> List[str]:
+        """Class numbers whose meetings overlap the given section's"""
+        _, section = self.sections[class_number]
+        if section.start_minutes is None or section.end_minutes is None:
+            return []
+        found = {m.class_number for m in self.overlapping(section.day_mask, section.start_minutes, section.end_minutes)}
+        found.discard(class_number)
+        return sorted(found)
+    
+    def room_occupancy(self, building: str, room: str, day: str) -> List[Meeting]:
+        """A room's meetings on a day, in start order"""
+        intervals = self.by_room.get((building, room, day))
+        return list(intervals.meetings) if intervals else []
+    
+    def room_free(self, building: str, room: str, day: str, start: int, end: int) -> bool:
+        """True when nothing is scheduled in the room during [start, end) on that day"""
+        intervals = self.by_room.get((building, room, day))
+        return not intervals or not intervals.overlapping(start, end)
+    
+    def fits(self, busy: Iterable[Tuple[int, int, int]], candidates: Optional[Iterable[str]] = None) -> List[str]:
+        """Class numbers (optionally limited to candidates) that meet without touching any busy block
+        
+        Each busy block is (day_mask, start, end); sections with no meeting time are left out
+        """
+        blocked = set()
+        for day_mask, start, end in busy:
+            blocked.update(m.class_number for m in self.overlapping(day_mask, start, end))
+        
+        pool = self.sections if candidates is None else [c for c in candidates if c in self.sections]
+        return sorted(
+            class_number for class_number in pool
+            if class_number not in blocked and self.sections[class_number][1].start_minutes is not None
+            and self.sections[class_number][1].day_mask
+        )
+
+def busy_block(days: str, start: int, end: int) -> Tuple[int, int, int]:
+    """Build a (day_mask, start, end) block from a days string like "MoWe" """
+    return days_to_mask(days), start, end
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+BM25 full-text index over course titles, descriptions, requirements and attributes
+Built at save time, written next to the output file and memory-mapped on load, so keyword
+search does not need the JSONL records at all. The term dictionary is a sorted fixed-width table
+that queries binary-search in the map, so opening an index only decodes the per-course header
+"""
+
+import heapq
+import json
+import math
+import mmap
+import re
+import struct
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from compressed_io import strip_compression_suffix
+
+from .models import OptimizedCourseData
+
+INDEX_MAGIC = b'PSUBM25\x02'
+INDEX_SUFFIX = '.bm25'
+POSTING = struct.Struct('<If')  # doc id, field-weighted term frequency
+TERM_ENTRY = struct.Struct('<IHII')  # token offset, token length, first posting, posting count
+HEADER_LENGTH = struct.Struct('<I')
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Matches in a title count more than matches in the description
+FIELD_WEIGHTS = {
+    'course_title': 3.0,
+    'class_attributes': 2.0,
+    'course_description': 1.0,
+    'enrollment_requirements': 1.0,
+}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has in into is it its of on or that the this to was were will with'.split()
+)
+
+def stem(word: str) -> str:
+    """Light suffix-stripping stemmer (plurals, -ing/-ed/-ly, trailing e); index and queries share it"""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    
+    for suffix in ('ingly', 'edly', 'ing', 'ed', 'ly'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if word[-1] == word[-2] and word[-1] not in 'lsz':
+                word = word[:-1]
+            break
+    
+    if word.endswith('e') and len(word) > 4:
+        word = word[:-1]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and stem"""
+    return [stem(token) for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOPWORDS]
+
+def search_index_path(output_file: str) -> str:
+    """Index file written next to an output: courses.jsonl.gz -> courses.jsonl.bm25"""
+    return strip_compression_suffix(output_file) + INDEX_SUFFIX
+
+def course_field_texts(course_data: OptimizedCourseData) -> Dict[str, str]:
+    """Searchable text of each indexed field"""
+    info = course_data.course_info
+    return {
+        'course_title': f"{info.course_code} {info.course_title}",
+        'class_attributes': ' '.join(info.class_attributes or []),
+        'course_description': info.course_description,
+        'enrollment_requirements': info.enrollment_requirements,
+    }
+
+def build_search_index(courses_data: Dict[str, OptimizedCourseData], index_file: str) -> int:
+    """Tokenize every course and write the BM25 index; returns the number of indexed terms"""
+    course_codes = sorted(courses_data)
+    doc_lengths = []
+    postings = defaultdict(list)
+    
+    for doc_id, course_code in enumerate(course_codes):
+        weighted = Counter()
+        for field_name, text in course_field_texts(courses_data[course_code]).items():
+            for token in tokenize(text):
+                weighted[token] += FIELD_WEIGHTS[field_name]
+        doc_lengths.append(sum(weighted.values()))
+        for token, tf in weighted.items():
+            postings[token].append((doc_id, tf))
+    
+    # File layout: magic, header length, JSON header, term table sorted by token bytes, tokens, postings
+    table = bytearray()
+    tokens = bytearray()
+    blob = bytearray()
+    for token in sorted(postings, key=lambda token: token.encode('utf-8')):
+        key = token.encode('utf-8')
+        table += TERM_ENTRY.pack(len(tokens), len(key), len(blob) // POSTING.size, len(postings[token]))
+        tokens += key
+        for doc_id, tf in postings[token]:
+            blob += POSTING.pack(doc_id, tf)
+    
+    header = json.dumps({
+        'course_codes': course_codes,
+        'doc_lengths': doc_lengths,
+        'avg_doc_length': (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0,
+        'term_count': len(postings),
+        'tokens_length': len(tokens),
+    }, separators=(',', ':')).encode('utf-8')
+    
+    with open(index_file, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(table)
+        f.write(tokens)
+        f.write(blob)
+    
+    return len(postings)
+
+class SearchIndex:
+    """Memory-mapped BM25 index; postings are read straight from the mapped file per query"""
+    
+    def __init__(self, index_file: str):
+        self.index_file = index_file
+        with open(index_file, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if self.map[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.map.close()
+            raise ValueError(f"{index_file} is not a course search index of this version; rebuild it with --search-index")
+        
+        header_start = len(INDEX_MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack_from(self.map, len(INDEX_MAGIC))
+        header = json.loads(self.map[header_start:header_start + header_length])
+        
+        self.course_codes = header['course_codes']
+        self.doc_lengths = header['doc_lengths']
+        self.avg_doc_length = header['avg_doc_length'] or 1.0
+        self.term_count = header['term_count']
+        self.table_start = header_start + header_length
+        self.tokens_start = self.table_start + self.term_count * TERM_ENTRY.size
+        self.postings_start = self.tokens_start + header['tokens_length']
+    
+    def close(self):
+        """Release the memory map"""
+        self.map.close()
+    
+    def term_entry(self, token: str) -> Optional[Tuple[int, int]]:
+        """(first posting, posting count) of a token, binary-searched in the mapped term table"""
+        key = token.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            offset, length, first, count = TERM_ENTRY.unpack_from(self.map, self.table_start + middle * TERM_ENTRY.size)
+            start = self.tokens_start + offset
+            candidate = self.map[start:start + length]
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                return first, count
+        return None
+    
+    def postings(self, token: str) -> Iterable[Tuple[int, float]]:
+        """(doc id, weighted tf) pairs for a token, unpacked from the mapped file"""
+        entry = self.term_entry(token)
+        if not entry:
+            return ()
+        first, count = entry
+        start = self.postings_start + first * POSTING.size
+        return POSTING.iter_unpack(self.map[start:start + count * POSTING.size])
+    
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Top (course_code, score) matches for a keyword query, best first"""
+        doc_count = len(self.course_codes)
+        scores = defaultdict(float)
+        
+        for token in set(tokenize(query)):
+            postings = list(self.postings(token))
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self.course_codes[doc_id], round(score, 4)) for doc_id, score in best]
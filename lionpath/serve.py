@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Read-only query API over a scraped snapshot
+Loads an optimized JSONL snapshot into in-memory indexes and serves JSON lookups over HTTP,
+with pagination, ETags and hot reload when a newer snapshot lands
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from compressed_io import iter_jsonl_records, strip_compression_suffix
+
+from .parsers import parse_clock_minutes, split_meeting_days
+from .search import SearchIndex, search_index_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+ATTRIBUTE_CODE_PATTERN = re.compile(r'\(([A-Z]{2,4})\)')
+NAME_TOKEN_PATTERN = re.compile(r"[a-z][a-z'\-]+")
+
+def attribute_keys(attribute: str) -> Set[str]:
+    """Lookup keys for a class attribute: the full text and any code in parentheses, e.g. (GQ)"""
+    keys = {attribute.strip().lower()}
+    keys.update(code.lower() for code in ATTRIBUTE_CODE_PATTERN.findall(attribute))
+    return keys
+
+def instructor_keys(instructor: str) -> Set[str]:
+    """Lookup keys for an instructor: the full name and each name part"""
+    name = (instructor or '').strip().lower()
+    if not name or name in ('staff', 'tba'):
+        return set()
+    return {name} | set(NAME_TOKEN_PATTERN.findall(name))
+
+class CourseIndex:
+    """In-memory indexes over one snapshot; every lookup is a dict hit or a bisect"""
+    
+    def __init__(self, records: Iterable[Dict[str, Any]], version: str = ''):
+        self.version = version
+        self.courses: Dict[str, Dict[str, Any]] = {}
+        self.by_subject = defaultdict(list)
+        self.by_class_number: Dict[str, Tuple[str, int]] = {}
+        self.by_instructor = defaultdict(set)
+        self.by_attribute = defaultdict(set)
+        # day -> sorted [(start_minute, end_minute, course_code, section_index)]
+        self.by_day = defaultdict(list)
+        
+        for record in records:
+            course = record.get('course', {})
+            course_code = course.get('course_code', '')
+            if not course_code:
+                continue
+            
+            self.courses[course_code] = record
+            self.by_subject[course.get('subject', '').upper()].append(course_code)
+            for attribute in course.get('class_attributes') or []:
+                for key in attribute_keys(attribute):
+                    self.by_attribute[key].add(course_code)
+            
+            for i, section in enumerate(record.get('sections', [])):
+                if section.get('class_number'):
+                    self.by_class_number[section['class_number']] = (course_code, i)
+                for key in instructor_keys(section.get('instructor', '')):
+                    self.by_instructor[key].add(course_code)
+                
+                start = parse_clock_minutes(section.get('start_time', ''))
+                end = parse_clock_minutes(section.get('end_time', ''))
+                if start is not None:
+                    for day in split_meeting_days(section.get('days', '')):
+                        self.by_day[day].append((start, end if end is not None else start, course_code, i))
+        
+        self.course_codes = sorted(self.courses)
+        self.search_index = None
+        for meetings in self.by_day.values():
+            meetings.sort()
+    
+    def close(self):
+        """Release the search index's memory map"""
+        if self.search_index is not None:
+            self.search_index.close()
+    
+    def course(self, course_code: str) -> Optional[Dict[str, Any]]:
+        """Full record for a course code"""
+        return self.courses.get(course_code.upper())
+    
+    def section(self, class_number: str) -> Optional[Dict[str, Any]]:
+        """One section with its course code"""
+        location = self.by_class_number.get(class_number)
+        if not location:
+            return None
+        course_code, i = location
+        return dict(self.courses[course_code]['sections'][i], course_code=course_code)
+    
+    def meetings(self, day: str, start: Optional[int] = None, end: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(course_code, section_index) of sections meeting on day that start at or after start and end by end"""
+        meetings = self.by_day.get(day, [])
+        lo = bisect.bisect_left(meetings, (start,)) if start is not None else 0
+        return [
+            (course_code, i) for meeting_start, meeting_end, course_code, i in meetings[lo:]
+            if end is None or meeting_end <= end
+        ]
+    
+    def find_courses(self, subject: str = None, instructor: str = None, attribute: str = None,
+                     day: str = None, start: Optional[int] = None, end: Optional[int] = None) -> List[str]:
+        """Course codes matching every given filter, sorted"""
+        candidates = None
+        
+        def narrow(codes: Iterable[str]):
+            nonlocal candidates
+            codes = set(codes)
+            candidates = codes if candidates is None else candidates & codes
+        
+        if subject:
+            narrow(self.by_subject.get(subject.upper(), []))
+        if instructor:
+            narrow(self.by_instructor.get(instructor.strip().lower(), set()))
+        if attribute:
+            narrow(self.by_attribute.get(attribute.strip().lower(), set()))
+        if day:
+            narrow(course_code for course_code, _ in self.meetings(day, start, end))
+        
+        if candidates is None:
+            return self.course_codes
+        return sorted(candidates)
+
+def snapshot_signature(path: str) -> str:
+    """Cheap change detector for a snapshot file: path, size and modification time"""
+    stat = os.stat(path)
+    return hashlib.sha1(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8')).hexdigest()[:16]
+
+def latest_snapshot(path: str) -> str:
+    """The snapshot file itself, or the newest optimized JSONL output in a directory"""
+    if not os.path.isdir(path):
+        return path
+    candidates = [
+        p for p in Path(path).iterdir()
+        if p.is_file() and strip_compression_suffix(p.name).endswith('.jsonl')
+    ]
+    if not candidates:
+        raise FileNotFoundError(f"No .jsonl snapshots in {path}")
+    return str(max(candidates, key=lambda p: p.stat().st_mtime))
+
+class SnapshotStore:
+    """Holds the current index and swaps in a new one when the snapshot changes on disk"""
+    
+    def __init__(self, path: str, reload_interval: float = 5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.index = None
+        self.source = None
+        self.loaded_at = None
+        self.pending_version = None
+        # Requests holding each index; a replaced index is closed once its last request finishes
+        self.lock = threading.Lock()
+        self.readers: Dict[CourseIndex, int] = {}
+        self.reload(force=True)
+    
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the index if the latest snapshot changed; the old index keeps serving until the swap"""
+        source = latest_snapshot(self.path)
+        version = snapshot_signature(source)
+        if not force and self.index is not None and version == self.index.version and source == self.source:
+            return False
+        
+        # A snapshot still being written changes between checks; load it once it has settled
+        if not force and version != self.pending_version:
+            self.pending_version = version
+            return False
+        
+        started = time.time()
+        index = CourseIndex(iter_jsonl_records(source), version)
+        if os.path.exists(search_index_path(source)):
+            index.search_index = SearchIndex(search_index_path(source))
+        with self.lock:
+            previous, self.index, self.source, self.loaded_at = self.index, index, source, time.time()
+            if previous is not None and not self.readers.get(previous):
+                previous.close()
+        logger.info(f"📚 Loaded {len(index.courses)} courses from {source} in {time.time() - started:.2f}s")
+        return True
+    
+    def current(self) -> CourseIndex:
+        """Index to answer a request with; use reading() to keep its search index open across a reload"""
+        return self.index
+    
+    @contextmanager
+    def reading(self) -> Iterator[CourseIndex]:
+        """The current index, kept open until the block exits even if a reload replaces it meanwhile"""
+        with self.lock:
+            index = self.index
+            self.readers[index] = self.readers.get(index, 0) + 1
+        try:
+            yield index
+        finally:
+            with self.lock:
+                self.readers[index] -= 1
+                if not self.readers[index]:
+                    del self.readers[index]
+                    if index is not self.index:
+                        index.close()
+    
+    def watch(self):
+        """Check for a new snapshot every reload_interval seconds in a background thread"""
+        def loop():
+            while True:
+                time.sleep(self.reload_interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    logger.error(f"❌ Snapshot reload failed, keeping previous index: {e}")
+        
+        thread = threading.Thread(target=loop, name='snapshot-reload', daemon=True)
+        thread.start()
+        return thread
+
+def query_minutes(value: Optional[str]) -> Optional[int]:
+    """Parse a start/end query value ("09:00", "1:25PM") into minutes since midnight"""
+    if not value:
+        return None
+    minutes = parse_clock_minutes(value)
+    if minutes is None:
+        raise ValueError(f"Invalid time: {value}")
+    return minutes
+
+def paginate(items: List[Any], params: Dict[str, str]) -> Dict[str, Any]:
+    """Slice a result list by offset/limit and describe the page"""
+    offset = max(int(params.get('offset', 0)), 0)
+    limit = min(max(int(params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    page = items[offset:offset + limit]
+    return {
+        'total': len(items),
+        'offset': offset,
+        'limit': limit,
+        'next_offset': offset + limit if offset + limit < len(items) else None,
+        'results': page,
+    }
+
+def handle_query(index: CourseIndex, path: str, params: Dict[str, str]) -> Tuple[int, Any]:
+    """Route one API request to (status, JSON body)"""
+    parts = [unquote(p) for p in path.strip('/').split('/') if p]
+    
+    if parts == ['health']:
+        return 200, {'courses': len(index.courses), 'sections': len(index.by_class_number), 'version': index.version}
+    
+    if parts == ['courses']:
+        codes = index.find_courses(
+            subject=params.get('subject'),
+            instructor=params.get('instructor'),
+            attribute=params.get('attribute'),
+            day=params.get('day'),
+            start=query_minutes(params.get('start')),
+            end=query_minutes(params.get('end')),
+        )
+        page = paginate(codes, params)
+        if params.get('fields') != 'code':
+            page['results'] = [index.courses[code] for code in page['results']]
+        return 200, page
+    
+    if len(parts) == 2 and parts[0] == 'courses':
+        record = index.course(parts[1])
+        return (200, record) if record else (404, {'error': f"Course {parts[1]} not found"})
+    
+    if len(parts) == 2 and parts[0] == 'sections':
+        section = index.section(parts[1])
+        return (200, section) if section else (404, {'error': f"Class number {parts[1]} not found"})
+    
+    if parts == ['search']:
+        if index.search_index is None:
+            return 404, {'error': "No search index next to this snapshot (save with --search-index)"}
+        matches = index.search_index.search(params.get('q', ''), limit=MAX_PAGE_SIZE)
+        page = paginate(matches, params)
+        page['results'] = [
+            {'course_code': code, 'score': score, 'course': index.courses[code]['course']}
+            for code, score in page['results'] if code in index.courses
+        ]
+        return 200, page
+    
+    if parts == ['subjects']:
+        return 200, {subject: len(codes) for subject, codes in sorted(index.by_subject.items())}
+    
+    return 404, {'error': f"Unknown endpoint /{'/'.join(parts)}"}
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """HTTP front end for handle_query; the store is attached to the server"""
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        
+        # Held until the body is built, so a reload cannot close the search index mid-query
+        with self.server.store.reading() as index:
+            etag = '"' + hashlib.sha1(f"{index.version}:{self.path}".encode('utf-8')).hexdigest()[:20] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            
+            try:
+                status, body = handle_query(index, url.path, params)
+            except ValueError as e:
+                status, body = 400, {'error': str(e)}
+        
+        payload = json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 200:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+def make_server(store: SnapshotStore, host: str = '127.0.0.1', port: int = 8000) -> ThreadingHTTPServer:
+    """Build (but do not start) the query server"""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.store = store
+    return server
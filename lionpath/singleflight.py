@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Once-per-run call sharing
+A keyed call runs once; callers that arrive while it is in flight wait for it, and later callers get its
+stored result, so a class detail page listed under several courses is fetched and parsed once
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Keyed calls that run once per run and share their result
+    
+    A call that raises is forgotten once its waiting callers have the exception, so the next caller retries
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, Future] = {}
+        self.stats = {'calls': 0, 'shared': 0}
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self.lock:
+            return key in self.calls
+    
+    def do(self, key: Hashable, function: Callable[..., Any], *args) -> Any:
+        """function(*args) for the first caller of key; every other caller gets the same result"""
+        with self.lock:
+            future = self.calls.get(key)
+            owner = future is None
+            if owner:
+                future = self.calls[key] = Future()
+                self.stats['calls'] += 1
+            else:
+                self.stats['shared'] += 1
+        
+        if owner:
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                with self.lock:
+                    del self.calls[key]
+                future.set_exception(e)
+        return future.result()
+    
+    def seed(self, key: Hashable, value: Any):
+        """Store a result obtained some other way, unless key already has one"""
+        with self.lock:
+            if key not in self.calls:
+                future = self.calls[key] = Future()
+                future.set_result(value)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+LionPath term (STRM) helpers
+A STRM is four digits: century (2 = 2000s), two-digit year and season (2 Spring, 5 Summer, 8 Fall),
+so 2258 is Fall 2025 and 2262 is Spring 2026
+"""
+
+import re
+from typing import List, Optional
+
+from compressed_io import strip_compression_suffix
+
+DEFAULT_TERM = '2258'  # Fall 2025
+
+SEASONS = {'2': 'Spring', '5': 'Summer', '8': 'Fall'}
+SEASON_CODES = {name.lower(): code for code, name in SEASONS.items()}
+
+STRM_PATTERN = re.compile(r'^\d{4}$')
+TERM_NAME_PATTERN = re.compile(r'^(Spring|Summer|Fall)\s+(\d{4})$', re.IGNORECASE)
+CLASS_DETAILS_PATTERN = re.compile(r'showClassDetails\((\d+),(\d+)\)')
+
+def parse_term(value: str) -> str:
+    """Normalize a term given as a STRM ("2258") or a name ("Fall 2025") to its STRM"""
+    value = (value or '').strip()
+    if STRM_PATTERN.match(value):
+        return value
+
+    match = TERM_NAME_PATTERN.match(value)
+    if match:
+        year = int(match.group(2))
+        return f"{(year // 1000) % 10}{year % 100:02d}{SEASON_CODES[match.group(1).lower()]}"
+
+    raise ValueError(f"Unrecognized term '{value}' (use a STRM like 2258 or a name like 'Fall 2025')")
+
+def parse_terms(value: str) -> List[str]:
+    """Parse a comma-separated list of terms into unique STRMs, keeping order"""
+    terms = []
+    for part in (value or '').split(','):
+        if part.strip():
+            strm = parse_term(part)
+            if strm not in terms:
+                terms.append(strm)
+    return terms
+
+def term_name(strm: str) -> str:
+    """Human-readable name for a STRM ("2258" -> "Fall 2025"); unknown codes are returned as-is"""
+    if not strm or not STRM_PATTERN.match(strm) or strm[3] not in SEASONS:
+        return strm or ''
+    year = (1000 * int(strm[0])) + int(strm[1:3])
+    return f"{SEASONS[strm[3]]} {year}"
+
+def term_from_url(course_url: str) -> Optional[str]:
+    """Extract the STRM from a showClassDetails(strm,class_nbr) reference"""
+    match = CLASS_DETAILS_PATTERN.search(course_url or '')
+    return match.group(1) if match else None
+
+def term_output_path(output_file: str, strm: str) -> str:
+    """Per-term output name: courses.jsonl.gz -> courses_2258.jsonl.gz"""
+    base = strip_compression_suffix(output_file)
+    compression_suffix = output_file[len(base):]
+    stem, dot, extension = base.rpartition('.')
+    if not dot or '/' in extension:
+        return f"{base}_{strm}{compression_suffix}"
+    return f"{stem}_{strm}.{extension}{compression_suffix}"
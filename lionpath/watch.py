@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Enrollment watch mode
+Polls only the enrollment fields of selected sections, nearly-full sections first, and emits
+JSON-line events when seats open or close
+"""
+
+import concurrent.futures
+import heapq
+import itertools
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO, Tuple
+
+from .engine import LionPathEngine
+from .models import SectionInfo
+from .parsers import (
+    detail_page_is_empty,
+    detect_career,
+    find_section_links,
+    parse_enrollment_fields,
+    parse_listing_text,
+)
+from .terms import DEFAULT_TERM, term_from_url
+from .writers import load_optimized_results
+
+logger = logging.getLogger(__name__)
+
+# Sections at or above this share of open seats are polled at the slowest interval
+RELAXED_OPEN_SHARE = 0.25
+
+@dataclass
+class WatchedSection:
+    """One polled section (STRM and class number), shared by every watcher that asked for it"""
+    class_number: str
+    strm: str
+    course_code: str = ""
+    career: str = ""
+    section: SectionInfo = None
+    watchers: Set[str] = field(default_factory=set)
+    polled: bool = False
+    next_poll: float = 0.0
+    # Set once the last watcher leaves; its heap slot is skipped instead of searched for and removed
+    dead: bool = False
+    
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.strm, self.class_number
+    
+    def __post_init__(self):
+        if self.section is None:
+            self.section = SectionInfo(class_number=self.class_number)
+
+def poll_interval(section: SectionInfo, min_interval: float, max_interval: float) -> float:
+    """Seconds until the next poll: full or nearly-full sections poll fastest, roomy ones slowest"""
+    if section.class_capacity <= 0:
+        return min_interval
+    
+    open_share = max(section.available_seats, 0) / section.class_capacity
+    return min_interval + (max_interval - min_interval) * min(open_share / RELAXED_OPEN_SHARE, 1.0)
+
+def enrollment_event(entry: WatchedSection, previous: SectionInfo) -> Optional[Dict[str, Any]]:
+    """Change event between two polls of a section, or None when nothing watched changed"""
+    current = entry.section
+    if (current.available_seats, current.status, current.enrollment_total, current.waitlist_total) == \
+       (previous.available_seats, previous.status, previous.enrollment_total, previous.waitlist_total):
+        return None
+    
+    if previous.available_seats <= 0 < current.available_seats:
+        event = 'seats_opened'
+    elif current.available_seats <= 0 < previous.available_seats:
+        event = 'seats_closed'
+    elif current.status != previous.status:
+        event = 'status_changed'
+    else:
+        event = 'enrollment_changed'
+    
+    return {
+        'event': event,
+        'timestamp': datetime.now().isoformat(),
+        'class_number': entry.class_number,
+        'course_code': entry.course_code,
+        'section': current.section,
+        'strm': entry.strm,
+        'available_seats': current.available_seats,
+        'previous_available_seats': previous.available_seats,
+        'enrollment_total': current.enrollment_total,
+        'class_capacity': current.class_capacity,
+        'waitlist_total': current.waitlist_total,
+        'status': current.status,
+        'previous_status': previous.status,
+    }
+
+class EnrollmentWatcher:
+    """Schedules enrollment polls for watched sections on a LionPathEngine's sessions and rate limiter"""
+    
+    def __init__(self, engine: LionPathEngine, min_interval: float = 2.0, max_interval: float = 60.0,
+                 max_workers: int = 8, events: TextIO = None):
+        self.engine = engine
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_workers = max_workers
+        self.events = events or sys.stdout
+        
+        # Class numbers are only unique within a term, so sections are keyed by (STRM, class number)
+        self.entries: Dict[Tuple[str, str], WatchedSection] = {}
+        self.schedule = []  # heap of (next_poll, push order, entry)
+        self.pushes = itertools.count()
+        self.lock = Lock()
+        self.stats = {'polls': 0, 'failed_polls': 0, 'events': 0}
+    
+    def watch(self, class_number: str, strm: str, watcher: str = 'cli', course_code: str = "",
+              section: SectionInfo = None, career: str = "") -> WatchedSection:
+        """Add a section for a watcher; a section already watched is shared, not polled twice"""
+        with self.lock:
+            entry = self.entries.get((strm, class_number))
+            if entry is None:
+                entry = WatchedSection(class_number=class_number, strm=strm, course_code=course_code,
+                                       career=career, section=section)
+                self.entries[entry.key] = entry
+                self.push(entry)
+            entry.watchers.add(watcher)
+            return entry
+    
+    def unwatch(self, class_number: str, strm: str, watcher: str = 'cli'):
+        """Drop a watcher; the section stops being polled once nobody watches it"""
+        with self.lock:
+            entry = self.entries.get((strm, class_number))
+            if entry:
+                entry.watchers.discard(watcher)
+                if not entry.watchers:
+                    entry.dead = True
+                    del self.entries[entry.key]
+    
+    def push(self, entry: WatchedSection):
+        """Queue an entry at its next_poll (caller holds the lock)"""
+        heapq.heappush(self.schedule, (entry.next_poll, next(self.pushes), entry))
+    
+    def due_entries(self, now: float) -> List[WatchedSection]:
+        """Pop every live entry whose poll time has come, most urgent first"""
+        due = []
+        with self.lock:
+            while self.schedule and self.schedule[0][0] <= now:
+                entry = heapq.heappop(self.schedule)[2]
+                if not entry.dead:
+                    due.append(entry)
+        return due
+    
+    def poll(self, entry: WatchedSection) -> Optional[Dict[str, Any]]:
+        """Fetch one section's detail page and return a change event if its enrollment moved"""
+        session = self.engine.get_session()
+        try:
+            html = self.engine.fetch_class_detail_any_career(session, entry.strm, entry.class_number,
+                                                             entry.career or None)
+        finally:
+            self.engine.return_session(session)
+        
+        if detail_page_is_empty(html):
+            raise ValueError(f"No class data returned for {entry.class_number}")
+        
+        previous = SectionInfo(**vars(entry.section))
+        parse_enrollment_fields(html, entry.section)
+        
+        first_poll = not entry.polled
+        entry.polled = True
+        return None if first_poll else enrollment_event(entry, previous)
+    
+    def poll_due(self, now: float = None) -> List[Dict[str, Any]]:
+        """Poll all due sections in parallel, reschedule them and write any events"""
+        now = time.monotonic() if now is None else now
+        due = self.due_entries(now)
+        if not due:
+            return []
+        
+        events = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.max_workers, len(due))) as executor:
+            future_to_entry = {executor.submit(self.poll, entry): entry for entry in due}
+            
+            for future in concurrent.futures.as_completed(future_to_entry):
+                entry = future_to_entry[future]
+                self.stats['polls'] += 1
+                try:
+                    event = future.result()
+                    if event:
+                        self.emit(event)
+                        events.append(event)
+                except Exception as e:
+                    self.stats['failed_polls'] += 1
+                    logger.debug(f"Poll of {entry.class_number} failed: {e}")
+                
+                self.reschedule(entry, now)
+        
+        return events
+    
+    def reschedule(self, entry: WatchedSection, now: float):
+        """Queue the entry's next poll according to how close the section is to full"""
+        with self.lock:
+            if not entry.dead:
+                entry.next_poll = now + poll_interval(entry.section, self.min_interval, self.max_interval)
+                self.push(entry)
+    
+    def emit(self, event: Dict[str, Any]):
+        """Write an event as one JSON line and flush so consumers see it immediately"""
+        self.stats['events'] += 1
+        self.events.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.events.flush()
+        icon = '🟢' if event['event'] == 'seats_opened' else '🔴' if event['event'] == 'seats_closed' else '🔄'
+        logger.info(f"{icon} {event['course_code']} {event['class_number']}: {event['event']} "
+                    f"({event['previous_available_seats']} -> {event['available_seats']} seats)")
+    
+    def run(self, duration: float = None):
+        """Poll until interrupted (or for duration seconds)"""
+        deadline = time.monotonic() + duration if duration else None
+        while self.entries and (deadline is None or time.monotonic() < deadline):
+            self.poll_due()
+            with self.lock:
+                next_poll = self.schedule[0][0] if self.schedule else time.monotonic() + self.min_interval
+            time.sleep(min(max(next_poll - time.monotonic(), 0.05), 1.0))
+
+def resolve_targets(engine: LionPathEngine, targets: Iterable[str], strm: str = DEFAULT_TERM,
+                    snapshot: str = None) -> List[Dict[str, Any]]:
+    """Turn class numbers and course codes ("CMPSC 131") into watch entries
+    
+    Course codes are looked up in the snapshot when one is given, otherwise by searching their subject live
+    """
+    resolved = []
+    courses = load_optimized_results(snapshot) if snapshot else {}
+    by_class_number = {
+        section.class_number: (course_code, section)
+        for course_code, course_data in courses.items()
+        for section in course_data.sections
+    }
+    
+    for target in targets:
+        target = target.strip().upper()
+        if target.isdigit():
+            course_code, section = by_class_number.get(target, ("", None))
+            resolved.append({'class_number': target, 'course_code': course_code, 'section': section,
+                             'strm': (term_from_url(section.course_url) if section else None) or strm})
+        elif target in courses:
+            for section in courses[target].sections:
+                resolved.append({'class_number': section.class_number, 'course_code': target,
+                                 'section': section, 'strm': term_from_url(section.course_url) or strm})
+        else:
+            resolved.extend(search_course_sections(engine, target))
+    
+    return resolved
+
+def search_course_sections(engine: LionPathEngine, course_code: str) -> List[Dict[str, Any]]:
+    """Find a course's class numbers by searching its subject in the engine's current term"""
+    listing = parse_listing_text(course_code)
+    subject = listing['subject'] if listing else course_code.split()[0]
+    checkbox_id = next((s['checkbox_id'] for s in engine.get_all_subjects() if s['code'] == subject), None)
+    if not checkbox_id:
+        logger.warning(f"⚠️ Subject {subject} not found for {course_code}")
+        return []
+    
+    session = engine.get_session()
+    try:
+        html = engine.search_subject(session, checkbox_id)
+    finally:
+        engine.return_session(session)
+    
+    sections = []
+    for strm, class_nbr, text in find_section_links(html):
+        listing = parse_listing_text(text)
+        if listing and listing['course_code'] == course_code:
+            sections.append({
+                'class_number': class_nbr,
+                'course_code': course_code,
+                'strm': strm,
+                'career': detect_career(listing['catalog_number'], text),
+                'section': SectionInfo(section=listing['section'], class_number=class_nbr,
+                                       campus=listing['campus'], course_url=f"showClassDetails({strm},{class_nbr})"),
+            })
+    
+    if not sections:
+        logger.warning(f"⚠️ No sections found for {course_code}")
+    return sections
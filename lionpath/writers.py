@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Output writers shared by the LionPath scrapers
+JSONL/JSON/CSV are compressed on the fly when the file name ends in .gz or .zst; SQLite is normalized and indexed
+"""
+
+import csv
+import json
+import logging
+import os
+import sqlite3
+from dataclasses import asdict, fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from compressed_io import open_output_stream, open_text_output
+
+from .models import CourseInfo, SectionInfo, OptimizedCourseData
+from .parsers import parse_clock_minutes, section_time_range, split_meeting_days
+from .prereqs import PrerequisiteGraph, graph_path
+from .reader import add_subject_range, course_subject, iter_courses, offset_index, write_offsets
+from .search import build_search_index, search_index_path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+COURSE_FIELDS = tuple(f.name for f in fields(CourseInfo))
+SECTION_FIELDS = tuple(f.name for f in fields(SectionInfo))
+
+def course_info_to_dict(course_info: CourseInfo) -> Dict[str, Any]:
+    """Shallow field-by-field dict of a CourseInfo (no deep copy like asdict)"""
+    values = course_info.__dict__
+    return {name: values[name] for name in COURSE_FIELDS}
+
+def section_info_to_dict(section: SectionInfo) -> Dict[str, Any]:
+    """Shallow field-by-field dict of a SectionInfo; temporary attributes are skipped"""
+    values = section.__dict__
+    return {name: values[name] for name in SECTION_FIELDS}
+
+def course_data_to_record(course_data: OptimizedCourseData) -> Dict[str, Any]:
+    """Build the optimized output record for one course"""
+    return {
+        'course': course_info_to_dict(course_data.course_info),
+        'sections': [section_info_to_dict(section) for section in course_data.sections],
+        'stats': {
+            'total_capacity': course_data.get_total_capacity(),
+            'total_enrollment': course_data.get_total_enrollment(),
+            'available_seats': course_data.get_available_seats(),
+            'section_count': course_data.get_section_count(),
+            'campuses': list(course_data.get_campuses())
+        }
+    }
+
+def dumps_record(record: Any) -> bytes:
+    """Serialize a record to compact UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def save_optimized_results(courses_data: Dict[str, OptimizedCourseData], output_file: str, format_type: str = 'jsonl',
+                           compression_level: Optional[int] = None, search_index: bool = False,
+                           prereq_graph: bool = False):
+    """Save optimized results in various formats
+    
+    Text formats are compressed on the fly when output_file ends in .gz or .zst; JSONL also gets a
+    byte-offset sidecar index for random access; search_index also writes a BM25 keyword index next to the output, prereq_graph the prerequisite graph
+    """
+    logger.info(f"💾 Saving {len(courses_data)} courses to {output_file}...")
+    
+    if format_type.lower() == 'jsonl':
+        write_jsonl_courses(courses_data.values(), output_file, compression_level)
+    
+    elif format_type.lower() == 'json':
+        data = {
+            course_code: course_data_to_record(course_data)
+            for course_code, course_data in courses_data.items()
+        }
+        
+        if orjson is not None:
+            with open_output_stream(output_file, compression_level) as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open_text_output(output_file, compression_level) as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+    
+    elif format_type.lower() == 'sqlite':
+        save_sqlite_results(courses_data, output_file)
+    
+    elif format_type.lower() == 'csv':
+        # Flatten to CSV format (one row per section, with course info repeated)
+        flattened_data = []
+        
+        for course_code, course_data in courses_data.items():
+            course_dict = course_info_to_dict(course_data.course_info)
+            # Clean up class_attributes for CSV
+            course_dict['class_attributes'] = '; '.join(course_dict.get('class_attributes') or [])
+            
+            for section in course_data.sections:
+                # Combine course and section data
+                flattened_data.append({**course_dict, **section_info_to_dict(section)})
+        
+        if flattened_data:
+            with open_text_output(output_file, compression_level, newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=flattened_data[0].keys())
+                writer.writeheader()
+                writer.writerows(flattened_data)
+    
+    write_course_sidecars(courses_data, output_file, search_index, prereq_graph)
+
+def write_jsonl_courses(courses: Iterable[OptimizedCourseData], output_file: str,
+                        compression_level: Optional[int] = None) -> int:
+    """Write courses to optimized JSONL as they arrive, plus the byte-offset sidecar; returns the course count"""
+    # Record offsets while writing, so the sidecar index costs no second pass
+    offsets = {}
+    subjects = {}
+    position = 0
+    count = 0
+    with open_output_stream(output_file, compression_level) as f:
+        for course_data in courses:
+            line = dumps_record(course_data_to_record(course_data)) + b'\n'
+            f.write(line)
+            course_code = course_data.course_info.course_code
+            if course_code:
+                offsets[course_code] = [position, len(line)]
+                add_subject_range(subjects, course_subject(course_code), position, position + len(line))
+            position += len(line)
+            count += 1
+    write_offsets(output_file, offset_index(output_file, offsets, subjects, position))
+    return count
+
+def write_course_sidecars(courses_data: Dict[str, OptimizedCourseData], output_file: str,
+                          search_index: bool = False, prereq_graph: bool = False):
+    """Write the optional search index and prerequisite graph next to an output (both read course-level fields only)"""
+    if search_index:
+        index_file = search_index_path(output_file)
+        term_count = build_search_index(courses_data, index_file)
+        logger.info(f"🔎 Search index with {term_count} terms saved to {index_file}")
+    
+    if prereq_graph:
+        graph_file = graph_path(output_file)
+        graph = PrerequisiteGraph.from_courses(courses_data)
+        graph.save(graph_file)
+        logger.info(f"🕸️ Prerequisite graph with {len(graph.nodes)} courses saved to {graph_file}")
+
+def save_course_batches(batches: Iterable[Dict[str, OptimizedCourseData]], output_file: str, format_type: str = 'jsonl',
+                        compression_level: Optional[int] = None, search_index: bool = False,
+                        prereq_graph: bool = False) -> int:
+    """Save courses that arrive a batch at a time (e.g. one subject each); returns the course count
+    
+    JSONL is written as the batches arrive and only course-level fields are kept for the search index and
+    prerequisite graph; the other formats need every course at once, so their batches are collected first
+    """
+    if format_type.lower() != 'jsonl':
+        courses_data = {}
+        for batch in batches:
+            courses_data.update(batch)
+        save_optimized_results(courses_data, output_file, format_type, compression_level,
+                               search_index=search_index, prereq_graph=prereq_graph)
+        return len(courses_data)
+    
+    course_level = {}
+    
+    def courses() -> Iterator[OptimizedCourseData]:
+        for batch in batches:
+            for course_code, course_data in batch.items():
+                if search_index or prereq_graph:
+                    course_level[course_code] = OptimizedCourseData(course_info=course_data.course_info, sections=[])
+                yield course_data
+    
+    logger.info(f"💾 Streaming courses to {output_file}...")
+    count = write_jsonl_courses(courses(), output_file, compression_level)
+    write_course_sidecars(course_level, output_file, search_index, prereq_graph)
+    return count
+
+def load_optimized_results(input_file: str, subjects: Optional[List[str]] = None) -> Dict[str, OptimizedCourseData]:
+    """Load a previous optimized JSONL output (optionally .gz/.zst) back into course data objects
+    
+    subjects limits loading to those subjects through the snapshot's offset index
+    """
+    return {
+        course_data.course_info.course_code: course_data
+        for course_data in iter_courses(input_file, subjects)
+    }
+
+def save_record_list(rows: List[Dict[str, Any]], output_file: str, format_type: str = 'jsonl',
+                     compression_level: Optional[int] = None):
+    """Save a flat list of record dicts (one per section) as JSONL, a JSON array or CSV"""
+    format_type = format_type.lower()
+    
+    if format_type == 'jsonl':
+        with open_output_stream(output_file, compression_level) as f:
+            for row in rows:
+                f.write(dumps_record(row))
+                f.write(b'\n')
+    
+    elif format_type == 'json':
+        with open_text_output(output_file, compression_level) as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+    
+    elif format_type == 'csv':
+        if rows:
+            with open_text_output(output_file, compression_level, newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+                writer.writeheader()
+                for row in rows:
+                    # Flatten list fields such as class_attributes for CSV
+                    writer.writerow({
+                        key: '; '.join(str(item) for item in value) if isinstance(value, list) else value
+                        for key, value in row.items()
+                    })
+
+def save_flat_results(courses_data: Dict[str, Any], output_file: str, format_type: str = 'jsonl',
+                      compression_level: Optional[int] = None):
+    """Save course data objects that provide to_dict() (enhanced/comprehensive profiles)"""
+    logger.info(f"💾 Saving {len(courses_data)} courses to {output_file}...")
+    
+    if format_type == 'jsonl':
+        with open_output_stream(output_file, compression_level) as f:
+            for course_data in courses_data.values():
+                f.write(json.dumps(course_data.to_dict(), default=str).encode('utf-8'))
+                f.write(b'\n')
+    
+    elif format_type == 'json':
+        output = {course_code: course_data.to_dict() for course_code, course_data in courses_data.items()}
+        with open_text_output(output_file, compression_level) as f:
+            json.dump(output, f, indent=2, default=str)
+    
+    elif format_type == 'csv':
+        # Flatten for CSV
+        rows = []
+        for course_data in courses_data.values():
+            course_dict = asdict(course_data.course_info)
+            for section in course_data.sections:
+                rows.append({**course_dict, **asdict(section)})
+        
+        if rows:
+            with open_text_output(output_file, compression_level, newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+                writer.writeheader()
+                writer.writerows(rows)
+    
+    logger.info(f"✅ Saved {len(courses_data)} courses")
+
+SQLITE_SCHEMA = """
+CREATE TABLE courses (
+    course_code TEXT PRIMARY KEY,
+    course_title TEXT,
+    subject TEXT,
+    catalog_number TEXT,
+    units TEXT,
+    career TEXT,
+    grading TEXT,
+    component TEXT,
+    course_description TEXT,
+    enrollment_requirements TEXT,
+    enforced_concurrent TEXT,
+    class_attributes TEXT,
+    academic_organization TEXT,
+    course_notes TEXT,
+    textbook_info TEXT,
+    semester TEXT,
+    last_updated TEXT
+);
+CREATE TABLE sections (
+    class_number TEXT,
+    course_code TEXT REFERENCES courses(course_code),
+    section TEXT,
+    section_type TEXT,
+    days TEXT,
+    times TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    meeting_dates TEXT,
+    campus TEXT,
+    location TEXT,
+    building TEXT,
+    room TEXT,
+    instruction_mode TEXT,
+    instructor TEXT,
+    instructor_email TEXT,
+    class_capacity INTEGER,
+    enrollment_total INTEGER,
+    available_seats INTEGER,
+    waitlist_capacity INTEGER,
+    waitlist_total INTEGER,
+    status TEXT,
+    add_consent TEXT,
+    drop_consent TEXT,
+    class_notes TEXT,
+    exam_schedule TEXT,
+    course_url TEXT,
+    detail_url TEXT,
+    scrape_timestamp TEXT
+);
+CREATE TABLE meetings (
+    class_number TEXT,
+    course_code TEXT,
+    day TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    start_minutes INTEGER,
+    end_minutes INTEGER,
+    building TEXT,
+    room TEXT
+);
+CREATE TABLE reserve_capacity (
+    class_number TEXT,
+    course_code TEXT,
+    position INTEGER,
+    reserved_for TEXT,
+    capacity INTEGER,
+    enrollment_total INTEGER,
+    details TEXT
+);
+"""
+
+# Indexes are built after the bulk insert, which is much cheaper than maintaining them row by row
+SQLITE_INDEXES = """
+CREATE INDEX idx_courses_subject_catalog ON courses(subject, catalog_number);
+CREATE INDEX idx_courses_catalog_number ON courses(catalog_number);
+CREATE INDEX idx_sections_class_number ON sections(class_number);
+CREATE INDEX idx_sections_course_code ON sections(course_code);
+CREATE INDEX idx_sections_campus_status ON sections(campus, status);
+CREATE INDEX idx_sections_status ON sections(status);
+CREATE INDEX idx_meetings_day_start ON meetings(day, start_minutes, end_minutes);
+CREATE INDEX idx_meetings_class_number ON meetings(class_number);
+CREATE INDEX idx_reserve_capacity_class_number ON reserve_capacity(class_number);
+"""
+
+def _reserve_value(entry: Dict[str, Any], keys: List[str]) -> Any:
+    """Return the first present value among candidate keys of a reserve capacity entry"""
+    for key in keys:
+        if entry.get(key) not in (None, ''):
+            return entry[key]
+    return None
+
+def save_sqlite_results(courses_data: Dict[str, OptimizedCourseData], output_file: str):
+    """Save results to a normalized, indexed SQLite database"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(output_file + suffix):
+            os.remove(output_file + suffix)
+    
+    course_rows = []
+    section_rows = []
+    meeting_rows = []
+    meeting_keys = set()
+    reserve_rows = []
+    
+    for course_code, course_data in courses_data.items():
+        info = course_data.course_info
+        course_rows.append((
+            course_code, info.course_title, info.subject, info.catalog_number,
+            info.units, info.career, info.grading, info.component,
+            info.course_description, info.enrollment_requirements, info.enforced_concurrent,
+            json.dumps(info.class_attributes or [], ensure_ascii=False),
+            info.academic_organization, info.course_notes, info.textbook_info,
+            info.semester, info.last_updated
+        ))
+        
+        for s in course_data.sections:
+            section_rows.append((
+                s.class_number, course_code, s.section, s.section_type,
+                s.days, s.times, s.start_time, s.end_time,
+                s.start_date, s.end_date, s.meeting_dates,
+                s.campus, s.location, s.building, s.room, s.instruction_mode,
+                s.instructor, s.instructor_email,
+                s.class_capacity, s.enrollment_total, s.available_seats,
+                s.waitlist_capacity, s.waitlist_total, s.status,
+                s.add_consent, s.drop_consent, s.class_notes,
+                json.dumps(s.exam_schedule or [], ensure_ascii=False),
+                s.course_url, s.detail_url, s.scrape_timestamp
+            ))
+            
+            start_time, end_time = section_time_range(s)
+            start_minutes = parse_clock_minutes(start_time)
+            end_minutes = parse_clock_minutes(end_time)
+            # TBA/arranged sections have no meeting days; a class listed twice under one course meets once per day
+            for day in split_meeting_days(s.days):
+                if (s.class_number, course_code, day) in meeting_keys:
+                    continue
+                meeting_keys.add((s.class_number, course_code, day))
+                meeting_rows.append((
+                    s.class_number, course_code, day, start_time, end_time,
+                    start_minutes, end_minutes, s.building, s.room
+                ))
+            
+            for position, entry in enumerate(s.reserve_capacity or []):
+                reserve_rows.append((
+                    s.class_number, course_code, position,
+                    _reserve_value(entry, ['reserved_for', 'requirement', 'description', 'group']),
+                    _reserve_value(entry, ['capacity', 'reserve_capacity', 'cap']),
+                    _reserve_value(entry, ['enrollment_total', 'enrolled', 'enrollment']),
+                    json.dumps(entry, ensure_ascii=False)
+                ))
+    
+    conn = sqlite3.connect(output_file)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SQLITE_SCHEMA)
+        
+        # One large transaction for the whole catalog
+        with conn:
+            conn.executemany(f"INSERT OR REPLACE INTO courses VALUES ({','.join('?' * 17)})", course_rows)
+            conn.executemany(f"INSERT INTO sections VALUES ({','.join('?' * 31)})", section_rows)
+            conn.executemany(f"INSERT INTO meetings VALUES ({','.join('?' * 9)})", meeting_rows)
+            conn.executemany(f"INSERT INTO reserve_capacity VALUES ({','.join('?' * 7)})", reserve_rows)
+        
+        conn.executescript(SQLITE_INDEXES)
+        conn.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+    
+    logger.info(f"🗄️ SQLite: {len(course_rows)} courses, {len(section_rows)} sections, "
+                f"{len(meeting_rows)} meetings, {len(reserve_rows)} reserve capacity rows")
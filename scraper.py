@@ -24,9 +24,22 @@ import asyncio
 import aiohttp
 from functools import partial
 import multiprocessing
-from queue import Queue, Empty
 import threading
 
+from lionpath.engine import LionPathEngine
+from lionpath.parsers import (
+    is_university_park,
+    parse_listing_text,
+    find_section_links,
+    extract_form_data,
+    DetailPage,
+    extract_course_description,
+    extract_class_attributes,
+    detect_career,
+)
+from lionpath.terms import DEFAULT_TERM, parse_term, term_name
+from lionpath.writers import save_record_list
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -113,7 +126,7 @@ class CourseDetails:
         if not self.scrape_timestamp:
             self.scrape_timestamp = datetime.now().isoformat()
 
-class HighPerformanceLionPathScraper:
+class HighPerformanceLionPathScraper(LionPathEngine):
     """Ultra-fast scraper with full course details extraction"""
     
     def __init__(self, 
@@ -121,33 +134,22 @@ class HighPerformanceLionPathScraper:
                  max_workers: int = 16, 
                  max_detail_workers: int = 50,
                  retry_attempts: int = 2,
-                 rate_limit_per_second: int = 20):
+                 rate_limit_per_second: int = 20,
+                 term: str = DEFAULT_TERM):
+        super().__init__(rate_limit_per_second=rate_limit_per_second,
+                         pool_size=max_workers + max_detail_workers,
+                         term=term)
         
         self.delay = delay
         self.max_workers = max_workers
         self.max_detail_workers = max_detail_workers
         self.retry_attempts = retry_attempts
-        self.rate_limit_per_second = rate_limit_per_second
-        
-        # Rate limiting
-        self.rate_limiter = BoundedSemaphore(rate_limit_per_second)
-        self.last_request_times = []
-        self.request_lock = Lock()
         
         # Data storage
         self.courses_data = []
         self.processed_courses = set()
         self.data_lock = Lock()
         
-        # Session pool for better performance
-        self.session_pool = Queue()
-        self.init_session_pool(max_workers + max_detail_workers)
-        
-        # URLs and patterns
-        self.base_url = "https://public.lionpath.psu.edu"
-        self.search_url = "https://public.lionpath.psu.edu/psc/CSPRD/EMPLOYEE/SA/c/PE_SR175_PUBLIC.PE_SR175_CLS_SRCH.GBL"
-        self.detail_url_template = "https://public.lionpath.psu.edu/psc/CSPRD/EMPLOYEE/SA/c/SA_LEARNER_SERVICES.SSR_SSENRL_DETAIL.GBL"
-        
         # Statistics
         self.stats = {
             'total_subjects': 0,
@@ -160,59 +162,6 @@ class HighPerformanceLionPathScraper:
             'end_time': None
         }
     
-    def init_session_pool(self, pool_size: int):
-        """Initialize a pool of session objects for reuse"""
-        for _ in range(pool_size):
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Cache-Control': 'max-age=0',
-            })
-            self.session_pool.put(session)
-    
-    def get_session(self) -> requests.Session:
-        """Get a session from the pool"""
-        try:
-            return self.session_pool.get_nowait()
-        except Empty:
-            # Create new session if pool is empty
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': f'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Connection': 'keep-alive',
-            })
-            return session
-    
-    def return_session(self, session: requests.Session):
-        """Return a session to the pool"""
-        try:
-            self.session_pool.put_nowait(session)
-        except:
-            pass  # If queue is full, just discard
-    
-    def rate_limited_request(self, method, *args, **kwargs):
-        """Make a rate-limited request"""
-        with self.request_lock:
-            now = time.time()
-            # Remove old timestamps
-            self.last_request_times = [t for t in self.last_request_times if now - t < 1.0]
-            
-            # Wait if we're at the rate limit
-            if len(self.last_request_times) >= self.rate_limit_per_second:
-                sleep_time = 1.0 - (now - self.last_request_times[0])
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-            
-            self.last_request_times.append(now)
-        
-        return method(*args, **kwargs)
-    
     def scrape_all_courses(self, campus_filter: str = "UP", max_subjects: int = None) -> List[CourseDetails]:
         """Main scraping method with aggressive optimization"""
         self.stats['start_time'] = datetime.now()
@@ -292,33 +241,7 @@ class HighPerformanceLionPathScraper:
     
     def is_university_park(self, course: CourseDetails) -> bool:
         """Determine if a course is at University Park"""
-        campus = course.campus.upper()
-        section = course.section.upper()
-        
-        # University Park indicators
-        up_indicators = ['UP', 'UNIVERSITY PARK', '']
-        
-        # Non-UP indicators
-        non_up_indicators = [
-            'WORLD CAMPUS', 'BERKS', 'ABINGTON', 'ALTOONA', 'BRANDYWINE',
-            'DUBOIS', 'ERIE', 'FAYETTE', 'GREATER ALLEGHENY', 'HARRISBURG',
-            'HAZLETON', 'LEHIGH VALLEY', 'MONT ALTO', 'NEW KENSINGTON',
-            'SCHUYLKILL', 'SHENANGO', 'WILKES-BARRE', 'YORK'
-        ]
-        
-        # Check campus field
-        if any(indicator in campus for indicator in non_up_indicators):
-            return False
-        
-        if any(indicator in campus for indicator in up_indicators):
-            return True
-        
-        # Check section suffixes (Y usually means online/World Campus)
-        if section.endswith('Y') or section.endswith('W'):
-            return False
-        
-        # Default to University Park if unclear
-        return True
+        return is_university_park(course.campus, course.section)
     
     def extract_course_details_parallel(self, courses: List[CourseDetails]) -> List[CourseDetails]:
         """Extract detailed course information in massive parallel fashion"""
@@ -368,16 +291,10 @@ class HighPerformanceLionPathScraper:
         
         try:
             # Load search page quickly
-            response = self.rate_limited_request(
-                session.get, 
-                self.search_url, 
-                params={'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'},
-                timeout=10
-            )
-            response.raise_for_status()
+            response = self.fetch_search_page(session)
             
             # Quick form data extraction
-            form_data = self.extract_form_data_fast(response.text)
+            form_data = self.apply_term(extract_form_data(response.text))
             
             # Select subject and submit
             checkbox_id = subject.get('checkbox_id', '')
@@ -404,28 +321,12 @@ class HighPerformanceLionPathScraper:
             logger.debug(f"Error scraping subject {subject_code}: {e}")
             raise
     
-    def extract_form_data_fast(self, html: str) -> Dict[str, str]:
-        """Fast form data extraction using regex"""
-        form_data = {}
-        
-        # Use regex for speed instead of BeautifulSoup
-        hidden_pattern = r'<input[^>]*type=["\']hidden["\'][^>]*name=["\']([^"\']+)["\'][^>]*value=["\']([^"\']*)["\'][^>]*>'
-        matches = re.findall(hidden_pattern, html, re.IGNORECASE)
-        
-        for name, value in matches:
-            form_data[name] = value
-        
-        return form_data
-    
     def parse_courses_optimized(self, html: str, subject_code: str) -> List[CourseDetails]:
         """Optimized course parsing with minimal overhead"""
         courses = []
         
         # Fast regex-based parsing for showClassDetails links
-        pattern = r'javascript:showClassDetails\((\d+),(\d+)\)[^>]*>([^<]+)<'
-        matches = re.findall(pattern, html)
-        
-        for strm, class_nbr, text in matches:
+        for strm, class_nbr, text in find_section_links(html):
             try:
                 course = self.parse_course_text_fast(text, strm, class_nbr, subject_code)
                 if course:
@@ -434,14 +335,16 @@ class HighPerformanceLionPathScraper:
                 logger.debug(f"Error parsing course text '{text}': {e}")
         
         # Also check enrollment links as backup
-        enroll_pattern = r'SSR_CRSE_INFO_FL[^"]*CLASS_NBR=(\d+)[^"]*[^>]*aria-label="Enroll ([^"]+)"'
+        # Neither gap can run into the next enrollment link, so a broken page is not rescanned per link
+        enroll_pattern = (r'SSR_CRSE_INFO_FL(?:(?!SSR_CRSE_INFO_FL)[^"<>])*CLASS_NBR=(\d+)(?!\d)'
+                          r'(?:(?!SSR_CRSE_INFO_FL)[^<>])*?aria-label="Enroll ([^"]+)"')
         enroll_matches = re.findall(enroll_pattern, html)
         
         for class_nbr, aria_text in enroll_matches:
             try:
                 # Check if we already have this course
                 if not any(c.class_number == class_nbr for c in courses):
-                    course = self.parse_course_text_fast(aria_text, "2258", class_nbr, subject_code)
+                    course = self.parse_course_text_fast(aria_text, self.term, class_nbr, subject_code)
                     if course:
                         courses.append(course)
             except Exception as e:
@@ -452,67 +355,18 @@ class HighPerformanceLionPathScraper:
     def parse_course_text_fast(self, text: str, strm: str, class_nbr: str, subject_code: str) -> Optional[CourseDetails]:
         """Fast course text parsing"""
         try:
-            # Clean text
-            text = text.strip()
-            
-            # Parse course code
-            course_patterns = [
-                r'^([A-Z]+-?[A-Z]+)\s+(\d+[A-Z]*)',
-                r'^([A-Z]{2,})\s+(\d+[A-Z]*)',
-            ]
-            
-            subject = ""
-            catalog_number = ""
-            
-            for pattern in course_patterns:
-                match = re.match(pattern, text)
-                if match:
-                    subject = match.group(1)
-                    catalog_number = match.group(2)
-                    break
-            
-            if not subject or not catalog_number:
+            listing = parse_listing_text(text)
+            if not listing:
                 return None
             
-            # Extract section and campus
-            section = ""
-            campus = ""
-            
-            if ' - ' in text:
-                parts = text.split(' - ')
-                if len(parts) > 1:
-                    section_campus = parts[1]
-                    
-                    # Extract section
-                    section_match = re.search(r'(\d{3}[A-Z]*|[A-Z]\d{2}|\d{2,3})', section_campus)
-                    if section_match:
-                        section = section_match.group(1)
-                    
-                    # Extract campus
-                    campus_names = [
-                        'World Campus', 'Berks', 'Abington', 'Altoona', 'Brandywine',
-                        'Dubois', 'Erie', 'Fayette', 'Greater Allegheny', 'Harrisburg',
-                        'Hazleton', 'Lehigh Valley', 'Mont Alto', 'New Kensington',
-                        'Schuylkill', 'Shenango', 'Wilkes-Barre', 'York', 'UP'
-                    ]
-                    
-                    for campus_name in campus_names:
-                        if campus_name in section_campus:
-                            campus = campus_name
-                            break
-                    
-                    # Default logic for UP
-                    if not campus and not any(c in section_campus.lower() for c in ['world', 'berks', 'y']):
-                        campus = 'UP'
-            
             course = CourseDetails(
-                course_code=f"{subject} {catalog_number}",
-                subject=subject,
-                catalog_number=catalog_number,
-                section=section,
-                campus=campus,
+                course_code=listing['course_code'],
+                subject=listing['subject'],
+                catalog_number=listing['catalog_number'],
+                section=listing['section'],
+                campus=listing['campus'],
                 class_number=class_nbr,
-                semester="Fall 2025",
+                semester=term_name(strm),
                 course_url=f"showClassDetails({strm},{class_nbr})"
             )
             
@@ -542,26 +396,11 @@ class HighPerformanceLionPathScraper:
                 strm, class_nbr = match.groups()
                 
                 # Try to get detailed course information
-                detail_url = f"{self.base_url}/psc/CSPRD/EMPLOYEE/SA/c/SA_LEARNER_SERVICES.SSR_SSENRL_DETAIL.GBL"
-                
-                params = {
-                    'Page': 'SSR_SSENRL_DETAIL',
-                    'Action': 'A',
-                    'STRM': strm,
-                    'CLASS_NBR': class_nbr,
-                    'ACAD_CAREER': 'UGRD',  # Undergraduate, could also be GRAD
-                }
-                
-                # Make request for detailed information
-                response = self.rate_limited_request(
-                    session.get,
-                    detail_url,
-                    params=params,
-                    timeout=8
-                )
+                html = self.fetch_class_detail_any_career(session, strm, class_nbr,
+                                                          detect_career(course.catalog_number))
                 
-                if response.status_code == 200:
-                    detailed_course = self.parse_detailed_course_info(response.text, course)
+                if html:
+                    detailed_course = self.parse_detailed_course_info(html, course)
                     return detailed_course
                 
             return course
@@ -573,7 +412,9 @@ class HighPerformanceLionPathScraper:
     def parse_detailed_course_info(self, html: str, base_course: CourseDetails) -> CourseDetails:
         """Parse detailed course information from the course detail page"""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # One walk builds the label map and page text every extractor below reads from
+            page = DetailPage(html)
+            soup = page.soup
             
             # Create a copy of the base course
             detailed_course = CourseDetails(**asdict(base_course))
@@ -596,55 +437,55 @@ class HighPerformanceLionPathScraper:
                     break
             
             # Extract units/credits
-            units_text = self.extract_field_value(soup, ['Units', 'Credits', 'Credit Hours'])
+            units_text = page.field(['Units', 'Credits', 'Credit Hours'])
             if units_text:
                 units_match = re.search(r'(\d+\.?\d*)', units_text)
                 if units_match:
                     detailed_course.units = units_match.group(1)
             
             # Extract grading basis
-            detailed_course.grading = self.extract_field_value(soup, ['Grading Basis', 'Grading'])
+            detailed_course.grading = page.field(['Grading Basis', 'Grading'])
             
             # Extract instruction mode
-            detailed_course.instruction_mode = self.extract_field_value(soup, ['Instruction Mode', 'Instructional Method'])
+            detailed_course.instruction_mode = page.field(['Instruction Mode', 'Instructional Method'])
             
             # Extract component (LEC, LAB, etc.)
-            component = self.extract_field_value(soup, ['Component', 'Class Component'])
+            component = page.field(['Component', 'Class Component'])
             if component:
                 detailed_course.component = component
             
             # Extract detailed scheduling information
-            self.extract_schedule_details(soup, detailed_course)
+            self.extract_schedule_details(page, detailed_course)
             
             # Extract enrollment information
-            self.extract_enrollment_details(soup, detailed_course)
+            self.extract_enrollment_details(page, detailed_course)
             
             # Extract course description
-            desc = self.extract_course_description(soup)
+            desc = extract_course_description(soup)
             if desc:
                 detailed_course.course_description = desc
             
             # Extract class notes
-            notes = self.extract_field_value(soup, ['Class Notes', 'Notes', 'Additional Information'])
+            notes = page.field(['Class Notes', 'Notes', 'Additional Information'])
             if notes:
                 detailed_course.class_notes = notes
             
             # Extract enrollment requirements
-            req = self.extract_field_value(soup, ['Enrollment Requirements', 'Prerequisites', 'Requirements'])
+            req = page.field(['Enrollment Requirements', 'Prerequisites', 'Requirements'])
             if req:
                 detailed_course.enrollment_requirements = req
             
             # Extract consent requirements
-            detailed_course.add_consent = self.extract_field_value(soup, ['Add Consent'])
-            detailed_course.drop_consent = self.extract_field_value(soup, ['Drop Consent'])
+            detailed_course.add_consent = page.field(['Add Consent'])
+            detailed_course.drop_consent = page.field(['Drop Consent'])
             
             # Extract status
-            status = self.extract_field_value(soup, ['Status', 'Class Status'])
+            status = page.field(['Status', 'Class Status'])
             if status:
                 detailed_course.status = status
             
             # Extract additional attributes
-            attributes = self.extract_class_attributes(soup)
+            attributes = extract_class_attributes(soup, page.text)
             if attributes:
                 detailed_course.class_attributes = attributes
             
@@ -657,42 +498,12 @@ class HighPerformanceLionPathScraper:
             logger.debug(f"Error parsing detailed course info: {e}")
             return base_course
     
-    def extract_field_value(self, soup: BeautifulSoup, field_names: List[str]) -> str:
-        """Extract a field value by looking for labels"""
-        for field_name in field_names:
-            # Look for labels containing the field name
-            label_patterns = [
-                soup.find('span', string=re.compile(field_name, re.IGNORECASE)),
-                soup.find('td', string=re.compile(field_name, re.IGNORECASE)),
-                soup.find('label', string=re.compile(field_name, re.IGNORECASE)),
-            ]
-            
-            for label in label_patterns:
-                if label:
-                    # Find the next element that might contain the value
-                    next_elem = label.find_next_sibling()
-                    if next_elem:
-                        value = next_elem.get_text(strip=True)
-                        if value and value != field_name:
-                            return value
-                    
-                    # Try parent's next sibling
-                    parent = label.parent
-                    if parent:
-                        next_elem = parent.find_next_sibling()
-                        if next_elem:
-                            value = next_elem.get_text(strip=True)
-                            if value and value != field_name:
-                                return value
-        
-        return ""
-    
-    def extract_schedule_details(self, soup: BeautifulSoup, course: CourseDetails):
+    def extract_schedule_details(self, page: DetailPage, course: CourseDetails):
         """Extract detailed schedule information"""
         try:
             # Look for time patterns
             time_pattern = r'(\d{1,2}:\d{2}[AP]M)\s*-\s*(\d{1,2}:\d{2}[AP]M)'
-            time_text = soup.get_text()
+            time_text = page.text
             time_match = re.search(time_pattern, time_text)
             
             if time_match:
@@ -732,10 +543,10 @@ class HighPerformanceLionPathScraper:
         except Exception as e:
             logger.debug(f"Error extracting schedule details: {e}")
     
-    def extract_enrollment_details(self, soup: BeautifulSoup, course: CourseDetails):
+    def extract_enrollment_details(self, page: DetailPage, course: CourseDetails):
         """Extract enrollment capacity and availability information"""
         try:
-            text = soup.get_text()
+            text = page.text
             
             # Patterns for enrollment data
             patterns = {
@@ -754,104 +565,6 @@ class HighPerformanceLionPathScraper:
         except Exception as e:
             logger.debug(f"Error extracting enrollment details: {e}")
     
-    def extract_course_description(self, soup: BeautifulSoup) -> str:
-        """Extract course description"""
-        try:
-            # Look for description in various places
-            desc_patterns = [
-                ('div', {'class': re.compile('description', re.IGNORECASE)}),
-                ('span', {'class': 'PSLONGEDITBOX'}),
-                ('td', {'class': re.compile('description', re.IGNORECASE)}),
-            ]
-            
-            for tag, attrs in desc_patterns:
-                desc_elem = soup.find(tag, attrs)
-                if desc_elem:
-                    desc_text = desc_elem.get_text(strip=True)
-                    if len(desc_text) > 50:  # Ensure it's a substantial description
-                        return desc_text
-            
-            # Look for text after "Description" label
-            desc_labels = soup.find_all(string=re.compile(r'Description', re.IGNORECASE))
-            for label in desc_labels:
-                if label.parent:
-                    next_elem = label.parent.find_next()
-                    if next_elem:
-                        desc_text = next_elem.get_text(strip=True)
-                        if len(desc_text) > 50:
-                            return desc_text
-            
-            return ""
-            
-        except Exception as e:
-            logger.debug(f"Error extracting course description: {e}")
-            return ""
-    
-    def extract_class_attributes(self, soup: BeautifulSoup) -> List[str]:
-        """Extract class attributes"""
-        try:
-            attributes = []
-            
-            # Look for attributes section
-            attr_text = soup.get_text()
-            
-            # Common attribute patterns
-            attr_patterns = [
-                r'General Education[:\s]*([^\n]+)',
-                r'Attributes[:\s]*([^\n]+)',
-                r'GenEd[:\s]*([^\n]+)',
-            ]
-            
-            for pattern in attr_patterns:
-                matches = re.findall(pattern, attr_text, re.IGNORECASE)
-                for match in matches:
-                    if match.strip():
-                        attributes.append(match.strip())
-            
-            return list(set(attributes))  # Remove duplicates
-            
-        except Exception as e:
-            logger.debug(f"Error extracting class attributes: {e}")
-            return []
-    
-    def get_all_subjects(self) -> List[Dict]:
-        """Get all subjects quickly"""
-        session = self.get_session()
-        try:
-            response = self.rate_limited_request(
-                session.get,
-                self.search_url,
-                params={'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'},
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            # Fast regex-based subject extraction
-            subjects = []
-            
-            # Pattern to match subject checkboxes and labels
-            pattern = r'<input[^>]*id="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*id="PTS_SELECT_LBL\$\1"[^>]*>([^<]+)</label>'
-            matches = re.findall(pattern, response.text, re.DOTALL)
-            
-            for checkbox_num, label_text in matches:
-                if '/' in label_text:
-                    parts = label_text.strip().split('/', 1)
-                    code = parts[0].strip()
-                    name = parts[1].strip() if len(parts) > 1 else code
-                    
-                    subjects.append({
-                        'code': code,
-                        'name': name,
-                        'checkbox_id': f'PTS_SELECT${checkbox_num}',
-                        'full_text': label_text.strip()
-                    })
-            
-            subjects.sort(key=lambda x: x['code'])
-            return subjects
-            
-        finally:
-            self.return_session(session)
-    
     def log_final_stats(self):
         """Log comprehensive final statistics"""
         duration = self.stats['end_time'] - self.stats['start_time']
@@ -872,31 +585,7 @@ class HighPerformanceLionPathScraper:
 def save_results_optimized(courses: List[CourseDetails], output_file: str, format_type: str = 'jsonl'):
     """Optimized result saving"""
     logger.info(f"💾 Saving {len(courses)} courses to {output_file}...")
-    
-    if format_type.lower() == 'jsonl':
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for course in courses:
-                json.dump(asdict(course), f, ensure_ascii=False, separators=(',', ':'))
-                f.write('\n')
-    
-    elif format_type.lower() == 'json':
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump([asdict(course) for course in courses], f, ensure_ascii=False, indent=2)
-    
-    elif format_type.lower() == 'csv':
-        import csv
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            if courses:
-                # Flatten class_attributes for CSV
-                flattened_courses = []
-                for course in courses:
-                    course_dict = asdict(course)
-                    course_dict['class_attributes'] = '; '.join(course_dict.get('class_attributes', []))
-                    flattened_courses.append(course_dict)
-                
-                writer = csv.DictWriter(f, fieldnames=flattened_courses[0].keys())
-                writer.writeheader()
-                writer.writerows(flattened_courses)
+    save_record_list([asdict(course) for course in courses], output_file, format_type)
 
 def main():
     """Main execution function"""
@@ -904,6 +593,8 @@ def main():
     parser.add_argument('--output', '-o', default='psu_courses_enhanced.jsonl', help='Output file')
     parser.add_argument('--format', choices=['jsonl', 'json', 'csv'], default='jsonl', help='Output format')
     parser.add_argument('--campus', '-c', default='UP', help='Campus filter (UP for University Park, ALL for all)')
+    parser.add_argument('--term', type=parse_term, default=DEFAULT_TERM,
+                        help='Term to scrape, as a STRM (2258) or name ("Fall 2025")')
     parser.add_argument('--delay', type=float, default=0.2, help='Delay between requests')
     parser.add_argument('--max-workers', type=int, default=16, help='Max concurrent workers for subjects')
     parser.add_argument('--max-detail-workers', type=int, default=50, help='Max concurrent workers for course details')
@@ -921,6 +612,7 @@ def main():
     logger.info(f"📁 Output file: {args.output}")
     logger.info(f"📊 Output format: {args.format}")
     logger.info(f"🏫 Campus filter: {args.campus}")
+    logger.info(f"📅 Term: {args.term} ({term_name(args.term)})")
     logger.info(f"⚙️ Subject workers: {args.max_workers}")
     logger.info(f"⚙️ Detail workers: {args.max_detail_workers}")
     logger.info(f"⚡ Rate limit: {args.rate_limit} req/sec")
@@ -931,7 +623,8 @@ def main():
         max_workers=args.max_workers,
         max_detail_workers=args.max_detail_workers,
         retry_attempts=args.retry_attempts,
-        rate_limit_per_second=args.rate_limit
+        rate_limit_per_second=args.rate_limit,
+        term=args.term
     )
     
     try:
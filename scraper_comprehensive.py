@@ -9,19 +9,21 @@ import asyncio
 import aiohttp
 import requests
 import logging
-import json
-import csv
 import re
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field, asdict
 from bs4 import BeautifulSoup
-import pandas as pd
-from queue import Queue
 import concurrent.futures
 from threading import Lock
 import threading
+from compressed_io import strip_compression_suffix
+
+from lionpath.engine import LionPathEngine
+from lionpath.parsers import is_university_park, extract_form_data, find_section_rows, parse_listing_row
+from lionpath.terms import DEFAULT_TERM, parse_term, parse_terms, term_name, term_output_path
+from lionpath.writers import save_flat_results
 
 # Configure logging
 logging.basicConfig(
@@ -145,33 +147,21 @@ class ComprehensiveCourseData:
             }
         }
 
-class ComprehensiveLionPathScraper:
+class ComprehensiveLionPathScraper(LionPathEngine):
     """Comprehensive scraper that captures ALL available course information"""
     
     def __init__(self, delay: float = 0.5, max_workers: int = 10, 
                  max_detail_workers: int = 20, retry_attempts: int = 3,
-                 rate_limit_per_second: float = 15):
-        # Use the correct URLs from the working scraper
-        self.base_url = "https://public.lionpath.psu.edu"
-        self.search_url = "https://public.lionpath.psu.edu/psc/CSPRD/EMPLOYEE/SA/c/PE_SR175_PUBLIC.PE_SR175_CLS_SRCH.GBL"
+                 rate_limit_per_second: float = 15, term: str = DEFAULT_TERM):
+        super().__init__(rate_limit_per_second=rate_limit_per_second,
+                         pool_size=max_workers + max_detail_workers,
+                         request_timeout=30,
+                         term=term)
         
         self.delay = delay
         self.max_workers = max_workers
         self.max_detail_workers = max_detail_workers
         self.retry_attempts = retry_attempts
-        self.rate_limit_per_second = rate_limit_per_second
-        self.rate_limiter = threading.Semaphore(int(rate_limit_per_second))
-        self.rate_limit_lock = Lock()
-        self.last_request_time = 0
-        
-        # Session pool for connection reuse
-        self.session_pool = Queue()
-        for _ in range(max_workers + max_detail_workers):
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            self.session_pool.put(session)
         
         # Storage
         self.courses_data = {}
@@ -186,137 +176,14 @@ class ComprehensiveLionPathScraper:
             'detailed_sections': 0
         }
     
-    def get_session(self) -> requests.Session:
-        """Get a session from the pool"""
-        return self.session_pool.get()
-    
-    def return_session(self, session: requests.Session):
-        """Return a session to the pool"""
-        self.session_pool.put(session)
-    
-    def rate_limited_request(self, method, *args, **kwargs):
-        """Make a rate-limited request"""
-        with self.rate_limit_lock:
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            min_interval = 1.0 / self.rate_limit_per_second
-            
-            if time_since_last < min_interval:
-                time.sleep(min_interval - time_since_last)
-            
-            self.last_request_time = time.time()
-        
-        return method(*args, **kwargs)
-    
-    def get_all_subjects(self) -> List[Dict]:
-        """Get all available subject codes using the correct URL"""
-        session = self.get_session()
-        try:
-            response = self.rate_limited_request(
-                session.get,
-                self.search_url,
-                params={'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'},
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            subjects = []
-            html_text = response.text
-            logger.debug(f"HTML length: {len(html_text)}")
-            
-            # Use a simpler pattern that matches the actual HTML structure
-            # Looking for: <label for='PTS_SELECT$31' id='PTS_SELECT_LBL$31' class='ps-label'>A-I / Artificial Intelligence</label>
-            pattern = r"<label[^>]*for='PTS_SELECT\$(\d+)'[^>]*>([^<]+)</label>"
-            matches = re.findall(pattern, html_text)
-            
-            if not matches:
-                # Try with double quotes
-                pattern = r'<label[^>]*for="PTS_SELECT\$(\d+)"[^>]*>([^<]+)</label>'
-                matches = re.findall(pattern, html_text)
-            
-            logger.debug(f"Found {len(matches)} label matches")
-            
-            for checkbox_num, label_text in matches:
-                label_text = label_text.strip()
-                if '/' in label_text and len(label_text) > 5:
-                    parts = label_text.split('/', 1)
-                    code = parts[0].strip()
-                    name = parts[1].strip() if len(parts) > 1 else code
-                    
-                    if re.match(r'^[A-Z]+-?[A-Z]*$', code):
-                        subjects.append({
-                            'code': code,
-                            'name': name,
-                            'checkbox_id': f'PTS_SELECT${checkbox_num}'
-                        })
-            
-            # Also try to find subjects from the checkbox input elements themselves
-            if not subjects:
-                pattern = r"<input[^>]*id='PTS_SELECT\$(\d+)'[^>]*title=\"([^\"]+)\""
-                matches = re.findall(pattern, html_text)
-                
-                for checkbox_num, title_text in matches:
-                    if '/' in title_text:
-                        parts = title_text.split('/', 1)
-                        code = parts[0].strip()
-                        name = parts[1].strip() if len(parts) > 1 else code
-                        
-                        if re.match(r'^[A-Z]+-?[A-Z]*$', code):
-                            subjects.append({
-                                'code': code,
-                                'name': name,
-                                'checkbox_id': f'PTS_SELECT${checkbox_num}'
-                            })
-                            
-            
-            # Remove duplicates
-            seen = set()
-            unique_subjects = []
-            for s in subjects:
-                if s['code'] not in seen:
-                    seen.add(s['code'])
-                    unique_subjects.append(s)
-            
-            logger.info(f"Found {len(unique_subjects)} subjects")
-            return unique_subjects
-            
-        except Exception as e:
-            logger.error(f"Error getting subjects: {e}")
-            return []
-        finally:
-            self.return_session(session)
-    
     def extract_form_data(self, html: str) -> Dict[str, str]:
         """Extract form data from HTML"""
-        form_data = {}
-        
-        # Extract ICSID (handle both single and double quotes)
-        icsid_match = re.search(r'<input[^>]*name=["\']ICSID["\'][^>]*value=["\']([^"\']+)["\']', html)
-        if icsid_match:
-            form_data['ICSID'] = icsid_match.group(1)
-        
-        # Extract ICStateNum
-        state_match = re.search(r'<input[^>]*name=["\']ICStateNum["\'][^>]*value=["\']([^"\']+)["\']', html)
-        if state_match:
-            form_data['ICStateNum'] = state_match.group(1)
-        
-        # Extract other important hidden fields
-        important_fields = ['ICType', 'ICElementNum', 'ICAction', 'ICXPos', 'ICYPos', 
-                           'ResponsetoDiffFrame', 'TargetFrameName', 'FacetPath']
-        
-        for field in important_fields:
-            pattern = rf'<input[^>]*name=["\']{field}["\'][^>]*value=["\']([^"\']*)["\']'
-            match = re.search(pattern, html)
-            if match:
-                form_data[field] = match.group(1)
+        form_data = extract_form_data(html)
         
         # Set defaults for some fields if not found
-        if 'ICAction' not in form_data:
-            form_data['ICAction'] = ''
-        if 'ICXPos' not in form_data:
-            form_data['ICXPos'] = '0'
-        if 'ICYPos' not in form_data:
-            form_data['ICYPos'] = '0'
+        form_data.setdefault('ICAction', '')
+        form_data.setdefault('ICXPos', '0')
+        form_data.setdefault('ICYPos', '0')
         
         return form_data
     
@@ -325,16 +192,10 @@ class ComprehensiveLionPathScraper:
         session = self.get_session()
         try:
             # First get the search page to extract form data
-            response = self.rate_limited_request(
-                session.get,
-                self.search_url,
-                params={'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'},
-                timeout=10
-            )
-            response.raise_for_status()
+            response = self.fetch_search_page(session)
             
             # Extract form data from the page
-            form_data = self.extract_form_data(response.text)
+            form_data = self.apply_term(self.extract_form_data(response.text))
             
             # Add the checkbox selection
             checkbox_id = subject.get('checkbox_id', '')
@@ -356,6 +217,10 @@ class ComprehensiveLionPathScraper:
                 
                 sections = self.parse_subject_sections(response.text, subject['code'])
                 
+                # Filter for campus before fetching details
+                if campus_filter == "UP":
+                    sections = [s for s in sections if self.is_university_park_section(s)]
+                
                 # Get detailed information for each section
                 detailed_sections = []
                 for section in sections:
@@ -376,11 +241,8 @@ class ComprehensiveLionPathScraper:
         """Parse sections from subject page HTML using regex for speed"""
         sections = []
         
-        # Use regex pattern to find showClassDetails links (from optimized scraper)
-        pattern = r'javascript:showClassDetails\((\d+),(\d+)\)[^>]*>([^<]+)<'
-        matches = re.findall(pattern, html)
-        
-        for strm, class_nbr, text in matches:
+        # Use the shared results row scanner; each row is read once, from its link to the next
+        for strm, class_nbr, text, row in find_section_rows(html):
             try:
                 section = ComprehensiveSectionInfo()
                 section.class_number = class_nbr
@@ -391,7 +253,7 @@ class ComprehensiveLionPathScraper:
                 text = text.strip()
                 
                 # Try to extract course code and section
-                course_match = re.match(r'^([A-Z]+-?[A-Z]*\s+\d+[A-Z]*)\s*-\s*(\S+)', text)
+                course_match = re.match(r'^([A-Z]+(?:-[A-Z]*)?\s+\d+[A-Z]*)\s*-\s*(\S+)', text)
                 if course_match:
                     section.course_code = course_match.group(1)
                     section.section = course_match.group(2)
@@ -399,35 +261,8 @@ class ComprehensiveLionPathScraper:
                     # If no section, use whole text as course code
                     section.course_code = text.split('-')[0].strip() if '-' in text else text
                 
-                # Try to extract additional info from the HTML around this match
-                # Look for enrollment info near the class number
-                enrollment_pattern = f'CLASS_NBR">{class_nbr}</span>.*?(\d+)/(\d+)'
-                enroll_match = re.search(enrollment_pattern, html[:html.find(f'showClassDetails({strm},{class_nbr})')+1000], re.DOTALL)
-                if enroll_match:
-                    section.enrollment_total = int(enroll_match.group(1))
-                    section.class_capacity = int(enroll_match.group(2))
-                    section.available_seats = section.class_capacity - section.enrollment_total
-                
-                # Look for status (Open/Closed)
-                status_pattern = f'{class_nbr}.*?(Open|Closed|Wait List)'
-                status_match = re.search(status_pattern, html[:html.find(f'showClassDetails({strm},{class_nbr})')+500])
-                if status_match:
-                    section.status = status_match.group(1)
-                
-                # Look for instructor
-                instructor_pattern = f'{class_nbr}.*?Instructor:.*?>([^<]+)<'
-                instructor_match = re.search(instructor_pattern, html[:html.find(f'showClassDetails({strm},{class_nbr})')+1000])
-                if instructor_match:
-                    section.instructor = instructor_match.group(1).strip()
-                
-                # Look for days/times
-                days_pattern = f'{class_nbr}.*?(Mo|Tu|We|Th|Fr|Sa|Su)[A-Za-z]*.*?(\d{{1,2}}:\d{{2}}[AP]M)'
-                days_match = re.search(days_pattern, html[:html.find(f'showClassDetails({strm},{class_nbr})')+1000])
-                if days_match:
-                    # Extract full days string
-                    days_text = re.search(f'{class_nbr}.*?([MoTuWeThFrSaSu][A-Za-z, ]*)', html[:html.find(f'showClassDetails({strm},{class_nbr})')+1000])
-                    if days_text:
-                        section.days = days_text.group(1).strip()
+                # Status, seats, days/times, room and instructor from the rest of the row
+                parse_listing_row(row, section)
                 
                 # Determine campus from section number patterns
                 if section.section:
@@ -638,6 +473,10 @@ class ComprehensiveLionPathScraper:
             logger.debug(f"Error parsing detailed section info: {e}")
             return base_section
     
+    def is_university_park_section(self, section) -> bool:
+        """Check if section is at University Park"""
+        return is_university_park(section.campus, section.section)
+    
     def organize_courses(self, sections: List[ComprehensiveSectionInfo]) -> Dict[str, ComprehensiveCourseData]:
         """Organize sections into courses with comprehensive information"""
         courses = {}
@@ -647,7 +486,7 @@ class ComprehensiveLionPathScraper:
             
             if course_code not in courses:
                 # Create course info from section data
-                course_info = ComprehensiveCourseInfo(course_code=course_code)
+                course_info = ComprehensiveCourseInfo(course_code=course_code, semester=term_name(self.term))
                 
                 # Extract course-level info from section notes if available
                 if section.class_notes:
@@ -682,7 +521,7 @@ class ComprehensiveLionPathScraper:
                         course_info.career = career_match.group(1).strip()
                 
                 # Parse subject and catalog number
-                match = re.match(r'^([A-Z]+-?[A-Z]*)\s+(\d+[A-Z]*)$', course_code)
+                match = re.match(r'^([A-Z]+(?:-[A-Z]*)?)\s+(\d+[A-Z]*)$', course_code)
                 if match:
                     course_info.subject = match.group(1)
                     course_info.catalog_number = match.group(2)
@@ -785,38 +624,10 @@ class ComprehensiveLionPathScraper:
             return self.courses_data
 
 def save_comprehensive_results(courses_data: Dict[str, ComprehensiveCourseData], 
-                              output_file: str, format: str = "jsonl"):
-    """Save comprehensive results to file"""
-    logger.info(f"💾 Saving {len(courses_data)} courses to {output_file}...")
-    
-    if format == "jsonl":
-        with open(output_file, 'w') as f:
-            for course_code, course_data in courses_data.items():
-                json_line = json.dumps(course_data.to_dict(), default=str)
-                f.write(json_line + '\n')
-    
-    elif format == "json":
-        output = {}
-        for course_code, course_data in courses_data.items():
-            output[course_code] = course_data.to_dict()
-        
-        with open(output_file, 'w') as f:
-            json.dump(output, f, indent=2, default=str)
-    
-    elif format == "csv":
-        # Flatten for CSV
-        rows = []
-        for course_code, course_data in courses_data.items():
-            course_dict = asdict(course_data.course_info)
-            for section in course_data.sections:
-                row = {**course_dict, **asdict(section)}
-                rows.append(row)
-        
-        if rows:
-            df = pd.DataFrame(rows)
-            df.to_csv(output_file, index=False)
-    
-    logger.info(f"✅ Saved {len(courses_data)} courses")
+                              output_file: str, format: str = "jsonl",
+                              compression_level: Optional[int] = None):
+    """Save comprehensive results to file (compressed when the name ends in .gz or .zst)"""
+    save_flat_results(courses_data, output_file, format, compression_level)
 
 def main():
     """Main function"""
@@ -827,8 +638,14 @@ def main():
                        help='Output file path')
     parser.add_argument('--format', choices=['jsonl', 'json', 'csv'], 
                        default='jsonl', help='Output format')
+    parser.add_argument('--compression-level', type=int,
+                       help='Compression level for .gz/.zst output files')
     parser.add_argument('--campus', default='UP', 
                        help='Campus filter (UP for University Park, ALL for all campuses)')
+    parser.add_argument('--term', type=parse_term, default=DEFAULT_TERM,
+                       help='Term to scrape, as a STRM (2258) or name ("Fall 2025")')
+    parser.add_argument('--terms', type=parse_terms,
+                       help='Comma-separated terms to scrape in one run, one output file per term')
     parser.add_argument('--max-subjects', type=int, 
                        help='Maximum number of subjects to scrape (for testing)')
     parser.add_argument('--max-workers', type=int, default=10,
@@ -844,32 +661,41 @@ def main():
     
     args = parser.parse_args()
     
+    terms = args.terms or [args.term]
+    
     # Create scraper
     scraper = ComprehensiveLionPathScraper(
         delay=args.delay,
         max_workers=args.max_workers,
         max_detail_workers=args.max_detail_workers,
         retry_attempts=args.retry_attempts,
-        rate_limit_per_second=args.rate_limit
-    )
-    
-    # Scrape courses
-    campus_filter = None if args.campus == 'ALL' else args.campus
-    courses_data = scraper.scrape_all_courses(
-        campus_filter=campus_filter,
-        max_subjects=args.max_subjects
+        rate_limit_per_second=args.rate_limit,
+        term=terms[0]
     )
     
-    # Save results
-    if courses_data:
-        output_file = args.output
-        if not output_file.endswith(f'.{args.format}'):
-            output_file = f"{output_file.rsplit('.', 1)[0]}.{args.format}"
+    output_file = args.output
+    base_name = strip_compression_suffix(output_file)
+    if not base_name.endswith(f'.{args.format}'):
+        output_file = f"{base_name.rsplit('.', 1)[0]}.{args.format}{output_file[len(base_name):]}"
+    
+    def scrape_term(strm: str):
+        # Scrape courses
+        campus_filter = None if args.campus == 'ALL' else args.campus
+        courses_data = scraper.scrape_all_courses(
+            campus_filter=campus_filter,
+            max_subjects=args.max_subjects
+        )
         
-        save_comprehensive_results(courses_data, output_file, args.format)
-        logger.info(f"✅ Results saved to {output_file}")
-    else:
-        logger.warning("⚠️ No data to save")
+        # Save results; several terms get one file per STRM
+        if courses_data:
+            term_file = term_output_path(output_file, strm) if len(terms) > 1 else output_file
+            save_comprehensive_results(courses_data, term_file, args.format, args.compression_level)
+            logger.info(f"✅ {term_name(strm)} results saved to {term_file}")
+        else:
+            logger.warning(f"⚠️ No data to save for {term_name(strm)}")
+        return courses_data
+    
+    scraper.for_each_term(terms, scrape_term)
     
     return 0
 
@@ -8,20 +8,21 @@ import asyncio
 import aiohttp
 import requests
 import logging
-import json
-import csv
 import re
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field, asdict
 from bs4 import BeautifulSoup
-import pandas as pd
-from queue import Queue
 import concurrent.futures
 from threading import Lock
 import threading
 
+from lionpath.engine import LionPathEngine, TERM_FORM_FIELD
+from lionpath.parsers import find_section_links, is_university_park
+from lionpath.terms import DEFAULT_TERM, parse_term, term_name
+from lionpath.writers import save_flat_results
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -144,30 +145,22 @@ class EnhancedCourseData:
             }
         }
 
-class EnhancedLionPathScraper:
+class EnhancedLionPathScraper(LionPathEngine):
     """Enhanced scraper that captures ALL available course information"""
     
     def __init__(self, delay: float = 0.5, max_workers: int = 10, 
                  max_detail_workers: int = 20, retry_attempts: int = 3,
-                 rate_limit_per_second: float = 15):
-        self.base_url = "https://public.lionpath.psu.edu/psp/CSPRD/EMPLOYEE/HRMS/c/COMMUNITY_ACCESS.CLASS_SEARCH.GBL"
+                 rate_limit_per_second: float = 15, term: str = DEFAULT_TERM):
+        super().__init__(rate_limit_per_second=rate_limit_per_second,
+                         pool_size=max_workers + max_detail_workers,
+                         request_timeout=30,
+                         term=term)
+        # Legacy community-access class search used for subject and detail posts
+        self.class_search_url = "https://public.lionpath.psu.edu/psp/CSPRD/EMPLOYEE/HRMS/c/COMMUNITY_ACCESS.CLASS_SEARCH.GBL"
         self.delay = delay
         self.max_workers = max_workers
         self.max_detail_workers = max_detail_workers
         self.retry_attempts = retry_attempts
-        self.rate_limit_per_second = rate_limit_per_second
-        self.rate_limiter = threading.Semaphore(int(rate_limit_per_second))
-        self.rate_limit_lock = Lock()
-        self.last_request_time = 0
-        
-        # Session pool for connection reuse
-        self.session_pool = Queue()
-        for _ in range(max_workers + max_detail_workers):
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            self.session_pool.put(session)
         
         # Storage
         self.courses_data = {}
@@ -182,73 +175,6 @@ class EnhancedLionPathScraper:
             'detailed_sections': 0
         }
     
-    def get_session(self) -> requests.Session:
-        """Get a session from the pool"""
-        return self.session_pool.get()
-    
-    def return_session(self, session: requests.Session):
-        """Return a session to the pool"""
-        self.session_pool.put(session)
-    
-    def rate_limited_request(self, method, *args, **kwargs):
-        """Make a rate-limited request"""
-        with self.rate_limit_lock:
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            min_interval = 1.0 / self.rate_limit_per_second
-            
-            if time_since_last < min_interval:
-                time.sleep(min_interval - time_since_last)
-            
-            self.last_request_time = time.time()
-        
-        return method(*args, **kwargs)
-    
-    def get_all_subjects(self) -> List[Dict]:
-        """Get all available subject codes"""
-        session = self.get_session()
-        try:
-            response = self.rate_limited_request(
-                session.get, 
-                self.base_url,
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Failed to get subjects: {response.status_code}")
-                return []
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            subjects = []
-            
-            # Find all subject checkboxes
-            subject_inputs = soup.find_all('input', {'id': re.compile(r'PTS_SELECT\$\d+')})
-            
-            for input_elem in subject_inputs:
-                # Get corresponding label
-                label_id = input_elem.get('id', '').replace('PTS_SELECT', 'PTS_SELECT_LBL')
-                label = soup.find('label', {'id': label_id})
-                
-                if label:
-                    text = label.get_text(strip=True)
-                    # Parse subject code and name
-                    match = re.match(r'([A-Z]+-?[A-Z]*)\s*/\s*(.+)', text)
-                    if match:
-                        subjects.append({
-                            'code': match.group(1),
-                            'name': match.group(2),
-                            'checkbox_id': input_elem.get('id')
-                        })
-            
-            logger.info(f"Found {len(subjects)} subjects")
-            return subjects
-            
-        except Exception as e:
-            logger.error(f"Error getting subjects: {e}")
-            return []
-        finally:
-            self.return_session(session)
-    
     def scrape_subject(self, subject: Dict, campus_filter: str = "UP") -> List[SectionInfo]:
         """Scrape all sections for a subject"""
         session = self.get_session()
@@ -260,7 +186,7 @@ class EnhancedLionPathScraper:
             
             response = self.rate_limited_request(
                 session.post,
-                self.base_url,
+                self.class_search_url,
                 data=form_data,
                 timeout=30
             )
@@ -289,10 +215,7 @@ class EnhancedLionPathScraper:
         sections = []
         
         # Find all class detail links
-        pattern = r'javascript:showClassDetails\((\d+),(\d+)\)[^>]*>([^<]+)<'
-        matches = re.findall(pattern, html)
-        
-        for strm, class_nbr, text in matches:
+        for strm, class_nbr, text in find_section_links(html):
             section = self.parse_section_text(text, strm, class_nbr, subject_code)
             if section:
                 sections.append(section)
@@ -312,7 +235,7 @@ class EnhancedLionPathScraper:
                 return None
             
             # Extract course code
-            course_match = re.match(r'^([A-Z]+-?[A-Z]*)\s+(\d+[A-Z]*)', parts[0])
+            course_match = re.match(r'^([A-Z]+(?:-[A-Z]*)?)\s+(\d+[A-Z]*)', parts[0])
             if not course_match:
                 return None
             
@@ -362,13 +285,13 @@ class EnhancedLionPathScraper:
                 'ICStateNum': '1',
                 'ICAction': f'DERIVED_CLSRCH_SSR_CLASSNAME_LONG${class_nbr}',
                 'DERIVED_SSTSNAV_SSTS_MAIN_GOTO$7$': '9999',
-                'CLASS_SRCH_WRK2_STRM$273$': strm,
+                TERM_FORM_FIELD: strm,
                 'SSR_CLS_DTL_WRK_CLASS_NBR': class_nbr
             }
             
             response = self.rate_limited_request(
                 session.post,
-                self.base_url,
+                self.class_search_url,
                 data=form_data,
                 timeout=30
             )
@@ -500,13 +423,13 @@ class EnhancedLionPathScraper:
                 'ICSID': self.get_icsid(session),
                 'ICStateNum': '1',
                 'ICAction': f'DERIVED_CLSRCH_SSR_CLASSNAME_LONG${class_nbr}',
-                'CLASS_SRCH_WRK2_STRM$273$': strm,
+                TERM_FORM_FIELD: strm,
                 'SSR_CLS_DTL_WRK_CLASS_NBR': class_nbr
             }
             
             response = self.rate_limited_request(
                 session.post,
-                self.base_url,
+                self.class_search_url,
                 data=form_data,
                 timeout=30
             )
@@ -527,7 +450,7 @@ class EnhancedLionPathScraper:
             text = soup.get_text()
             
             # Parse course code components
-            match = re.match(r'^([A-Z]+-?[A-Z]*)\s+(\d+[A-Z]*)', course_code)
+            match = re.match(r'^([A-Z]+(?:-[A-Z]*)?)\s+(\d+[A-Z]*)', course_code)
             subject = match.group(1) if match else ""
             catalog_number = match.group(2) if match else ""
             
@@ -564,8 +487,8 @@ class EnhancedLionPathScraper:
             
             # Extract course description (long text)
             desc_patterns = [
-                r'Course Description[:\s]*\n([^]+?)(?:\n\n|Enrollment|Class Notes|$)',
-                r'Description[:\s]*\n([^]+?)(?:\n\n|Enrollment|Class Notes|$)',
+                r'Course Description[:\s]*\n([\s\S]+?)(?:\n\n|Enrollment|Class Notes|$)',
+                r'Description[:\s]*\n([\s\S]+?)(?:\n\n|Enrollment|Class Notes|$)',
                 r'(?:Course Description|Description)[:\s]*([^\n]+(?:\n[^\n]+)*?)(?:\n\n|Enrollment|$)'
             ]
             
@@ -622,32 +545,16 @@ class EnhancedLionPathScraper:
         """Build form data for subject request"""
         return {
             'ICAction': 'CLASS_SRCH_WRK2_SSR_PB_CLASS_SRCH',
-            'CLASS_SRCH_WRK2_STRM$273$': '2025',  # Fall 2025
+            TERM_FORM_FIELD: self.term,
             'SSR_CLSRCH_WRK_SUBJECT$0': subject['code'],
             'SSR_CLSRCH_WRK_SSR_OPEN_ONLY$chk': 'N',
             'SSR_CLSRCH_WRK_CAMPUS$0': 'UP',
             subject['checkbox_id']: 'Y'
         }
     
-    def is_university_park_section(self, section: SectionInfo) -> bool:
+    def is_university_park_section(self, section) -> bool:
         """Check if section is at University Park"""
-        campus = section.campus.upper()
-        section_num = section.section.upper()
-        
-        # Non-UP indicators
-        if "WORLD CAMPUS" in campus:
-            return False
-        if any(c in campus for c in ['BERKS', 'ABINGTON', 'ALTOONA', 'HAZLETON']):
-            return False
-        
-        # Section number indicators
-        if section_num.endswith('W'):  # World Campus
-            return False
-        if section_num.endswith('Y'):  # York
-            return False
-        
-        # If campus is explicitly UP or empty (default), it's UP
-        return campus in ['UP', 'UNIVERSITY PARK', '']
+        return is_university_park(section.campus, section.section)
     
     def scrape_all_courses(self, campus_filter: str = "UP", max_subjects: int = None) -> Dict[str, EnhancedCourseData]:
         """Main method to scrape all courses with complete information"""
@@ -719,6 +626,7 @@ class EnhancedLionPathScraper:
                     course_code, sections, session = course_futures[future]
                     try:
                         course_info = future.result()
+                        course_info.semester = term_name(self.term)
                         
                         # Get detailed section information
                         detailed_sections = []
@@ -738,7 +646,7 @@ class EnhancedLionPathScraper:
                         logger.error(f"❌ Failed to get details for {course_code}: {e}")
                         # Still save basic info
                         self.courses_data[course_code] = EnhancedCourseData(
-                            course_info=CourseInfo(course_code=course_code),
+                            course_info=CourseInfo(course_code=course_code, semester=term_name(self.term)),
                             sections=sections
                         )
                     finally:
@@ -776,36 +684,7 @@ class EnhancedLionPathScraper:
 def save_enhanced_results(courses_data: Dict[str, EnhancedCourseData], 
                          output_file: str, format: str = "jsonl"):
     """Save enhanced results to file"""
-    logger.info(f"💾 Saving {len(courses_data)} courses to {output_file}...")
-    
-    if format == "jsonl":
-        with open(output_file, 'w') as f:
-            for course_code, course_data in courses_data.items():
-                json_line = json.dumps(course_data.to_dict(), default=str)
-                f.write(json_line + '\n')
-    
-    elif format == "json":
-        output = {}
-        for course_code, course_data in courses_data.items():
-            output[course_code] = course_data.to_dict()
-        
-        with open(output_file, 'w') as f:
-            json.dump(output, f, indent=2, default=str)
-    
-    elif format == "csv":
-        # Flatten for CSV
-        rows = []
-        for course_code, course_data in courses_data.items():
-            course_dict = asdict(course_data.course_info)
-            for section in course_data.sections:
-                row = {**course_dict, **asdict(section)}
-                rows.append(row)
-        
-        if rows:
-            df = pd.DataFrame(rows)
-            df.to_csv(output_file, index=False)
-    
-    logger.info(f"✅ Saved {len(courses_data)} courses")
+    save_flat_results(courses_data, output_file, format)
 
 def main():
     """Main function"""
@@ -818,6 +697,8 @@ def main():
                        default='jsonl', help='Output format')
     parser.add_argument('--campus', default='UP', 
                        help='Campus filter (UP for University Park, ALL for all campuses)')
+    parser.add_argument('--term', type=parse_term, default=DEFAULT_TERM,
+                       help='Term to scrape, as a STRM (2258) or name ("Fall 2025")')
     parser.add_argument('--max-subjects', type=int, 
                        help='Maximum number of subjects to scrape (for testing)')
     parser.add_argument('--max-workers', type=int, default=10,
@@ -839,7 +720,8 @@ def main():
         max_workers=args.max_workers,
         max_detail_workers=args.max_detail_workers,
         retry_attempts=args.retry_attempts,
-        rate_limit_per_second=args.rate_limit
+        rate_limit_per_second=args.rate_limit,
+        term=args.term
     )
     
     # Scrape courses
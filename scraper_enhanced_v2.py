@@ -5,23 +5,31 @@ Organizes data to minimize redundancy by separating course info from section inf
 """
 
 import requests
-import json
 import re
-import time
-from dataclasses import dataclass, asdict
+from dataclasses import asdict
 from typing import List, Dict, Optional, Set, Any, Tuple
 import logging
 from pathlib import Path
 import argparse
-from urllib.parse import urljoin, urlparse, parse_qs, unquote
 import sys
 from datetime import datetime
 from bs4 import BeautifulSoup
 import concurrent.futures
-from threading import Lock, BoundedSemaphore
-import random
+from threading import Lock
 from collections import defaultdict
-from queue import Queue, Empty
+
+from lionpath.engine import LionPathEngine, TERM_FORM_FIELD
+from lionpath.models import CourseInfo, SectionInfo, OptimizedCourseData
+from lionpath.parsers import (
+    is_university_park,
+    parse_listing_text,
+    find_section_links,
+    extract_form_data,
+    detect_career,
+    normalize_meeting_time,
+)
+from lionpath.terms import DEFAULT_TERM, parse_term, term_name, term_from_url
+from lionpath.writers import save_optimized_results
 
 # Set up logging
 logging.basicConfig(
@@ -34,125 +42,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
-class CourseInfo:
-    """Course-level information that stays constant across sections"""
-    course_code: str = ""
-    course_title: str = ""
-    subject: str = ""
-    catalog_number: str = ""
-    
-    # Academic details
-    units: str = ""
-    career: str = ""
-    grading: str = ""
-    component: str = ""
-    
-    # Course content
-    course_description: str = ""
-    enrollment_requirements: str = ""
-    enforced_concurrent: str = ""
-    class_attributes: List[str] = None
-    academic_organization: str = ""
-    
-    # Course-level requirements and notes
-    course_notes: str = ""
-    textbook_info: str = ""
-    
-    # Metadata
-    semester: str = ""
-    last_updated: str = ""
-    
-    def __post_init__(self):
-        if self.class_attributes is None:
-            self.class_attributes = []
-
-@dataclass
-class SectionInfo:
-    """Section-specific information that varies per section"""
-    section: str = ""
-    class_number: str = ""
-    section_type: str = ""  # Lecture, Lab, Recitation, etc.
-    
-    # Scheduling
-    days: str = ""
-    times: str = ""
-    start_time: str = ""
-    end_time: str = ""
-    start_date: str = ""
-    end_date: str = ""
-    meeting_dates: str = ""
-    
-    # Location
-    campus: str = ""
-    location: str = ""
-    building: str = ""
-    room: str = ""
-    instruction_mode: str = ""
-    
-    # Instructor
-    instructor: str = ""
-    instructor_email: str = ""
-    
-    # Enrollment - General Capacity
-    class_capacity: int = 0
-    enrollment_total: int = 0
-    available_seats: int = 0
-    waitlist_capacity: int = 0
-    waitlist_total: int = 0
-    status: str = ""
-    
-    # Reserve Capacity details
-    reserve_capacity: List[Dict[str, Any]] = None
-    
-    # Section-specific details
-    add_consent: str = ""
-    drop_consent: str = ""
-    class_notes: str = ""
-    
-    # Exam schedule
-    exam_schedule: List[Dict[str, str]] = None
-    
-    # Metadata
-    course_url: str = ""
-    detail_url: str = ""
-    scrape_timestamp: str = ""
-    
-    def __post_init__(self):
-        if not self.scrape_timestamp:
-            self.scrape_timestamp = datetime.now().isoformat()
-        if self.reserve_capacity is None:
-            self.reserve_capacity = []
-        if self.exam_schedule is None:
-            self.exam_schedule = []
-
-@dataclass
-class OptimizedCourseData:
-    """Optimized course data structure separating course from section info"""
-    course_info: CourseInfo
-    sections: List[SectionInfo]
-    
-    def get_total_capacity(self) -> int:
-        """Get total capacity across all sections"""
-        return sum(section.class_capacity for section in self.sections)
-    
-    def get_total_enrollment(self) -> int:
-        """Get total enrollment across all sections"""
-        return sum(section.enrollment_total for section in self.sections)
-    
-    def get_available_seats(self) -> int:
-        """Get total available seats across all sections"""
-        return sum(section.available_seats for section in self.sections)
-    
-    def get_section_count(self) -> int:
-        """Get number of sections"""
-        return len(self.sections)
-    
-    def get_campuses(self) -> Set[str]:
-        """Get unique campuses where course is offered"""
-        return set(section.campus for section in self.sections if section.campus)
-
-class OptimizedLionPathScraper:
+class OptimizedLionPathScraper(LionPathEngine):
     """Optimized scraper with improved data structure"""
     
     def __init__(self, 
@@ -160,31 +50,21 @@ class OptimizedLionPathScraper:
                  max_workers: int = 16, 
                  max_detail_workers: int = 50,
                  retry_attempts: int = 2,
-                 rate_limit_per_second: int = 20):
+                 rate_limit_per_second: int = 20,
+                 term: str = DEFAULT_TERM):
+        super().__init__(rate_limit_per_second=rate_limit_per_second,
+                         pool_size=max_workers + max_detail_workers,
+                         term=term)
         
         self.delay = delay
         self.max_workers = max_workers
         self.max_detail_workers = max_detail_workers
         self.retry_attempts = retry_attempts
-        self.rate_limit_per_second = rate_limit_per_second
-        
-        # Rate limiting
-        self.rate_limiter = BoundedSemaphore(rate_limit_per_second)
-        self.last_request_times = []
-        self.request_lock = Lock()
         
         # Data storage - organized by course code
         self.courses_data = {}  # Dict[str, OptimizedCourseData]
         self.data_lock = Lock()
         
-        # Session pool
-        self.session_pool = Queue()
-        self.init_session_pool(max_workers + max_detail_workers)
-        
-        # URLs
-        self.base_url = "https://public.lionpath.psu.edu"
-        self.search_url = "https://public.lionpath.psu.edu/psc/CSPRD/EMPLOYEE/SA/c/PE_SR175_PUBLIC.PE_SR175_CLS_SRCH.GBL"
-        
         # Statistics
         self.stats = {
             'total_subjects': 0,
@@ -198,55 +78,6 @@ class OptimizedLionPathScraper:
             'end_time': None
         }
     
-    def init_session_pool(self, pool_size: int):
-        """Initialize a pool of session objects for reuse"""
-        for _ in range(pool_size):
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Cache-Control': 'max-age=0',
-            })
-            self.session_pool.put(session)
-    
-    def get_session(self) -> requests.Session:
-        """Get a session from the pool"""
-        try:
-            return self.session_pool.get_nowait()
-        except Empty:
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': f'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Connection': 'keep-alive',
-            })
-            return session
-    
-    def return_session(self, session: requests.Session):
-        """Return a session to the pool"""
-        try:
-            self.session_pool.put_nowait(session)
-        except:
-            pass
-    
-    def rate_limited_request(self, method, *args, **kwargs):
-        """Make a rate-limited request"""
-        with self.request_lock:
-            now = time.time()
-            self.last_request_times = [t for t in self.last_request_times if now - t < 1.0]
-            
-            if len(self.last_request_times) >= self.rate_limit_per_second:
-                sleep_time = 1.0 - (now - self.last_request_times[0])
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-            
-            self.last_request_times.append(now)
-        
-        return method(*args, **kwargs)
-    
     def scrape_all_courses(self, campus_filter: str = "UP", max_subjects: int = None) -> Dict[str, OptimizedCourseData]:
         """Main scraping method with optimized data structure"""
         self.stats['start_time'] = datetime.now()
@@ -353,12 +184,12 @@ class OptimizedLionPathScraper:
             # Create course info from course code
             course_info = CourseInfo(
                 course_code=course_code,
-                semester="Fall 2025",
+                semester=term_name(term_from_url(course_sections_list[0].course_url) or self.term),
                 last_updated=datetime.now().isoformat()
             )
             
             # Extract subject and catalog number from course code
-            course_match = re.match(r'^([A-Z]+-?[A-Z]+)\s+(\d+[A-Z]*)', course_code)
+            course_match = re.match(r'^([A-Z](?:[A-Z]*-)?[A-Z]+)\s+(\d+[A-Z]*)', course_code)
             if course_match:
                 course_info.subject = course_match.group(1)
                 course_info.catalog_number = course_match.group(2)
@@ -423,30 +254,12 @@ class OptimizedLionPathScraper:
         """Get course-level details that are consistent across sections"""
         try:
             # Use the sample section to get course details
-            if "showClassDetails" in sample_section.course_url:
-                match = re.search(r'showClassDetails\((\d+),(\d+)\)', sample_section.course_url)
-                if match:
-                    strm, class_nbr = match.groups()
-                    
-                    detail_url = f"{self.base_url}/psc/CSPRD/EMPLOYEE/SA/c/SA_LEARNER_SERVICES.SSR_SSENRL_DETAIL.GBL"
-                    params = {
-                        'Page': 'SSR_SSENRL_DETAIL',
-                        'Action': 'A',
-                        'STRM': strm,
-                        'CLASS_NBR': class_nbr,
-                        'ACAD_CAREER': 'UGRD',
-                    }
-                    
-                    response = self.rate_limited_request(
-                        session.get,
-                        detail_url,
-                        params=params,
-                        timeout=8
-                    )
-                    
-                    if response.status_code == 200:
-                        enhanced_info = self.parse_course_level_info(response.text, course_info)
-                        return enhanced_info
+            match = re.search(r'showClassDetails\((\d+),(\d+)\)', sample_section.course_url or '')
+            if match:
+                html = self.fetch_class_detail_any_career(session, *match.groups(),
+                                                          detect_career(course_info.catalog_number))
+                if html:
+                    return self.parse_course_level_info(html, course_info)
             
             return course_info
             
@@ -467,7 +280,7 @@ class OptimizedLionPathScraper:
                     form_data = self.extract_form_data_fast(session.cookies.get('PS_TOKEN', ''))
                     form_data.update({
                         'ICAction': f'DERIVED_CLSRCH_SSR_CLASSNAME_LONG${class_nbr}',
-                        'CLASS_SRCH_WRK2_STRM$273$': strm,
+                        TERM_FORM_FIELD: strm,
                         'SSR_CLS_DTL_WRK_CLASS_NBR': class_nbr
                     })
                     
@@ -534,10 +347,12 @@ class OptimizedLionPathScraper:
                     section.times = f"{section.start_time} to {section.end_time}"
                     break
             
+            normalize_meeting_time(section)
+            
             # Extract meeting dates
             dates_patterns = [
                 r'(?:Meeting Dates?|Dates?)[:\s]*(\d{1,2}/\d{1,2}/\d{4})\s*[-to]+\s*(\d{1,2}/\d{1,2}/\d{4})',
-                r'Start Date[:\s]*(\d{1,2}/\d{1,2}/\d{4}).*?End Date[:\s]*(\d{1,2}/\d{1,2}/\d{4})',
+                r'Start Date[:\s]*(\d{1,2}/\d{1,2}/\d{4})(?:(?!Start Date).)*?End Date[:\s]*(\d{1,2}/\d{1,2}/\d{4})',
             ]
             
             for pattern in dates_patterns:
@@ -664,9 +479,9 @@ class OptimizedLionPathScraper:
             
             # Extract course title more comprehensively
             title_patterns = [
-                r'([A-Z]+-?[A-Z]+\s+\d+[A-Z]*)\s+(.+?)(?:\n|Status|Units|$)',
-                r'Course:\s*([A-Z]+-?[A-Z]+\s+\d+[A-Z]*)\s+(.+?)(?:\n|$)',
-                r'([A-Z]+-?[A-Z]+\s+\d+[A-Z]*)\s*-\s*(.+?)(?:\n|$)',
+                r'\b([A-Z](?:[A-Z]*-)?[A-Z]+\s+\d+[A-Z]*)\s+(.+?)(?:\n|Status|Units|$)',
+                r'Course:\s*([A-Z](?:[A-Z]*-)?[A-Z]+\s+\d+[A-Z]*)\s+(.+?)(?:\n|$)',
+                r'\b([A-Z](?:[A-Z]*-)?[A-Z]+\s+\d+[A-Z]*)\s*-\s*(.+?)(?:\n|$)',
             ]
             
             for pattern in title_patterns:
@@ -702,8 +517,8 @@ class OptimizedLionPathScraper:
             
             # Extract course description - improved pattern
             desc_patterns = [
-                r'Course Description[:\s]*\n([^]+?)(?:\n\n|\nEnrollment|\nClass Notes|$)',
-                r'Description[:\s]*\n([^]+?)(?:\n\n|\nEnrollment|\nClass Notes|$)',
+                r'Course Description[:\s]*\n([\s\S]+?)(?:\n\n|\nEnrollment|\nClass Notes|$)',
+                r'Description[:\s]*\n([\s\S]+?)(?:\n\n|\nEnrollment|\nClass Notes|$)',
                 r'(?:Course Description|Description)[:\s]*([^\n]+(?:\n(?![A-Z][a-z]+:)[^\n]+)*?)(?:\n\n|$)',
             ]
             
@@ -805,15 +620,9 @@ class OptimizedLionPathScraper:
         subject_code = subject.get('code', 'unknown')
         
         try:
-            response = self.rate_limited_request(
-                session.get, 
-                self.search_url, 
-                params={'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'},
-                timeout=10
-            )
-            response.raise_for_status()
+            response = self.fetch_search_page(session)
             
-            form_data = self.extract_form_data_fast(response.text)
+            form_data = self.apply_term(self.extract_form_data_fast(response.text))
             
             checkbox_id = subject.get('checkbox_id', '')
             if checkbox_id:
@@ -842,10 +651,7 @@ class OptimizedLionPathScraper:
         sections = []
         
         # Fast regex-based parsing for showClassDetails links
-        pattern = r'javascript:showClassDetails\((\d+),(\d+)\)[^>]*>([^<]+)<'
-        matches = re.findall(pattern, html)
-        
-        for strm, class_nbr, text in matches:
+        for strm, class_nbr, text in find_section_links(html):
             try:
                 section = self.parse_section_text_optimized(text, strm, class_nbr, subject_code)
                 if section:
@@ -858,69 +664,20 @@ class OptimizedLionPathScraper:
     def parse_section_text_optimized(self, text: str, strm: str, class_nbr: str, subject_code: str) -> Optional[SectionInfo]:
         """Parse section information from text"""
         try:
-            text = text.strip()
-            
-            # Parse course code
-            course_patterns = [
-                r'^([A-Z]+-?[A-Z]+)\s+(\d+[A-Z]*)',
-                r'^([A-Z]{2,})\s+(\d+[A-Z]*)',
-            ]
-            
-            subject = ""
-            catalog_number = ""
-            course_code = ""
-            
-            for pattern in course_patterns:
-                match = re.match(pattern, text)
-                if match:
-                    subject = match.group(1)
-                    catalog_number = match.group(2)
-                    course_code = f"{subject} {catalog_number}"
-                    break
-            
-            if not course_code:
+            listing = parse_listing_text(text)
+            if not listing:
                 return None
             
-            # Extract section and campus
-            section = ""
-            campus = ""
-            
-            if ' - ' in text:
-                parts = text.split(' - ')
-                if len(parts) > 1:
-                    section_campus = parts[1]
-                    
-                    # Extract section
-                    section_match = re.search(r'(\d{3}[A-Z]*|[A-Z]\d{2}|\d{2,3})', section_campus)
-                    if section_match:
-                        section = section_match.group(1)
-                    
-                    # Extract campus
-                    campus_names = [
-                        'World Campus', 'Berks', 'Abington', 'Altoona', 'Brandywine',
-                        'Dubois', 'Erie', 'Fayette', 'Greater Allegheny', 'Harrisburg',
-                        'Hazleton', 'Lehigh Valley', 'Mont Alto', 'New Kensington',
-                        'Schuylkill', 'Shenango', 'Wilkes-Barre', 'York', 'UP'
-                    ]
-                    
-                    for campus_name in campus_names:
-                        if campus_name in section_campus:
-                            campus = campus_name
-                            break
-                    
-                    if not campus and not any(c in section_campus.lower() for c in ['world', 'berks', 'y']):
-                        campus = 'UP'
-            
             # Create section info with course code reference
             section_info = SectionInfo(
-                section=section,
+                section=listing['section'],
                 class_number=class_nbr,
-                campus=campus,
+                campus=listing['campus'],
                 course_url=f"showClassDetails({strm},{class_nbr})"
             )
             
             # Store course code for grouping
-            section_info.course_code = course_code  # Add this as a temporary attribute
+            section_info.course_code = listing['course_code']  # Add this as a temporary attribute
             
             return section_info
             
@@ -930,211 +687,11 @@ class OptimizedLionPathScraper:
     
     def is_university_park_section(self, section: SectionInfo) -> bool:
         """Determine if a section is at University Park"""
-        campus = section.campus.upper()
-        section_num = section.section.upper()
-        
-        # Non-UP indicators
-        non_up_indicators = [
-            'WORLD CAMPUS', 'BERKS', 'ABINGTON', 'ALTOONA', 'BRANDYWINE',
-            'DUBOIS', 'ERIE', 'FAYETTE', 'GREATER ALLEGHENY', 'HARRISBURG',
-            'HAZLETON', 'LEHIGH VALLEY', 'MONT ALTO', 'NEW KENSINGTON',
-            'SCHUYLKILL', 'SHENANGO', 'WILKES-BARRE', 'YORK'
-        ]
-        
-        if any(indicator in campus for indicator in non_up_indicators):
-            return False
-        
-        if section_num.endswith('Y') or section_num.endswith('W'):
-            return False
-        
-        return True
+        return is_university_park(section.campus, section.section)
     
-    # Include other helper methods...
     def extract_form_data_fast(self, html: str) -> Dict[str, str]:
         """Fast form data extraction using regex"""
-        form_data = {}
-        hidden_pattern = r'<input[^>]*type=["\']hidden["\'][^>]*name=["\']([^"\']+)["\'][^>]*value=["\']([^"\']*)["\'][^>]*>'
-        matches = re.findall(hidden_pattern, html, re.IGNORECASE)
-        
-        for name, value in matches:
-            form_data[name] = value
-        
-        return form_data
-    
-    def get_all_subjects(self) -> List[Dict]:
-        """Get all subjects quickly"""
-        session = self.get_session()
-        try:
-            response = self.rate_limited_request(
-                session.get,
-                self.search_url,
-                params={'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'},
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            subjects = []
-            
-            # Try multiple patterns to find subject checkboxes
-            patterns = [
-                # Original pattern
-                r'<input[^>]*id="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*id="PTS_SELECT_LBL\$\1"[^>]*>([^<]+)</label>',
-                # Alternative pattern for different HTML structure
-                r'<input[^>]*name="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*for="PTS_SELECT\$\1"[^>]*>([^<]+)</label>',
-                # More flexible pattern
-                r'<input[^>]*id="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*>([^<]*)</label>'
-            ]
-            
-            html_text = response.text
-            logger.debug(f"HTML length: {len(html_text)}")
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, html_text, re.DOTALL | re.IGNORECASE)
-                logger.debug(f"Pattern '{pattern[:50]}...' found {len(matches)} matches")
-                
-                if matches:
-                    for checkbox_num, label_text in matches:
-                        label_text = label_text.strip()
-                        if '/' in label_text and len(label_text) > 5:  # Basic validation
-                            parts = label_text.split('/', 1)
-                            code = parts[0].strip()
-                            name = parts[1].strip() if len(parts) > 1 else code
-                            
-                            # Validate code format (should be letters)
-                            if re.match(r'^[A-Z]+-?[A-Z]*$', code):
-                                subjects.append({
-                                    'code': code,
-                                    'name': name,
-                                    'checkbox_id': f'PTS_SELECT${checkbox_num}',
-                                    'full_text': label_text
-                                })
-                    
-                    if subjects:  # If we found subjects, stop trying other patterns
-                        break
-            
-            # If no subjects found, try a simpler approach
-            if not subjects:
-                logger.debug("No subjects found with regex patterns, trying BeautifulSoup...")
-                soup = BeautifulSoup(html_text, 'html.parser')
-                
-                # Find all checkboxes with PTS_SELECT in ID
-                checkboxes = soup.find_all('input', {'id': re.compile(r'PTS_SELECT\$\d+')})
-                logger.debug(f"Found {len(checkboxes)} checkboxes with BeautifulSoup")
-                
-                for checkbox in checkboxes:
-                    checkbox_id = checkbox.get('id', '')
-                    checkbox_num = checkbox_id.split('$')[-1] if '$' in checkbox_id else ''
-                    
-                    # Find corresponding label
-                    label_id = f'PTS_SELECT_LBL${checkbox_num}'
-                    label = soup.find('label', {'id': label_id})
-                    
-                    if label:
-                        label_text = label.get_text(strip=True)
-                        if '/' in label_text:
-                            parts = label_text.split('/', 1)
-                            code = parts[0].strip()
-                            name = parts[1].strip() if len(parts) > 1 else code
-                            
-                            if re.match(r'^[A-Z]+-?[A-Z]*$', code):
-                                subjects.append({
-                                    'code': code,
-                                    'name': name,
-                                    'checkbox_id': checkbox_id,
-                                    'full_text': label_text
-                                })
-            
-            subjects.sort(key=lambda x: x['code'])
-            logger.debug(f"Final subjects count: {len(subjects)}")
-            if subjects:
-                logger.debug(f"Sample subjects: {[s['code'] for s in subjects[:5]]}")
-            
-            return subjects
-            
-        finally:
-            self.return_session(session)
-    
-    def extract_field_value(self, soup: BeautifulSoup, field_names: List[str]) -> str:
-        """Extract a field value by looking for labels"""
-        for field_name in field_names:
-            label_patterns = [
-                soup.find('span', string=re.compile(field_name, re.IGNORECASE)),
-                soup.find('td', string=re.compile(field_name, re.IGNORECASE)),
-                soup.find('label', string=re.compile(field_name, re.IGNORECASE)),
-            ]
-            
-            for label in label_patterns:
-                if label:
-                    next_elem = label.find_next_sibling()
-                    if next_elem:
-                        value = next_elem.get_text(strip=True)
-                        if value and value != field_name:
-                            return value
-                    
-                    parent = label.parent
-                    if parent:
-                        next_elem = parent.find_next_sibling()
-                        if next_elem:
-                            value = next_elem.get_text(strip=True)
-                            if value and value != field_name:
-                                return value
-        
-        return ""
-    
-    def extract_course_description(self, soup: BeautifulSoup) -> str:
-        """Extract course description"""
-        try:
-            desc_patterns = [
-                ('div', {'class': re.compile('description', re.IGNORECASE)}),
-                ('span', {'class': 'PSLONGEDITBOX'}),
-                ('td', {'class': re.compile('description', re.IGNORECASE)}),
-            ]
-            
-            for tag, attrs in desc_patterns:
-                desc_elem = soup.find(tag, attrs)
-                if desc_elem:
-                    desc_text = desc_elem.get_text(strip=True)
-                    if len(desc_text) > 50:
-                        return desc_text
-            
-            desc_labels = soup.find_all(string=re.compile(r'Description', re.IGNORECASE))
-            for label in desc_labels:
-                if label.parent:
-                    next_elem = label.parent.find_next()
-                    if next_elem:
-                        desc_text = next_elem.get_text(strip=True)
-                        if len(desc_text) > 50:
-                            return desc_text
-            
-            return ""
-            
-        except Exception as e:
-            logger.debug(f"Error extracting course description: {e}")
-            return ""
-    
-    def extract_class_attributes(self, soup: BeautifulSoup) -> List[str]:
-        """Extract class attributes"""
-        try:
-            attributes = []
-            attr_text = soup.get_text()
-            
-            attr_patterns = [
-                r'General Education[:\s]*([^\n]+)',
-                r'Attributes[:\s]*([^\n]+)',
-                r'GenEd[:\s]*([^\n]+)',
-            ]
-            
-            for pattern in attr_patterns:
-                matches = re.findall(pattern, attr_text, re.IGNORECASE)
-                for match in matches:
-                    if match.strip():
-                        attributes.append(match.strip())
-            
-            return list(set(attributes))
-            
-        except Exception as e:
-            logger.debug(f"Error extracting class attributes: {e}")
-            return []
+        return extract_form_data(html)
     
     def log_final_stats(self):
         """Log comprehensive final statistics"""
@@ -1165,74 +722,14 @@ class OptimizedLionPathScraper:
             savings_pct = ((traditional_size - optimized_size) / traditional_size) * 100 if traditional_size > 0 else 0
             logger.info(f"💾 Estimated data savings: {savings_pct:.1f}%")
 
-def save_optimized_results(courses_data: Dict[str, OptimizedCourseData], output_file: str, format_type: str = 'jsonl'):
-    """Save optimized results in various formats"""
-    logger.info(f"💾 Saving {len(courses_data)} courses to {output_file}...")
-    
-    if format_type.lower() == 'jsonl':
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for course_code, course_data in courses_data.items():
-                # Create optimized record
-                record = {
-                    'course': asdict(course_data.course_info),
-                    'sections': [asdict(section) for section in course_data.sections],
-                    'stats': {
-                        'total_capacity': course_data.get_total_capacity(),
-                        'total_enrollment': course_data.get_total_enrollment(),
-                        'available_seats': course_data.get_available_seats(),
-                        'section_count': course_data.get_section_count(),
-                        'campuses': list(course_data.get_campuses())
-                    }
-                }
-                json.dump(record, f, ensure_ascii=False, separators=(',', ':'))
-                f.write('\n')
-    
-    elif format_type.lower() == 'json':
-        data = {}
-        for course_code, course_data in courses_data.items():
-            data[course_code] = {
-                'course': asdict(course_data.course_info),
-                'sections': [asdict(section) for section in course_data.sections],
-                'stats': {
-                    'total_capacity': course_data.get_total_capacity(),
-                    'total_enrollment': course_data.get_total_enrollment(),
-                    'available_seats': course_data.get_available_seats(),
-                    'section_count': course_data.get_section_count(),
-                    'campuses': list(course_data.get_campuses())
-                }
-            }
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    elif format_type.lower() == 'csv':
-        # Flatten to CSV format (one row per section, with course info repeated)
-        import csv
-        flattened_data = []
-        
-        for course_code, course_data in courses_data.items():
-            course_dict = asdict(course_data.course_info)
-            
-            for section in course_data.sections:
-                section_dict = asdict(section)
-                # Combine course and section data
-                combined = {**course_dict, **section_dict}
-                # Clean up class_attributes for CSV
-                combined['class_attributes'] = '; '.join(combined.get('class_attributes', []))
-                flattened_data.append(combined)
-        
-        if flattened_data:
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=flattened_data[0].keys())
-                writer.writeheader()
-                writer.writerows(flattened_data)
-
 def main():
     """Main execution function"""
     parser = argparse.ArgumentParser(description='Penn State LionPath Course Scraper - Optimized Data Structure')
     parser.add_argument('--output', '-o', default='psu_courses_optimized.jsonl', help='Output file')
     parser.add_argument('--format', choices=['jsonl', 'json', 'csv'], default='jsonl', help='Output format')
     parser.add_argument('--campus', '-c', default='UP', help='Campus filter (UP for University Park, ALL for all)')
+    parser.add_argument('--term', type=parse_term, default=DEFAULT_TERM,
+                        help='Term to scrape, as a STRM (2258) or name ("Fall 2025")')
     parser.add_argument('--delay', type=float, default=0.2, help='Delay between requests')
     parser.add_argument('--max-workers', type=int, default=16, help='Max concurrent workers for subjects')
     parser.add_argument('--max-detail-workers', type=int, default=50, help='Max concurrent workers for course details')
@@ -1250,13 +747,15 @@ def main():
     logger.info(f"📁 Output file: {args.output}")
     logger.info(f"📊 Output format: {args.format}")
     logger.info(f"🏫 Campus filter: {args.campus}")
+    logger.info(f"📅 Term: {args.term} ({term_name(args.term)})")
     
     scraper = OptimizedLionPathScraper(
         delay=args.delay,
         max_workers=args.max_workers,
         max_detail_workers=args.max_detail_workers,
         retry_attempts=args.retry_attempts,
-        rate_limit_per_second=args.rate_limit
+        rate_limit_per_second=args.rate_limit,
+        term=args.term
     )
     
     try:
@@ -5,23 +5,71 @@ Organizes data to minimize redundancy by separating course info from section inf
 """
 
 import requests
-import json
 import re
-import time
-from dataclasses import dataclass, asdict
+from dataclasses import asdict
 from typing import List, Dict, Optional, Set, Any, Tuple
 import logging
 from pathlib import Path
 import argparse
-from urllib.parse import urljoin, urlparse, parse_qs, unquote
 import sys
 from datetime import datetime
 from bs4 import BeautifulSoup
 import concurrent.futures
-from threading import Lock, BoundedSemaphore
-import random
+from threading import Lock
 from collections import defaultdict
-from queue import Queue, Empty
+
+from lionpath.archive import ResponseArchive
+from lionpath.engine import LionPathEngine, UNIVERSITY_PARK_CAMPUS
+from lionpath.models import CourseInfo, SectionInfo, OptimizedCourseData
+from lionpath.planner import (
+    OVERSIZED_SUBJECT_SECTIONS,
+    is_oversized_page,
+    merge_sections,
+    plan_subject_batches,
+    save_subject_counts,
+    split_criteria,
+    split_sections_by_subject,
+    subject_section_counts,
+    subjects_path,
+)
+from lionpath.regex_guard import regex_incidents
+from lionpath.reparse import merge_course_info
+from lionpath.singleflight import SingleFlight
+from lionpath.terms import DEFAULT_TERM, parse_term, parse_terms, term_name, term_from_url, term_output_path
+# Shared core; names below are re-exported for existing imports of this module
+from lionpath.parsers import (
+    is_university_park,
+    parse_listing_text,
+    find_section_links,
+    extract_form_data,
+    parse_enrollment_fields,
+    enrollment_fields,
+    apply_enrollment_fields,
+    CAREERS,
+    career_code,
+    detect_career,
+    detail_page_is_empty,
+    split_meeting_days,
+    parse_clock_minutes,
+    section_time_range,
+    listing_section,
+    listing_missing_fields,
+    parse_listing_sections,
+    parse_course_level_info,
+    LISTING_FIELD_GROUPS,
+    REFRESH_SECTION_FIELDS,
+)
+from lionpath.writers import (
+    COURSE_FIELDS,
+    SECTION_FIELDS,
+    course_info_to_dict,
+    section_info_to_dict,
+    course_data_to_record,
+    dumps_record,
+    save_optimized_results,
+    load_optimized_results,
+    save_sqlite_results,
+)
 
 # Set up logging
 logging.basicConfig(
@@ -34,125 +82,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
-class CourseInfo:
-    """Course-level information that stays constant across sections"""
-    course_code: str = ""
-    course_title: str = ""
-    subject: str = ""
-    catalog_number: str = ""
-    
-    # Academic details
-    units: str = ""
-    career: str = ""
-    grading: str = ""
-    component: str = ""
-    
-    # Course content
-    course_description: str = ""
-    enrollment_requirements: str = ""
-    enforced_concurrent: str = ""
-    class_attributes: List[str] = None
-    academic_organization: str = ""
-    
-    # Course-level requirements and notes
-    course_notes: str = ""
-    textbook_info: str = ""
-    
-    # Metadata
-    semester: str = ""
-    last_updated: str = ""
-    
-    def __post_init__(self):
-        if self.class_attributes is None:
-            self.class_attributes = []
-
-@dataclass
-class SectionInfo:
-    """Section-specific information that varies per section"""
-    section: str = ""
-    class_number: str = ""
-    section_type: str = ""  # Lecture, Lab, Recitation, etc.
-    
-    # Scheduling
-    days: str = ""
-    times: str = ""
-    start_time: str = ""
-    end_time: str = ""
-    start_date: str = ""
-    end_date: str = ""
-    meeting_dates: str = ""
-    
-    # Location
-    campus: str = ""
-    location: str = ""
-    building: str = ""
-    room: str = ""
-    instruction_mode: str = ""
-    
-    # Instructor
-    instructor: str = ""
-    instructor_email: str = ""
-    
-    # Enrollment - General Capacity
-    class_capacity: int = 0
-    enrollment_total: int = 0
-    available_seats: int = 0
-    waitlist_capacity: int = 0
-    waitlist_total: int = 0
-    status: str = ""
-    
-    # Reserve Capacity details
-    reserve_capacity: List[Dict[str, Any]] = None
-    
-    # Section-specific details
-    add_consent: str = ""
-    drop_consent: str = ""
-    class_notes: str = ""
-    
-    # Exam schedule
-    exam_schedule: List[Dict[str, str]] = None
-    
-    # Metadata
-    course_url: str = ""
-    detail_url: str = ""
-    scrape_timestamp: str = ""
-    
-    def __post_init__(self):
-        if not self.scrape_timestamp:
-            self.scrape_timestamp = datetime.now().isoformat()
-        if self.reserve_capacity is None:
-            self.reserve_capacity = []
-        if self.exam_schedule is None:
-            self.exam_schedule = []
-
-@dataclass
-class OptimizedCourseData:
-    """Optimized course data structure separating course from section info"""
-    course_info: CourseInfo
-    sections: List[SectionInfo]
-    
-    def get_total_capacity(self) -> int:
-        """Get total capacity across all sections"""
-        return sum(section.class_capacity for section in self.sections)
-    
-    def get_total_enrollment(self) -> int:
-        """Get total enrollment across all sections"""
-        return sum(section.enrollment_total for section in self.sections)
-    
-    def get_available_seats(self) -> int:
-        """Get total available seats across all sections"""
-        return sum(section.available_seats for section in self.sections)
-    
-    def get_section_count(self) -> int:
-        """Get number of sections"""
-        return len(self.sections)
-    
-    def get_campuses(self) -> Set[str]:
-        """Get unique campuses where course is offered"""
-        return set(section.campus for section in self.sections if section.campus)
-
-class OptimizedLionPathScraper:
+class OptimizedLionPathScraper(LionPathEngine):
     """Optimized scraper with improved data structure"""
     
     def __init__(self, 
@@ -160,30 +90,30 @@ class OptimizedLionPathScraper:
                  max_workers: int = 16, 
                  max_detail_workers: int = 50,
                  retry_attempts: int = 2,
-                 rate_limit_per_second: int = 20):
+                 rate_limit_per_second: int = 20,
+                 term: str = DEFAULT_TERM):
+        super().__init__(rate_limit_per_second=rate_limit_per_second,
+                         pool_size=max_workers + max_detail_workers,
+                         term=term)
         
         self.delay = delay
         self.max_workers = max_workers
         self.max_detail_workers = max_detail_workers
         self.retry_attempts = retry_attempts
-        self.rate_limit_per_second = rate_limit_per_second
         
-        # Rate limiting
-        self.rate_limiter = BoundedSemaphore(rate_limit_per_second)
-        self.last_request_times = []
-        self.request_lock = Lock()
+        # Sections each subject listed last run; when set, small subjects share search posts
+        self.subject_history = {}
+        # Sections each subject listed this run (after the campus filter), written out as the next run's history
+        self.subject_counts = {}
         
         # Data storage - organized by course code
         self.courses_data = {}  # Dict[str, OptimizedCourseData]
         self.data_lock = Lock()
         
-        # Session pool
-        self.session_pool = Queue()
-        self.init_session_pool(max_workers + max_detail_workers)
-        
-        # URLs
-        self.base_url = "https://public.lionpath.psu.edu"
-        self.search_url = "https://public.lionpath.psu.edu/psc/CSPRD/EMPLOYEE/SA/c/PE_SR175_PUBLIC.PE_SR175_CLS_SRCH.GBL"
+        # Detail pages fetched and parsed once per run, shared by every course and section that lists them:
+        # enrollment by (STRM, CLASS_NBR), course-level details by course identity (see course_key)
+        self.section_flights = SingleFlight()
+        self.course_flights = SingleFlight()
         
         # Statistics
         self.stats = {
@@ -194,97 +124,29 @@ class OptimizedLionPathScraper:
             'detailed_sections': 0,
             'failed_subjects': [],
             'failed_details': 0,
+            'off_campus_sections': 0,
+            'subject_searches': 0,
+            'split_subjects': 0,
+            'sub_queries': 0,
+            'listing_complete_sections': 0,
+            'section_detail_requests': 0,
             'start_time': None,
             'end_time': None
         }
     
-    def init_session_pool(self, pool_size: int):
-        """Initialize a pool of session objects for reuse"""
-        for _ in range(pool_size):
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Cache-Control': 'max-age=0',
-            })
-            self.session_pool.put(session)
-    
-    def get_session(self) -> requests.Session:
-        """Get a session from the pool"""
-        try:
-            return self.session_pool.get_nowait()
-        except Empty:
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': f'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Connection': 'keep-alive',
-            })
-            return session
-    
-    def return_session(self, session: requests.Session):
-        """Return a session to the pool"""
-        try:
-            self.session_pool.put_nowait(session)
-        except:
-            pass
-    
-    def rate_limited_request(self, method, *args, **kwargs):
-        """Make a rate-limited request"""
-        with self.request_lock:
-            now = time.time()
-            self.last_request_times = [t for t in self.last_request_times if now - t < 1.0]
-            
-            if len(self.last_request_times) >= self.rate_limit_per_second:
-                sleep_time = 1.0 - (now - self.last_request_times[0])
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-            
-            self.last_request_times.append(now)
-        
-        return method(*args, **kwargs)
-    
     def scrape_all_courses(self, campus_filter: str = "UP", max_subjects: int = None) -> Dict[str, OptimizedCourseData]:
         """Main scraping method with optimized data structure"""
         self.stats['start_time'] = datetime.now()
         logger.info("🚀 Starting Optimized LionPath scraping...")
         
         try:
-            # Get all subjects
-            logger.info("📚 Getting all subject codes...")
-            subjects = self.get_all_subjects()
-            self.stats['total_subjects'] = len(subjects)
-            logger.info(f"Found {len(subjects)} subjects")
-            
-            if max_subjects:
-                subjects = subjects[:max_subjects]
-                logger.info(f"Limited to first {max_subjects} subjects for testing")
-            
-            # Scrape subjects in parallel
-            logger.info("🏃‍♂️ Starting parallel subject scraping...")
-            raw_sections = self.scrape_subjects_parallel(subjects, campus_filter)
-            
-            # Organize data by course
-            logger.info("📊 Organizing sections by course...")
-            self.organize_sections_by_course(raw_sections)
+            self.discover_sections(campus_filter, max_subjects)
             
             # Extract detailed information for each unique course
             logger.info(f"🔍 Extracting course details for {len(self.courses_data)} unique courses...")
             self.extract_course_details_parallel()
             
-            # Update statistics
-            self.stats['unique_courses'] = len(self.courses_data)
-            self.stats['total_sections'] = sum(len(course_data.sections) for course_data in self.courses_data.values())
-            self.stats['detailed_sections'] = sum(
-                len([s for s in course_data.sections if s.class_capacity > 0])
-                for course_data in self.courses_data.values()
-            )
-            self.stats['end_time'] = datetime.now()
-            
-            self.log_final_stats()
+            self.finalize_stats()
             return self.courses_data
             
         except Exception as e:
@@ -293,36 +155,144 @@ class OptimizedLionPathScraper:
             logger.debug(traceback.format_exc())
             return {}
     
+    def refresh_enrollment(self, previous_courses: Dict[str, OptimizedCourseData], campus_filter: str = "UP",
+                           max_subjects: int = None) -> Dict[str, OptimizedCourseData]:
+        """Enrollment-only scrape: reuse course-level info from a previous run and refresh volatile section fields"""
+        self.stats['start_time'] = datetime.now()
+        logger.info("🚀 Starting enrollment-only LionPath refresh...")
+        
+        try:
+            self.discover_sections(campus_filter, max_subjects)
+            
+            # Reuse course info and stable section fields; only courses new since the last run get full details
+            new_courses = {}
+            listed_complete = set()
+            for course_code, course_data in self.courses_data.items():
+                previous = previous_courses.get(course_code)
+                if previous is None:
+                    new_courses[course_code] = course_data
+                    continue
+                
+                previous_sections = {s.class_number: s for s in previous.sections}
+                course_data.course_info = previous.course_info
+                listed_complete.update(s.class_number for s in course_data.sections
+                                       if not listing_missing_fields(s, REFRESH_SECTION_FIELDS))
+                
+                # A career confirmed by the previous run's detail fetch beats the listing heuristic
+                previous_career = career_code(previous.course_info.career)
+                if previous_career:
+                    for section in course_data.sections:
+                        self.class_careers[(self.term, section.class_number)] = previous_career
+                course_data.sections = [
+                    merge_section_refresh(previous_sections.get(s.class_number), s)
+                    for s in course_data.sections
+                ]
+            
+            self.stats['reused_courses'] = len(self.courses_data) - len(new_courses)
+            logger.info(f"♻️ Reusing course info for {self.stats['reused_courses']} courses, "
+                        f"{len(new_courses)} new courses need full details")
+            
+            # New courses get full details below, which read only what each section's listing lacked;
+            # reused sections whose results row showed status, seats and waitlists need no detail request at all
+            sections = [
+                s for course_code, course_data in self.courses_data.items() if course_code not in new_courses
+                for s in course_data.sections if s.class_number not in listed_complete
+            ]
+            self.stats['listing_complete_sections'] += len(listed_complete)
+            logger.info(f"🔄 Refreshing enrollment for {len(sections)} sections...")
+            self.refresh_sections_parallel(sections)
+            
+            if new_courses:
+                self.extract_course_details_parallel(new_courses)
+            
+            self.finalize_stats()
+            return self.courses_data
+            
+        except Exception as e:
+            logger.error(f"💥 Enrollment refresh failed: {e}")
+            import traceback
+            logger.debug(traceback.format_exc())
+            return {}
+    
+    def discover_sections(self, campus_filter: str, max_subjects: int = None):
+        """Run the subject phase and group the listed sections by course"""
+        # Get all subjects
+        logger.info("📚 Getting all subject codes...")
+        subjects = self.get_all_subjects()
+        self.stats['total_subjects'] = len(subjects)
+        logger.info(f"Found {len(subjects)} subjects")
+        
+        if max_subjects:
+            subjects = subjects[:max_subjects]
+            logger.info(f"Limited to first {max_subjects} subjects for testing")
+        
+        # Ask LionPath for University Park sections only; the client-side filter stays as a safety net
+        self.campus = UNIVERSITY_PARK_CAMPUS if campus_filter.upper() == "UP" else ''
+        
+        # Scrape subjects in parallel
+        logger.info("🏃‍♂️ Starting parallel subject scraping...")
+        raw_sections = self.scrape_subjects_parallel(subjects, campus_filter)
+        
+        # Organize data by course
+        logger.info("📊 Organizing sections by course...")
+        self.organize_sections_by_course(raw_sections)
+    
+    def finalize_stats(self):
+        """Update final statistics and log them"""
+        self.stats['unique_courses'] = len(self.courses_data)
+        self.stats['total_sections'] = sum(len(course_data.sections) for course_data in self.courses_data.values())
+        self.stats['detailed_sections'] = sum(
+            len([s for s in course_data.sections if s.class_capacity > 0])
+            for course_data in self.courses_data.values()
+        )
+        self.stats['end_time'] = datetime.now()
+        
+        self.log_final_stats()
+    
     def scrape_subjects_parallel(self, subjects: List[Dict], campus_filter: str) -> List[SectionInfo]:
         """Scrape all subjects in parallel, returning raw section data"""
         all_sections = []
+        self.subject_counts = {}
+        
+        batches = plan_subject_batches(subjects, self.subject_history)
+        if len(batches) < len(subjects):
+            logger.info(f"📦 Searching {len(subjects)} subjects in {len(batches)} requests")
         
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_subject = {
-                executor.submit(self.scrape_subject_optimized, subject): subject 
-                for subject in subjects
+            future_to_batch = {
+                executor.submit(self.scrape_subject_batch, batch): batch
+                for batch in batches
             }
             
-            for future in concurrent.futures.as_completed(future_to_subject):
-                subject = future_to_subject[future]
+            for future in concurrent.futures.as_completed(future_to_batch):
+                batch = future_to_batch[future]
+                with self.data_lock:
+                    self.stats['subject_searches'] += 1
                 try:
-                    sections = future.result()
+                    sections_by_subject = future.result()
+                except Exception as e:
+                    for subject in batch:
+                        self.stats['failed_subjects'].append(subject.get('code', 'unknown'))
+                    logger.error(f"❌ {', '.join(s.get('code', 'unknown') for s in batch)} failed: {e}")
+                    continue
+                
+                for subject in batch:
+                    sections = sections_by_subject.get(subject.get('code', 'unknown'), [])
+                    kept = sections
                     if sections:
                         # Filter for campus if requested
                         if campus_filter.upper() == "UP":
-                            up_sections = [s for s in sections if self.is_university_park_section(s)]
-                            if up_sections:
-                                all_sections.extend(up_sections)
-                                logger.info(f"✅ {subject.get('code', 'unknown')}: {len(up_sections)} UP sections")
+                            kept = [s for s in sections if self.is_university_park_section(s)]
+                            self.stats['off_campus_sections'] += len(sections) - len(kept)
+                            if kept:
+                                all_sections.extend(kept)
+                                logger.info(f"✅ {subject.get('code', 'unknown')}: {len(kept)} UP sections")
                         else:
                             all_sections.extend(sections)
                             logger.info(f"✅ {subject.get('code', 'unknown')}: {len(sections)} sections")
                     
+                    self.subject_counts[subject.get('code', 'unknown')] = len(kept)
                     self.stats['processed_subjects'] += 1
-                    
-                except Exception as e:
-                    self.stats['failed_subjects'].append(subject.get('code', 'unknown'))
-                    logger.error(f"❌ {subject.get('code', 'unknown')} failed: {e}")
         
         logger.info(f"📊 Subject scraping complete: {len(all_sections)} total sections found")
         return all_sections
@@ -343,6 +313,12 @@ class OptimizedLionPathScraper:
             if hasattr(section, 'course_code'):
                 delattr(section, 'course_code')
             
+            # Remember the listed career so the detail fetch asks for it directly
+            career = getattr(section, 'career', None)
+            if career:
+                self.class_careers[(self.term, section.class_number)] = career
+                delattr(section, 'career')
+            
             course_sections[course_code].append(section)
         
         # Create optimized course data structures
@@ -353,16 +329,21 @@ class OptimizedLionPathScraper:
             # Create course info from course code
             course_info = CourseInfo(
                 course_code=course_code,
-                semester="Fall 2025",
+                semester=term_name(term_from_url(course_sections_list[0].course_url) or self.term),
                 last_updated=datetime.now().isoformat()
             )
             
             # Extract subject and catalog number from course code
-            course_match = re.match(r'^([A-Z]+-?[A-Z]+)\s+(\d+[A-Z]*)', course_code)
+            course_match = re.match(r'^([A-Z](?:[A-Z]*-)?[A-Z]+)\s+(\d+[A-Z]*)', course_code)
             if course_match:
                 course_info.subject = course_match.group(1)
                 course_info.catalog_number = course_match.group(2)
             
+            # Sections without a listed career fall back to the catalog number rule
+            for section in course_sections_list:
+                self.class_careers.setdefault((self.term, section.class_number), detect_career(course_info.catalog_number))
+            course_info.career = CAREERS[self.class_careers[(self.term, course_sections_list[0].class_number)]]
+            
             # Create optimized course data
             self.courses_data[course_code] = OptimizedCourseData(
                 course_info=course_info,
@@ -371,13 +352,16 @@ class OptimizedLionPathScraper:
         
         logger.info(f"📊 Organized {len(sections)} sections into {len(self.courses_data)} unique courses")
     
-    def extract_course_details_parallel(self):
-        """Extract detailed course information for each unique course"""
+    def extract_course_details_parallel(self, courses: Dict[str, OptimizedCourseData] = None):
+        """Extract detailed course information for each unique course (or only the given courses)"""
+        if courses is None:
+            courses = self.courses_data
+        
         # We'll enhance this to get course-level details and section-level details separately
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_detail_workers) as executor:
             future_to_course = {
                 executor.submit(self.enhance_course_data, course_code, course_data): course_code
-                for course_code, course_data in self.courses_data.items()
+                for course_code, course_data in courses.items()
             }
             
             completed = 0
@@ -390,22 +374,24 @@ class OptimizedLionPathScraper:
                     
                     completed += 1
                     if completed % 50 == 0:
-                        logger.info(f"🔍 Course enhancement progress: {completed}/{len(self.courses_data)}")
+                        logger.info(f"🔍 Course enhancement progress: {completed}/{len(courses)}")
                         
                 except Exception as e:
                     self.stats['failed_details'] += 1
                     logger.debug(f"Failed to enhance {course_code}: {e}")
         
-        logger.info(f"✅ Course enhancement complete: {len(self.courses_data)} courses processed")
+        logger.info(f"✅ Course enhancement complete: {len(courses)} courses processed")
     
     def enhance_course_data(self, course_code: str, course_data: OptimizedCourseData) -> OptimizedCourseData:
         """Enhance course data with detailed information"""
         session = self.get_session()
         try:
             # Get detailed course information (course-level details)
-            enhanced_course_info = self.get_course_level_details(session, course_data.course_info, course_data.sections[0])
+            sample_section = self.course_sample(course_data.sections)
+            enhanced_course_info = self.get_course_level_details(session, course_data.course_info, sample_section,
+                                                                 self.course_key(course_data, sample_section))
             
-            # Get enhanced section details
+            # Sections only need what their listing lacked; the sample's page is already shared
             enhanced_sections = []
             for section in course_data.sections:
                 enhanced_section = self.get_section_details(session, section)
@@ -419,34 +405,86 @@ class OptimizedLionPathScraper:
         finally:
             self.return_session(session)
     
-    def get_course_level_details(self, session: requests.Session, course_info: CourseInfo, sample_section: SectionInfo) -> CourseInfo:
-        """Get course-level details that are consistent across sections"""
+    def detail_key(self, section: SectionInfo) -> Optional[Tuple[str, str]]:
+        """(STRM, CLASS_NBR) of a section's class detail page, None without a detail link"""
+        match = re.search(r'showClassDetails\((\d+),(\d+)\)', section.course_url or '')
+        return match.groups() if match else None
+    
+    def fetch_class_detail(self, session: requests.Session, section: SectionInfo) -> Optional[str]:
+        """Fetch the class detail page for a section, returning its HTML (None if unavailable)"""
+        key = self.detail_key(section)
+        if not key:
+            return None
+        
+        strm, class_nbr = key
+        return self.fetch_class_detail_any_career(session, strm, class_nbr)
+    
+    def course_sample(self, sections: List[SectionInfo]) -> SectionInfo:
+        """The section whose detail page a course's details are read from: the lowest class number, so copies
+        of a course listing the same classes settle on the same page"""
+        keyed = [(key, section) for key, section in ((self.detail_key(s), s) for s in sections) if key]
+        if not keyed:
+            return sections[0]
+        return min(keyed, key=lambda item: int(item[0][1]))[1]
+    
+    def course_key(self, course_data: OptimizedCourseData, sample_section: SectionInfo) -> Optional[Tuple]:
+        """Key a course's details are fetched once under
+        
+        Cross-listed copies of a course meet together under their own class numbers, so when every section's
+        row gives its meeting, the course is identified by its term, catalog number and those meetings;
+        otherwise by the (STRM, CLASS_NBR) of its sample section
+        """
+        key = self.detail_key(sample_section)
+        meetings = frozenset((s.section, s.days, s.start_time, s.end_time, s.room, s.instructor)
+                             for s in course_data.sections)
+        if key and all(days and start and (room or instructor) for _, days, start, _, room, instructor in meetings):
+            return ('course', key[0], course_data.course_info.catalog_number, meetings)
+        return key
+    
+    def load_course_detail(self, session: requests.Session, sample_section: SectionInfo) -> Optional[Dict[str, Any]]:
+        """Fetch and parse the page a course's details come from; its enrollment is shared with the section"""
+        html = self.fetch_class_detail(session, sample_section)
+        if detail_page_is_empty(html):
+            return None
+        
+        detail = {
+            'key': self.detail_key(sample_section),
+            'enrollment': enrollment_fields(html),
+            'course_info': self.parse_course_level_info(html, CourseInfo()),
+        }
+        self.section_flights.seed(self.detail_key(sample_section), detail['enrollment'])
+        return detail
+    
+    def load_section_detail(self, session: requests.Session, section: SectionInfo) -> Optional[Dict[str, Any]]:
+        """Fetch and parse a section's detail page for its enrollment fields (None if the page is empty)"""
+        with self.data_lock:
+            self.stats['section_detail_requests'] += 1
+        html = self.fetch_class_detail(session, section)
+        if detail_page_is_empty(html):
+            return None
+        return enrollment_fields(html)
+    
+    def section_detail(self, session: requests.Session, section: SectionInfo) -> Optional[Dict[str, Any]]:
+        """A section's detail page enrollment fields, fetched at most once per run for its (STRM, CLASS_NBR)"""
+        key = self.detail_key(section)
+        if not key:
+            return None
+        return self.section_flights.do(key, self.load_section_detail, session, section)
+    
+    def get_course_level_details(self, session: requests.Session, course_info: CourseInfo, sample_section: SectionInfo,
+                                 key: Optional[Tuple] = None) -> CourseInfo:
+        """Get course-level details that are consistent across sections, fetched once per key (see course_key)"""
         try:
-            # Use the sample section to get course details
-            if "showClassDetails" in sample_section.course_url:
-                match = re.search(r'showClassDetails\((\d+),(\d+)\)', sample_section.course_url)
-                if match:
-                    strm, class_nbr = match.groups()
-                    
-                    detail_url = f"{self.base_url}/psc/CSPRD/EMPLOYEE/SA/c/SA_LEARNER_SERVICES.SSR_SSENRL_DETAIL.GBL"
-                    params = {
-                        'Page': 'SSR_SSENRL_DETAIL',
-                        'Action': 'A',
-                        'STRM': strm,
-                        'CLASS_NBR': class_nbr,
-                        'ACAD_CAREER': 'UGRD',
-                    }
-                    
-                    response = self.rate_limited_request(
-                        session.get,
-                        detail_url,
-                        params=params,
-                        timeout=8
-                    )
-                    
-                    if response.status_code == 200:
-                        enhanced_info = self.parse_course_level_info(response.text, course_info)
-                        return enhanced_info
+            # Use the sample section to get course details; its enrollment comes from the same page
+            key = key or self.detail_key(sample_section)
+            detail = self.course_flights.do(key, self.load_course_detail, session, sample_section) if key else None
+            if detail is not None:
+                # A cross-listed copy shares the page but not the class, so only that class takes its enrollment
+                if detail['key'] == self.detail_key(sample_section):
+                    apply_enrollment_fields(sample_section, detail['enrollment'])
+                enhanced_info = merge_course_info(course_info, detail['course_info'])
+                enhanced_info.career = CAREERS.get(self.class_careers.get((self.term, sample_section.class_number)), enhanced_info.career)
+                return enhanced_info
             
             return course_info
             
@@ -454,91 +492,83 @@ class OptimizedLionPathScraper:
             logger.debug(f"Failed to get course-level details: {e}")
             return course_info
     
+    def refresh_sections_parallel(self, sections: List[SectionInfo]):
+        """Refresh the volatile enrollment fields of many sections in parallel"""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_detail_workers) as executor:
+            future_to_section = {
+                executor.submit(self.refresh_section_enrollment, section): section
+                for section in sections
+            }
+            
+            completed = 0
+            for future in concurrent.futures.as_completed(future_to_section):
+                section = future_to_section[future]
+                try:
+                    future.result()
+                    completed += 1
+                    if completed % 200 == 0:
+                        logger.info(f"🔄 Enrollment refresh progress: {completed}/{len(sections)}")
+                except Exception as e:
+                    self.stats['failed_details'] += 1
+                    logger.debug(f"Failed to refresh {section.class_number}: {e}")
+        
+        logger.info(f"✅ Enrollment refresh complete: {len(sections)} sections processed")
+    
+    def refresh_section_enrollment(self, section: SectionInfo) -> SectionInfo:
+        """Re-fetch a section's detail page and update only its volatile enrollment fields"""
+        session = self.get_session()
+        try:
+            detail = self.section_detail(session, section)
+            if detail is not None:
+                apply_enrollment_fields(section, detail)
+            return section
+        finally:
+            self.return_session(session)
+    
     def get_section_details(self, session: requests.Session, section: SectionInfo) -> SectionInfo:
-        """Get section-specific details"""
-        # For now, return the section as-is
-        # In the future, this could make additional requests for section-specific info
+        """Fill section fields its results row lacked from the detail page; rows showing them all cost no request"""
+        missing = listing_missing_fields(section)
+        if not missing:
+            with self.data_lock:
+                self.stats['listing_complete_sections'] += 1
+            return section
+        
+        detail = self.section_detail(session, section)
+        if detail is not None:
+            apply_enrollment_fields(section, detail)
+        else:
+            logger.debug(f"No detail page for {section.class_number} (listing lacked {', '.join(missing)})")
         return section
     
     def parse_course_level_info(self, html: str, base_course_info: CourseInfo) -> CourseInfo:
         """Parse comprehensive course-level information from detailed page"""
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            text = soup.get_text()
-            
-            # Create enhanced course info
-            enhanced_info = CourseInfo(**asdict(base_course_info))
-            
-            # Extract course title - look for patterns like "CMPSC 131 PROG & COMP I"
-            title_patterns = [
-                r'([A-Z]+-?[A-Z]+\s+\d+[A-Z]*)\s+(.+?)(?:\n|Status|$)',
-                r'Course:\s*([A-Z]+-?[A-Z]+\s+\d+[A-Z]*)\s+(.+?)(?:\n|$)',
-            ]
-            
-            for pattern in title_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    enhanced_info.course_code = match.group(1).strip()
-                    enhanced_info.course_title = match.group(2).strip()
-                    break
-            
-            # Extract units (3.00)
-            units_match = re.search(r'Units[:\s]*(\d+\.?\d*)', text, re.IGNORECASE)
-            if units_match:
-                enhanced_info.units = units_match.group(1)
-            
-            # Extract grading
-            grading_match = re.search(r'Grading[:\s]*([^\n]+)', text, re.IGNORECASE)
-            if grading_match:
-                enhanced_info.grading = grading_match.group(1).strip()
-            
-            # Extract course description (long paragraph)
-            desc_match = re.search(r'Course Description[:\s]*\n([^]+?)(?:\n\n|Enrollment Information|$)', text, re.IGNORECASE)
-            if desc_match:
-                enhanced_info.course_description = desc_match.group(1).strip()
-            
-            # Extract enrollment requirements
-            req_patterns = [
-                r'Enrollment Requirements[:\s]*([^\n]+)',
-                r'Enforced Concurrent at Enrollment[:\s]*([^\n]+)',
-                r'Prerequisites[:\s]*([^\n]+)'
-            ]
-            
-            for pattern in req_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    req_text = match.group(1).strip()
-                    if 'Enforced Concurrent' in pattern:
-                        enhanced_info.enforced_concurrent = req_text
-                    else:
-                        enhanced_info.enrollment_requirements = req_text
-            
-            # Extract class attributes
-            attr_match = re.search(r'Class Attributes[:\s]*([^\n]+)', text, re.IGNORECASE)
-            if attr_match and attr_match.group(1).strip() != "No Class Attributes":
-                enhanced_info.class_attributes = [attr_match.group(1).strip()]
-            
-            # Extract class notes
-            notes_match = re.search(r'Class Notes[:\s]*([^\n]+)', text, re.IGNORECASE)
-            if notes_match and notes_match.group(1).strip() != "No Class Notes":
-                enhanced_info.course_notes = notes_match.group(1).strip()
-            
-            # Extract textbook info
-            textbook_match = re.search(r'Text Books[:\s]*([^\n]+)', text, re.IGNORECASE)
-            if textbook_match:
-                enhanced_info.textbook_info = textbook_match.group(1).strip()
-            
-            enhanced_info.last_updated = datetime.now().isoformat()
-            
-            return enhanced_info
-            
-        except Exception as e:
-            logger.debug(f"Error parsing course-level info: {e}")
-            return base_course_info
+        return parse_course_level_info(html, base_course_info)
     
     # ... (include other helper methods from the previous scraper)
     # I'll include the key methods here but truncate for brevity
     
+    def scrape_subject_batch(self, batch: List[Dict]) -> Dict[str, List[SectionInfo]]:
+        """Search a batch of subjects in one post (a lone subject goes through scrape_subject_optimized)"""
+        codes = [subject.get('code', 'unknown') for subject in batch]
+        if len(batch) == 1:
+            return {codes[0]: self.scrape_subject_optimized(batch[0])}
+        
+        session = self.get_session()
+        try:
+            html = self.search_subjects(session, [subject['checkbox_id'] for subject in batch])
+        finally:
+            self.return_session(session)
+        
+        sections = self.parse_sections_optimized(html, '+'.join(codes))
+        if is_oversized_page(html, sections):
+            # The row cap may have cut the list anywhere, so no subject of the batch can be trusted
+            logger.info(f"✂️ {'+'.join(codes)}: {len(sections)} rows in {len(html) // 1024} KB, "
+                        f"searching each subject alone")
+            with self.data_lock:
+                self.stats['subject_searches'] += len(batch)
+            return {code: self.scrape_subject_optimized(subject) for code, subject in zip(codes, batch)}
+        return split_sections_by_subject(sections, codes)
+    
     def scrape_subject_optimized(self, subject: Dict) -> List[SectionInfo]:
         """Scrape subject returning SectionInfo objects"""
         session = self.get_session()
@@ -552,30 +582,21 @@ class OptimizedLionPathScraper:
         subject_code = subject.get('code', 'unknown')
         
         try:
-            response = self.rate_limited_request(
-                session.get, 
-                self.search_url, 
-                params={'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'},
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            form_data = self.extract_form_data_fast(response.text)
-            
             checkbox_id = subject.get('checkbox_id', '')
             if checkbox_id:
-                form_data[checkbox_id] = 'Y'
-                form_data['ICAction'] = checkbox_id
+                # A subject that was oversized last run skips the whole-subject search
+                if self.subject_history.get(subject_code, 0) > OVERSIZED_SUBJECT_SECTIONS:
+                    logger.info(f"✂️ {subject_code}: {self.subject_history[subject_code]} sections last run, "
+                                f"searching in sub-queries")
+                    return self.search_subject_split(subject, {})
                 
-                response = self.rate_limited_request(
-                    session.post, 
-                    self.search_url, 
-                    data=form_data,
-                    timeout=10
-                )
-                response.raise_for_status()
+                html = self.search_subject(session, checkbox_id)
                 
-                sections = self.parse_sections_optimized(response.text, subject_code)
+                sections = self.parse_sections_optimized(html, subject_code)
+                if is_oversized_page(html, sections):
+                    logger.info(f"✂️ {subject_code}: {len(sections)} rows in {len(html) // 1024} KB, "
+                                f"searching again in sub-queries")
+                    return merge_sections(sections, self.search_subject_split(subject, {}))
                 return sections
             
             return []
@@ -584,304 +605,54 @@ class OptimizedLionPathScraper:
             logger.debug(f"Error scraping subject {subject_code}: {e}")
             raise
     
-    def parse_sections_optimized(self, html: str, subject_code: str) -> List[SectionInfo]:
-        """Parse sections from HTML, returning SectionInfo objects"""
-        sections = []
-        
-        # Fast regex-based parsing for showClassDetails links
-        pattern = r'javascript:showClassDetails\((\d+),(\d+)\)[^>]*>([^<]+)<'
-        matches = re.findall(pattern, html)
+    def search_subject_split(self, subject: Dict, criteria: Dict[str, str]) -> List[SectionInfo]:
+        """Search a subject as parallel sub-queries that narrow criteria, splitting again any that are still oversized"""
+        parts = split_criteria(criteria)
+        with self.data_lock:
+            if not criteria:
+                self.stats['split_subjects'] += 1
+            self.stats['sub_queries'] += len(parts)
         
-        for strm, class_nbr, text in matches:
-            try:
-                section = self.parse_section_text_optimized(text, strm, class_nbr, subject_code)
-                if section:
-                    sections.append(section)
-            except Exception as e:
-                logger.debug(f"Error parsing section text '{text}': {e}")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            results = list(executor.map(lambda part: self.search_subject_part(subject, part), parts))
+        return merge_sections(*results)
+    
+    def search_subject_part(self, subject: Dict, criteria: Dict[str, str]) -> List[SectionInfo]:
+        """One sub-query of an oversized subject"""
+        subject_code = subject.get('code', 'unknown')
+        session = self.get_session()
+        try:
+            html = self.search_subject(session, subject['checkbox_id'], criteria)
+        finally:
+            self.return_session(session)
         
+        sections = self.parse_sections_optimized(html, subject_code)
+        if is_oversized_page(html, sections):
+            if split_criteria(criteria):
+                return merge_sections(sections, self.search_subject_split(subject, criteria))
+            logger.warning(f"⚠️ {subject_code}: sub-query {criteria} still lists {len(sections)} rows; "
+                           f"results may be truncated")
         return sections
     
+    def parse_sections_optimized(self, html: str, subject_code: str) -> List[SectionInfo]:
+        """Parse sections from HTML, returning SectionInfo objects"""
+        return parse_listing_sections(html)
+    
     def parse_section_text_optimized(self, text: str, strm: str, class_nbr: str, subject_code: str) -> Optional[SectionInfo]:
         """Parse section information from text"""
         try:
-            text = text.strip()
-            
-            # Parse course code
-            course_patterns = [
-                r'^([A-Z]+-?[A-Z]+)\s+(\d+[A-Z]*)',
-                r'^([A-Z]{2,})\s+(\d+[A-Z]*)',
-            ]
-            
-            subject = ""
-            catalog_number = ""
-            course_code = ""
-            
-            for pattern in course_patterns:
-                match = re.match(pattern, text)
-                if match:
-                    subject = match.group(1)
-                    catalog_number = match.group(2)
-                    course_code = f"{subject} {catalog_number}"
-                    break
-            
-            if not course_code:
-                return None
-            
-            # Extract section and campus
-            section = ""
-            campus = ""
-            
-            if ' - ' in text:
-                parts = text.split(' - ')
-                if len(parts) > 1:
-                    section_campus = parts[1]
-                    
-                    # Extract section
-                    section_match = re.search(r'(\d{3}[A-Z]*|[A-Z]\d{2}|\d{2,3})', section_campus)
-                    if section_match:
-                        section = section_match.group(1)
-                    
-                    # Extract campus
-                    campus_names = [
-                        'World Campus', 'Berks', 'Abington', 'Altoona', 'Brandywine',
-                        'Dubois', 'Erie', 'Fayette', 'Greater Allegheny', 'Harrisburg',
-                        'Hazleton', 'Lehigh Valley', 'Mont Alto', 'New Kensington',
-                        'Schuylkill', 'Shenango', 'Wilkes-Barre', 'York', 'UP'
-                    ]
-                    
-                    for campus_name in campus_names:
-                        if campus_name in section_campus:
-                            campus = campus_name
-                            break
-                    
-                    if not campus and not any(c in section_campus.lower() for c in ['world', 'berks', 'y']):
-                        campus = 'UP'
-            
-            # Create section info with course code reference
-            section_info = SectionInfo(
-                section=section,
-                class_number=class_nbr,
-                campus=campus,
-                course_url=f"showClassDetails({strm},{class_nbr})"
-            )
-            
-            # Store course code for grouping
-            section_info.course_code = course_code  # Add this as a temporary attribute
-            
-            return section_info
-            
+            return listing_section(text, strm, class_nbr)
         except Exception as e:
             logger.debug(f"Error in optimized parsing: {e}")
             return None
     
     def is_university_park_section(self, section: SectionInfo) -> bool:
         """Determine if a section is at University Park"""
-        campus = section.campus.upper()
-        section_num = section.section.upper()
-        
-        # Non-UP indicators
-        non_up_indicators = [
-            'WORLD CAMPUS', 'BERKS', 'ABINGTON', 'ALTOONA', 'BRANDYWINE',
-            'DUBOIS', 'ERIE', 'FAYETTE', 'GREATER ALLEGHENY', 'HARRISBURG',
-            'HAZLETON', 'LEHIGH VALLEY', 'MONT ALTO', 'NEW KENSINGTON',
-            'SCHUYLKILL', 'SHENANGO', 'WILKES-BARRE', 'YORK'
-        ]
-        
-        if any(indicator in campus for indicator in non_up_indicators):
-            return False
-        
-        if section_num.endswith('Y') or section_num.endswith('W'):
-            return False
-        
-        return True
+        return is_university_park(section.campus, section.section)
     
-    # Include other helper methods...
     def extract_form_data_fast(self, html: str) -> Dict[str, str]:
         """Fast form data extraction using regex"""
-        form_data = {}
-        hidden_pattern = r'<input[^>]*type=["\']hidden["\'][^>]*name=["\']([^"\']+)["\'][^>]*value=["\']([^"\']*)["\'][^>]*>'
-        matches = re.findall(hidden_pattern, html, re.IGNORECASE)
-        
-        for name, value in matches:
-            form_data[name] = value
-        
-        return form_data
-    
-    def get_all_subjects(self) -> List[Dict]:
-        """Get all subjects quickly"""
-        session = self.get_session()
-        try:
-            response = self.rate_limited_request(
-                session.get,
-                self.search_url,
-                params={'Page': 'PE_SR175_CLS_SRCH', 'Action': 'U'},
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            subjects = []
-            
-            # Try multiple patterns to find subject checkboxes
-            patterns = [
-                # Original pattern
-                r'<input[^>]*id="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*id="PTS_SELECT_LBL\$\1"[^>]*>([^<]+)</label>',
-                # Alternative pattern for different HTML structure
-                r'<input[^>]*name="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*for="PTS_SELECT\$\1"[^>]*>([^<]+)</label>',
-                # More flexible pattern
-                r'<input[^>]*id="PTS_SELECT\$(\d+)"[^>]*>.*?<label[^>]*>([^<]*)</label>'
-            ]
-            
-            html_text = response.text
-            logger.debug(f"HTML length: {len(html_text)}")
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, html_text, re.DOTALL | re.IGNORECASE)
-                logger.debug(f"Pattern '{pattern[:50]}...' found {len(matches)} matches")
-                
-                if matches:
-                    for checkbox_num, label_text in matches:
-                        label_text = label_text.strip()
-                        if '/' in label_text and len(label_text) > 5:  # Basic validation
-                            parts = label_text.split('/', 1)
-                            code = parts[0].strip()
-                            name = parts[1].strip() if len(parts) > 1 else code
-                            
-                            # Validate code format (should be letters)
-                            if re.match(r'^[A-Z]+-?[A-Z]*$', code):
-                                subjects.append({
-                                    'code': code,
-                                    'name': name,
-                                    'checkbox_id': f'PTS_SELECT${checkbox_num}',
-                                    'full_text': label_text
-                                })
-                    
-                    if subjects:  # If we found subjects, stop trying other patterns
-                        break
-            
-            # If no subjects found, try a simpler approach
-            if not subjects:
-                logger.debug("No subjects found with regex patterns, trying BeautifulSoup...")
-                soup = BeautifulSoup(html_text, 'html.parser')
-                
-                # Find all checkboxes with PTS_SELECT in ID
-                checkboxes = soup.find_all('input', {'id': re.compile(r'PTS_SELECT\$\d+')})
-                logger.debug(f"Found {len(checkboxes)} checkboxes with BeautifulSoup")
-                
-                for checkbox in checkboxes:
-                    checkbox_id = checkbox.get('id', '')
-                    checkbox_num = checkbox_id.split('$')[-1] if '$' in checkbox_id else ''
-                    
-                    # Find corresponding label
-                    label_id = f'PTS_SELECT_LBL${checkbox_num}'
-                    label = soup.find('label', {'id': label_id})
-                    
-                    if label:
-                        label_text = label.get_text(strip=True)
-                        if '/' in label_text:
-                            parts = label_text.split('/', 1)
-                            code = parts[0].strip()
-                            name = parts[1].strip() if len(parts) > 1 else code
-                            
-                            if re.match(r'^[A-Z]+-?[A-Z]*$', code):
-                                subjects.append({
-                                    'code': code,
-                                    'name': name,
-                                    'checkbox_id': checkbox_id,
-                                    'full_text': label_text
-                                })
-            
-            subjects.sort(key=lambda x: x['code'])
-            logger.debug(f"Final subjects count: {len(subjects)}")
-            if subjects:
-                logger.debug(f"Sample subjects: {[s['code'] for s in subjects[:5]]}")
-            
-            return subjects
-            
-        finally:
-            self.return_session(session)
-    
-    def extract_field_value(self, soup: BeautifulSoup, field_names: List[str]) -> str:
-        """Extract a field value by looking for labels"""
-        for field_name in field_names:
-            label_patterns = [
-                soup.find('span', string=re.compile(field_name, re.IGNORECASE)),
-                soup.find('td', string=re.compile(field_name, re.IGNORECASE)),
-                soup.find('label', string=re.compile(field_name, re.IGNORECASE)),
-            ]
-            
-            for label in label_patterns:
-                if label:
-                    next_elem = label.find_next_sibling()
-                    if next_elem:
-                        value = next_elem.get_text(strip=True)
-                        if value and value != field_name:
-                            return value
-                    
-                    parent = label.parent
-                    if parent:
-                        next_elem = parent.find_next_sibling()
-                        if next_elem:
-                            value = next_elem.get_text(strip=True)
-                            if value and value != field_name:
-                                return value
-        
-        return ""
-    
-    def extract_course_description(self, soup: BeautifulSoup) -> str:
-        """Extract course description"""
-        try:
-            desc_patterns = [
-                ('div', {'class': re.compile('description', re.IGNORECASE)}),
-                ('span', {'class': 'PSLONGEDITBOX'}),
-                ('td', {'class': re.compile('description', re.IGNORECASE)}),
-            ]
-            
-            for tag, attrs in desc_patterns:
-                desc_elem = soup.find(tag, attrs)
-                if desc_elem:
-                    desc_text = desc_elem.get_text(strip=True)
-                    if len(desc_text) > 50:
-                        return desc_text
-            
-            desc_labels = soup.find_all(string=re.compile(r'Description', re.IGNORECASE))
-            for label in desc_labels:
-                if label.parent:
-                    next_elem = label.parent.find_next()
-                    if next_elem:
-                        desc_text = next_elem.get_text(strip=True)
-                        if len(desc_text) > 50:
-                            return desc_text
-            
-            return ""
-            
-        except Exception as e:
-            logger.debug(f"Error extracting course description: {e}")
-            return ""
-    
-    def extract_class_attributes(self, soup: BeautifulSoup) -> List[str]:
-        """Extract class attributes"""
-        try:
-            attributes = []
-            attr_text = soup.get_text()
-            
-            attr_patterns = [
-                r'General Education[:\s]*([^\n]+)',
-                r'Attributes[:\s]*([^\n]+)',
-                r'GenEd[:\s]*([^\n]+)',
-            ]
-            
-            for pattern in attr_patterns:
-                matches = re.findall(pattern, attr_text, re.IGNORECASE)
-                for match in matches:
-                    if match.strip():
-                        attributes.append(match.strip())
-            
-            return list(set(attributes))
-            
-        except Exception as e:
-            logger.debug(f"Error extracting class attributes: {e}")
-            return []
+        return extract_form_data(html)
     
     def log_final_stats(self):
         """Log comprehensive final statistics"""
@@ -891,11 +662,24 @@ class OptimizedLionPathScraper:
         logger.info("=" * 60)
         logger.info(f"⏱️  Total time: {duration}")
         logger.info(f"📚 Subjects processed: {self.stats['processed_subjects']}/{self.stats['total_subjects']}")
+        logger.info(f"📨 Subject search requests: {self.stats['subject_searches']}")
+        if self.stats['split_subjects']:
+            logger.info(f"✂️ Oversized subjects split: {self.stats['split_subjects']} "
+                        f"({self.stats['sub_queries']} sub-queries)")
+        logger.info(f"📋 Sections complete from the listing: {self.stats['listing_complete_sections']} "
+                    f"(section detail requests: {self.stats['section_detail_requests']})")
+        shared = self.section_flights.stats['shared'] + self.course_flights.stats['shared']
+        if shared:
+            logger.info(f"🔗 Detail pages shared between listings: {shared} "
+                        f"({self.course_flights.stats['shared']} course-level)")
         logger.info(f"🎓 Unique courses: {self.stats['unique_courses']}")
         logger.info(f"📖 Total sections: {self.stats['total_sections']}")
         logger.info(f"🔍 Detailed sections: {self.stats['detailed_sections']}")
         logger.info(f"❌ Failed subjects: {len(self.stats['failed_subjects'])}")
         logger.info(f"❌ Failed details: {self.stats['failed_details']}")
+        if self.stats['off_campus_sections']:
+            logger.warning(f"🏫 {self.stats['off_campus_sections']} off-campus sections listed despite the campus "
+                           f"criterion (dropped client-side)")
         
         if self.stats['total_sections'] > 0:
             sections_per_second = self.stats['total_sections'] / duration.total_seconds()
@@ -911,81 +695,66 @@ class OptimizedLionPathScraper:
             optimized_size = self.stats['unique_courses'] + self.stats['total_sections']  # Course records + section records
             savings_pct = ((traditional_size - optimized_size) / traditional_size) * 100 if traditional_size > 0 else 0
             logger.info(f"💾 Estimated data savings: {savings_pct:.1f}%")
-
-def save_optimized_results(courses_data: Dict[str, OptimizedCourseData], output_file: str, format_type: str = 'jsonl'):
-    """Save optimized results in various formats"""
-    logger.info(f"💾 Saving {len(courses_data)} courses to {output_file}...")
-    
-    if format_type.lower() == 'jsonl':
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for course_code, course_data in courses_data.items():
-                # Create optimized record
-                record = {
-                    'course': asdict(course_data.course_info),
-                    'sections': [asdict(section) for section in course_data.sections],
-                    'stats': {
-                        'total_capacity': course_data.get_total_capacity(),
-                        'total_enrollment': course_data.get_total_enrollment(),
-                        'available_seats': course_data.get_available_seats(),
-                        'section_count': course_data.get_section_count(),
-                        'campuses': list(course_data.get_campuses())
-                    }
-                }
-                json.dump(record, f, ensure_ascii=False, separators=(',', ':'))
-                f.write('\n')
-    
-    elif format_type.lower() == 'json':
-        data = {}
-        for course_code, course_data in courses_data.items():
-            data[course_code] = {
-                'course': asdict(course_data.course_info),
-                'sections': [asdict(section) for section in course_data.sections],
-                'stats': {
-                    'total_capacity': course_data.get_total_capacity(),
-                    'total_enrollment': course_data.get_total_enrollment(),
-                    'available_seats': course_data.get_available_seats(),
-                    'section_count': course_data.get_section_count(),
-                    'campuses': list(course_data.get_campuses())
-                }
-            }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    elif format_type.lower() == 'csv':
-        # Flatten to CSV format (one row per section, with course info repeated)
-        import csv
-        flattened_data = []
-        
-        for course_code, course_data in courses_data.items():
-            course_dict = asdict(course_data.course_info)
-            
-            for section in course_data.sections:
-                section_dict = asdict(section)
-                # Combine course and section data
-                combined = {**course_dict, **section_dict}
-                # Clean up class_attributes for CSV
-                combined['class_attributes'] = '; '.join(combined.get('class_attributes', []))
-                flattened_data.append(combined)
-        
-        if flattened_data:
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=flattened_data[0].keys())
-                writer.writeheader()
-                writer.writerows(flattened_data)
+        # Parser patterns that ran past their time budget on some page
+        for name, metrics in regex_incidents().items():
+            logger.warning(f"⏱️ Regex {name}: {metrics['overruns']} overruns, {metrics['aborted']} aborted "
+                           f"of {metrics['calls']} calls, slowest {metrics['max_seconds']:.2f}s")
+
+# Section fields that change hour to hour; everything else is stable for the term
+VOLATILE_SECTION_FIELDS = (
+    'status', 'class_capacity', 'enrollment_total', 'available_seats',
+    'waitlist_capacity', 'waitlist_total', 'scrape_timestamp'
+)
+
+def merge_section_refresh(previous: Optional[SectionInfo], listed: SectionInfo) -> SectionInfo:
+    """Combine a freshly listed section with the stable fields saved for it in the previous run"""
+    if previous is None:
+        return listed
+    
+    merged = SectionInfo(**{name: getattr(previous, name) for name in SECTION_FIELDS})
+    # Listing fields are current by definition
+    merged.section = listed.section or previous.section
+    merged.campus = listed.campus or previous.campus
+    merged.course_url = listed.course_url or previous.course_url
+    # So is whatever the results row showed, zeros included; the rest keeps the previous run's values
+    shown = getattr(listed, 'listed_fields', None)
+    for group in LISTING_FIELD_GROUPS:
+        for name in group:
+            if (name in shown) if shown is not None else getattr(listed, group[0]):
+                setattr(merged, name, getattr(listed, name))
+    # Only a row that showed every refreshed field makes the section current without a detail fetch
+    if not listing_missing_fields(listed, REFRESH_SECTION_FIELDS):
+        merged.scrape_timestamp = listed.scrape_timestamp
+    return merged
 
 def main():
     """Main execution function"""
     parser = argparse.ArgumentParser(description='Penn State LionPath Course Scraper - Optimized Data Structure')
     parser.add_argument('--output', '-o', default='psu_courses_optimized.jsonl', help='Output file')
-    parser.add_argument('--format', choices=['jsonl', 'json', 'csv'], default='jsonl', help='Output format')
+    parser.add_argument('--format', choices=['jsonl', 'json', 'csv', 'sqlite'], default='jsonl', help='Output format')
+    parser.add_argument('--compression-level', type=int, help='Compression level for .gz/.zst output files')
+    parser.add_argument('--search-index', action='store_true', help='Also write a BM25 keyword search index next to the output')
+    parser.add_argument('--prereq-graph', action='store_true', help='Also write the prerequisite graph next to the output')
     parser.add_argument('--campus', '-c', default='UP', help='Campus filter (UP for University Park, ALL for all)')
+    parser.add_argument('--term', type=parse_term, default=DEFAULT_TERM,
+                        help='Term to scrape, as a STRM (2258) or name ("Fall 2025")')
+    parser.add_argument('--terms', type=parse_terms, help='Comma-separated terms to scrape in one run, one output file per term')
     parser.add_argument('--delay', type=float, default=0.2, help='Delay between requests')
     parser.add_argument('--max-workers', type=int, default=16, help='Max concurrent workers for subjects')
     parser.add_argument('--max-detail-workers', type=int, default=50, help='Max concurrent workers for course details')
     parser.add_argument('--rate-limit', type=int, default=20, help='Requests per second limit')
     parser.add_argument('--max-subjects', type=int, help='Limit number of subjects (for testing)')
     parser.add_argument('--retry-attempts', type=int, default=2, help='Number of retry attempts')
+    parser.add_argument('--mode', choices=['full', 'enrollment-only'], default='full',
+                        help='full scrape, or refresh only enrollment/status fields reusing course info from --previous')
+    parser.add_argument('--previous', help='Previous optimized JSONL output for --mode enrollment-only and '
+                                           '--batch-subjects (default: --output)')
+    parser.add_argument('--batch-subjects', action='store_true',
+                        help='Search subjects that listed few sections in --previous several to a request')
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument('--record', metavar='DIR', help='Also store every raw response in a record/replay archive')
+    archive_group.add_argument('--replay', metavar='DIR', help='Answer every request from an archive instead of the network')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     
     args = parser.parse_args()
@@ -993,31 +762,81 @@ def main():
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    terms = args.terms or [args.term]
+    
+    def term_path(path: str, strm: str) -> str:
+        # A single term keeps the plain file names; several terms get one file per STRM
+        return term_output_path(path, strm) if len(terms) > 1 else path
+    
+    previous_base = args.previous or args.output
+    if args.mode == 'enrollment-only':
+        for strm in terms:
+            if not Path(term_path(previous_base, strm)).exists():
+                parser.error(f"--mode enrollment-only needs a previous output; "
+                             f"{term_path(previous_base, strm)} does not exist")
+    
     logger.info("🎓 Penn State LionPath Course Scraper - Optimized Data Structure")
     logger.info(f"📁 Output file: {args.output}")
     logger.info(f"📊 Output format: {args.format}")
+    logger.info(f"🔁 Mode: {args.mode}")
     logger.info(f"🏫 Campus filter: {args.campus}")
+    logger.info(f"📅 Terms: {', '.join(f'{strm} ({term_name(strm)})' for strm in terms)}")
     
     scraper = OptimizedLionPathScraper(
         delay=args.delay,
         max_workers=args.max_workers,
         max_detail_workers=args.max_detail_workers,
         retry_attempts=args.retry_attempts,
-        rate_limit_per_second=args.rate_limit
+        rate_limit_per_second=args.rate_limit,
+        term=terms[0]
     )
     
-    try:
+    archive = None
+    if args.record or args.replay:
+        archive = ResponseArchive(args.record or args.replay, writable=bool(args.record))
+        scraper.use_archive(archive, replay=bool(args.replay))
+        logger.info(f"🗄️ {'Replaying from' if args.replay else 'Recording to'} {archive.path} "
+                    f"({archive.stats()['records']} responses archived)")
+    
+    def scrape_term(strm: str) -> str:
+        output_file = term_path(args.output, strm)
+        
+        previous_file = term_path(previous_base, strm)
+        if args.batch_subjects and Path(previous_file).exists():
+            try:
+                scraper.subject_history = subject_section_counts(previous_file)
+                logger.info(f"📦 Batching small subjects using section counts from {previous_file}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Could not read subject history from {previous_file}: {e}")
+                scraper.subject_history = {}
+        
         # Run the scraper
-        courses_data = scraper.scrape_all_courses(
-            campus_filter=args.campus,
-            max_subjects=args.max_subjects
-        )
+        if args.mode == 'enrollment-only':
+            previous_courses = load_optimized_results(previous_file)
+            logger.info(f"♻️ Loaded {len(previous_courses)} courses from {previous_file}")
+            courses_data = scraper.refresh_enrollment(
+                previous_courses,
+                campus_filter=args.campus,
+                max_subjects=args.max_subjects
+            )
+        else:
+            courses_data = scraper.scrape_all_courses(
+                campus_filter=args.campus,
+                max_subjects=args.max_subjects
+            )
         
         # Save results
-        save_optimized_results(courses_data, args.output, args.format)
+        save_optimized_results(courses_data, output_file, args.format, args.compression_level,
+                               search_index=args.search_index, prereq_graph=args.prereq_graph)
+        if scraper.subject_counts:
+            save_subject_counts(subjects_path(output_file), scraper.subject_counts)
+        logger.info(f"💾 {term_name(strm)} results saved to: {output_file}")
+        return output_file
+    
+    try:
+        scraper.for_each_term(terms, scrape_term)
         
         logger.info(f"✅ Optimized scraping completed successfully!")
-        logger.info(f"💾 Results saved to: {args.output}")
         
     except KeyboardInterrupt:
         logger.info("⏹️ Scraping interrupted by user")
@@ -1025,6 +844,11 @@ def main():
         logger.error(f"💥 Error during scraping: {e}")
         import traceback
         logger.debug(traceback.format_exc())
+    finally:
+        if archive is not None:
+            stats = archive.stats()
+            logger.info(f"🗄️ Archive: {stats['records']} responses, {stats['bodies']} unique bodies")
+            archive.close()
 
 if __name__ == "__main__":
     main()
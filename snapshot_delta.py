@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Delta snapshots between weekly scrapes
+Compares two optimized-format JSONL snapshots by course_code/class_number, writes a compact
+delta of added, removed and changed fields, and rebuilds full snapshots from a base plus deltas
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from compressed_io import iter_jsonl_records, open_output_stream
+
+DELTA_FORMAT = 'psu-courses-delta'
+DELTA_VERSION = 1
+
+# Fields rewritten on every scrape; diffing them would mark every record as changed
+DEFAULT_IGNORED_FIELDS = ('last_updated', 'scrape_timestamp')
+
+def load_snapshot(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load a snapshot into a dict keyed by course_code, streaming the (possibly compressed) file"""
+    records = {}
+    for record in iter_jsonl_records(path):
+        course_code = record.get('course', {}).get('course_code', '')
+        if course_code:
+            records[course_code] = record
+    return records
+
+def compute_stats(sections: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Recompute the derived stats block for a list of section dicts"""
+    return {
+        'total_capacity': sum(s.get('class_capacity', 0) or 0 for s in sections),
+        'total_enrollment': sum(s.get('enrollment_total', 0) or 0 for s in sections),
+        'available_seats': sum(s.get('available_seats', 0) or 0 for s in sections),
+        'section_count': len(sections),
+        'campuses': sorted(set(s.get('campus', '') for s in sections if s.get('campus')))
+    }
+
+_MISSING = object()
+
+def diff_fields(old: Dict[str, Any], new: Dict[str, Any], ignored: Iterable[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """Return (changed/added field values, removed field names) between two flat dicts"""
+    ignored = set(ignored)
+    changed = {k: v for k, v in new.items() if k not in ignored and old.get(k, _MISSING) != v}
+    removed = [k for k in old if k not in new and k not in ignored]
+    return changed, removed
+
+def diff_course(old: Dict[str, Any], new: Dict[str, Any], ignored: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """Return a change entry for one course, or None when nothing (outside ignored fields) changed"""
+    entry = {}
+
+    course_changed, course_removed = diff_fields(old.get('course', {}), new.get('course', {}), ignored)
+    if course_changed:
+        entry['course'] = course_changed
+    if course_removed:
+        entry['course_removed'] = course_removed
+
+    old_sections = {s.get('class_number', ''): s for s in old.get('sections', [])}
+    new_sections = new.get('sections', [])
+    new_numbers = [s.get('class_number', '') for s in new_sections]
+    new_number_set = set(new_numbers)
+
+    added = [s for s in new_sections if s.get('class_number', '') not in old_sections]
+    removed = [n for n in old_sections if n not in new_number_set]
+    changed = {}
+    for section in new_sections:
+        number = section.get('class_number', '')
+        if number in old_sections:
+            fields_changed, fields_removed = diff_fields(old_sections[number], section, ignored)
+            if fields_removed:
+                fields_changed['__removed__'] = fields_removed
+            if fields_changed:
+                changed[number] = fields_changed
+
+    if added:
+        entry['sections_added'] = added
+    if removed:
+        entry['sections_removed'] = removed
+    if changed:
+        entry['sections_changed'] = changed
+
+    # Only record the order when applying the other operations would not reproduce it
+    expected_order = [n for n in old_sections if n in new_number_set] + [s.get('class_number', '') for s in added]
+    if expected_order != new_numbers:
+        entry['section_order'] = new_numbers
+
+    return entry or None
+
+def compute_delta(base: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]],
+                  ignored: Iterable[str] = DEFAULT_IGNORED_FIELDS) -> List[Dict[str, Any]]:
+    """Compute delta operations turning the base snapshot into the new one"""
+    ignored = tuple(ignored)
+    operations = []
+
+    for course_code in sorted(new):
+        if course_code not in base:
+            operations.append({'op': 'add', 'course_code': course_code, 'record': new[course_code]})
+        else:
+            entry = diff_course(base[course_code], new[course_code], ignored)
+            if entry:
+                operations.append(dict({'op': 'change', 'course_code': course_code}, **entry))
+
+    for course_code in sorted(base):
+        if course_code not in new:
+            operations.append({'op': 'remove', 'course_code': course_code})
+
+    return operations
+
+def apply_delta(base: Dict[str, Dict[str, Any]], operations: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Apply delta operations to a snapshot, returning a new snapshot dict (the base is not modified)"""
+    result = dict(base)
+
+    for operation in operations:
+        op = operation.get('op')
+        course_code = operation.get('course_code', '')
+
+        if op == 'add':
+            result[course_code] = operation['record']
+
+        elif op == 'remove':
+            result.pop(course_code, None)
+
+        elif op == 'change':
+            old = result.get(course_code)
+            if old is None:
+                raise ValueError(f"Delta changes {course_code}, which is not in the base snapshot")
+
+            course = dict(old.get('course', {}))
+            course.update(operation.get('course', {}))
+            for name in operation.get('course_removed', []):
+                course.pop(name, None)
+
+            sections = {s.get('class_number', ''): s for s in old.get('sections', [])}
+            order = list(sections)
+            for number in operation.get('sections_removed', []):
+                sections.pop(number, None)
+            for number, changes in operation.get('sections_changed', {}).items():
+                section = dict(sections[number])
+                for name in changes.get('__removed__', []):
+                    section.pop(name, None)
+                section.update({k: v for k, v in changes.items() if k != '__removed__'})
+                sections[number] = section
+            for section in operation.get('sections_added', []):
+                sections[section.get('class_number', '')] = section
+                order.append(section.get('class_number', ''))
+
+            order = operation.get('section_order') or [n for n in order if n in sections]
+            section_list = [sections[n] for n in order]
+
+            record = dict(old)
+            record['course'] = course
+            record['sections'] = section_list
+            record['stats'] = compute_stats(section_list)
+            result[course_code] = record
+
+        elif op == 'header':
+            continue
+
+        else:
+            raise ValueError(f"Unknown delta operation: {op}")
+
+    return result
+
+def snapshot_digest(snapshot: Dict[str, Dict[str, Any]], ignored: Iterable[str] = DEFAULT_IGNORED_FIELDS) -> str:
+    """Order-independent digest of a snapshot's course and section data (stats and ignored fields excluded)"""
+    ignored = set(ignored)
+    digest = hashlib.sha256()
+    for course_code in sorted(snapshot):
+        record = snapshot[course_code]
+        canonical = {
+            'course': {k: v for k, v in record.get('course', {}).items() if k not in ignored},
+            'sections': sorted(
+                ({k: v for k, v in s.items() if k not in ignored} for s in record.get('sections', [])),
+                key=lambda s: s.get('class_number', '')
+            )
+        }
+        digest.update(json.dumps(canonical, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+def write_delta(base: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]], output_file: str,
+                ignored: Iterable[str] = DEFAULT_IGNORED_FIELDS, compression_level: Optional[int] = None) -> Dict[str, Any]:
+    """Compute and write a delta file (header line followed by one operation per line); returns the header"""
+    ignored = tuple(ignored)
+    operations = compute_delta(base, new, ignored)
+    header = {
+        'op': 'header',
+        'format': DELTA_FORMAT,
+        'version': DELTA_VERSION,
+        'ignored_fields': list(ignored),
+        'base_courses': len(base),
+        'new_courses': len(new),
+        'base_digest': snapshot_digest(base, ignored),
+        'new_digest': snapshot_digest(new, ignored),
+        'added': sum(1 for op in operations if op['op'] == 'add'),
+        'removed': sum(1 for op in operations if op['op'] == 'remove'),
+        'changed': sum(1 for op in operations if op['op'] == 'change'),
+    }
+
+    with open_output_stream(output_file, compression_level) as f:
+        for entry in [header] + operations:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            f.write(b'\n')
+
+    return header
+
+def read_delta(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Read a delta file, returning (header, operations)"""
+    header = None
+    operations = []
+    for entry in iter_jsonl_records(path):
+        if entry.get('op') == 'header':
+            header = entry
+        else:
+            operations.append(entry)
+
+    if not header or header.get('format') != DELTA_FORMAT:
+        raise ValueError(f"{path} is not a {DELTA_FORMAT} file")
+    if header.get('version', 0) > DELTA_VERSION:
+        raise ValueError(f"{path} uses delta version {header['version']}, newer than supported {DELTA_VERSION}")
+    return header, operations
+
+def rebuild_snapshot(base_file: str, delta_files: List[str], verify: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Rebuild a snapshot from a base file and a chain of delta files, checking digests along the way"""
+    snapshot = load_snapshot(base_file)
+
+    for delta_file in delta_files:
+        header, operations = read_delta(delta_file)
+        ignored = header.get('ignored_fields', DEFAULT_IGNORED_FIELDS)
+        if verify and snapshot_digest(snapshot, ignored) != header['base_digest']:
+            raise ValueError(f"{delta_file} was not computed against this base snapshot")
+
+        snapshot = apply_delta(snapshot, operations)
+
+        if verify and snapshot_digest(snapshot, ignored) != header['new_digest']:
+            raise ValueError(f"Rebuilding with {delta_file} did not reproduce the recorded snapshot")
+
+    return snapshot
+
+def save_snapshot(snapshot: Dict[str, Dict[str, Any]], output_file: str, compression_level: Optional[int] = None):
+    """Write a snapshot dict as optimized-format JSONL, sorted by course code"""
+    with open_output_stream(output_file, compression_level) as f:
+        for course_code in sorted(snapshot):
+            f.write(json.dumps(snapshot[course_code], ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            f.write(b'\n')
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Delta snapshots for Penn State course data')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    diff_parser = subparsers.add_parser('diff', help='Write a delta from a base snapshot to a new snapshot')
+    diff_parser.add_argument('base', help='Previous snapshot (.jsonl, .jsonl.gz or .jsonl.zst)')
+    diff_parser.add_argument('new', help='New snapshot')
+    diff_parser.add_argument('--output', '-o', required=True, help='Delta output file')
+    diff_parser.add_argument('--compression-level', type=int, help='Compression level for .gz/.zst output')
+
+    apply_parser = subparsers.add_parser('apply', help='Rebuild a full snapshot from a base plus deltas')
+    apply_parser.add_argument('base', help='Base snapshot')
+    apply_parser.add_argument('deltas', nargs='+', help='Delta files, oldest first')
+    apply_parser.add_argument('--output', '-o', required=True, help='Rebuilt snapshot output file')
+    apply_parser.add_argument('--compression-level', type=int, help='Compression level for .gz/.zst output')
+    apply_parser.add_argument('--no-verify', action='store_true', help='Skip digest verification')
+
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        header = write_delta(load_snapshot(args.base), load_snapshot(args.new), args.output,
+                             compression_level=args.compression_level)
+        print(f"📦 Delta written to {args.output}: {header['added']} added, "
+              f"{header['removed']} removed, {header['changed']} changed courses")
+    else:
+        snapshot = rebuild_snapshot(args.base, args.deltas, verify=not args.no_verify)
+        save_snapshot(snapshot, args.output, args.compression_level)
+        print(f"✅ Rebuilt {len(snapshot)} courses into {args.output}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
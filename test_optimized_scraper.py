@@ -3,6 +3,7 @@
 Test script for the optimized Penn State LionPath Course Scraper
 """
 
+import itertools
 import subprocess
 import sys
 import time
@@ -47,38 +48,39 @@ def test_optimized_scraper():
             # Check output file
             output_file = Path("test_optimized_output.jsonl")
             if output_file.exists():
-                with open(output_file, 'r') as f:
-                    lines = f.readlines()
+                from lionpath.reader import iter_courses, load_offsets, offsets_path
                 
-                print(f"📁 Output file: {len(lines)} course records found")
+                course_count = len(load_offsets(str(output_file))['courses'])
+                print(f"📁 Output file: {course_count} course records found")
                 
-                if lines:
-                    # Parse first course as example
+                # Course blocks only: sections are not decoded for the summary
+                first_course = next(iter_courses(str(output_file), projection='course'), None)
+                first_record = next(iter_courses(str(output_file)), None)
+                
+                if first_course and first_record:
                     try:
-                        first_record = json.loads(lines[0])
-                        course_info = first_record.get('course', {})
-                        sections_info = first_record.get('sections', [])
-                        stats_info = first_record.get('stats', {})
+                        course_info = first_course.course_info
+                        sections_info = first_record.sections
                         
-                        print(f"📚 Example course: {course_info.get('course_code', 'Unknown')}")
-                        print(f"📖 Title: {course_info.get('course_title', 'Unknown')}")
+                        print(f"📚 Example course: {course_info.course_code or 'Unknown'}")
+                        print(f"📖 Title: {course_info.course_title or 'Unknown'}")
                         print(f"📝 Sections: {len(sections_info)}")
-                        print(f"👥 Total capacity: {stats_info.get('total_capacity', 0)}")
-                        print(f"🏫 Campuses: {', '.join(stats_info.get('campuses', []))}")
+                        print(f"👥 Total capacity: {first_record.get_total_capacity()}")
+                        print(f"🏫 Campuses: {', '.join(sorted(first_record.get_campuses()))}")
                         
                         # Show section details
                         if sections_info:
                             section = sections_info[0]
-                            print(f"📍 First section: {section.get('section', 'N/A')} - {section.get('instructor', 'TBA')}")
-                            print(f"⏰ Time: {section.get('days', 'N/A')} {section.get('times', 'N/A')}")
-                            print(f"📍 Location: {section.get('campus', 'N/A')} - {section.get('room', 'N/A')}")
+                            print(f"📍 First section: {section.section or 'N/A'} - {section.instructor or 'TBA'}")
+                            print(f"⏰ Time: {section.days or 'N/A'} {section.times or 'N/A'}")
+                            print(f"📍 Location: {section.campus or 'N/A'} - {section.room or 'N/A'}")
                         
                         # Validate data structure
                         required_course_fields = ['course_code', 'course_title', 'subject', 'catalog_number']
                         required_section_fields = ['section', 'class_number', 'campus']
                         
-                        missing_course_fields = [f for f in required_course_fields if not course_info.get(f)]
-                        missing_section_fields = [f for f in required_section_fields if not sections_info[0].get(f)] if sections_info else required_section_fields
+                        missing_course_fields = [f for f in required_course_fields if not getattr(course_info, f)]
+                        missing_section_fields = [f for f in required_section_fields if not getattr(sections_info[0], f)] if sections_info else required_section_fields
                         
                         if not missing_course_fields and not missing_section_fields:
                             print("✅ Data structure validation passed")
@@ -86,28 +88,26 @@ def test_optimized_scraper():
                             print(f"⚠️ Missing course fields: {missing_course_fields}")
                             print(f"⚠️ Missing section fields: {missing_section_fields}")
                         
-                    except json.JSONDecodeError as e:
-                        print(f"❌ Could not parse first record: {e}")
                     except Exception as e:
                         print(f"❌ Error analyzing record: {e}")
                 
-                # Test a few more records
-                if len(lines) > 1:
+                # Test a few more records, enrollment fields only
+                if course_count > 1:
                     print(f"\n🔍 Testing additional records...")
                     valid_records = 0
                     
-                    for i, line in enumerate(lines[:5]):  # Test first 5 records
-                        try:
-                            record = json.loads(line.strip())
-                            if 'course' in record and 'sections' in record and 'stats' in record:
+                    try:
+                        for course_data in itertools.islice(iter_courses(str(output_file), projection='enrollment'), 5):
+                            if course_data.course_info.course_code and course_data.sections:
                                 valid_records += 1
                             else:
-                                print(f"⚠️ Record {i+1}: Missing required top-level fields")
-                        except json.JSONDecodeError:
-                            print(f"❌ Record {i+1}: Invalid JSON")
+                                print(f"⚠️ {course_data.course_info.course_code or 'Record'}: Missing course code or sections")
+                    except json.JSONDecodeError as e:
+                        print(f"❌ Invalid JSON: {e}")
                     
-                    print(f"✅ Valid records: {valid_records}/{min(len(lines), 5)}")
+                    print(f"✅ Valid records: {valid_records}/{min(course_count, 5)}")
                 
+                Path(offsets_path(str(output_file))).unlink(missing_ok=True)
                 # Cleanup
                 output_file.unlink()
                 print("🧹 Cleaned up test output file")
@@ -8,6 +8,7 @@ import json
 import os
 import sys
 import tempfile
+import time
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 import requests
@@ -293,6 +294,242 @@ class TestOptimizedLionPathScraper(unittest.TestCase):
         
         math_data = self.scraper.courses_data["MATH 140"]
         self.assertEqual(len(math_data.sections), 1)
+    
+    def test_parse_enrollment_fields(self):
+        """Test volatile enrollment fields are read from a detail page"""
+        from scraper_optimized import parse_enrollment_fields
+        
+        html = """
+        <table><tr><td>Status</td><td>Closed</td></tr>
+        <tr><td>Class Capacity</td><td>120</td></tr>
+        <tr><td>Enrollment Total</td><td>120</td></tr>
+        <tr><td>Available&nbsp;Seats</td><td>0</td></tr>
+        <tr><td>Wait List Capacity</td><td>15</td></tr>
+        <tr><td>Wait List Total</td><td>7</td></tr></table>
+        """
+        section = SectionInfo(section="001", class_number="12345", instructor="Smith, Jane", status="Open")
+        parse_enrollment_fields(html, section)
+        
+        self.assertEqual(section.status, "Closed")
+        self.assertEqual(section.class_capacity, 120)
+        self.assertEqual(section.enrollment_total, 120)
+        self.assertEqual(section.available_seats, 0)
+        self.assertEqual(section.waitlist_capacity, 15)
+        self.assertEqual(section.waitlist_total, 7)
+        self.assertEqual(section.instructor, "Smith, Jane")
+    
+    def test_refresh_enrollment_reuses_course_info(self):
+        """Test enrollment-only mode keeps previous course info and skips course-level parsing"""
+        previous_info = CourseInfo(course_code="CMPSC 131", course_title="Programming",
+                                   course_description="Intro to programming")
+        previous_section = SectionInfo(section="001", class_number="12345", instructor="Smith, Jane",
+                                       room="WILLARD 062", class_capacity=100, enrollment_total=90)
+        previous = {"CMPSC 131": OptimizedCourseData(course_info=previous_info, sections=[previous_section])}
+        
+        listed = SectionInfo(section="001", class_number="12345", campus="UP",
+                             course_url="javascript:showClassDetails(2258,12345)")
+        listed.course_code = "CMPSC 131"
+        
+        def fake_discover(campus_filter, max_subjects=None):
+            self.scraper.organize_sections_by_course([listed])
+        
+        def fake_refresh(section):
+            section.enrollment_total = 100
+            section.available_seats = 0
+            section.status = "Closed"
+            return section
+        
+        with patch.object(self.scraper, 'discover_sections', side_effect=fake_discover), \
+             patch.object(self.scraper, 'refresh_section_enrollment', side_effect=fake_refresh), \
+             patch.object(self.scraper, 'parse_course_level_info') as mock_parse, \
+             patch.object(self.scraper, 'enhance_course_data') as mock_enhance:
+            courses_data = self.scraper.refresh_enrollment(previous)
+        
+        mock_parse.assert_not_called()
+        mock_enhance.assert_not_called()
+        
+        course_data = courses_data["CMPSC 131"]
+        self.assertEqual(course_data.course_info.course_description, "Intro to programming")
+        section = course_data.sections[0]
+        self.assertEqual(section.instructor, "Smith, Jane")
+        self.assertEqual(section.room, "WILLARD 062")
+        self.assertEqual(section.class_capacity, 100)
+        self.assertEqual(section.enrollment_total, 100)
+        self.assertEqual(section.status, "Closed")
+        self.assertEqual(self.scraper.stats['reused_courses'], 1)
+
+    def test_refresh_picks_up_waitlist_change(self):
+        """Test enrollment-only refresh re-reads waitlists even when the listing row showed status and seats"""
+        previous_section = SectionInfo(section="001", class_number="12345", status="Closed", class_capacity=40,
+                                       enrollment_total=40, waitlist_capacity=15, waitlist_total=3,
+                                       scrape_timestamp="2025-01-01T00:00:00")
+        previous = {"CMPSC 131": OptimizedCourseData(course_info=CourseInfo(course_code="CMPSC 131"),
+                                                     sections=[previous_section])}
+        
+        listed = SectionInfo(section="001", class_number="12345", status="Closed", class_capacity=40,
+                             enrollment_total=40, course_url="showClassDetails(2258,12345)")
+        listed.course_code = "CMPSC 131"
+        detail = ("<div>Class Capacity: 40 Enrollment Total: 40 Available Seats: 0 "
+                  "Wait List Capacity: 15 Wait List Total: 7 Status: Closed</div>")
+        
+        def fake_discover(campus_filter, max_subjects=None):
+            self.scraper.organize_sections_by_course([listed])
+        
+        with patch.object(self.scraper, 'discover_sections', side_effect=fake_discover), \
+             patch.object(self.scraper, 'fetch_class_detail', return_value=detail) as mock_fetch:
+            courses_data = self.scraper.refresh_enrollment(previous)
+        
+        mock_fetch.assert_called_once()
+        section = courses_data["CMPSC 131"].sections[0]
+        self.assertEqual(section.waitlist_total, 7)
+        self.assertNotEqual(section.scrape_timestamp, "2025-01-01T00:00:00")
+
+    def test_refresh_takes_waitlist_from_row(self):
+        """Test a results row showing waitlists (zeros included) refreshes them without a detail request"""
+        from lionpath import parse_listing_sections
+
+        def previous_section(class_number, waitlist_total):
+            return SectionInfo(section="001", class_number=class_number, status="Closed", class_capacity=40,
+                               enrollment_total=40, waitlist_capacity=15, waitlist_total=waitlist_total,
+                               scrape_timestamp="2025-01-01T00:00:00")
+
+        previous = {"CMPSC 131": OptimizedCourseData(course_info=CourseInfo(course_code="CMPSC 131"),
+                                                     sections=[previous_section("12345", 3), previous_section("12346", 4)])}
+        html = ''.join(
+            f'<tr><td><a href="javascript:showClassDetails(2258,{n})">CMPSC 131 - 001 - University Park</a></td>'
+            f'<td>Closed</td><td>Class Capacity 40 Enrollment Total 40 Available Seats 0 '
+            f'Wait List Capacity 15 Wait List Total {total}</td></tr>'
+            for n, total in (("12345", 9), ("12346", 0)))
+
+        def fake_discover(campus_filter, max_subjects=None):
+            self.scraper.organize_sections_by_course(parse_listing_sections(html))
+
+        with patch.object(self.scraper, 'discover_sections', side_effect=fake_discover), \
+             patch.object(self.scraper, 'fetch_class_detail') as mock_fetch:
+            courses_data = self.scraper.refresh_enrollment(previous)
+
+        mock_fetch.assert_not_called()
+        sections = {s.class_number: s for s in courses_data["CMPSC 131"].sections}
+        self.assertEqual((sections["12345"].waitlist_total, sections["12346"].waitlist_total), (9, 0))
+        self.assertTrue(all(s.scrape_timestamp != "2025-01-01T00:00:00" for s in sections.values()))
+
+    def test_section_details_only_for_missing_fields(self):
+        """Test sections whose results row showed status and seats skip the detail request"""
+        listed = SectionInfo(section="001", class_number="12345", status="Open", class_capacity=40,
+                             enrollment_total=38, available_seats=2, course_url="showClassDetails(2258,12345)")
+        bare = SectionInfo(section="002", class_number="12346", course_url="showClassDetails(2258,12346)")
+        detail = "<div>Class Capacity: 30 Enrollment Total: 30 Available Seats: 0 Status: Closed</div>"
+        
+        with patch.object(self.scraper, 'fetch_class_detail', return_value=detail) as mock_fetch:
+            self.scraper.get_section_details(Mock(), listed)
+            self.scraper.get_section_details(Mock(), bare)
+        
+        mock_fetch.assert_called_once()
+        self.assertEqual((listed.status, listed.class_capacity), ("Open", 40))
+        self.assertEqual((bare.status, bare.class_capacity, bare.enrollment_total), ("Closed", 30, 30))
+        self.assertEqual(self.scraper.stats['listing_complete_sections'], 1)
+        self.assertEqual(self.scraper.stats['section_detail_requests'], 1)
+    
+    def test_cross_listed_detail_pages_fetched_once(self):
+        """Test courses listing the same classes share one detail page fetch and parse per class"""
+        detail = ('<div>CMPSC 360 DISCRETE MATHEMATICS\nUnits: 3.00\nGrading: Letter Grade\n'
+                  'Class Capacity: 40 Enrollment Total: 38 Available Seats: 2 Status: Open</div>')
+        
+        def course(code, class_numbers):
+            sections = [SectionInfo(class_number=n, course_url=f"showClassDetails(2258,{n})") for n in class_numbers]
+            return OptimizedCourseData(course_info=CourseInfo(course_code=code), sections=sections)
+        
+        courses = {"CMPSC 360": course("CMPSC 360", ["22222", "11111"]),
+                   "MATH 360": course("MATH 360", ["11111", "22222"])}
+        self.scraper.courses_data = dict(courses)
+        with patch.object(self.scraper, 'fetch_class_detail', return_value=detail) as mock_fetch:
+            self.scraper.extract_course_details_parallel(courses)
+        
+        fetched = sorted(call.args[1].class_number for call in mock_fetch.call_args_list)
+        self.assertEqual(fetched, ["11111", "22222"])
+        for code, course_data in self.scraper.courses_data.items():
+            self.assertEqual(course_data.course_info.course_code, code)
+            self.assertEqual(course_data.course_info.units, "3.00")
+            self.assertTrue(all(s.class_capacity == 40 for s in course_data.sections))
+        self.assertEqual(self.scraper.course_flights.stats['shared'], 1)
+
+    def test_cross_listed_copies_with_own_class_numbers(self):
+        """Test cross-listed copies meeting together under distinct class numbers read one course page"""
+        def detail(section):
+            capacity = 40 if section.class_number == "11111" else 25
+            return ('<div>CMPSC 360 DISCRETE MATHEMATICS\nUnits: 3.00\nGrading: Letter Grade\n'
+                    f'Class Capacity: {capacity} Enrollment Total: 20 Available Seats: {capacity - 20} Status: Open</div>')
+
+        def course(code, class_number, room="101 Thomas"):
+            section = SectionInfo(section="001", class_number=class_number, course_url=f"showClassDetails(2258,{class_number})",
+                                  days="MoWeFr", start_time="10:10AM", end_time="11:00AM", room=room, instructor="Smith")
+            course_info = CourseInfo(course_code=code, catalog_number="360")
+            return OptimizedCourseData(course_info=course_info, sections=[section])
+
+        courses = {"CMPSC 360": course("CMPSC 360", "11111"), "MATH 360": course("MATH 360", "33333"),
+                   "EE 360": course("EE 360", "44444", room="202 Sackett")}
+        self.scraper.courses_data = dict(courses)
+        with patch.object(self.scraper, 'fetch_class_detail',
+                          side_effect=lambda session, section: detail(section)) as mock_fetch:
+            self.scraper.extract_course_details_parallel(courses)
+
+        # MATH 360 shares the CMPSC 360 course page and only fetches its own class for enrollment;
+        # EE 360 meets elsewhere, so it is a different course with its own page
+        self.assertEqual(self.scraper.course_flights.stats, {'calls': 2, 'shared': 1})
+        self.assertEqual(sorted(call.args[1].class_number for call in mock_fetch.call_args_list), ["11111", "33333", "44444"])
+        math = self.scraper.courses_data["MATH 360"]
+        self.assertEqual((math.course_info.course_code, math.course_info.units), ("MATH 360", "3.00"))
+        self.assertEqual(math.sections[0].class_capacity, 25)
+        self.assertEqual(self.scraper.courses_data["CMPSC 360"].sections[0].class_capacity, 40)
+
+    def test_oversized_subject_split(self):
+        """Test a subject listing the row cap is searched again in sub-queries and merged on class number"""
+        from lionpath import CAREER_FORM_FIELD, CATALOG_FORM_FIELD
+        from lionpath.planner import RESULT_ROW_CAP
+
+        def page(class_numbers):
+            return ''.join(f'<a href="javascript:showClassDetails(2258,{n})">ENGL 015 - {n % 1000:03d}</a>'
+                           for n in class_numbers)
+
+        def fake_search(session, checkbox_id, criteria=None):
+            if not criteria:
+                return page(range(10000, 10000 + RESULT_ROW_CAP))
+            if criteria[CATALOG_FORM_FIELD] == '299Z':
+                # Lower division still fills a page, so it splits again by career
+                if CAREER_FORM_FIELD not in criteria:
+                    return page(range(10000, 10000 + RESULT_ROW_CAP))
+                return page(range(10000, 10400)) if criteria[CAREER_FORM_FIELD] == 'UGRD' else ''
+            return page(range(10350, 10450))
+
+        subject = {'code': 'ENGL', 'checkbox_id': 'PTS_SELECT$0'}
+        with patch.object(self.scraper, 'search_subject', side_effect=fake_search), \
+             patch.object(self.scraper, 'get_session'), patch.object(self.scraper, 'return_session'):
+            sections = self.scraper._scrape_subject_internal_optimized(Mock(), subject)
+
+        class_numbers = [s.class_number for s in sections]
+        self.assertEqual(len(class_numbers), len(set(class_numbers)))
+        self.assertEqual(set(class_numbers), {str(n) for n in range(10000, 10450)})
+        self.assertEqual(self.scraper.stats['split_subjects'], 1)
+        self.assertEqual(self.scraper.stats['sub_queries'], 2 + 4)
+
+    def test_oversized_batch_searches_subjects_alone(self):
+        """Test a batched search that hits the row cap is repeated per subject instead of split as listed"""
+        from lionpath.planner import RESULT_ROW_CAP
+
+        def page(course_code, class_numbers):
+            return ''.join(f'<a href="javascript:showClassDetails(2258,{n})">{course_code} - {n % 1000:03d}</a>'
+                           for n in class_numbers)
+
+        subjects = {'PTS_SELECT$0': ('A-I 285', range(10000, 10200)), 'PTS_SELECT$1': ('ASTRO 001', range(20000, 20150))}
+        batch = [{'code': 'A-I', 'checkbox_id': 'PTS_SELECT$0'}, {'code': 'ASTRO', 'checkbox_id': 'PTS_SELECT$1'}]
+        capped = page('A-I 285', range(10000, 10000 + RESULT_ROW_CAP))
+        with patch.object(self.scraper, 'search_subjects', return_value=capped), \
+             patch.object(self.scraper, 'search_subject', side_effect=lambda session, checkbox_id: page(*subjects[checkbox_id])), \
+             patch.object(self.scraper, 'get_session'), patch.object(self.scraper, 'return_session'):
+            by_subject = self.scraper.scrape_subject_batch(batch)
+
+        self.assertEqual({code: len(sections) for code, sections in by_subject.items()}, {'A-I': 200, 'ASTRO': 150})
+        self.assertEqual(self.scraper.stats['subject_searches'], 2)
 
 
 class TestSaveOptimizedResults(unittest.TestCase):
@@ -375,6 +612,1350 @@ class TestSaveOptimizedResults(unittest.TestCase):
             self.assertIn("course_code", content)
             self.assertIn("TEST 101", content)
             self.assertIn("001", content)
+    
+    def test_record_serializer_matches_asdict(self):
+        """Test the field-walking serializer produces the same record as asdict"""
+        from dataclasses import asdict
+        from scraper_optimized import course_data_to_record
+        
+        course_data = self.courses_data["TEST 101"]
+        course_data.sections[0].reserve_capacity = [{"reserved_for": "Majors", "capacity": 10}]
+        course_data.sections[0].course_code = "TEST 101"  # temporary grouping attribute
+        
+        record = course_data_to_record(course_data)
+        
+        self.assertEqual(record["course"], asdict(course_data.course_info))
+        self.assertEqual(record["sections"], [asdict(s) for s in course_data.sections])
+        self.assertEqual(record["stats"]["total_capacity"], 30)
+    
+    def test_save_as_jsonl_without_orjson(self):
+        """Test the stdlib fallback writes the same bytes as the orjson path"""
+        from lionpath import writers
+        
+        self.courses_data["TEST 101"].course_info.course_title = "Café Études"
+        fast_file = os.path.join(self.temp_dir, "fast.jsonl")
+        stdlib_file = os.path.join(self.temp_dir, "stdlib.jsonl")
+        
+        save_optimized_results(self.courses_data, fast_file, "jsonl")
+        with patch.object(writers, "orjson", None):
+            save_optimized_results(self.courses_data, stdlib_file, "jsonl")
+        
+        with open(fast_file, 'rb') as f1, open(stdlib_file, 'rb') as f2:
+            self.assertEqual(json.loads(f1.read()), json.loads(f2.read()))
+        with open(stdlib_file, encoding='utf-8') as f:
+            self.assertIn("Café Études", f.read())
+    
+    def test_save_compressed_jsonl(self):
+        """Test .jsonl.gz/.jsonl.zst output is compressed and streams back"""
+        from compressed_io import iter_jsonl_records, zstandard
+        
+        suffixes = [".jsonl.gz"] + ([".jsonl.zst"] if zstandard is not None else [])
+        for suffix in suffixes:
+            output_file = os.path.join(self.temp_dir, "test" + suffix)
+            save_optimized_results(self.courses_data, output_file, "jsonl", compression_level=3)
+            
+            with open(output_file, 'rb') as f:
+                self.assertNotIn(b"TEST 101", f.read())
+            
+            records = list(iter_jsonl_records(output_file))
+            self.assertEqual(len(records), 1)
+            self.assertEqual(records[0]["course"]["course_code"], "TEST 101")
+    
+    def test_validate_compressed_jsonl(self):
+        """Test the validator accepts a compressed snapshot"""
+        from validate_jsonl import validate_jsonl
+        
+        output_file = os.path.join(self.temp_dir, "test.jsonl.gz")
+        save_optimized_results(self.courses_data, output_file, "jsonl")
+        
+        with patch('builtins.print'):
+            self.assertTrue(validate_jsonl(output_file))
+    
+    def test_save_as_sqlite(self):
+        """Test saving as an indexed SQLite database"""
+        import sqlite3
+        
+        section = self.courses_data["TEST 101"].sections[0]
+        section.days = "MoWeFr"
+        section.times = "1:25PM - 2:15PM"
+        section.campus = "UP"
+        section.status = "Open"
+        section.reserve_capacity = [{"reserved_for": "Majors", "capacity": 10}]
+        # The same class listed again, plus unscheduled sections that must not get meeting rows
+        self.courses_data["TEST 101"].sections += [
+            SectionInfo(section="001", class_number="12345", days="MoWeFr", times="1:25PM - 2:15PM"),
+            SectionInfo(section="002", class_number="12346", days="TBA", times="1:25PM - 2:15PM"),
+            SectionInfo(section="003", class_number="12347", days="ARR"),
+        ]
+        
+        output_file = os.path.join(self.temp_dir, "test.sqlite")
+        save_optimized_results(self.courses_data, output_file, "sqlite")
+        
+        conn = sqlite3.connect(output_file)
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT s.class_number FROM sections s "
+                "JOIN courses c ON c.course_code = s.course_code "
+                "JOIN meetings m ON m.class_number = s.class_number "
+                "WHERE c.subject = 'TEST' AND s.status = 'Open' "
+                "AND m.day = 'We' AND m.start_minutes >= 720"
+            ).fetchall()
+            self.assertEqual(rows, [("12345",)])
+            
+            days = [r[0] for r in conn.execute("SELECT day FROM meetings ORDER BY rowid")]
+            self.assertEqual(days, ["Mo", "We", "Fr"])
+            
+            reserve = conn.execute("SELECT reserved_for, capacity FROM reserve_capacity").fetchall()
+            self.assertEqual(reserve, [("Majors", 10)])
+            
+            indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            self.assertIn("idx_sections_class_number", indexes)
+            self.assertIn("idx_meetings_day_start", indexes)
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        finally:
+            conn.close()
+
+
+class TestSnapshotDelta(unittest.TestCase):
+    """Test delta snapshots between scrapes"""
+    
+    def setUp(self):
+        """Build a base snapshot and a modified new snapshot"""
+        self.temp_dir = tempfile.mkdtemp()
+        
+        def record(course_code, sections):
+            return {
+                "course": {"course_code": course_code, "course_title": "Title", "last_updated": "t0"},
+                "sections": sections,
+                "stats": {}
+            }
+        
+        def section(class_number, enrolled):
+            return {"class_number": class_number, "section": "001", "campus": "UP",
+                    "class_capacity": 30, "enrollment_total": enrolled,
+                    "available_seats": 30 - enrolled, "scrape_timestamp": "t0"}
+        
+        self.base = {
+            "CMPSC 131": record("CMPSC 131", [section("1", 10), section("2", 20)]),
+            "MATH 140": record("MATH 140", [section("3", 5)]),
+            "OLD 100": record("OLD 100", [section("4", 1)]),
+        }
+        self.new = json.loads(json.dumps(self.base))
+        self.new["CMPSC 131"]["sections"][0]["enrollment_total"] = 12
+        self.new["CMPSC 131"]["sections"][0]["available_seats"] = 18
+        self.new["CMPSC 131"]["sections"].append(section("5", 0))
+        self.new["MATH 140"]["sections"][0]["scrape_timestamp"] = "t1"
+        del self.new["OLD 100"]
+        self.new["NEW 200"] = record("NEW 200", [section("6", 3)])
+    
+    def tearDown(self):
+        """Clean up temp files"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_compute_delta_is_compact(self):
+        """Test only added, removed and changed fields are recorded"""
+        from snapshot_delta import compute_delta
+        
+        operations = {op["course_code"]: op for op in compute_delta(self.base, self.new)}
+        
+        self.assertEqual(set(operations), {"CMPSC 131", "NEW 200", "OLD 100"})
+        self.assertEqual(operations["OLD 100"]["op"], "remove")
+        self.assertEqual(operations["NEW 200"]["op"], "add")
+        change = operations["CMPSC 131"]
+        self.assertEqual(change["sections_changed"], {"1": {"enrollment_total": 12, "available_seats": 18}})
+        self.assertEqual([s["class_number"] for s in change["sections_added"]], ["5"])
+        self.assertNotIn("course", change)
+    
+    def test_rebuild_from_base_plus_deltas(self):
+        """Test a base plus a chain of delta files rebuilds the newest snapshot"""
+        from snapshot_delta import write_delta, rebuild_snapshot, save_snapshot, snapshot_digest, apply_delta, compute_delta
+        
+        newer = json.loads(json.dumps(self.new))
+        newer["MATH 140"]["sections"] = []
+        
+        base_file = os.path.join(self.temp_dir, "base.jsonl.gz")
+        save_snapshot(self.base, base_file)
+        write_delta(self.base, self.new, os.path.join(self.temp_dir, "d1.jsonl.gz"))
+        write_delta(self.new, newer, os.path.join(self.temp_dir, "d2.jsonl.gz"))
+        
+        rebuilt = rebuild_snapshot(base_file, [os.path.join(self.temp_dir, "d1.jsonl.gz"),
+                                               os.path.join(self.temp_dir, "d2.jsonl.gz")])
+        
+        self.assertEqual(snapshot_digest(rebuilt), snapshot_digest(newer))
+        self.assertEqual(rebuilt["CMPSC 131"]["stats"]["total_enrollment"], 32)
+        self.assertEqual([s["class_number"] for s in rebuilt["CMPSC 131"]["sections"]], ["1", "2", "5"])
+        self.assertEqual(rebuilt["MATH 140"]["sections"], [])
+        # The in-memory base is left untouched
+        self.assertEqual(apply_delta(self.base, [])["CMPSC 131"]["sections"][0]["enrollment_total"], 10)
+        self.assertEqual(len(compute_delta(newer, rebuilt)), 0)
+    
+    def test_rebuild_rejects_wrong_base(self):
+        """Test applying a delta to a snapshot it was not computed from fails"""
+        from snapshot_delta import write_delta, rebuild_snapshot, save_snapshot
+        
+        base_file = os.path.join(self.temp_dir, "new.jsonl")
+        save_snapshot(self.new, base_file)
+        write_delta(self.base, self.new, os.path.join(self.temp_dir, "d1.jsonl"))
+        
+        with self.assertRaises(ValueError):
+            rebuild_snapshot(base_file, [os.path.join(self.temp_dir, "d1.jsonl")])
+
+
+class TestLionPathCore(unittest.TestCase):
+    """Test the shared lionpath core used by every scraper profile"""
+    
+    def test_profiles_share_engine(self):
+        """Test all five scraper entry points are built on the same fetch engine"""
+        from lionpath import LionPathEngine
+        import scraper
+        import scraper_enhanced
+        import scraper_enhanced_v2
+        import scraper_comprehensive
+        
+        profiles = [
+            scraper.HighPerformanceLionPathScraper,
+            scraper_enhanced.EnhancedLionPathScraper,
+            scraper_enhanced_v2.OptimizedLionPathScraper,
+            scraper_comprehensive.ComprehensiveLionPathScraper,
+            OptimizedLionPathScraper,
+        ]
+        for profile in profiles:
+            self.assertTrue(issubclass(profile, LionPathEngine), profile.__name__)
+            for method in ('get_session', 'rate_limited_request', 'get_all_subjects'):
+                self.assertIs(getattr(profile, method), getattr(LionPathEngine, method),
+                              f"{profile.__name__}.{method}")
+    
+    def test_parse_subject_list(self):
+        """Test subject parsing handles both quote styles and drops duplicates"""
+        from lionpath import parse_subject_list
+        
+        html = """
+        <label for='PTS_SELECT$1' id='PTS_SELECT_LBL$1' class='ps-label'>MATH / Mathematics</label>
+        <label for="PTS_SELECT$0" id="PTS_SELECT_LBL$0">A-I / Artificial Intelligence</label>
+        <label for='PTS_SELECT$2' id='PTS_SELECT_LBL$2'>MATH / Mathematics</label>
+        """
+        subjects = parse_subject_list(html)
+        
+        self.assertEqual([s['code'] for s in subjects], ['A-I', 'MATH'])
+        self.assertEqual(subjects[0]['checkbox_id'], 'PTS_SELECT$0')
+    
+    def test_subject_list_scan(self):
+        """Test the subject scan reads ids, for attributes and titles, and stays fast on malformed pages"""
+        from lionpath import parse_subject_list
+        
+        html = """
+        <input type="checkbox" id="PTS_SELECT$4" title="ENGL / English &amp; Literature">
+        <input type=checkbox id=PTS_SELECT$5><label id=PTS_SELECT_LBL$5>CMPSC / Computer Science</label>
+        <label data-for="PTS_SELECT$9" for="PTS_SELECT$6">Not a subject</label>
+        """
+        subjects = {s['code']: s for s in parse_subject_list(html)}
+        self.assertEqual(sorted(subjects), ['CMPSC', 'ENGL'])
+        self.assertEqual(subjects['ENGL']['name'], 'English & Literature')
+        self.assertEqual(subjects['CMPSC']['checkbox_id'], 'PTS_SELECT$5')
+        
+        # Each of these took the old backreference patterns seconds at a few KB
+        hostile = [
+            '<input id="PTS_SELECT$1" type="checkbox">' * 50000,
+            '<input id="PTS_SELECT$1" ' * 80000,
+            '<input id="PTS_SELECT$7">' + '<label id="PTS_SELECT_LBL$7">X' * 60000,
+        ]
+        for page in hostile:
+            start = time.perf_counter()
+            self.assertEqual(parse_subject_list(page), [])
+            self.assertLess(time.perf_counter() - start, 2.0)
+    
+    def test_page_scanners_stay_linear(self):
+        """Test the link and hidden field scanners on well-formed and hostile pages"""
+        from lionpath import extract_form_data, find_section_links, parse_listing_sections
+        
+        html = '''
+        <a href="javascript:showClassDetails(2258,12345)" class="ps-link">CMPSC 131 - 001</a>
+        <a href="javascript:showClassDetails(2258,67890)"></a>
+        <input name="ICSID" type="hidden" value="abc">
+        <input type='hidden' name='ICStateNum' value='7'>
+        <input type="text" name="ICType" value="Panel">
+        '''
+        self.assertEqual(find_section_links(html), [('2258', '12345', 'CMPSC 131 - 001')])
+        self.assertEqual(extract_form_data(html), {'ICSID': 'abc', 'ICStateNum': '7', 'ICType': 'Panel'})
+        
+        hostile = [
+            'javascript:showClassDetails(1,2)' * 40000,
+            '<input type="hidden" name="x" ' * 40000,
+            '<' * 500000,
+        ]
+        for page in hostile:
+            start = time.perf_counter()
+            find_section_links(page)
+            parse_listing_sections(page)
+            extract_form_data(page)
+            self.assertLess(time.perf_counter() - start, 2.0)
+    
+    def test_listing_row_fields(self):
+        """Test results rows fill status, seats, meeting time, room and instructor by element id or by label"""
+        from lionpath import listing_missing_fields, parse_listing_sections
+        
+        html = '''<tr><td><a href="javascript:showClassDetails(2258,12345)">CMPSC 131 - 001 - University Park</a></td>
+        <td><div id="win0divMTG_DAYTIME$0"><span id="MTG_DAYTIME$0">MoWeFr 10:10AM - 11:00AM</span></div></td>
+        <td><span id="MTG_ROOM$0">Willard Bldg 062</span></td><td><span id="MTG_INSTR$0">Jane Smith<br>John Doe</span></td>
+        <td><div id="DERIVED_CLSRCH_SSR_STATUS_LONG$0"><img src="open.gif" alt="Open"></div></td><td>38/40</td></tr>
+        <tr><td><span id="MTG_CLASS_NBR$1">12346</span></td><td><span id="MTG_ROOM$1">Next Row</span></td>
+        <td><a href="javascript:showClassDetails(2258,12346)">CMPSC 131 - 002 - University Park</a></td>
+        <td>Days &amp; Times</td><td>TuTh 1:35PM - 2:50PM</td><td>Room: Thomas 102</td>
+        <td>Instructor:</td><td>Staff</td><td>Closed</td></tr>'''
+        first, second = parse_listing_sections(html)
+        
+        self.assertEqual((first.status, first.enrollment_total, first.class_capacity, first.available_seats),
+                         ('Open', 38, 40, 2))
+        self.assertEqual((first.days, first.times, first.start_minutes, first.end_minutes),
+                         ('MoWeFr', '10:10AM - 11:00AM', 610, 660))
+        self.assertEqual((first.room, first.instructor), ('Willard Bldg 062', 'Jane Smith, John Doe'))
+        self.assertEqual(listing_missing_fields(first), [])
+        
+        self.assertEqual((second.status, second.days, second.end_time), ('Closed', 'TuTh', '2:50PM'))
+        self.assertEqual((second.room, second.instructor), ('Thomas 102', 'Staff'))
+        self.assertEqual(listing_missing_fields(second), ['class_capacity'])
+    
+    def test_regex_audit(self):
+        """Test every registered parser pattern passes the backtracking audit, which catches a nested repeat"""
+        from lionpath import audit_pattern, audit_registered
+        
+        results = audit_registered(sizes=(256, 1024), bound=1.0)
+        self.assertGreater(len(results), 10)
+        for name, result in results.items():
+            self.assertTrue(result['ok'], f"{name}: {result['error']}")
+        
+        result = audit_pattern(r'(a+)+b', sizes=(16, 64), bound=0.2)
+        self.assertFalse(result['ok'])
+        self.assertFalse(audit_pattern(r'[^]+?')['ok'])
+    
+    def test_guarded_pattern_budget(self):
+        """Test a call over its budget is recorded but later calls still match"""
+        from lionpath.regex_guard import GuardedPattern
+        
+        pattern = GuardedPattern('test_budget', r'(\d+)', budget=0.0)
+        pattern.timed = None  # the stdlib re path, whether or not the regex module is installed
+        self.assertEqual(pattern.findall('a1b22'), ['1', '22'])
+        self.assertEqual(pattern.findall('a3b44'), ['3', '44'])
+        self.assertEqual(pattern.search('x5y66').group(1), '5')
+        self.assertEqual(pattern.metrics['calls'], 3)
+        self.assertEqual(pattern.metrics['aborted'], 0)
+        self.assertGreaterEqual(pattern.metrics['overruns'], 1)
+    
+    def test_guarded_pattern_input_limit(self):
+        """Test the stdlib re path refuses text over its length limit instead of running unbounded"""
+        from lionpath.regex_guard import GuardedPattern
+        
+        pattern = GuardedPattern('test_limit', r'(\d+)', max_chars=10)
+        pattern.timed = None
+        self.assertEqual(pattern.findall('a1b22'), ['1', '22'])
+        self.assertEqual(pattern.findall('a1' * 10), [])
+        self.assertIsNone(pattern.search('x5' * 10))
+        self.assertEqual(pattern.sub('', 'a1' * 10), 'a1' * 10)
+        self.assertEqual(pattern.metrics['calls'], 4)
+        self.assertEqual(pattern.metrics['aborted'], 3)
+        self.assertEqual(pattern.search('x5y66').group(1), '5')
+    
+    def test_slow_call_does_not_suppress_matches(self):
+        """Test one overrun on a detail page check leaves later pages of any length recognized"""
+        from lionpath.parsers import DETAIL_CONTENT_PATTERN, detail_page_is_empty
+        
+        page = '<div>' + 'x' * 5000 + 'Class Capacity: 40</div>'
+        self.assertFalse(detail_page_is_empty(page))
+        # The stdlib re path, which cannot abort, overruns a zero budget
+        with patch.object(DETAIL_CONTENT_PATTERN, 'budget', 0.0), patch.object(DETAIL_CONTENT_PATTERN, 'timed', None):
+            self.assertFalse(detail_page_is_empty(page))
+        self.assertGreaterEqual(DETAIL_CONTENT_PATTERN.metrics['overruns'], 1)
+        self.assertFalse(detail_page_is_empty(page + ' ' * 1000))
+    
+    def test_subject_batches(self):
+        """Test small subjects are packed into shared searches and their sections split back out"""
+        from lionpath.planner import plan_subject_batches, split_sections_by_subject
+        
+        subjects = [{'code': code, 'checkbox_id': f'PTS_SELECT${i}'}
+                    for i, code in enumerate(['ENGL', 'A-I', 'E E', 'ASTRO', 'EMPTY', 'NEW'])]
+        self.assertEqual(plan_subject_batches(subjects, {}), [[s] for s in subjects])
+        
+        # NEW is missing from the history (new, or failed last run), so it is not assumed to be small
+        batches = plan_subject_batches(subjects, {'ENGL': 400, 'A-I': 3, 'E E': 10, 'ASTRO': 8, 'EMPTY': 0}, budget=15)
+        codes = sorted(sorted(s['code'] for s in batch) for batch in batches)
+        self.assertEqual(codes, [['A-I', 'E E', 'EMPTY'], ['ASTRO'], ['ENGL'], ['NEW']])
+        
+        listed = []
+        for course_code, class_number in [('E E 210', '1'), ('A-I 285', '2'), ('MATH 140', '3')]:
+            section = SectionInfo(class_number=class_number)
+            section.course_code = course_code
+            listed.append(section)
+        split = split_sections_by_subject(listed, ['A-I', 'E E'])
+        self.assertEqual({code: [s.class_number for s in v] for code, v in split.items()}, {'A-I': ['2'], 'E E': ['1']})
+
+    def test_subject_counts_file(self):
+        """Test the subject counts written next to an output are preferred over counting the snapshot"""
+        from lionpath.planner import save_subject_counts, subject_section_counts, subjects_path
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, 'courses.jsonl.gz')
+            self.assertEqual(subjects_path(output_file), os.path.join(temp_dir, 'courses.jsonl.subjects.json'))
+            save_subject_counts(subjects_path(output_file), {'EMPTY': 0, 'MATH': 310})
+            self.assertEqual(subject_section_counts(output_file), {'EMPTY': 0, 'MATH': 310})
+
+    def test_single_flight(self):
+        """Test concurrent callers of one key share a single call, and a failed call is retried"""
+        import threading
+        from lionpath import SingleFlight
+        
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+        
+        def load(key):
+            calls.append(key)
+            release.wait(5)
+            return key.upper()
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do('a', load, 'a'))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while flights.stats['shared'] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual((calls, results), (['a'], ['A'] * 4))
+        self.assertEqual(flights.do('a', load, 'a'), 'A')
+        
+        with self.assertRaises(ValueError):
+            flights.do('b', int, 'x')
+        self.assertNotIn('b', flights)
+        self.assertEqual(flights.do('b', int, '7'), 7)
+    
+    def test_split_criteria(self):
+        """Test oversized searches split by catalog number, then by career, and merge on class number"""
+        from lionpath import CAREERS, CAREER_FORM_FIELD, CATALOG_FORM_FIELD
+        from lionpath.planner import RESULT_ROW_CAP, is_oversized_page, merge_sections, split_criteria
+
+        by_catalog = split_criteria({})
+        self.assertEqual([part[CATALOG_FORM_FIELD] for part in by_catalog], ['299Z', '300'])
+        # Suffixed catalog numbers fall in exactly one half under PeopleSoft's string comparison
+        for number in ('015', '299', '299H', '299W', '300', '300H', '497A'):
+            lower = number <= by_catalog[0][CATALOG_FORM_FIELD]
+            upper = number >= by_catalog[1][CATALOG_FORM_FIELD]
+            self.assertTrue(lower != upper, number)
+        by_career = split_criteria(by_catalog[1])
+        self.assertEqual(len(by_career), len(CAREERS))
+        self.assertTrue(all(part[CATALOG_FORM_FIELD] == '300' and part[CAREER_FORM_FIELD] for part in by_career))
+        self.assertEqual(split_criteria(by_career[0]), [])
+
+        self.assertTrue(is_oversized_page('', [SectionInfo()] * RESULT_ROW_CAP))
+        self.assertFalse(is_oversized_page('<html></html>', [SectionInfo()]))
+
+        first = SectionInfo(class_number='1', section='001')
+        merged = merge_sections([first, SectionInfo(class_number='2')],
+                                [SectionInfo(class_number='1', section='dup'), SectionInfo(class_number='3')])
+        self.assertEqual([s.class_number for s in merged], ['1', '2', '3'])
+        self.assertIs(merged[0], first)
+
+    def test_campus_filter(self):
+        """Test the shared University Park filter"""
+        from lionpath import is_university_park
+        
+        self.assertTrue(is_university_park("UP", "001"))
+        self.assertTrue(is_university_park("", "002"))
+        self.assertFalse(is_university_park("World Campus", "001"))
+        self.assertFalse(is_university_park("", "001W"))
+        self.assertFalse(is_university_park("Berks", "001"))
+    
+    def test_term_parsing(self):
+        """Test STRM parsing, naming and per-term output paths"""
+        from lionpath import parse_term, parse_terms, term_name, term_output_path
+        
+        self.assertEqual(parse_term("2258"), "2258")
+        self.assertEqual(parse_term("spring 2026"), "2262")
+        self.assertEqual(parse_terms("Fall 2025, 2262,2258"), ["2258", "2262"])
+        self.assertEqual(term_name("2265"), "Summer 2026")
+        self.assertEqual(term_output_path("out/courses.jsonl.gz", "2262"), "out/courses_2262.jsonl.gz")
+        with self.assertRaises(ValueError):
+            parse_term("Winter 2026")
+    
+    def test_detect_career(self):
+        """Test career detection from the listing label and the catalog number"""
+        from lionpath import detect_career, career_code
+        
+        self.assertEqual(detect_career("140"), "UGRD")
+        self.assertEqual(detect_career("597A"), "GRAD")
+        self.assertEqual(detect_career("963", "LAW 963 - 001 - Career: Law"), "LAW")
+        self.assertEqual(career_code("Graduate"), "GRAD")
+        self.assertEqual(career_code("unknown"), "")
+    
+    def test_detail_page_single_pass(self):
+        """Test detail fields come from one label map and the page text is extracted once"""
+        from bs4 import BeautifulSoup
+        from lionpath import DetailPage, extract_field_value
+        import scraper
+        
+        html = """
+        <span class="PALEVEL0SECONDARY">CMPSC 131 - Programming and Computation I</span>
+        <table>
+          <tr><td><span>Units</span></td><td>3.00 units</td></tr>
+          <tr><td><span>Grading Basis:</span></td><td>Letter Grade</td></tr>
+          <tr><td><label>Class Status</label></td><td>Open</td></tr>
+          <tr><td><span>Add Consent</span></td><td>No Special Consent Required</td></tr>
+        </table>
+        <div>MoWeFr 10:10AM - 11:00AM Class Capacity: 40 Enrollment Total: 38 General Education: GQ</div>
+        """
+        page = DetailPage(html)
+        self.assertEqual(page.field(['Grading Basis', 'Grading']), 'Letter Grade')
+        self.assertEqual(page.field(['Status', 'Class Status']), 'Open')
+        self.assertEqual(page.field(['Drop Consent']), '')
+        self.assertEqual(extract_field_value(BeautifulSoup(html, 'html.parser'), ['Units']), '3.00 units')
+        
+        profile = scraper.HighPerformanceLionPathScraper(max_workers=1, max_detail_workers=1)
+        with patch.object(BeautifulSoup, 'get_text', autospec=True, side_effect=BeautifulSoup.get_text) as get_text:
+            course = profile.parse_detailed_course_info(html, scraper.CourseDetails(course_code='CMPSC 131'))
+        
+        self.assertEqual(sum(1 for call in get_text.call_args_list if isinstance(call.args[0], BeautifulSoup)), 1)
+        self.assertEqual(course.course_title, 'Programming and Computation I')
+        self.assertEqual(course.units, '3.00')
+        self.assertEqual(course.status, 'Open')
+        self.assertEqual(course.add_consent, 'No Special Consent Required')
+        self.assertEqual(course.start_time, '10:10AM')
+        self.assertEqual(course.class_capacity, 40)
+        self.assertEqual(course.class_attributes, ['GQ'])
+    
+    def test_detail_fetch_retries_career_only_when_empty(self):
+        """Test one detail request per class, with other careers tried only after an empty page"""
+        scraper = OptimizedLionPathScraper(delay=0, max_workers=1, max_detail_workers=1)
+        pages = {"GRAD": "<td>Class Number</td><td>54321</td>"}
+        
+        with patch.object(scraper, 'fetch_class_detail_page',
+                          side_effect=lambda session, strm, nbr, career: pages.get(career)) as fetch:
+            html = scraper.fetch_class_detail_any_career(None, "2258", "54321", "UGRD")
+            self.assertIn("54321", html)
+            self.assertEqual([c.args[3] for c in fetch.call_args_list], ["UGRD", "GRAD"])
+            
+            fetch.reset_mock()
+            scraper.fetch_class_detail_any_career(None, "2258", "54321", "UGRD")
+            self.assertEqual([c.args[3] for c in fetch.call_args_list], ["GRAD"])
+
+            # The same class number in another term is a different class; its career is not carried over
+            fetch.reset_mock()
+            scraper.fetch_class_detail_any_career(None, "2262", "54321", "UGRD")
+            self.assertEqual([c.args[3] for c in fetch.call_args_list], ["UGRD", "GRAD"])
+
+            fetch.reset_mock()
+            pages["UGRD"] = "<td>Class Number</td><td>12345</td>"
+            scraper.fetch_class_detail_any_career(None, "2258", "12345", "UGRD")
+            self.assertEqual(fetch.call_count, 1)
+    
+    def test_scrape_terms_keyed_by_term(self):
+        """Test a multi-term run posts each STRM, reuses the subject list and keys results by term"""
+        from lionpath import TERM_FORM_FIELD
+        
+        scraper = OptimizedLionPathScraper(delay=0, max_workers=1, max_detail_workers=1)
+        posted_terms = []
+    
+        def fake_request(method, url, **kwargs):
+            response = Mock(status_code=404, text='')
+            if 'data' in kwargs:
+                strm = kwargs['data'][TERM_FORM_FIELD]
+                posted_terms.append(strm)
+                response.status_code = 200
+                response.text = f'<a href="javascript:showClassDetails({strm},1{strm})">MATH 140 - 001 - University Park</a>'
+            return response
+        
+        subjects = [{'code': 'MATH', 'name': 'Mathematics', 'checkbox_id': 'PTS_SELECT$0'}]
+        with patch.object(scraper, 'fetch_subjects', return_value=subjects) as fetch_subjects, \
+             patch.object(scraper, 'fetch_search_page', return_value=Mock(text='')), \
+             patch.object(scraper, 'rate_limited_request', side_effect=fake_request):
+            results = scraper.scrape_terms(["2258", "2262"], campus_filter="UP")
+        
+        self.assertEqual(fetch_subjects.call_count, 1)
+        self.assertEqual(posted_terms, ["2258", "2262"])
+        self.assertEqual(list(results), ["2258", "2262"])
+        self.assertEqual(results["2258"]["MATH 140"].course_info.semester, "Fall 2025")
+        self.assertEqual(results["2262"]["MATH 140"].course_info.semester, "Spring 2026")
+        self.assertEqual(results["2262"]["MATH 140"].sections[0].class_number, "12262")
+
+
+class TestEnrollmentWatch(unittest.TestCase):
+    """Test the enrollment watch poller"""
+    
+    def detail_page(self, enrolled, capacity=30):
+        """Minimal class detail page with enrollment numbers"""
+        status = "Closed" if enrolled >= capacity else "Open"
+        return (f"<td>Class Number</td><td>12345</td><td>Status</td><td>{status}</td>"
+                f"<td>Class Capacity</td><td>{capacity}</td><td>Enrollment Total</td><td>{enrolled}</td>"
+                f"<td>Available Seats</td><td>{capacity - enrolled}</td>")
+    
+    def test_poll_interval_prioritizes_full_sections(self):
+        """Test full sections are polled at the minimum interval and roomy ones at the maximum"""
+        from lionpath.watch import poll_interval
+        
+        full = SectionInfo(class_capacity=30, enrollment_total=30, available_seats=0)
+        nearly_full = SectionInfo(class_capacity=100, enrollment_total=95, available_seats=5)
+        roomy = SectionInfo(class_capacity=30, enrollment_total=10, available_seats=20)
+        
+        self.assertEqual(poll_interval(full, 2, 60), 2)
+        self.assertLess(poll_interval(nearly_full, 2, 60), 60)
+        self.assertEqual(poll_interval(roomy, 2, 60), 60)
+    
+    def test_watchers_share_polls_and_emit_seat_events(self):
+        """Test duplicate watches poll once and seat changes are written as JSON lines"""
+        import io
+        from lionpath import LionPathEngine
+        from lionpath.watch import EnrollmentWatcher
+        
+        engine = LionPathEngine(pool_size=1)
+        events = io.StringIO()
+        watcher = EnrollmentWatcher(engine, min_interval=2, max_interval=60, max_workers=2, events=events)
+        watcher.watch("12345", "2258", watcher="alice", course_code="CMPSC 131")
+        watcher.watch("12345", "2258", watcher="bob", course_code="CMPSC 131")
+        self.assertEqual(len(watcher.entries), 1)
+        
+        pages = [self.detail_page(30), self.detail_page(29), self.detail_page(30)]
+        with patch.object(engine, 'fetch_class_detail_any_career', side_effect=pages) as fetch:
+            self.assertEqual(watcher.poll_due(now=0), [])
+            self.assertEqual(watcher.poll_due(now=1), [])
+            opened = watcher.poll_due(now=2)
+            closed = watcher.poll_due(now=20)
+        
+        self.assertEqual(fetch.call_count, 3)
+        self.assertEqual(opened[0]['event'], 'seats_opened')
+        self.assertEqual(opened[0]['available_seats'], 1)
+        self.assertEqual(closed[0]['event'], 'seats_closed')
+        lines = [json.loads(line) for line in events.getvalue().splitlines()]
+        self.assertEqual([e['event'] for e in lines], ['seats_opened', 'seats_closed'])
+
+    def test_watch_keyed_by_term_and_rewatch_polls_once(self):
+        """Test one class number in two terms is two sections, and an unwatched entry is never polled"""
+        import io
+        from lionpath import LionPathEngine
+        from lionpath.watch import EnrollmentWatcher
+
+        engine = LionPathEngine(pool_size=1)
+        watcher = EnrollmentWatcher(engine, min_interval=2, max_interval=60, max_workers=2, events=io.StringIO())
+        watcher.watch("12345", "2258")
+        watcher.watch("12345", "2262")
+        self.assertEqual(sorted(watcher.entries), [("2258", "12345"), ("2262", "12345")])
+
+        watcher.unwatch("12345", "2262")
+        watcher.unwatch("12345", "2258")
+        watcher.watch("12345", "2258")
+        with patch.object(engine, 'fetch_class_detail_any_career', return_value=self.detail_page(30)) as fetch:
+            watcher.poll_due(now=0)
+        self.assertEqual([call.args[1:3] for call in fetch.call_args_list], [("2258", "12345")])
+
+
+class TestQueryServer(unittest.TestCase):
+    """Test the read-only snapshot query API"""
+    
+    def setUp(self):
+        """Write a small snapshot to serve"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.snapshot = os.path.join(self.temp_dir, "courses.jsonl")
+        self.courses_data = {
+            "CMPSC 131": OptimizedCourseData(
+                course_info=CourseInfo(course_code="CMPSC 131", subject="CMPSC", catalog_number="131",
+                                       class_attributes=["General Education - Quantification (GQ)"]),
+                sections=[SectionInfo(section="001", class_number="11111", instructor="Smith, Jane",
+                                      days="MoWeFr", start_time="10:10AM", end_time="11:00AM"),
+                          # Unscheduled, so never listed under Tuesday despite its times
+                          SectionInfo(section="002", class_number="11112", days="TBA",
+                                      start_time="1:35PM", end_time="2:50PM")]
+            ),
+            "MATH 140": OptimizedCourseData(
+                course_info=CourseInfo(course_code="MATH 140", subject="MATH", catalog_number="140"),
+                sections=[SectionInfo(section="001", class_number="22222", instructor="Lee, Ann",
+                                      days="TuTh", start_time="1:35PM", end_time="2:50PM")]
+            ),
+        }
+        save_optimized_results(self.courses_data, self.snapshot, 'jsonl')
+    
+    def tearDown(self):
+        """Clean up temp files"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_indexed_queries(self):
+        """Test lookups by code, class number, subject, instructor, attribute and meeting time"""
+        from lionpath.serve import SnapshotStore, handle_query
+        
+        index = SnapshotStore(self.temp_dir, reload_interval=0).current()
+        
+        status, body = handle_query(index, '/courses/CMPSC%20131', {})
+        self.assertEqual((status, body['course']['course_code']), (200, "CMPSC 131"))
+        self.assertEqual(handle_query(index, '/sections/22222', {})[1]['course_code'], "MATH 140")
+        self.assertEqual(handle_query(index, '/sections/99999', {})[0], 404)
+        
+        def codes(**params):
+            return handle_query(index, '/courses', dict(params, fields='code'))[1]['results']
+        
+        self.assertEqual(codes(subject='math'), ["MATH 140"])
+        self.assertEqual(codes(instructor='smith'), ["CMPSC 131"])
+        self.assertEqual(codes(attribute='GQ'), ["CMPSC 131"])
+        self.assertEqual(codes(day='Tu', start='13:00', end='15:00'), ["MATH 140"])
+        self.assertEqual(codes(day='Mo', start='11:00'), [])
+        
+        page = handle_query(index, '/courses', {'fields': 'code', 'limit': '1'})[1]
+        self.assertEqual((page['total'], page['results'], page['next_offset']), (2, ["CMPSC 131"], 1))
+    
+    def test_http_etag_and_hot_reload(self):
+        """Test ETag revalidation over HTTP and that a settled new snapshot replaces the index"""
+        import threading
+        import urllib.request
+        import urllib.error
+        from lionpath.serve import SnapshotStore, make_server
+        
+        store = SnapshotStore(self.snapshot, reload_interval=0)
+        server = make_server(store, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/courses/MATH%20140"
+        try:
+            with urllib.request.urlopen(url) as response:
+                etag = response.headers['ETag']
+                self.assertEqual(json.loads(response.read())['course']['course_code'], "MATH 140")
+            
+            request = urllib.request.Request(url, headers={'If-None-Match': etag})
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                urllib.request.urlopen(request)
+            self.assertEqual(cm.exception.code, 304)
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        del self.courses_data["MATH 140"]
+        save_optimized_results(self.courses_data, self.snapshot, 'jsonl')
+        os.utime(self.snapshot, ns=(1, 1))
+        self.assertFalse(store.reload())
+        self.assertTrue(store.reload())
+        self.assertIsNone(store.current().course("MATH 140"))
+    
+    def test_reload_closes_replaced_search_index(self):
+        """Test a replaced index's search index stays open for a request in flight and closes after it"""
+        from lionpath.serve import SnapshotStore
+        
+        save_optimized_results(self.courses_data, self.snapshot, 'jsonl', search_index=True)
+        store = SnapshotStore(self.snapshot, reload_interval=0)
+        with store.reading() as index:
+            self.assertTrue(store.reload(force=True))
+            self.assertIsNot(store.current(), index)
+            self.assertFalse(index.search_index.map.closed)
+            self.assertEqual(index.search_index.search("nonexistentterm"), [])
+        self.assertTrue(index.search_index.map.closed)
+        self.assertEqual(store.readers, {})
+        
+        replaced = store.current()
+        self.assertTrue(store.reload(force=True))
+        self.assertTrue(replaced.search_index.map.closed)
+        store.current().close()
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test the BM25 keyword index written at save time"""
+    
+    def setUp(self):
+        """Save a small catalog with its search index"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.temp_dir, "courses.jsonl.gz")
+        courses = {
+            "CMPSC 131": CourseInfo(course_code="CMPSC 131", course_title="Programming and Computation I",
+                                    course_description="Introduction to programming in Python."),
+            "CMPSC 132": CourseInfo(course_code="CMPSC 132", course_title="Programming and Computation II",
+                                    course_description="Data structures and object oriented programming.",
+                                    enrollment_requirements="Prerequisite: CMPSC 131"),
+            "MATH 140": CourseInfo(course_code="MATH 140", course_title="Calculus With Analytic Geometry I",
+                                   course_description="Functions, limits, derivatives and integrals.",
+                                   class_attributes=["General Education - Quantification (GQ)"]),
+        }
+        self.courses_data = {
+            code: OptimizedCourseData(course_info=info, sections=[SectionInfo(section="001")])
+            for code, info in courses.items()
+        }
+        save_optimized_results(self.courses_data, self.output, 'jsonl', search_index=True)
+    
+    def tearDown(self):
+        """Clean up temp files"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_stemming(self):
+        """Test index and query terms reduce to the same stem"""
+        from lionpath.search import tokenize
+        
+        self.assertEqual(tokenize("Programs"), tokenize("programming"))
+        self.assertEqual(tokenize("Derivatives of the functions"), ["derivativ", "function"])
+    
+    def test_bm25_search(self):
+        """Test ranked keyword search from the memory-mapped index"""
+        from lionpath import SearchIndex, search_index_path
+        
+        index_file = search_index_path(self.output)
+        self.assertTrue(index_file.endswith("courses.jsonl.bm25"))
+        
+        index = SearchIndex(index_file)
+        try:
+            results = index.search("object oriented programs")
+            self.assertEqual(results[0][0], "CMPSC 132")
+            self.assertEqual({code for code, _ in results}, {"CMPSC 131", "CMPSC 132"})
+            self.assertEqual(index.search("GQ derivative")[0][0], "MATH 140")
+            self.assertEqual(index.search("nonexistentterm"), [])
+            
+            # Terms are looked up in the mapped table, not a dict loaded up front
+            from lionpath.search import tokenize
+            self.assertEqual(index.term_entry(tokenize("programming")[0])[1], 2)
+            self.assertIsNone(index.term_entry("nonexistentterm"))
+            self.assertFalse(hasattr(index, 'terms'))
+        finally:
+            index.close()
+
+
+class TestScheduleIndex(unittest.TestCase):
+    """Test normalized meeting times and the time-slot index"""
+    
+    def setUp(self):
+        """Build a small catalog with overlapping meetings"""
+        def section(class_number, days, start, end, building="", room=""):
+            return SectionInfo(class_number=class_number, days=days, start_time=start, end_time=end,
+                               building=building, room=room)
+        
+        self.courses_data = {
+            "CMPSC 131": OptimizedCourseData(course_info=CourseInfo(course_code="CMPSC 131"), sections=[
+                section("1001", "MoWeFr", "10:10AM", "11:00AM", "Westgate", "E201"),
+                section("1002", "TuTh", "1:35PM", "2:50PM", "Westgate", "E201"),
+            ]),
+            "MATH 140": OptimizedCourseData(course_info=CourseInfo(course_code="MATH 140"), sections=[
+                section("2001", "MoWe", "10:35AM", "11:25AM", "Thomas", "102"),
+                section("2002", "MWF", "11:00AM", "11:50AM", "Westgate", "E201"),
+                section("2003", "", "", ""),
+            ]),
+        }
+    
+    def test_normalize_meeting_time(self):
+        """Test text days/times become minutes and a day bitmask"""
+        from lionpath import days_to_mask, mask_to_days, normalize_meeting_time
+        
+        section = normalize_meeting_time(SectionInfo(days="MoWeFr", start_time="10:10AM", end_time="11:00AM"))
+        self.assertEqual((section.start_minutes, section.end_minutes), (610, 660))
+        self.assertEqual(section.day_mask, 0b10101)
+        self.assertEqual(days_to_mask("TR"), days_to_mask("TuTh"))
+        
+        # Unscheduled sections have no meeting days, rather than whatever day letters the label contains
+        from lionpath.parsers import split_meeting_days
+        for unscheduled in ("TBA", "ARR", "Arranged", ""):
+            self.assertEqual(split_meeting_days(unscheduled), [])
+            self.assertEqual(days_to_mask(unscheduled), 0)
+        self.assertEqual(split_meeting_days("Mo We MoFr"), ["Mo", "We", "Fr"])
+        self.assertEqual(mask_to_days(section.day_mask), ["Mo", "We", "Fr"])
+    
+    def test_conflicts(self):
+        """Test overlap detection; back-to-back meetings do not conflict"""
+        from lionpath import ScheduleIndex, sections_conflict
+        
+        index = ScheduleIndex(self.courses_data)
+        self.assertEqual(index.conflicts("1001"), ["2001"])
+        self.assertEqual(index.conflicts("1002"), [])
+        self.assertEqual(index.conflicts("2003"), [])
+        
+        cmpsc, math = self.courses_data["CMPSC 131"].sections, self.courses_data["MATH 140"].sections
+        self.assertTrue(sections_conflict(cmpsc[0], math[0]))
+        self.assertFalse(sections_conflict(cmpsc[0], math[1]))
+        self.assertFalse(sections_conflict(cmpsc[1], math[0]))
+    
+    def test_time_and_room_queries(self):
+        """Test in-session, room occupancy and free-around-busy-block queries"""
+        from lionpath import ScheduleIndex, busy_block
+        
+        index = ScheduleIndex(self.courses_data)
+        self.assertEqual({m.class_number for m in index.meeting_at("Mo", 10 * 60 + 40)}, {"1001", "2001"})
+        self.assertEqual(index.meeting_at("Sa", 600), [])
+        
+        # A TBA section with times listed is not placed on Tuesday (the T of "TBA")
+        tba = OptimizedCourseData(course_info=CourseInfo(course_code="ENGL 015"), sections=[
+            SectionInfo(class_number="3001", days="TBA", start_time="1:35PM", end_time="2:50PM")])
+        with_tba = ScheduleIndex(dict(self.courses_data, **{"ENGL 015": tba}))
+        self.assertEqual({m.class_number for m in with_tba.meeting_at("Tu", 14 * 60)}, {"1002"})
+        
+        occupancy = index.room_occupancy("Westgate", "E201", "Fr")
+        self.assertEqual([m.class_number for m in occupancy], ["1001", "2002"])
+        self.assertTrue(index.room_free("Westgate", "E201", "Fr", 9 * 60, 10 * 60 + 10))
+        self.assertFalse(index.room_free("Westgate", "E201", "Fr", 11 * 60 + 30, 12 * 60))
+        
+        self.assertEqual(index.fits([busy_block("MoWe", 10 * 60 + 30, 11 * 60)]), ["1002", "2002"])
+
+
+class TestPrerequisiteGraph(unittest.TestCase):
+    """Test requirement parsing and the precomputed prerequisite graph"""
+    
+    def setUp(self):
+        """Build a small catalog with a prerequisite chain"""
+        self.temp_dir = tempfile.mkdtemp()
+        requirements = {
+            "MATH 140": "MATH 041 or satisfactory performance on the mathematics placement examination",
+            "MATH 141": "Enforced Prerequisite at Enrollment: MATH 140 or MATH 140H",
+            "CMPSC 131": "",
+            "CMPSC 132": "Prerequisite: CMPSC 131 or 121",
+            "CMPSC 360": "Prerequisite: CMPSC 132 and MATH 141; Enforced Concurrent at Enrollment: CMPSC 221",
+        }
+        self.courses_data = {
+            code: OptimizedCourseData(course_info=CourseInfo(course_code=code, enrollment_requirements=text), sections=[])
+            for code, text in requirements.items()
+        }
+    
+    def tearDown(self):
+        """Clean up temp files"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_parse_prerequisites(self):
+        """Test AND-of-OR groups, bare catalog numbers and dropped corequisites"""
+        from lionpath import parse_prerequisites
+        
+        self.assertEqual(parse_prerequisites("Prerequisite: CMPSC 131 or 121"), [["CMPSC 131", "CMPSC 121"]])
+        self.assertEqual(
+            parse_prerequisites("(MATH 140 or 140H) and (CMPSC 131 or CMPSC 121) Enforced Concurrent at Enrollment: STAT 200"),
+            [["MATH 140", "MATH 140H"], ["CMPSC 131", "CMPSC 121"]]
+        )
+        self.assertEqual(parse_prerequisites("Students must be enrolled in the College of Engineering"), [])
+        self.assertEqual(parse_prerequisites("MATH 140 OR MATH 140H AND CMPSC 131"),
+                         [["MATH 140", "MATH 140H"], ["CMPSC 131"]])
+    
+    def test_closures_and_levels(self):
+        """Test chains, unlocks and levels come from the precomputed arrays"""
+        from lionpath import PrerequisiteGraph
+        
+        graph = PrerequisiteGraph.from_courses(self.courses_data)
+        self.assertEqual(graph.prerequisites("CMPSC 360"), ["CMPSC 132", "MATH 141"])
+        self.assertEqual(graph.prerequisite_chain("CMPSC 360"),
+                         ["CMPSC 121", "CMPSC 131", "CMPSC 132", "MATH 041", "MATH 140", "MATH 140H", "MATH 141"])
+        self.assertEqual(graph.unlocks("MATH 140"), ["MATH 141"])
+        self.assertEqual(graph.leads_to("MATH 140"), ["CMPSC 360", "MATH 141"])
+        # MATH 141 only needs the cheapest alternative: MATH 140H has no listed prerequisites
+        self.assertEqual([graph.level(c) for c in ("CMPSC 131", "MATH 140", "MATH 141", "CMPSC 360")], [0, 1, 1, 2])
+        self.assertIsNone(graph.level("ART 001"))
+    
+    def test_available_after_and_reload(self):
+        """Test "what can I take next" queries survive a save/load round trip"""
+        from lionpath import PrerequisiteGraph, save_optimized_results, graph_path
+        
+        output = os.path.join(self.temp_dir, "courses.jsonl.gz")
+        save_optimized_results(self.courses_data, output, 'jsonl', prereq_graph=True)
+        graph = PrerequisiteGraph.load(graph_path(output))
+        
+        self.assertEqual(graph.available_after(["CMPSC 131", "MATH 140"]), ["CMPSC 132", "MATH 141"])
+        self.assertEqual(graph.available_after(["CMPSC 132"]), [])
+        self.assertEqual(graph.available_after(["CMPSC 132", "MATH 141"]), ["CMPSC 360"])
+    
+    def test_cycle(self):
+        """Test courses on a requirement cycle get level -1 but still have closures"""
+        from lionpath import PrerequisiteGraph
+        
+        graph = PrerequisiteGraph({"A 100": [["B 100"]], "B 100": [["A 100"]], "C 100": [["B 100"]]})
+        self.assertEqual(graph.level("A 100"), -1)
+        self.assertEqual(graph.prerequisite_chain("C 100"), ["A 100", "B 100"])
+    
+    def test_self_reference(self):
+        """Test a course whose only requirement names itself has no prerequisites instead of an empty group"""
+        from lionpath import PrerequisiteGraph, parse_prerequisites
+        
+        graph = PrerequisiteGraph({"MATH 141H": parse_prerequisites("MATH 141H"), "MATH 230": [["MATH 141H", "MATH 230"]]})
+        self.assertEqual(graph.level("MATH 141H"), 0)
+        self.assertEqual(graph.prerequisites("MATH 141H"), [])
+        self.assertEqual(graph.level("MATH 230"), 1)
+        self.assertEqual(graph.available_after([]), [])
+
+
+class TestLazyReader(unittest.TestCase):
+    """Test the lazy JSONL reader, projections and subject pushdown"""
+    
+    def setUp(self):
+        """Save a snapshot spanning three subjects"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.courses_data = {}
+        for code in ("CMPSC 131", "CMPSC 132", "MATH 140", "E E 210"):
+            self.courses_data[code] = OptimizedCourseData(
+                course_info=CourseInfo(course_code=code, course_title=f"{code} title", subject=code.rsplit(' ', 1)[0],
+                                       course_description="A long description " * 20),
+                sections=[SectionInfo(section="001", class_number=code[-3:] + "01", instructor="Smith, John",
+                                      days="MoWe", start_time="9:05AM", end_time="9:55AM",
+                                      class_capacity=30, enrollment_total=28, available_seats=2)]
+            )
+    
+    def tearDown(self):
+        """Clean up temp files"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_projections(self):
+        """Test course-only and enrollment-only decoding"""
+        from lionpath import iter_courses
+        
+        output = os.path.join(self.temp_dir, "courses.jsonl.gz")
+        save_optimized_results(self.courses_data, output, 'jsonl')
+        
+        full = list(iter_courses(output))
+        self.assertEqual([c.course_info.course_code for c in full], list(self.courses_data))
+        self.assertEqual(full[0].sections[0].day_mask, 0b101)
+        
+        course_only = next(iter_courses(output, projection='course'))
+        self.assertEqual(course_only.course_info.course_title, "CMPSC 131 title")
+        self.assertEqual(course_only.sections, [])
+        
+        enrollment = next(iter_courses(output, projection='enrollment'))
+        self.assertEqual(enrollment.course_info.course_description, "")
+        self.assertEqual(enrollment.sections[0].available_seats, 2)
+        self.assertEqual(enrollment.sections[0].instructor, "")
+        
+        with self.assertRaises(ValueError):
+            next(iter_courses(output, projection='stats'))
+    
+    def test_subject_pushdown(self):
+        """Test subject filters read only their byte ranges through the sidecar index"""
+        from lionpath import iter_courses, load_offsets, offsets_path
+        from lionpath.writers import load_optimized_results
+        
+        output = os.path.join(self.temp_dir, "courses.jsonl")
+        save_optimized_results(self.courses_data, output, 'jsonl')
+        
+        # Corrupt the MATH record: a CMPSC/E E read must never touch it
+        with open(output, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        lines[2] = b'{' + b'x' * (len(lines[2]) - 2) + b'\n'
+        with open(output, 'wb') as f:
+            f.write(b''.join(lines))
+        
+        codes = [c.course_info.course_code for c in iter_courses(output, subjects=["cmpsc", "E E"])]
+        self.assertEqual(codes, ["CMPSC 131", "CMPSC 132", "E E 210"])
+        self.assertTrue(os.path.exists(offsets_path(output)))
+        self.assertEqual(load_offsets(output)['subjects']['CMPSC'], [[0, len(lines[0]) + len(lines[1])]])
+        self.assertEqual(list(load_optimized_results(output, subjects=["E E"])), ["E E 210"])
+        
+        # A rewritten snapshot makes the sidecar stale and it is rebuilt
+        save_optimized_results({"MATH 140": self.courses_data["MATH 140"]}, output, 'jsonl')
+        os.utime(output, ns=(1, 1))
+        self.assertEqual([c.course_info.course_code for c in iter_courses(output, subjects=["MATH"])], ["MATH 140"])
+        self.assertEqual(list(iter_courses(output, subjects=["CMPSC"])), [])
+
+
+class TestOffsetIndex(unittest.TestCase):
+    """Test the byte-offset sidecar written with JSONL snapshots"""
+    
+    def setUp(self):
+        """Build a catalog spanning two subjects"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.courses_data = {
+            code: OptimizedCourseData(
+                course_info=CourseInfo(course_code=code, course_title=f"{code} title"),
+                sections=[SectionInfo(section="001", class_number=str(10000 + i), available_seats=i)]
+            )
+            for i, code in enumerate(["CMPSC 131", "CMPSC 132", "MATH 140", "MATH 141", "STAT 200"])
+        }
+    
+    def tearDown(self):
+        """Clean up temp files"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_writer_emits_index(self):
+        """Test the writer's offsets point at the records without a rescan"""
+        from lionpath.reader import offsets_path, scan_offsets
+        
+        for name in ("courses.jsonl", "courses.jsonl.gz"):
+            output = os.path.join(self.temp_dir, name)
+            save_optimized_results(self.courses_data, output, 'jsonl')
+            with open(offsets_path(output)) as f:
+                written = json.load(f)
+            self.assertEqual(written, scan_offsets(output))
+            math_140, math_141 = written['courses']['MATH 140'], written['courses']['MATH 141']
+            self.assertEqual(written['subjects']['MATH'], [[math_140[0], math_141[0] + math_141[1]]])
+    
+    def test_random_access(self):
+        """Test single-course and subject reads from plain (mmap) and compressed snapshots"""
+        from lionpath.reader import SnapshotReader
+        
+        for name in ("courses.jsonl", "courses.jsonl.gz"):
+            output = os.path.join(self.temp_dir, name)
+            save_optimized_results(self.courses_data, output, 'jsonl')
+            with SnapshotReader(output) as reader:
+                self.assertEqual(reader.course("math 141").sections[0].class_number, "10003")
+                self.assertIsNone(reader.course("ART 001"))
+                self.assertEqual([c.course_info.course_code for c in reader.subject("CMPSC", projection='course')],
+                                 ["CMPSC 131", "CMPSC 132"])
+    
+    def test_parallel_validation(self):
+        """Test byte-range partitions cover every line and parallel validation agrees with a serial pass"""
+        from lionpath.reader import load_offsets, partition_spans
+        from validate_jsonl import can_split, check_lines, check_parallel
+        from compressed_io import iter_jsonl_lines
+        
+        output = os.path.join(self.temp_dir, "courses.jsonl.gz")
+        save_optimized_results(self.courses_data, output, 'jsonl')
+        plain = os.path.join(self.temp_dir, "plain.jsonl")
+        save_optimized_results(self.courses_data, plain, 'jsonl')
+        # Only an uncompressed file with its offset index is fanned out
+        self.assertEqual((can_split(output), can_split(plain)), (False, True))
+        os.remove(plain + '.offsets.json')
+        self.assertFalse(can_split(plain))
+        
+        spans = partition_spans(load_offsets(output), 3)
+        self.assertEqual(len(spans), 3)
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(sum(length for _, length in spans), load_offsets(output)['data_size'])
+        
+        serial = check_lines(iter_jsonl_lines(output))
+        self.assertEqual(check_parallel(output, 3), serial)
+        self.assertEqual(serial[:3], (5, 5, []))
+
+
+class TestResponseArchive(unittest.TestCase):
+    """Test recording raw responses and replaying them without a network"""
+    
+    def setUp(self):
+        """Serve a fake search page and results page from a local HTTP server"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs
+        import threading
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.requests_seen = []
+        self.posted = []
+        seen = self.requests_seen
+        posted = self.posted
+        
+        class FakeLionPath(BaseHTTPRequestHandler):
+            def do_GET(self):
+                seen.append('GET')
+                # A fresh ICSID on every load, like PeopleSoft
+                self.reply(f'<input name="ICSID" value="{len(seen)}"><input name="ICStateNum" value="{len(seen)}">')
+            
+            def do_POST(self):
+                seen.append('POST')
+                posted.append(parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')))
+                self.reply('<a href="javascript:showClassDetails(2258,12345)">CMPSC 131 - 001</a>')
+            
+            def reply(self, html):
+                body = html.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeLionPath)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+    
+    def tearDown(self):
+        """Clean up temp files"""
+        import shutil
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def make_engine(self):
+        from lionpath import LionPathEngine
+        engine = LionPathEngine(rate_limit_per_second=100, pool_size=2)
+        engine.search_url = self.url
+        return engine
+    
+    def test_request_key_ignores_page_state(self):
+        """Test PeopleSoft state fields do not change the key but the action and term do"""
+        from lionpath import request_key
+        
+        key = request_key('POST', self.url, 'ICSID=1&ICStateNum=4&ICAction=SUBJ%240&SUBJ%240=Y')
+        self.assertEqual(key, request_key('POST', self.url, b'ICSID=9&ICAction=SUBJ%240&ICStateNum=7&SUBJ%240=Y'))
+        self.assertNotEqual(key, request_key('POST', self.url, 'ICAction=SUBJ%241&SUBJ%241=Y'))
+        self.assertEqual(request_key('GET', self.url + '?b=2&a=1'), request_key('GET', self.url + '?a=1&b=2'))
+    
+    def test_record_then_replay(self):
+        """Test recorded pages replay with no network and repeated bodies are stored once"""
+        from lionpath import ResponseArchive
+        
+        archive_dir = os.path.join(self.temp_dir, "archive")
+        archive = ResponseArchive(archive_dir, writable=True)
+        engine = self.make_engine()
+        engine.use_archive(archive)
+        session = engine.get_session()
+        live_html = engine.search_subject(session, 'SUBJ$0')
+        engine.search_subject(session, 'SUBJ$0')
+        engine.fetch_search_page(session)
+        archive.close()
+        self.assertEqual(self.requests_seen, ['GET', 'POST', 'GET', 'POST', 'GET'])
+        
+        replay_archive = ResponseArchive(archive_dir)
+        # Five responses under two keys: three distinct search pages, one results body stored once
+        self.assertEqual(len(list(replay_archive.iter_records())), 5)
+        self.assertEqual(replay_archive.stats(), {'records': 2, 'bodies': 4})
+        
+        self.server.shutdown()
+        replay = self.make_engine()
+        replay.use_archive(replay_archive, replay=True)
+        session = replay.get_session()
+        self.assertEqual(replay.search_subject(session, 'SUBJ$0'), live_html)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            replay.search_subject(session, 'SUBJ$1')
+        self.assertEqual(len(self.requests_seen), 5)
+        replay_archive.close()
+    
+    def test_batched_subject_search(self):
+        """Test several subject checkboxes are ticked in one search post"""
+        engine = self.make_engine()
+        engine.search_subjects(engine.get_session(), ['SUBJ$0', 'SUBJ$3'])
+        
+        self.assertEqual(self.requests_seen, ['GET', 'POST'])
+        self.assertEqual(self.posted[0]['SUBJ$0'], ['Y'])
+        self.assertEqual(self.posted[0]['SUBJ$3'], ['Y'])
+    
+    def test_campus_criterion_posted(self):
+        """Test the subject search sends the campus criterion only when a campus is set"""
+        from lionpath import CAMPUS_FORM_FIELD
+        
+        engine = self.make_engine()
+        session = engine.get_session()
+        engine.search_subject(session, 'SUBJ$0')
+        engine.campus = 'UP'
+        engine.search_subject(session, 'SUBJ$0')
+        
+        self.assertNotIn(CAMPUS_FORM_FIELD, self.posted[0])
+        self.assertEqual(self.posted[1][CAMPUS_FORM_FIELD], ['UP'])
+        self.assertEqual(self.posted[1]['SUBJ$0'], ['Y'])
+
+
+class TestArchiveReparse(unittest.TestCase):
+    """Test rebuilding a snapshot from archived pages in a process pool"""
+    
+    def setUp(self):
+        """Archive one results page (two UP sections, one World Campus) and detail pages for class 12345"""
+        from lionpath import ResponseArchive, request_key, SEARCH_URL, DETAIL_URL
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.archive_dir = os.path.join(self.temp_dir, "archive")
+        archive = ResponseArchive(self.archive_dir, writable=True)
+        
+        def add(method, url, body, form=None):
+            archive.add(request_key(method, url, form), method, url, 200,
+                        {'Content-Type': 'text/html; charset=utf-8'}, body.encode('utf-8'))
+        
+        add('GET', SEARCH_URL + '?Page=PE_SR175_CLS_SRCH&Action=U', '<input name="ICSID" value="1">')
+        add('POST', SEARCH_URL, (
+            '<a href="javascript:showClassDetails(2258,12345)">CMPSC 131 - 001 - University Park</a>'
+            '<a href="javascript:showClassDetails(2258,12346)">CMPSC 131 - 002 - University Park</a>'
+            '<a href="javascript:showClassDetails(2258,12347)">CMPSC 131 - 001W - World Campus</a>'
+        ), 'ICAction=PTS_SELECT%240&PTS_SELECT%240=Y')
+        detail = DETAIL_URL + '?Page=SSR_SSENRL_DETAIL&Action=A&STRM=2258&CLASS_NBR=12345&ACAD_CAREER='
+        add('GET', detail + 'GRAD', '<p>No class found</p>')
+        add('GET', detail + 'UGRD', (
+            '<div>CMPSC 131 PROGRAMMING AND COMPUTATION I\nUnits: 3.00\nGrading: Letter Grade\n'
+            'Class Capacity: 40 Enrollment Total: 38 Available Seats: 2 Status: Open</div>'
+        ))
+        archive.close()
+    
+    def tearDown(self):
+        """Clean up temp files"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_reparse_archive(self):
+        """Test listing and detail pages are parsed in worker processes and assembled into courses"""
+        from lionpath import ArchiveReparser, ResponseArchive
+        
+        archive = ResponseArchive(self.archive_dir)
+        reparser = ArchiveReparser(archive, workers=2)
+        snapshots = reparser.reparse()
+        archive.close()
+        
+        self.assertEqual(list(snapshots), ['2258'])
+        batches = list(snapshots['2258'])
+        self.assertEqual([list(batch) for batch in batches], [['CMPSC 131']])
+        course = batches[0]['CMPSC 131']
+        self.assertEqual([s.class_number for s in course.sections], ['12345', '12346'])
+        self.assertEqual(course.sections[0].class_capacity, 40)
+        self.assertEqual(course.sections[0].status, 'Open')
+        self.assertEqual(course.sections[1].class_capacity, 0)
+        self.assertFalse(hasattr(course.sections[0], 'course_code'))
+        self.assertEqual(course.course_info.course_title, 'PROGRAMMING AND COMPUTATION I')
+        self.assertEqual(course.course_info.units, '3.00')
+        self.assertEqual(course.course_info.career, 'Undergraduate')
+        self.assertEqual(course.course_info.semester, 'Fall 2025')
+        self.assertEqual(reparser.stats['listing_pages'], 1)
+        self.assertEqual(reparser.stats['detail_pages'], 1)
+        self.assertEqual(reparser.stats['empty_pages'], 1)
+
+    def test_reparse_keeps_listed_fields_a_detail_page_lacks(self):
+        """Test a detail page without status or seats leaves the values its results row showed"""
+        from lionpath import ArchiveReparser, ResponseArchive, request_key, SEARCH_URL, DETAIL_URL
+
+        archive_dir = os.path.join(self.temp_dir, "listed")
+        archive = ResponseArchive(archive_dir, writable=True)
+
+        def add(method, url, body, form=None):
+            archive.add(request_key(method, url, form), method, url, 200,
+                        {'Content-Type': 'text/html; charset=utf-8'}, body.encode('utf-8'))
+
+        add('POST', SEARCH_URL, (
+            '<tr><td><a href="javascript:showClassDetails(2258,12345)">CMPSC 131 - 001 - University Park</a></td>'
+            '<td>Closed</td><td>Class Capacity 40 Enrollment Total 40 Available Seats 0 '
+            'Wait List Capacity 15 Wait List Total 9</td></tr>'
+        ), 'ICAction=PTS_SELECT%240&PTS_SELECT%240=Y')
+        add('GET', DETAIL_URL + '?Page=SSR_SSENRL_DETAIL&Action=A&STRM=2258&CLASS_NBR=12345&ACAD_CAREER=UGRD',
+            '<div>CMPSC 131 PROGRAMMING AND COMPUTATION I\nUnits: 3.00\nClass Number 12345</div>')
+        archive.close()
+
+        archive = ResponseArchive(archive_dir)
+        batches = list(ArchiveReparser(archive, workers=1).reparse()['2258'])
+        archive.close()
+
+        course = batches[0]['CMPSC 131']
+        section = course.sections[0]
+        self.assertEqual(course.course_info.units, '3.00')
+        self.assertEqual(course.course_info.subject, 'CMPSC')
+        self.assertEqual(course.course_info.catalog_number, '131')
+        self.assertEqual(section.status, 'Closed')
+        self.assertEqual((section.class_capacity, section.enrollment_total), (40, 40))
+        self.assertEqual((section.waitlist_capacity, section.waitlist_total), (15, 9))
+
+    def test_reparse_command_writes_snapshot(self):
+        """Test python -m lionpath reparse writes a loadable snapshot"""
+        from lionpath import load_optimized_results
+        from lionpath.__main__ import main
+        
+        output_file = os.path.join(self.temp_dir, "reparsed.jsonl")
+        self.assertEqual(main(['reparse', self.archive_dir, '--output', output_file, '--workers', '1']), 0)
+        courses = load_optimized_results(output_file)
+        self.assertEqual(list(courses), ['CMPSC 131'])
+        self.assertEqual(courses['CMPSC 131'].get_total_enrollment(), 38)
+
+    def test_save_course_batches_streams_jsonl(self):
+        """Test courses written a subject at a time load back whole, with their offsets and graph"""
+        from lionpath import iter_courses, load_optimized_results, save_course_batches
+        from lionpath.prereqs import PrerequisiteGraph, graph_path
+
+        def course(code, requirements=''):
+            info = CourseInfo(course_code=code, enrollment_requirements=requirements)
+            return OptimizedCourseData(course_info=info, sections=[SectionInfo(class_number=code[-3:], class_capacity=10)])
+
+        batches = iter([{'CMPSC 131': course('CMPSC 131'), 'CMPSC 132': course('CMPSC 132', 'Prerequisite: CMPSC 131')},
+                        {'MATH 140': course('MATH 140')}])
+        output_file = os.path.join(self.temp_dir, "streamed.jsonl.gz")
+        self.assertEqual(save_course_batches(batches, output_file, prereq_graph=True), 3)
+
+        self.assertEqual(list(load_optimized_results(output_file)), ['CMPSC 131', 'CMPSC 132', 'MATH 140'])
+        math = list(iter_courses(output_file, subjects=['MATH']))
+        self.assertEqual([(c.course_info.course_code, c.sections[0].class_capacity) for c in math], [('MATH 140', 10)])
+        self.assertEqual(PrerequisiteGraph.load(graph_path(output_file)).prerequisites('CMPSC 132'), ['CMPSC 131'])
+
+    def test_course_title_not_taken_from_labels(self):
+        """Test a class number label is not read as a course code and title"""
+        from lionpath import parse_course_level_info
+
+        html = ('<div>Class Number 12345 Section 001\nCMPSC 131 - Programming and Computation I\n'
+                'Units: 3.00\n</div>')
+        info = parse_course_level_info(html, CourseInfo(course_code='CMPSC 131'))
+        self.assertEqual((info.course_code, info.course_title), ('CMPSC 131', 'Programming and Computation I'))
 
 
 class TestIntegration(unittest.TestCase):
@@ -522,6 +2103,16 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestOptimizedCourseData))
     suite.addTests(loader.loadTestsFromTestCase(TestOptimizedLionPathScraper))
     suite.addTests(loader.loadTestsFromTestCase(TestSaveOptimizedResults))
+    suite.addTests(loader.loadTestsFromTestCase(TestSnapshotDelta))
+    suite.addTests(loader.loadTestsFromTestCase(TestLionPathCore))
+    suite.addTests(loader.loadTestsFromTestCase(TestEnrollmentWatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestQueryServer))
+    suite.addTests(loader.loadTestsFromTestCase(TestSearchIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestScheduleIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestPrerequisiteGraph))
+    suite.addTests(loader.loadTestsFromTestCase(TestLazyReader))
+    suite.addTests(loader.loadTestsFromTestCase(TestOffsetIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestResponseArchive))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
     suite.addTests(loader.loadTestsFromTestCase(TestErrorHandling))
     suite.addTests(loader.loadTestsFromTestCase(TestPerformance))
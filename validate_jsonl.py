@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Validate an optimized-format JSONL snapshot
+Streams the file (decompressing .gz/.zst on the fly) instead of reading it into memory; with
+--workers, byte ranges from an uncompressed snapshot's offset index are validated in parallel processes
+"""
+
+import argparse
+import concurrent.futures
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from compressed_io import compression_for_path, iter_jsonl_lines
+from lionpath.reader import load_offsets, partition_spans, read_spans
+
+def check_lines(lines: Iterable[bytes]) -> Tuple[int, int, List[int], Optional[Dict[str, Any]]]:
+    """Count non-empty lines, valid records and invalid line numbers (1-based, relative to the lines given)"""
+    total_lines = 0
+    valid_lines = 0
+    invalid_lines = []
+    sample = None
+
+    for i, line in enumerate((line for line in lines if line.strip()), 1):
+        total_lines += 1
+        try:
+            data = json.loads(line)
+            if "course" in data and "sections" in data:
+                valid_lines += 1
+                if sample is None:
+                    sample = data.get("course", {})
+            else:
+                invalid_lines.append(i)
+        except json.JSONDecodeError:
+            invalid_lines.append(i)
+
+    return total_lines, valid_lines, invalid_lines, sample
+
+def check_span(filepath: str, offset: int, length: int) -> Tuple[int, int, List[int], Optional[Dict[str, Any]]]:
+    """Validate one byte range of the decompressed snapshot (runs in a worker process)"""
+    chunk = next(read_spans(filepath, [(offset, length)]), b'')
+    return check_lines(chunk.splitlines())
+
+def can_split(filepath: str) -> bool:
+    """Whether workers can seek straight to their byte ranges: the file is uncompressed and has a current
+    offset index (every worker of a compressed file would decompress from the start to reach its range)"""
+    return compression_for_path(filepath) is None and load_offsets(filepath, build=False) is not None
+
+def check_parallel(filepath: str, workers: int) -> Tuple[int, int, List[int], Optional[Dict[str, Any]]]:
+    """Validate byte ranges in parallel and merge their results in file order"""
+    spans = partition_spans(load_offsets(filepath), workers)
+    total_lines = 0
+    valid_lines = 0
+    invalid_lines = []
+    sample = None
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(check_span, filepath, offset, length) for offset, length in spans]
+        for future in futures:
+            span_total, span_valid, span_invalid, span_sample = future.result()
+            invalid_lines.extend(total_lines + i for i in span_invalid)
+            total_lines += span_total
+            valid_lines += span_valid
+            sample = sample or span_sample
+
+    return total_lines, valid_lines, invalid_lines, sample
+
+def validate_jsonl(filepath: str, workers: int = 1) -> bool:
+    """Check every line is a JSON record with course and sections blocks"""
+    try:
+        if workers > 1 and not can_split(filepath):
+            print(f"ℹ️ {filepath} is compressed or has no offset index; validating in one pass")
+            workers = 1
+        if workers > 1:
+            total_lines, valid_lines, invalid_lines, sample = check_parallel(filepath, workers)
+        else:
+            total_lines, valid_lines, invalid_lines, sample = check_lines(iter_jsonl_lines(filepath))
+    except Exception as e:
+        print(f"💥 Validation error: {e}")
+        return False
+
+    if not total_lines:
+        print("❌ File is empty")
+        return False
+
+    print(f"📊 Validation Results:")
+    print(f"  Total lines: {total_lines}")
+    print(f"  Valid records: {valid_lines}")
+    print(f"  Invalid records: {len(invalid_lines)}")
+
+    if invalid_lines:
+        print(f"❌ Invalid lines: {invalid_lines[:5]}")
+        return False
+
+    print(f"✅ All {valid_lines} records are valid!")
+    print(f"📚 Sample: {sample.get('course_code', 'N/A')} - {sample.get('course_title', 'N/A')}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Validate an optimized JSONL snapshot')
+    parser.add_argument('file', help='Snapshot (.jsonl, .jsonl.gz or .jsonl.zst)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Validate byte ranges in this many processes; needs an uncompressed file with an offset index (default: 1)')
+    args = parser.parse_args()
+    sys.exit(0 if validate_jsonl(args.file, args.workers) else 1)